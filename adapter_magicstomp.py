@@ -19,7 +19,9 @@ from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tupl
 
 import mido
 
+from magicstomp_patch import Patch
 from magicstomp_sysex import ParameterLocation, build_parameter_message
+from sysex_inventory import get_parameter_locations, load_inventory
 
 # ---------------------------------------------------------------------------
 # Chargement du mapping MagicstompFrenzy
@@ -30,26 +32,42 @@ from magicstomp_sysex import ParameterLocation, build_parameter_message
 class _MappingEntry:
     effect: str
     label: str
-    transform: Callable[["MagicstompAdapter", Any], Optional[int]]
+    transform: Callable[[Any], Optional[int]]
+    inverse: Optional[Callable[[int], Any]] = None
 
 
 class _SysexInventory:
-    """Expose les offsets calculés par :mod:`auto_sysex_mapper`."""
+    """Expose les offsets calculés par :mod:`auto_sysex_mapper`.
+
+    Sans chemin explicite, les tables précompilées de :mod:`sysex_inventory`
+    sont partagées par tous les adaptateurs du processus.
+    """
 
     def __init__(self, inventory_path: Optional[Path] = None) -> None:
         if inventory_path is None:
-            inventory_path = Path(__file__).with_name("sysex_inventory.json")
+            self._effects: Dict[str, Dict[str, ParameterLocation]] = get_parameter_locations()
+            self._types: Dict[str, int] = {
+                effect_name: entry[0] for effect_name, entry in load_inventory().items()
+            }
+            return
 
         with inventory_path.open(encoding="utf-8") as handle:
             data = json.load(handle)
 
-        self._effects: Dict[str, Dict[str, ParameterLocation]] = {}
+        self._effects = {}
+        self._types = {}
         for effect_name, info in data.get("effects", {}).items():
             effect_map: Dict[str, ParameterLocation] = {}
             for entry in info.get("parameters", []):
                 location = ParameterLocation(entry["global_offset"], entry["label"])
                 effect_map[entry["label"]] = location
             self._effects[effect_name] = effect_map
+            if "effect_id" in info:
+                self._types[effect_name] = info["effect_id"]
+
+    def effect_type(self, effect: str) -> Optional[int]:
+        """Type d'effet (octet 1 de la section common), None si inconnu."""
+        return self._types.get(effect)
 
     def get(self, effect: str, label: str) -> ParameterLocation:
         try:
@@ -68,7 +86,7 @@ class _SysexInventory:
 class MagicstompAdapter:
     """Convertit un patch JSON en messages SysEx Magicstomp."""
 
-    ValueTransform = Callable[["MagicstompAdapter", Any], Optional[int]]
+    ValueTransform = Callable[[Any], Optional[int]]
 
     def __init__(self, device_id: int = 0x00):
         self.device_id = device_id
@@ -102,52 +120,52 @@ class MagicstompAdapter:
         self.parameter_mappings: Dict[Tuple[str, str], _MappingEntry] = {
             # Amplificateur (AmpMultiFlange regroupe les contrôles amp)
             ("amp", "model"): _MappingEntry(
-                "AmpMultiFlange", "Amp Type", self._transform_amp_model
+                "AmpMultiFlange", "Amp Type", self._transform_amp_model, self._inverse_amp_model
             ),
             ("amp", "gain"): _MappingEntry(
-                "AmpMultiFlange", "Gain", self._transform_normalized
+                "AmpMultiFlange", "Gain", self._transform_normalized, self._inverse_normalized
             ),
             ("amp", "bass"): _MappingEntry(
-                "AmpMultiFlange", "Bass", self._transform_normalized
+                "AmpMultiFlange", "Bass", self._transform_normalized, self._inverse_normalized
             ),
             ("amp", "mid"): _MappingEntry(
-                "AmpMultiFlange", "Middle", self._transform_normalized
+                "AmpMultiFlange", "Middle", self._transform_normalized, self._inverse_normalized
             ),
             ("amp", "treble"): _MappingEntry(
-                "AmpMultiFlange", "Treble", self._transform_normalized
+                "AmpMultiFlange", "Treble", self._transform_normalized, self._inverse_normalized
             ),
             ("amp", "presence"): _MappingEntry(
-                "AmpMultiFlange", "Presence", self._transform_normalized
+                "AmpMultiFlange", "Presence", self._transform_normalized, self._inverse_normalized
             ),
             # Delay (MonoDelay)
             ("delay", "time_ms"): _MappingEntry(
-                "MonoDelay", "Time", self._transform_delay_time
+                "MonoDelay", "Time", self._transform_delay_time, self._inverse_delay_time
             ),
             ("delay", "feedback"): _MappingEntry(
-                "MonoDelay", "Feedback", self._transform_normalized
+                "MonoDelay", "Feedback", self._transform_normalized, self._inverse_normalized
             ),
             ("delay", "mix"): _MappingEntry(
-                "MonoDelay", "Level", self._transform_normalized
+                "MonoDelay", "Level", self._transform_normalized, self._inverse_normalized
             ),
             # Reverb
             ("reverb", "type"): _MappingEntry(
-                "Reverb", "Type", self._transform_reverb_type
+                "Reverb", "Type", self._transform_reverb_type, self._inverse_reverb_type
             ),
             ("reverb", "decay_s"): _MappingEntry(
-                "Reverb", "Decay", self._transform_reverb_decay
+                "Reverb", "Decay", self._transform_reverb_decay, self._inverse_reverb_decay
             ),
             ("reverb", "mix"): _MappingEntry(
-                "Reverb", "Mix", self._transform_normalized
+                "Reverb", "Mix", self._transform_normalized, self._inverse_normalized
             ),
             # Modulation : on se base sur l'effet Chorus pour la vitesse/profondeur
             ("mod", "rate_hz"): _MappingEntry(
-                "Chorus", "Frequency", self._transform_mod_rate
+                "Chorus", "Frequency", self._transform_mod_rate, self._inverse_mod_rate
             ),
             ("mod", "depth"): _MappingEntry(
-                "Chorus", "Depth", self._transform_normalized
+                "Chorus", "Depth", self._transform_normalized, self._inverse_normalized
             ),
             ("mod", "mix"): _MappingEntry(
-                "Chorus", "Feedback", self._transform_normalized
+                "Chorus", "Feedback", self._transform_normalized, self._inverse_normalized
             ),
         }
 
@@ -197,6 +215,30 @@ class MagicstompAdapter:
         ratio = (math.log(rate) - math.log(0.1)) / (math.log(10.0) - math.log(0.1))
         return self._clamp_7bit(ratio * 127)
 
+    # Transformations inverses (valeur brute → valeur JSON)
+
+    @staticmethod
+    def _inverse_normalized(raw: int) -> float:
+        return raw / 127
+
+    def _inverse_amp_model(self, raw: int) -> Optional[str]:
+        return next((name for name, value in self.amp_models.items() if value == raw), None)
+
+    @staticmethod
+    def _inverse_delay_time(raw: int) -> float:
+        return math.exp(raw / 127 * math.log(2000.0))
+
+    def _inverse_reverb_type(self, raw: int) -> Optional[str]:
+        return next((name for name, value in self.reverb_types.items() if value == raw), None)
+
+    @staticmethod
+    def _inverse_reverb_decay(raw: int) -> float:
+        return raw / 127 * 6.0
+
+    @staticmethod
+    def _inverse_mod_rate(raw: int) -> float:
+        return 0.1 * math.exp(raw / 127 * (math.log(10.0) - math.log(0.1)))
+
     # ------------------------------------------------------------------
     # Conversion principale
     # ------------------------------------------------------------------
@@ -222,7 +264,7 @@ class MagicstompAdapter:
                 continue
 
             raw_value = section_data[key]
-            value = mapping.transform(self, raw_value)
+            value = mapping.transform(raw_value)
             if value is None:
                 continue
 
@@ -241,6 +283,76 @@ class MagicstompAdapter:
         print(f"✅ {len(messages)} message(s) SysEx généré(s)")
         return messages
 
+    def _json_effect(self, patch: Dict[str, Any]) -> Optional[str]:
+        """Effet ciblé par un patch JSON, None s'il en mélange plusieurs.
+
+        La section amp ne compte que si elle est seule : ses offsets ne
+        recouvrent ceux d'aucune autre section.
+        """
+
+        effects = {
+            mapping.effect
+            for (section, key), mapping in self.parameter_mappings.items()
+            if section != "amp"
+            and isinstance(patch.get(section), dict)
+            and patch[section].get("enabled", True) is not False
+            and key in patch[section]
+        }
+        if not effects and isinstance(patch.get("amp"), dict):
+            effects = {self.parameter_mappings[("amp", "gain")].effect}
+        return effects.pop() if len(effects) == 1 else None
+
+    def json_to_patch(
+        self, patch_json: Union[Dict[str, Any], str], base: Optional[Patch] = None
+    ) -> Patch:
+        """Applique un patch JSON sur ``base`` (patch vide par défaut).
+
+        ``base`` n'est pas modifié : le résultat en est un clone. Sans
+        ``base``, le type d'effet est celui de l'unique effet ciblé par le
+        JSON (le patch reste sans type s'il en cible plusieurs).
+        """
+
+        patch_json = self._load_patch(patch_json)
+        patch = base.clone() if base is not None else Patch()
+        if base is None:
+            effect = self._json_effect(patch_json)
+            effect_type = self.inventory.effect_type(effect) if effect else None
+            if effect_type is not None:
+                patch[1] = effect_type
+        patch.apply_messages(self._iter_parameter_messages(patch_json))
+        return patch
+
+    def patch_to_json(self, patch: Patch) -> Dict[str, Any]:
+        """Relit les valeurs JSON couvertes par ``parameter_mappings``.
+
+        Les valeurs sont celles des octets du patch (quantifiées sur 7 bits).
+        Plusieurs sections partagent des offsets (32, 40, 41...) : seules
+        les sections de l'effet du patch (``patch.effect_type``) sont relues,
+        la section amp ne l'étant que pour un patch AmpMultiFlange. Pour un
+        patch sans type connu, chaque offset n'est relu qu'une fois, par la
+        première section qui l'utilise.
+        """
+
+        effects = {mapping.effect for mapping in self.parameter_mappings.values()}
+        effect = next((name for name in effects
+                       if self.inventory.effect_type(name) == patch.effect_type), None)
+
+        result: Dict[str, Dict[str, Any]] = {}
+        claimed = set()
+        for (section, key), mapping in self.parameter_mappings.items():
+            if mapping.inverse is None:
+                continue
+            if effect is not None and mapping.effect != effect:
+                continue
+            location = self.inventory.get(mapping.effect, mapping.label)
+            if location.global_offset in claimed:
+                continue
+            claimed.add(location.global_offset)
+            value = mapping.inverse(patch[location.global_offset])
+            if value is not None:
+                result.setdefault(section, {})[key] = value
+        return result
+
     # ------------------------------------------------------------------
     # Entrées/Sorties
     # ------------------------------------------------------------------
@@ -8,37 +8,71 @@ un patch JSON compatible Magicstomp.
 
 Usage:
     python analyze2json.py input.wav [--output output.json] [--verbose]
+    python analyze2json.py remap library/ [--thresholds seuils.json]
 
 Fonctionnalités:
 - Détection d'effets (delay, reverb, chorus, phaser, distortion)
 - Mapping vers paramètres Magicstomp (amp, cab, drive, delay, reverb, mod)
 - Export JSON neutre avec scores de confiance
+- Sorties brutes des détecteurs sauvegardées à côté du patch
+  (``x.detectors.json``) : la commande ``remap`` réapplique les seuils de
+  ``config.py`` à toute une bibliothèque sans réanalyser l'audio
 """
 
 import librosa
 import numpy as np
+import copy
 import json
 import argparse
+import os
 import sys
+import time
 from pathlib import Path
-from typing import Dict, Any, Tuple, Optional
+from typing import Dict, Any, Iterable, List, Tuple, Optional, Union
 from scipy import signal
 from scipy.stats import kurtosis
 
+from config import AMP_MODELS, DETECTION_THRESHOLDS
+
+# Version du format des sorties brutes des détecteurs
+DETECTORS_VERSION = "1.0"
+DETECTORS_SUFFIX = ".detectors.json"
+
+# Nombre de pics d'auto-corrélation conservés pour la décision du delay
+MAX_STORED_PEAKS = 32
+
+# Seuils appliqués pendant la mesure (les autres ne servent qu'aux décisions)
+MEASUREMENT_THRESHOLDS = {
+    "delay": ("min_delay_samples", "min_delay_ms", "max_delay_ms"),
+    "modulation": ("low_freq_cutoff_hz", "max_mod_rate_hz"),
+    "distortion": ("clipping_threshold",)
+}
+
+# Modèle retenu quand aucune borne spectrale de AMP_MODELS ne correspond
+DEFAULT_AMP_MODEL = "JCM800"
+
 
 class AudioAnalyzer:
     """Analyseur audio pour extraction de features guitare."""
     
-    def __init__(self, sample_rate: int = 44100):
+    def __init__(self, sample_rate: int = 44100, thresholds: Optional[Dict[str, Any]] = None,
+                 amp_models: Optional[Dict[str, Any]] = None, quiet: bool = False):
         """
         Initialise l'analyseur audio.
         
         Args:
             sample_rate: Fréquence d'échantillonnage cible
+            thresholds: Seuils de détection (``config.DETECTION_THRESHOLDS`` par défaut)
+            amp_models: Modèles d'ampli (``config.AMP_MODELS`` par défaut)
+            quiet: N'affiche pas le détail des décisions (remap de bibliothèque)
         """
         self.sample_rate = sample_rate
+        self.thresholds = thresholds if thresholds is not None else DETECTION_THRESHOLDS
+        self.amp_models = amp_models if amp_models is not None else AMP_MODELS
+        self.quiet = quiet
         self.features = {}
         self.confidence_scores = {}
+        self.detectors: Dict[str, Any] = {}
     
     def load_audio(self, file_path: str) -> np.ndarray:
         """
@@ -106,19 +140,25 @@ class AudioAnalyzer:
         
         return features
     
-    def detect_delay(self, y: np.ndarray) -> Tuple[bool, Dict[str, float]]:
+    # ------------------------------------------------------------------
+    # Mesures brutes des détecteurs (indépendantes des seuils de décision)
+    # ------------------------------------------------------------------
+    
+    def measure_delay(self, y: np.ndarray) -> Dict[str, Any]:
         """
-        Détecte la présence et les paramètres de delay.
+        Mesure les pics d'auto-corrélation candidats au delay.
         
-        Heuristique: Auto-corrélation pour trouver des répétitions périodiques.
+        Seule la fenêtre de recherche (``min_delay_ms`` / ``max_delay_ms``)
+        et l'écart entre pics (``min_delay_samples``) interviennent ici ; la
+        hauteur minimale est appliquée par :meth:`decide_delay`.
         
         Args:
             y: Signal audio
-            
+        
         Returns:
-            Tuple (présence_delay, paramètres)
+            ``{'peaks': [[délai_ms, hauteur], ...]}`` trié par hauteur décroissante
         """
-        print("⏰ Détection du delay...")
+        thresholds = self.thresholds['delay']
         
         # Auto-corrélation
         autocorr = np.correlate(y, y, mode='full')
@@ -128,53 +168,29 @@ class AudioAnalyzer:
         autocorr = autocorr / np.max(autocorr)
         
         # Recherche des pics après le premier (delay)
-        # Ignore les premiers 10ms (latence minimum)
-        min_delay_samples = int(0.01 * self.sample_rate)
-        search_window = autocorr[min_delay_samples:min(len(autocorr), int(2.0 * self.sample_rate))]
+        # Ignore les premiers ms (latence minimum)
+        min_delay_samples = int(thresholds['min_delay_ms'] / 1000 * self.sample_rate)
+        max_delay_samples = int(thresholds['max_delay_ms'] / 1000 * self.sample_rate)
+        search_window = autocorr[min_delay_samples:min(len(autocorr), max_delay_samples)]
         
-        # Détecte les pics significatifs
-        peaks, properties = signal.find_peaks(search_window, height=0.3, distance=100)
+        peaks, _ = signal.find_peaks(search_window, distance=thresholds['min_delay_samples'])
+        peaks = peaks[np.argsort(search_window[peaks])[::-1][:MAX_STORED_PEAKS]]
         
-        if len(peaks) > 0:
-            # Prend le pic le plus fort
-            best_peak_idx = peaks[np.argmax(search_window[peaks])]
-            delay_time_ms = (best_peak_idx + min_delay_samples) * 1000 / self.sample_rate
-            
-            # Estime le feedback basé sur l'amplitude du pic
-            feedback = min(0.8, search_window[best_peak_idx] * 1.5)
-            
-            # Estime le mix basé sur l'énergie relative
-            mix = min(0.4, feedback * 0.6)
-            
-            confidence = min(0.95, search_window[best_peak_idx] * 1.2)
-            
-            print(f"   ✅ Delay détecté: {delay_time_ms:.0f}ms, feedback={feedback:.2f}, mix={mix:.2f}")
-            print(f"   📊 Confiance: {confidence:.2f}")
-            
-            return True, {
-                'time_ms': delay_time_ms,
-                'feedback': feedback,
-                'mix': mix,
-                'confidence': confidence
-            }
-        else:
-            print("   ❌ Aucun delay détecté")
-            return False, {'confidence': 0.0}
+        return {
+            'peaks': [[(int(peak) + min_delay_samples) * 1000 / self.sample_rate, float(search_window[peak])]
+                      for peak in peaks]
+        }
     
-    def detect_reverb(self, y: np.ndarray) -> Tuple[bool, Dict[str, float]]:
+    def measure_reverb(self, y: np.ndarray) -> Dict[str, Any]:
         """
-        Détecte la présence et les paramètres de reverb.
-        
-        Heuristique: Analyse de la queue de réverbération et des caractéristiques spectrales.
+        Mesure la queue de réverbération et la densité haute fréquence.
         
         Args:
             y: Signal audio
-            
+        
         Returns:
-            Tuple (présence_reverb, paramètres)
+            ``{'decay_time_s', 'high_freq_ratio'}``
         """
-        print("🏛️ Détection de la reverb...")
-        
         # Analyse de la queue de réverbération
         # Trouve le point où l'enveloppe descend en dessous de 10% du max
         envelope = np.abs(y)
@@ -199,61 +215,30 @@ class AudioAnalyzer:
         high_freq_energy = np.mean(magnitude[high_freq_mask, :])
         total_energy = np.mean(magnitude)
         
-        high_freq_ratio = high_freq_energy / (total_energy + 1e-8)
-        
-        # Détection basée sur la queue et la densité spectrale
-        has_reverb = decay_time_s > 0.8 and high_freq_ratio > 0.1
-        
-        if has_reverb:
-            # Estime le type de reverb basé sur la décroissance
-            if decay_time_s > 2.0:
-                reverb_type = "HALL"
-                decay_s = min(3.0, decay_time_s)
-            elif decay_time_s > 1.2:
-                reverb_type = "PLATE"
-                decay_s = min(2.0, decay_time_s)
-            else:
-                reverb_type = "ROOM"
-                decay_s = min(1.5, decay_time_s)
-            
-            # Estime le mix basé sur l'énergie relative
-            mix = min(0.3, high_freq_ratio * 2.0)
-            
-            confidence = min(0.9, (decay_time_s - 0.5) / 2.0 + high_freq_ratio)
-            
-            print(f"   ✅ Reverb détectée: {reverb_type}, decay={decay_s:.1f}s, mix={mix:.2f}")
-            print(f"   📊 Confiance: {confidence:.2f}")
-            
-            return True, {
-                'type': reverb_type,
-                'decay_s': decay_s,
-                'mix': mix,
-                'confidence': confidence
-            }
-        else:
-            print("   ❌ Aucune reverb détectée")
-            return False, {'confidence': 0.0}
+        return {
+            'decay_time_s': float(decay_time_s),
+            'high_freq_ratio': float(high_freq_energy / (total_energy + 1e-8))
+        }
     
-    def detect_modulation(self, y: np.ndarray) -> Tuple[bool, Dict[str, float]]:
+    def measure_modulation(self, y: np.ndarray) -> Dict[str, Any]:
         """
-        Détecte les effets de modulation (chorus, phaser, tremolo).
-        
-        Heuristique: Analyse de la modulation d'amplitude et de phase.
+        Mesure le pic principal du spectre de l'enveloppe (0.5 Hz à
+        ``max_mod_rate_hz``).
         
         Args:
             y: Signal audio
-            
+        
         Returns:
-            Tuple (présence_modulation, paramètres)
+            ``{'rate_hz', 'strength'}`` (``None`` si la bande est vide)
         """
-        print("🌊 Détection de la modulation...")
+        thresholds = self.thresholds['modulation']
         
         # Analyse de la modulation d'amplitude
         envelope = np.abs(y)
         
         # Filtre passe-bas pour isoler la modulation
         nyquist = self.sample_rate / 2
-        low_freq = 20 / nyquist
+        low_freq = thresholds['low_freq_cutoff_hz'] / nyquist
         b, a = signal.butter(4, low_freq, btype='low')
         mod_envelope = signal.filtfilt(b, a, envelope)
         
@@ -264,65 +249,33 @@ class AudioAnalyzer:
         mod_fft = np.fft.fft(mod_envelope)
         freqs = np.fft.fftfreq(len(mod_fft), 1/self.sample_rate)
         
-        # Recherche des pics dans la bande 0.5-8 Hz (modulation typique)
-        freq_mask = (freqs >= 0.5) & (freqs <= 8.0)
+        # Recherche des pics dans la bande de modulation typique
+        freq_mask = (freqs >= 0.5) & (freqs <= thresholds['max_mod_rate_hz'])
         mod_spectrum = np.abs(mod_fft[freq_mask])
         mod_freqs = freqs[freq_mask]
         
-        if len(mod_spectrum) > 0:
-            # Trouve le pic principal
-            peak_idx = np.argmax(mod_spectrum)
-            mod_rate = mod_freqs[peak_idx]
-            mod_strength = mod_spectrum[peak_idx] / np.sum(mod_spectrum)
-            
-            # Détection basée sur la force de la modulation
-            has_modulation = mod_strength > 0.1 and mod_rate > 0.3
-            
-            if has_modulation:
-                # Détermine le type basé sur la fréquence
-                if mod_rate < 1.5:
-                    mod_type = "CHORUS"
-                elif mod_rate < 4.0:
-                    mod_type = "PHASER"
-                else:
-                    mod_type = "TREMOLO"
-                
-                # Estime les paramètres
-                depth = min(0.7, mod_strength * 3.0)
-                mix = min(0.3, mod_strength * 2.0)
-                
-                confidence = min(0.85, mod_strength * 4.0)
-                
-                print(f"   ✅ Modulation détectée: {mod_type}, rate={mod_rate:.1f}Hz, depth={depth:.2f}")
-                print(f"   📊 Confiance: {confidence:.2f}")
-                
-                return True, {
-                    'type': mod_type,
-                    'rate_hz': mod_rate,
-                    'depth': depth,
-                    'mix': mix,
-                    'confidence': confidence
-                }
+        if len(mod_spectrum) == 0:
+            return {'rate_hz': None, 'strength': None}
         
-        print("   ❌ Aucune modulation détectée")
-        return False, {'confidence': 0.0}
+        # Trouve le pic principal
+        peak_idx = np.argmax(mod_spectrum)
+        return {
+            'rate_hz': float(mod_freqs[peak_idx]),
+            'strength': float(mod_spectrum[peak_idx] / np.sum(mod_spectrum))
+        }
     
-    def detect_distortion(self, y: np.ndarray) -> Tuple[bool, Dict[str, float]]:
+    def measure_distortion(self, y: np.ndarray) -> Dict[str, Any]:
         """
-        Détecte la présence de distortion/overdrive.
-        
-        Heuristique: Analyse de la distorsion harmonique et du clipping.
+        Mesure le taux de clipping et la distorsion harmonique approximative.
         
         Args:
             y: Signal audio
-            
+        
         Returns:
-            Tuple (présence_distortion, paramètres)
+            ``{'clipping_ratio', 'thd_approx'}``
         """
-        print("🔥 Détection de la distortion...")
-        
         # Analyse du clipping (saturation)
-        clipped_samples = np.sum(np.abs(y) > 0.95)
+        clipped_samples = np.sum(np.abs(y) > self.thresholds['distortion']['clipping_threshold'])
         clipping_ratio = clipped_samples / len(y)
         
         # Analyse harmonique
@@ -350,30 +303,278 @@ class AudioAnalyzer:
         else:
             thd_approx = 0
         
+        return {
+            'clipping_ratio': float(clipping_ratio),
+            'thd_approx': float(thd_approx)
+        }
+    
+    def measure(self, y: np.ndarray, input_file: str = "") -> Dict[str, Any]:
+        """
+        Exécute toutes les mesures coûteuses sur le signal.
+        
+        Le résultat est sérialisable en JSON et suffit à :meth:`map_detectors`
+        pour reconstruire le patch sans réanalyser l'audio.
+        
+        Args:
+            y: Signal audio
+            input_file: Nom du fichier analysé (repris dans ``meta``)
+        
+        Returns:
+            Sorties brutes des détecteurs
+        """
+        spectral_features = self.analyze_spectral_features(y)
+        
+        print("📏 Mesures des détecteurs...")
+        return {
+            'version': DETECTORS_VERSION,
+            'input_file': input_file,
+            'sample_rate': self.sample_rate,
+            'measurement': self.measurement_settings(),
+            'spectral': {key: float(value) for key, value in spectral_features.items()},
+            'delay': self.measure_delay(y),
+            'reverb': self.measure_reverb(y),
+            'modulation': self.measure_modulation(y),
+            'distortion': self.measure_distortion(y)
+        }
+    
+    def measurement_settings(self) -> Dict[str, Dict[str, Any]]:
+        """Seuils appliqués pendant la mesure : les changer impose une réanalyse."""
+        return {
+            detector: {key: self.thresholds[detector][key] for key in keys}
+            for detector, keys in MEASUREMENT_THRESHOLDS.items()
+        }
+    
+    # ------------------------------------------------------------------
+    # Décisions (seuils de config.py appliqués aux mesures brutes)
+    # ------------------------------------------------------------------
+    
+    def _log(self, message: str) -> None:
+        if not self.quiet:
+            print(message)
+    
+    def decide_delay(self, raw: Dict[str, Any]) -> Tuple[bool, Dict[str, float]]:
+        """
+        Décide la présence et les paramètres de delay.
+        
+        Args:
+            raw: Sortie de :meth:`measure_delay`
+        
+        Returns:
+            Tuple (présence_delay, paramètres)
+        """
+        self._log("⏰ Détection du delay...")
+        thresholds = self.thresholds['delay']
+        
+        # Détecte les pics significatifs et prend le plus fort
+        candidates = [(time_ms, height) for time_ms, height in raw['peaks']
+                      if height >= thresholds['min_peak_height']
+                      and thresholds['min_delay_ms'] <= time_ms <= thresholds['max_delay_ms']]
+        
+        if candidates:
+            delay_time_ms, height = max(candidates, key=lambda peak: peak[1])
+        
+            # Estime le feedback basé sur l'amplitude du pic
+            feedback = min(0.8, height * 1.5)
+        
+            # Estime le mix basé sur l'énergie relative
+            mix = min(0.4, feedback * 0.6)
+        
+            confidence = min(0.95, height * 1.2)
+        
+            self._log(f"   ✅ Delay détecté: {delay_time_ms:.0f}ms, feedback={feedback:.2f}, mix={mix:.2f}")
+            self._log(f"   📊 Confiance: {confidence:.2f}")
+        
+            return True, {
+                'time_ms': delay_time_ms,
+                'feedback': feedback,
+                'mix': mix,
+                'confidence': confidence
+            }
+        else:
+            self._log("   ❌ Aucun delay détecté")
+            return False, {'confidence': 0.0}
+    
+    def decide_reverb(self, raw: Dict[str, Any]) -> Tuple[bool, Dict[str, float]]:
+        """
+        Décide la présence et les paramètres de reverb.
+        
+        Args:
+            raw: Sortie de :meth:`measure_reverb`
+        
+        Returns:
+            Tuple (présence_reverb, paramètres)
+        """
+        self._log("🏛️ Détection de la reverb...")
+        thresholds = self.thresholds['reverb']
+        decay_time_s = raw['decay_time_s']
+        high_freq_ratio = raw['high_freq_ratio']
+        
+        # Détection basée sur la queue et la densité spectrale
+        has_reverb = (decay_time_s > thresholds['min_decay_time_s']
+                      and high_freq_ratio > thresholds['min_high_freq_ratio'])
+        
+        if has_reverb:
+            # Estime le type de reverb basé sur la décroissance
+            if decay_time_s > thresholds['hall_min_decay_s']:
+                reverb_type = "HALL"
+                decay_s = min(3.0, decay_time_s)
+            elif decay_time_s > thresholds['plate_min_decay_s']:
+                reverb_type = "PLATE"
+                decay_s = min(2.0, decay_time_s)
+            else:
+                reverb_type = "ROOM"
+                decay_s = min(1.5, decay_time_s)
+        
+            # Estime le mix basé sur l'énergie relative
+            mix = min(0.3, high_freq_ratio * 2.0)
+        
+            confidence = min(0.9, (decay_time_s - 0.5) / 2.0 + high_freq_ratio)
+        
+            self._log(f"   ✅ Reverb détectée: {reverb_type}, decay={decay_s:.1f}s, mix={mix:.2f}")
+            self._log(f"   📊 Confiance: {confidence:.2f}")
+        
+            return True, {
+                'type': reverb_type,
+                'decay_s': decay_s,
+                'mix': mix,
+                'confidence': confidence
+            }
+        else:
+            self._log("   ❌ Aucune reverb détectée")
+            return False, {'confidence': 0.0}
+    
+    def decide_modulation(self, raw: Dict[str, Any]) -> Tuple[bool, Dict[str, float]]:
+        """
+        Décide la présence et le type de modulation (chorus, phaser, tremolo).
+        
+        Args:
+            raw: Sortie de :meth:`measure_modulation`
+        
+        Returns:
+            Tuple (présence_modulation, paramètres)
+        """
+        self._log("🌊 Détection de la modulation...")
+        thresholds = self.thresholds['modulation']
+        mod_rate = raw['rate_hz']
+        mod_strength = raw['strength']
+        
+        if mod_rate is not None:
+            # Détection basée sur la force de la modulation
+            has_modulation = (mod_strength > thresholds['min_mod_strength']
+                              and mod_rate > thresholds['min_mod_rate_hz'])
+        
+            if has_modulation:
+                # Détermine le type basé sur la fréquence
+                if mod_rate < thresholds['chorus_max_rate_hz']:
+                    mod_type = "CHORUS"
+                elif mod_rate < thresholds['phaser_max_rate_hz']:
+                    mod_type = "PHASER"
+                else:
+                    mod_type = "TREMOLO"
+        
+                # Estime les paramètres
+                depth = min(0.7, mod_strength * 3.0)
+                mix = min(0.3, mod_strength * 2.0)
+        
+                confidence = min(0.85, mod_strength * 4.0)
+        
+                self._log(f"   ✅ Modulation détectée: {mod_type}, rate={mod_rate:.1f}Hz, depth={depth:.2f}")
+                self._log(f"   📊 Confiance: {confidence:.2f}")
+        
+                return True, {
+                    'type': mod_type,
+                    'rate_hz': mod_rate,
+                    'depth': depth,
+                    'mix': mix,
+                    'confidence': confidence
+                }
+        
+        self._log("   ❌ Aucune modulation détectée")
+        return False, {'confidence': 0.0}
+    
+    def decide_distortion(self, raw: Dict[str, Any]) -> Tuple[bool, Dict[str, float]]:
+        """
+        Décide la présence de distortion/overdrive.
+        
+        Args:
+            raw: Sortie de :meth:`measure_distortion`
+        
+        Returns:
+            Tuple (présence_distortion, paramètres)
+        """
+        self._log("🔥 Détection de la distortion...")
+        thresholds = self.thresholds['distortion']
+        clipping_ratio = raw['clipping_ratio']
+        thd_approx = raw['thd_approx']
+        
         # Détection basée sur le clipping et les harmoniques
-        has_distortion = clipping_ratio > 0.01 or thd_approx > 0.1
+        has_distortion = clipping_ratio > thresholds['min_clipping_ratio'] or thd_approx > thresholds['min_thd']
         
         if has_distortion:
             # Estime le gain basé sur le clipping
-            if clipping_ratio > 0.05:
+            if clipping_ratio > thresholds['heavy_clipping_ratio']:
                 drive_level = min(0.9, 0.3 + clipping_ratio * 10)
             else:
                 drive_level = min(0.7, thd_approx * 3.0)
-            
+        
             confidence = min(0.9, (clipping_ratio * 20 + thd_approx * 2))
-            
-            print(f"   ✅ Distortion détectée: drive={drive_level:.2f}, THD≈{thd_approx:.3f}")
-            print(f"   📊 Confiance: {confidence:.2f}")
-            
+        
+            self._log(f"   ✅ Distortion détectée: drive={drive_level:.2f}, THD≈{thd_approx:.3f}")
+            self._log(f"   📊 Confiance: {confidence:.2f}")
+        
             return True, {
                 'drive_level': drive_level,
                 'thd_approx': thd_approx,
                 'confidence': confidence
             }
         else:
-            print("   ❌ Aucune distortion détectée")
+            self._log("   ❌ Aucune distortion détectée")
             return False, {'confidence': 0.0}
     
+    def detect_delay(self, y: np.ndarray) -> Tuple[bool, Dict[str, float]]:
+        """Mesure puis décide la présence de delay (voir :meth:`measure_delay`)."""
+        return self.decide_delay(self.measure_delay(y))
+    
+    def detect_reverb(self, y: np.ndarray) -> Tuple[bool, Dict[str, float]]:
+        """Mesure puis décide la présence de reverb (voir :meth:`measure_reverb`)."""
+        return self.decide_reverb(self.measure_reverb(y))
+    
+    def detect_modulation(self, y: np.ndarray) -> Tuple[bool, Dict[str, float]]:
+        """Mesure puis décide la présence de modulation (voir :meth:`measure_modulation`)."""
+        return self.decide_modulation(self.measure_modulation(y))
+    
+    def detect_distortion(self, y: np.ndarray) -> Tuple[bool, Dict[str, float]]:
+        """Mesure puis décide la présence de distortion (voir :meth:`measure_distortion`)."""
+        return self.decide_distortion(self.measure_distortion(y))
+    
+    def select_amp_model(self, features: Dict[str, float]) -> str:
+        """
+        Choisit le premier modèle de ``AMP_MODELS`` dont les bornes spectrales
+        (``spectral_centroid_min``, ``spectral_bandwidth_max``...) sont
+        respectées ; ``DEFAULT_AMP_MODEL`` sinon.
+        
+        Args:
+            features: Features spectrales extraites
+        
+        Returns:
+            Nom du modèle d'ampli
+        """
+        values = {
+            'spectral_centroid': features.get('spectral_centroid_mean', 2000),
+            'spectral_bandwidth': features.get('spectral_bandwidth_mean', 1000)
+        }
+        
+        for name, model in self.amp_models.items():
+            if name == DEFAULT_AMP_MODEL:
+                continue
+            bounds = [(feature, model.get(f"{feature}_min"), model.get(f"{feature}_max")) for feature in values]
+            if all(low is None and high is None for _, low, high in bounds):
+                continue
+            if all((low is None or values[feature] > low) and (high is None or values[feature] < high)
+                   for feature, low, high in bounds):
+                return name
+        return DEFAULT_AMP_MODEL
+    
     def map_to_amp_settings(self, features: Dict[str, float], has_distortion: bool, 
                            distortion_params: Dict[str, float]) -> Dict[str, Any]:
         """
@@ -387,18 +588,12 @@ class AudioAnalyzer:
         Returns:
             Configuration d'amplificateur
         """
-        print("🎸 Mapping vers paramètres amplificateur...")
+        self._log("🎸 Mapping vers paramètres amplificateur...")
         
         # Sélection du modèle d'amp basé sur les caractéristiques spectrales
         centroid = features.get('spectral_centroid_mean', 2000)
         bandwidth = features.get('spectral_bandwidth_mean', 1000)
-        
-        if centroid > 3000 and bandwidth > 1500:
-            amp_model = "BRIT_TOP_BOOST"  # Bright, clair
-        elif centroid < 2000 and bandwidth < 1000:
-            amp_model = "TWEED_BASSMAN"   # Chaleureux, vintage
-        else:
-            amp_model = "JCM800"          # Équilibré, rock
+        amp_model = self.select_amp_model(features)
         
         # Paramètres de tonalité basés sur le spectre
         treble = min(1.0, (centroid - 1000) / 3000)
@@ -425,9 +620,9 @@ class AudioAnalyzer:
         }
         cab = cab_mapping.get(amp_model, "2x12_ALNICO")
         
-        print(f"   Amp: {amp_model}, Gain: {gain:.2f}")
-        print(f"   EQ: Bass={bass:.2f}, Mid={mid:.2f}, Treble={treble:.2f}, Presence={presence:.2f}")
-        print(f"   Cab: {cab}")
+        self._log(f"   Amp: {amp_model}, Gain: {gain:.2f}")
+        self._log(f"   EQ: Bass={bass:.2f}, Mid={mid:.2f}, Treble={treble:.2f}, Presence={presence:.2f}")
+        self._log(f"   Cab: {cab}")
         
         return {
             "model": amp_model,
@@ -468,30 +663,26 @@ class AudioAnalyzer:
             "level": level
         }
     
-    def analyze(self, file_path: str) -> Dict[str, Any]:
+    def map_detectors(self, detectors: Dict[str, Any]) -> Dict[str, Any]:
         """
-        Analyse complète d'un fichier audio.
+        Construit le patch à partir des sorties brutes des détecteurs.
+        
+        Étape rapide (aucun accès à l'audio) : c'est elle que rejoue
+        :func:`remap_library` après un changement de seuils.
         
         Args:
-            file_path: Chemin vers le fichier audio
-            
+            detectors: Sortie de :meth:`measure` (ou fichier ``.detectors.json``)
+        
         Returns:
             Dictionnaire contenant la configuration complète
         """
-        print(f"🚀 Analyse audio de {file_path}")
-        print("=" * 50)
-        
-        # Charge l'audio
-        y = self.load_audio(file_path)
-        
-        # Analyse des features spectrales
-        spectral_features = self.analyze_spectral_features(y)
+        spectral_features = detectors['spectral']
         
         # Détection des effets
-        has_delay, delay_params = self.detect_delay(y)
-        has_reverb, reverb_params = self.detect_reverb(y)
-        has_modulation, mod_params = self.detect_modulation(y)
-        has_distortion, distortion_params = self.detect_distortion(y)
+        has_delay, delay_params = self.decide_delay(detectors['delay'])
+        has_reverb, reverb_params = self.decide_reverb(detectors['reverb'])
+        has_modulation, mod_params = self.decide_modulation(detectors['modulation'])
+        has_distortion, distortion_params = self.decide_distortion(detectors['distortion'])
         
         # Mapping vers paramètres Magicstomp
         amp_config = self.map_to_amp_settings(spectral_features, has_distortion, distortion_params)
@@ -522,22 +713,206 @@ class AudioAnalyzer:
             mod_params.get('confidence', 0),
             distortion_params.get('confidence', 0)
         ]
-        global_confidence = np.mean([score for score in confidence_scores if score > 0])
+        detected_scores = [score for score in confidence_scores if score > 0]
+        global_confidence = float(np.mean(detected_scores)) if detected_scores else 0.0
         
         patch["meta"] = {
             "global_confidence": global_confidence,
             "analysis_version": "1.0",
-            "input_file": Path(file_path).name
+            "input_file": detectors.get('input_file', "")
         }
         
+        return patch
+    
+    def analyze(self, file_path: str) -> Dict[str, Any]:
+        """
+        Analyse complète d'un fichier audio.
+        
+        Les sorties brutes des détecteurs restent disponibles dans
+        ``self.detectors`` (voir :func:`save_analysis`).
+        
+        Args:
+            file_path: Chemin vers le fichier audio
+            
+        Returns:
+            Dictionnaire contenant la configuration complète
+        """
+        print(f"🚀 Analyse audio de {file_path}")
+        print("=" * 50)
+        
+        # Charge l'audio
+        y = self.load_audio(file_path)
+        
+        # Mesures brutes puis décisions
+        self.detectors = self.measure(y, input_file=Path(file_path).name)
+        patch = self.map_detectors(self.detectors)
+        
         print("\n" + "=" * 50)
-        print(f"✅ Analyse terminée - Confiance globale: {global_confidence:.2f}")
+        print(f"✅ Analyse terminée - Confiance globale: {patch['meta']['global_confidence']:.2f}")
         
         return patch
 
 
+def detectors_path(patch_path: Union[str, Path]) -> Path:
+    """Fichier des sorties brutes associé à un patch (``x.json`` → ``x.detectors.json``)."""
+    patch_path = Path(patch_path)
+    return patch_path.with_name(patch_path.stem + DETECTORS_SUFFIX)
+
+
+def _write_json(path: Path, data: Dict[str, Any]) -> None:
+    """Écriture atomique (fichier temporaire puis remplacement)."""
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def save_analysis(patch: Dict[str, Any], detectors: Dict[str, Any], patch_path: Union[str, Path]) -> Path:
+    """
+    Sauvegarde le patch et, à côté, les sorties brutes des détecteurs.
+
+    Args:
+        patch: Patch généré
+        detectors: Sorties brutes (``AudioAnalyzer.detectors``)
+        patch_path: Fichier JSON du patch
+
+    Returns:
+        Chemin du fichier ``.detectors.json``
+    """
+    patch_path = Path(patch_path)
+    raw_path = detectors_path(patch_path)
+    _write_json(patch_path, patch)
+    _write_json(raw_path, {**detectors, 'patch_file': patch_path.name})
+    return raw_path
+
+
+def remap_library(paths: Iterable[Union[str, Path]], analyzer: Optional[AudioAnalyzer] = None,
+                  dry_run: bool = False) -> Dict[str, List[Path]]:
+    """
+    Régénère les patches d'une bibliothèque depuis les sorties brutes stockées.
+
+    Seuls les patches dont le contenu change sont réécrits ; aucun fichier
+    audio n'est relu. Les seuils appliqués pendant la mesure (fenêtre du
+    delay, coupure de la modulation, niveau de clipping) ne peuvent pas être
+    rejoués : les fichiers mesurés avec d'autres valeurs sont signalés.
+
+    Args:
+        paths: Fichiers ``.detectors.json`` ou répertoires (parcourus récursivement)
+        analyzer: Analyseur portant les seuils à appliquer
+        dry_run: Ne rien écrire, seulement lister les changements
+
+    Returns:
+        ``{'changed': [...], 'unchanged': [...], 'stale': [...]}`` (chemins des patches)
+    """
+    analyzer = analyzer or AudioAnalyzer(quiet=True)
+    settings = json.loads(json.dumps(analyzer.measurement_settings()))
+    result: Dict[str, List[Path]] = {'changed': [], 'unchanged': [], 'stale': []}
+
+    raw_files: List[Path] = []
+    for path in map(Path, paths):
+        raw_files.extend(sorted(path.rglob('*' + DETECTORS_SUFFIX)) if path.is_dir() else [path])
+
+    for raw_path in raw_files:
+        with open(raw_path, 'r', encoding='utf-8') as f:
+            detectors = json.load(f)
+
+        patch_path = raw_path.with_name(detectors.get('patch_file') or raw_path.name[:-len(DETECTORS_SUFFIX)] + '.json')
+        if detectors.get('measurement') != settings:
+            result['stale'].append(patch_path)
+
+        patch = json.loads(json.dumps(analyzer.map_detectors(detectors)))
+        try:
+            with open(patch_path, 'r', encoding='utf-8') as f:
+                current = json.load(f)
+        except (OSError, ValueError):
+            current = None
+
+        if patch == current:
+            result['unchanged'].append(patch_path)
+            continue
+
+        result['changed'].append(patch_path)
+        if not dry_run:
+            _write_json(patch_path, patch)
+
+    return result
+
+
+def load_thresholds(path: Union[str, Path]) -> Dict[str, Any]:
+    """
+    Fusionne un fichier JSON de surcharges avec les seuils de ``config.py``.
+
+    Le fichier peut contenir ``detection_thresholds`` et ``amp_models``
+    (mêmes clés que ``config.get_config()``), partiellement.
+
+    Args:
+        path: Fichier JSON de surcharges
+
+    Returns:
+        Arguments pour :class:`AudioAnalyzer` (``thresholds``, ``amp_models``)
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        overrides = json.load(f)
+
+    def merge(base: Dict[str, Any], update: Dict[str, Any]) -> Dict[str, Any]:
+        merged = copy.deepcopy(base)
+        for key, value in update.items():
+            if isinstance(value, dict) and isinstance(merged.get(key), dict):
+                merged[key] = merge(merged[key], value)
+            else:
+                merged[key] = value
+        return merged
+
+    return {
+        'thresholds': merge(DETECTION_THRESHOLDS, overrides.get('detection_thresholds', {})),
+        'amp_models': merge(AMP_MODELS, overrides.get('amp_models', {}))
+    }
+
+
+def remap_main(argv: List[str]) -> None:
+    """Commande ``remap`` : réapplique les seuils à une bibliothèque analysée."""
+    parser = argparse.ArgumentParser(
+        prog="analyze2json.py remap",
+        description="Régénère les patches depuis les sorties brutes des détecteurs",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Exemples:
+  python analyze2json.py remap library/
+  python analyze2json.py remap library/ --thresholds seuils.json --dry-run
+        """
+    )
+    parser.add_argument('paths', nargs='+', help='Fichiers .detectors.json ou répertoires')
+    parser.add_argument('--thresholds', '-t', help='JSON de surcharges des seuils de config.py')
+    parser.add_argument('--dry-run', action='store_true', help='Lister les changements sans écrire')
+    parser.add_argument('--verbose', '-v', action='store_true', help='Mode verbeux')
+    args = parser.parse_args(argv)
+
+    options = load_thresholds(args.thresholds) if args.thresholds else {}
+    analyzer = AudioAnalyzer(quiet=True, **options)
+
+    start = time.perf_counter()
+    result = remap_library(args.paths, analyzer, dry_run=args.dry_run)
+    elapsed = time.perf_counter() - start
+
+    total = len(result['changed']) + len(result['unchanged'])
+    action = "à réécrire" if args.dry_run else "réécrit(s)"
+    print(f"🔁 {total} patch(es) remappé(s) en {elapsed:.2f}s - {len(result['changed'])} {action}")
+    for patch_path in result['changed']:
+        print(f"   ✏️  {patch_path}")
+    if args.verbose:
+        for patch_path in result['unchanged']:
+            print(f"   =  {patch_path}")
+    if result['stale']:
+        print(f"⚠️  {len(result['stale'])} fichier(s) mesuré(s) avec d'autres seuils de mesure "
+              f"({', '.join(sorted(MEASUREMENT_THRESHOLDS))}) : réanalyse nécessaire pour en tenir compte")
+
+
 def main():
     """Point d'entrée principal."""
+    if sys.argv[1:2] == ['remap']:
+        remap_main(sys.argv[2:])
+        return
+
     parser = argparse.ArgumentParser(
         description="Analyse audio et génère un patch JSON Magicstomp",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -545,11 +920,13 @@ def main():
 Exemples:
   python analyze2json.py guitar.wav
   python analyze2json.py guitar.wav --output my_patch.json --verbose
+  python analyze2json.py remap library/ --thresholds seuils.json
         """
     )
     
     parser.add_argument('input', help='Fichier audio à analyser')
     parser.add_argument('--output', '-o', help='Fichier JSON de sortie')
+    parser.add_argument('--thresholds', '-t', help='JSON de surcharges des seuils de config.py')
     parser.add_argument('--verbose', '-v', action='store_true', help='Mode verbeux')
     
     args = parser.parse_args()
@@ -560,7 +937,8 @@ Exemples:
         sys.exit(1)
     
     # Analyse
-    analyzer = AudioAnalyzer()
+    options = load_thresholds(args.thresholds) if args.thresholds else {}
+    analyzer = AudioAnalyzer(**options)
     patch = analyzer.analyze(args.input)
     
     # Détermine le fichier de sortie
@@ -569,12 +947,12 @@ Exemples:
         input_path = Path(args.input)
         output_file = input_path.with_suffix('.json')
     
-    # Sauvegarde
+    # Sauvegarde (patch + sorties brutes pour `remap`)
     print(f"\n💾 Sauvegarde vers {output_file}...")
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(patch, f, indent=2, ensure_ascii=False)
+    raw_file = save_analysis(patch, analyzer.detectors, output_file)
     
     print(f"✅ Patch sauvegardé: {output_file}")
+    print(f"📏 Sorties des détecteurs: {raw_file}")
     
     if args.verbose:
         print("\n📋 Configuration générée:")
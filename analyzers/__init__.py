@@ -5,6 +5,9 @@ Analyzers Package - Dual Backend Audio Analysis
 Provides interchangeable audio analysis backends:
 - LibrosaAnalyzer: Pure Python implementation
 - EssentiaAnalyzer: C++ core with Python bindings
+- EssentiaStreamingAnalyzer: single-pass Essentia streaming network
+- CompositeAnalyzer: per-feature routing to the fastest agreeing backend
+- AnalyzerPool: warm, thread-safe instances shared by concurrent jobs
 
 Usage:
     from analyzers.factory import get_analyzer
@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+Composite Audio Analyzer
+========================
+
+Routes each feature to the fastest available backend whose result agrees
+with the reference backend (librosa) within the tolerances used in
+``tests/test_backends_equivalence.py``.
+
+Every feature is micro-benchmarked once per machine on synthetic signals;
+timings, agreement checks and the resulting routing table are cached in a
+JSON profile (``~/.cache/magicstomp/backend_profile.json`` by default, or
+``$AUDIO_BACKEND_PROFILE``). The profile is rebuilt when the machine,
+Python version, backend versions or sample rate change.
+"""
+
+import json
+import os
+import platform
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple, Union
+
+import numpy as np
+
+from .base import AudioAnalyzer
+
+PROFILE_VERSION = 1
+DEFAULT_PROFILE_PATH = Path.home() / ".cache" / "magicstomp" / "backend_profile.json"
+REFERENCE_BACKEND = 'librosa'
+
+FEATURES = (
+    'spectral_tilt_db',
+    'spectral_centroid_mean',
+    'thd_proxy',
+    'onset_delay_ms',
+    'reverb_estimate',
+    'lfo_rate_hz',
+    'tempo_bpm',
+)
+
+
+class Tolerance(NamedTuple):
+    """Agreement check for one element of a feature result."""
+
+    kind: str              # 'rel' or 'abs'
+    value: float
+    floor: float = 0.0     # 'rel': only compared above this magnitude
+    optional: bool = False  # None on either side is accepted
+
+
+# Same tolerances as tests/test_backends_equivalence.py; features the tests do
+# not cover use the suite's default 10% relative tolerance.
+FEATURE_TOLERANCES: Dict[str, Tuple[Tolerance, ...]] = {
+    'spectral_centroid_mean': (Tolerance('rel', 0.1),),
+    'spectral_tilt_db': (Tolerance('abs', 3.0),),
+    'thd_proxy': (Tolerance('rel', 0.5, floor=0.01),),
+    'onset_delay_ms': (Tolerance('abs', 50.0), Tolerance('abs', 0.3)),
+    'lfo_rate_hz': (Tolerance('abs', 2.0, optional=True), Tolerance('abs', 0.5)),
+    'reverb_estimate': (Tolerance('rel', 0.1), Tolerance('rel', 0.1)),
+    'tempo_bpm': (Tolerance('rel', 0.1),),
+}
+
+
+def results_agree(feature: str, first: Any, second: Any) -> bool:
+    """
+    Check whether two backend results for *feature* agree.
+
+    Args:
+        feature: Feature name (see FEATURES)
+        first: Result of one backend
+        second: Result of the other backend
+
+    Returns:
+        True if every element is within the feature tolerance
+    """
+    tolerances = FEATURE_TOLERANCES[feature]
+    if len(tolerances) == 1:
+        first, second = (first,), (second,)
+
+    for tolerance, a, b in zip(tolerances, first, second):
+        if a is None or b is None:
+            if tolerance.optional or (a is None and b is None):
+                continue
+            return False
+
+        a, b = float(a), float(b)
+        if not (np.isfinite(a) and np.isfinite(b)):
+            return False
+        if tolerance.kind == 'abs':
+            if abs(a - b) >= tolerance.value:
+                return False
+        else:
+            scale = max(abs(a), abs(b))
+            if scale > tolerance.floor and abs(a - b) / scale >= tolerance.value:
+                return False
+    return True
+
+
+def benchmark_signal(feature: str, sample_rate: int, duration: float = 2.0) -> np.ndarray:
+    """
+    Deterministic test signal for *feature*, as in the equivalence tests.
+
+    Args:
+        feature: Feature name
+        sample_rate: Sample rate
+        duration: Signal length in seconds
+
+    Returns:
+        Mono float32 signal normalized to 0.7 peak
+    """
+    t = np.linspace(0, duration, int(sample_rate * duration))
+
+    if feature == 'onset_delay_ms':
+        # 2 Hz impulse train with a 100 ms echo
+        y = np.zeros_like(t)
+        y[(np.arange(0, duration, 0.5) * sample_rate).astype(int)] = 1.0
+        delay = int(0.1 * sample_rate)
+        y[delay:] += 0.3 * y[:-delay]
+    elif feature in ('spectral_centroid_mean', 'lfo_rate_hz'):
+        y = np.sin(2 * np.pi * 440.0 * t)
+        if feature == 'lfo_rate_hz':
+            y *= 1.0 + 0.3 * np.sin(2 * np.pi * 5.0 * t)
+    else:
+        frequency = 220.0 if feature in ('spectral_tilt_db', 'tempo_bpm', 'reverb_estimate') else 440.0
+        y = (np.sin(2 * np.pi * frequency * t)
+             + 0.5 * np.sin(2 * np.pi * frequency * 2 * t)
+             + 0.3 * np.sin(2 * np.pi * frequency * 3 * t))
+
+    return (y / np.max(np.abs(y)) * 0.7).astype(np.float32)
+
+
+def choose_routing(timings: Dict[str, Dict[str, float]], agrees: Dict[str, Dict[str, bool]],
+                   reference: str) -> Dict[str, str]:
+    """
+    Pick the fastest agreeing backend for every feature.
+
+    Args:
+        timings: Seconds per call, ``{feature: {backend: seconds}}``
+        agrees: Agreement with the reference, ``{feature: {backend: bool}}``
+        reference: Backend used when nothing else qualifies
+
+    Returns:
+        Routing table ``{feature: backend}``
+    """
+    routing = {}
+    for feature, backend_timings in timings.items():
+        candidates = [name for name in backend_timings
+                      if name == reference or agrees.get(feature, {}).get(name)]
+        routing[feature] = min(candidates, key=lambda name: backend_timings[name]) if candidates else reference
+    return routing
+
+
+class CompositeAnalyzer(AudioAnalyzer):
+    """
+    Analyzer delegating each feature to the backend chosen by the profile.
+
+    Audio loading always goes through the reference backend so that every
+    feature sees the same normalized signal.
+    """
+
+    def __init__(self, backends: Dict[str, AudioAnalyzer], sample_rate: int = 44100,
+                 profile_path: Union[str, Path, None] = None, repeats: int = 3):
+        """
+        Initialize the composite analyzer and load (or build) its profile.
+
+        Args:
+            backends: Available backend instances by name
+            sample_rate: Target sample rate for analysis
+            profile_path: Profile file (``$AUDIO_BACKEND_PROFILE`` or the user cache by default)
+            repeats: Timed calls per feature and backend when benchmarking
+
+        Raises:
+            RuntimeError: If no backend is given
+        """
+        super().__init__(sample_rate)
+        if not backends:
+            raise RuntimeError("Composite analyzer needs at least one backend")
+
+        self.backends = dict(backends)
+        self.reference = REFERENCE_BACKEND if REFERENCE_BACKEND in self.backends else next(iter(self.backends))
+        self.profile_path = Path(profile_path or os.environ.get('AUDIO_BACKEND_PROFILE') or DEFAULT_PROFILE_PATH)
+        self.repeats = max(1, repeats)
+
+        self.profile = self._load_profile()
+        if self.profile is None:
+            self.profile = self.benchmark()
+            self._save_profile(self.profile)
+        self.routing: Dict[str, str] = self.profile['routing']
+
+        self.logger.info("Feature routing: " + ", ".join(f"{f}={b}" for f, b in self.routing.items()))
+
+    def fingerprint(self) -> Dict[str, Any]:
+        """Describe what the timings depend on; a mismatch invalidates the profile."""
+        versions = {}
+        for name in sorted(self.backends):
+            module = sys.modules.get(name.split('_')[0])
+            versions[name] = str(getattr(module, '__version__', 'unknown'))
+        return {
+            'version': PROFILE_VERSION,
+            'node': platform.node(),
+            'machine': platform.machine(),
+            'python': platform.python_version(),
+            'sample_rate': self.sample_rate,
+            'backends': versions,
+            'features': list(FEATURES),
+        }
+
+    def benchmark(self) -> Dict[str, Any]:
+        """
+        Time every feature on every backend and compare results with the reference.
+
+        Returns:
+            Profile dictionary (fingerprint, timings, agreement, routing)
+        """
+        self.logger.info(f"Benchmarking {len(FEATURES)} features on {', '.join(self.backends)}...")
+        timings: Dict[str, Dict[str, float]] = {}
+        agrees: Dict[str, Dict[str, bool]] = {}
+
+        for feature in FEATURES:
+            y = benchmark_signal(feature, self.sample_rate)
+            results = {}
+            timings[feature] = {}
+            for name, backend in self.backends.items():
+                method = getattr(backend, feature)
+                best = float('inf')
+                try:
+                    for _ in range(self.repeats):
+                        # Backends sharing one analysis per signal would
+                        # otherwise time a cache lookup after the first call
+                        backend.clear_cache()
+                        start = time.perf_counter()
+                        results[name] = method(y, self.sample_rate)
+                        best = min(best, time.perf_counter() - start)
+                except Exception as e:
+                    self.logger.warning(f"{name}.{feature} failed during benchmark: {e}")
+                    continue
+                timings[feature][name] = best
+
+            reference = results.get(self.reference)
+            agrees[feature] = {
+                name: name == self.reference or (self.reference in results
+                                                 and results_agree(feature, result, reference))
+                for name, result in results.items()
+            }
+
+        return {
+            'fingerprint': self.fingerprint(),
+            'reference': self.reference,
+            'timings_s': timings,
+            'agrees': agrees,
+            'routing': choose_routing(timings, agrees, self.reference),
+        }
+
+    def _load_profile(self) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.profile_path, 'r', encoding='utf-8') as f:
+                profile = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if profile.get('fingerprint') != self.fingerprint() or profile.get('reference') != self.reference:
+            self.logger.info(f"Backend profile {self.profile_path} is stale, re-benchmarking")
+            return None
+        return profile
+
+    def _save_profile(self, profile: Dict[str, Any]) -> None:
+        try:
+            self.profile_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.profile_path.with_name(self.profile_path.name + '.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(profile, f, indent=2)
+            os.replace(tmp_path, self.profile_path)
+            self.logger.info(f"Saved backend profile to {self.profile_path}")
+        except OSError as e:
+            self.logger.warning(f"Could not save backend profile: {e}")
+
+    def routing_table(self) -> List[Dict[str, Any]]:
+        """
+        Routing table rows for display.
+
+        Returns:
+            One ``{feature, backend, timings_s, agrees}`` dict per feature
+        """
+        return [
+            {
+                'feature': feature,
+                'backend': backend,
+                'timings_s': self.profile['timings_s'].get(feature, {}),
+                'agrees': self.profile['agrees'].get(feature, {}),
+            }
+            for feature, backend in self.routing.items()
+        ]
+
+    def _backend(self, feature: str) -> AudioAnalyzer:
+        return self.backends[self.routing.get(feature, self.reference)]
+
+    def load_audio(self, path: str, sr: Optional[int] = None) -> Tuple[Any, int]:
+        """Load audio with the reference backend."""
+        return self.backends[self.reference].load_audio(path, sr)
+
+    def spectral_tilt_db(self, y: Any, sr: int) -> float:
+        """Spectral tilt from the routed backend."""
+        return self._backend('spectral_tilt_db').spectral_tilt_db(y, sr)
+
+    def spectral_centroid_mean(self, y: Any, sr: int) -> float:
+        """Spectral centroid from the routed backend."""
+        return self._backend('spectral_centroid_mean').spectral_centroid_mean(y, sr)
+
+    def thd_proxy(self, y: Any, sr: int) -> float:
+        """THD proxy from the routed backend."""
+        return self._backend('thd_proxy').thd_proxy(y, sr)
+
+    def onset_delay_ms(self, y: Any, sr: int) -> Tuple[float, float]:
+        """Delay time and feedback from the routed backend."""
+        return self._backend('onset_delay_ms').onset_delay_ms(y, sr)
+
+    def reverb_estimate(self, y: Any, sr: int) -> Tuple[float, float]:
+        """Reverb decay and mix from the routed backend."""
+        return self._backend('reverb_estimate').reverb_estimate(y, sr)
+
+    def lfo_rate_hz(self, y: Any, sr: int) -> Tuple[Optional[float], float]:
+        """LFO rate and strength from the routed backend."""
+        return self._backend('lfo_rate_hz').lfo_rate_hz(y, sr)
+
+    def tempo_bpm(self, y: Any, sr: int) -> Optional[float]:
+        """Tempo from the routed backend."""
+        return self._backend('tempo_bpm').tempo_bpm(y, sr)
@@ -49,7 +49,6 @@ class EssentiaAnalyzer(AudioAnalyzer):
         self.logger.info("Initialized Essentia backend")
         
         # Initialize Essentia algorithms
-        self.mono_loader = es.MonoLoader(sampleRate=sample_rate, normalize=True)
         self.spectrum = es.Spectrum()
         self.centroid = es.Centroid()
         self.spectral_peaks = es.SpectralPeaks()
@@ -76,16 +75,10 @@ class EssentiaAnalyzer(AudioAnalyzer):
         if not ESSENTIA_AVAILABLE:
             raise RuntimeError("Essentia not available")
         
-        if sr is not None and sr != self.sample_rate:
-            # Create loader with custom sample rate
-            loader = es.MonoLoader(filename=path, sampleRate=sr, normalize=True)
-            audio = loader()
-            actual_sr = sr
-        else:
-            # Use default sample rate
-            self.mono_loader.parameter('filename').setValue(path)
-            audio = self.mono_loader()
-            actual_sr = self.sample_rate
+        # Loader private to this call: no shared state between files or threads
+        actual_sr = sr if sr is not None else self.sample_rate
+        loader = es.MonoLoader(filename=path, sampleRate=actual_sr, normalize=True)
+        audio = loader()
         
         # Convert to numpy array
         audio_array = np.array(audio)
@@ -0,0 +1,396 @@
+#!/usr/bin/env python3
+"""
+Essentia Streaming Audio Analyzer
+=================================
+
+Single-pass implementation built on an ``essentia.streaming`` network:
+
+    loader → FrameCutter → Windowing → FFT/CartesianToPolar (spectrum)
+           → Centroid, SpectralPeaks → HarmonicPeaks → Tristimulus,
+             OnsetDetection, EnergyBand, RMS → Pool → PoolAggregator
+    loader → RhythmExtractor2013 → Pool
+
+Every feature is computed at once while the audio streams through the C++
+graph; only per-frame scalars reach the pool, so memory grows with the
+number of frames rather than with full spectra. Each run builds its own
+network, so instances share no mutable state and can be created per
+worker for parallel batch runs (see :func:`analyze_files`).
+"""
+
+import hashlib
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from scipy import signal
+
+from .base import AudioAnalyzer
+
+try:
+    import essentia
+    import essentia.standard as es
+    import essentia.streaming as ess
+    ESSENTIA_STREAMING_AVAILABLE = True
+except ImportError:
+    ESSENTIA_STREAMING_AVAILABLE = False
+    es = None
+    ess = None
+
+
+class EssentiaStreamingAnalyzer(AudioAnalyzer):
+    """
+    Essentia streaming-mode analyzer.
+
+    The individual feature methods share one network run per signal: the
+    first call analyzes ``y`` and the following calls on the same signal
+    read the cached result.
+    """
+
+    def __init__(self, sample_rate: int = 44100, frame_size: int = 2048, hop_size: int = 512):
+        """
+        Initialize the streaming analyzer.
+
+        Args:
+            sample_rate: Target sample rate for analysis
+            frame_size: Analysis frame size in samples
+            hop_size: Hop between frames in samples
+
+        Raises:
+            RuntimeError: If Essentia is not available
+        """
+        super().__init__(sample_rate)
+
+        if not ESSENTIA_STREAMING_AVAILABLE:
+            raise RuntimeError("Essentia streaming mode not available")
+
+        self.frame_size = frame_size
+        self.hop_size = hop_size
+        self._cache_key: Optional[Tuple[str, int]] = None
+        self._cache: Dict[str, Any] = {}
+        self.logger.info("Initialized Essentia streaming backend")
+
+    def get_backend_name(self) -> str:
+        """Return the name of this backend implementation."""
+        return 'essentia_streaming'
+
+    def load_audio(self, path: str, sr: Optional[int] = None) -> Tuple[np.ndarray, int]:
+        """
+        Load audio file with a loader private to this call.
+
+        Args:
+            path: Path to audio file
+            sr: Target sample rate (defaults to self.sample_rate)
+
+        Returns:
+            Tuple of (audio_data, actual_sample_rate)
+        """
+        sr = sr or self.sample_rate
+        audio = np.array(es.MonoLoader(filename=path, sampleRate=sr)())
+
+        peak = np.max(np.abs(audio)) if len(audio) else 0.0
+        if peak > 0:
+            audio = audio / peak
+
+        self.logger.debug(f"Loaded audio: {len(audio)} samples, {sr}Hz")
+        return audio, sr
+
+    def _build_network(self, source_output: Any, sr: int, pool: Any) -> None:
+        """Connect the analysis graph from *source_output* into *pool*."""
+        nyquist = sr / 2
+
+        frame_cutter = ess.FrameCutter(frameSize=self.frame_size, hopSize=self.hop_size,
+                                       startFromZero=True, silentFrames='noise')
+        windowing = ess.Windowing(type='hann')
+        # Spectrum is |FFT|; the polar split also gives OnsetDetection its phase
+        fft = ess.FFT(size=self.frame_size)
+        polar = ess.CartesianToPolar()
+
+        centroid = ess.Centroid(range=nyquist)
+        spectral_peaks = ess.SpectralPeaks(sampleRate=sr, orderBy='frequency', minFrequency=20,
+                                           maxPeaks=100)
+        pitch = ess.PitchYinFFT(frameSize=self.frame_size, sampleRate=sr)
+        harmonic_peaks = ess.HarmonicPeaks(maxHarmonics=8)
+        tristimulus = ess.Tristimulus()
+        onset_detection = ess.OnsetDetection(method='hfc', sampleRate=sr)
+        energy = ess.Energy()
+        low_band = ess.EnergyBand(sampleRate=sr, startCutoffFrequency=0, stopCutoffFrequency=1000)
+        high_band = ess.EnergyBand(sampleRate=sr, startCutoffFrequency=4000, stopCutoffFrequency=nyquist * 0.999)
+        air_band = ess.EnergyBand(sampleRate=sr, startCutoffFrequency=3000, stopCutoffFrequency=nyquist * 0.999)
+        rms = ess.RMS()
+
+        source_output >> frame_cutter.signal
+        frame_cutter.frame >> windowing.frame
+        frame_cutter.frame >> rms.array
+        windowing.frame >> fft.frame
+        fft.fft >> polar.complex
+
+        spectrum = polar.magnitude
+        spectrum >> centroid.array
+        spectrum >> spectral_peaks.spectrum
+        spectrum >> pitch.spectrum
+        spectrum >> onset_detection.spectrum
+        spectrum >> energy.array
+        spectrum >> low_band.spectrum
+        spectrum >> high_band.spectrum
+        spectrum >> air_band.spectrum
+        polar.phase >> onset_detection.phase
+
+        spectral_peaks.frequencies >> harmonic_peaks.frequencies
+        spectral_peaks.magnitudes >> harmonic_peaks.magnitudes
+        pitch.pitch >> harmonic_peaks.pitch
+        pitch.pitchConfidence >> None
+        harmonic_peaks.harmonicFrequencies >> tristimulus.frequencies
+        harmonic_peaks.harmonicMagnitudes >> tristimulus.magnitudes
+
+        centroid.centroid >> (pool, 'frames.centroid')
+        tristimulus.tristimulus >> (pool, 'frames.tristimulus')
+        onset_detection.onsetDetection >> (pool, 'frames.onset')
+        energy.energy >> (pool, 'frames.energy')
+        low_band.energyBand >> (pool, 'frames.energy_low')
+        high_band.energyBand >> (pool, 'frames.energy_high')
+        air_band.energyBand >> (pool, 'frames.energy_air')
+        rms.rms >> (pool, 'frames.rms')
+
+        # RhythmExtractor2013 assumes 44.1 kHz input
+        if sr == 44100:
+            rhythm = ess.RhythmExtractor2013(method='multifeature')
+            source_output >> rhythm.signal
+            rhythm.bpm >> (pool, 'rhythm.bpm')
+            rhythm.ticks >> None
+            rhythm.confidence >> None
+            rhythm.estimates >> None
+            rhythm.bpmIntervals >> None
+
+    def _run(self, source: Any, source_output: Any, sr: int) -> Dict[str, Any]:
+        """Run a freshly built network and reduce the pool to features."""
+        pool = essentia.Pool()
+        self._build_network(source_output, sr, pool)
+        essentia.run(source)
+
+        means = es.PoolAggregator(defaultStats=['mean'])(pool)
+        frames = len(pool['frames.rms']) if 'frames.rms' in pool.descriptorNames() else 0
+        features = self._features_from_pool(pool, means, sr)
+        features['duration_s'] = frames * self.hop_size / sr
+        return features
+
+    def _features_from_pool(self, pool: Any, means: Any, sr: int) -> Dict[str, Any]:
+        """Derive the interface features from per-frame descriptors."""
+        names = set(pool.descriptorNames())
+        mean_names = set(means.descriptorNames())
+        frame_rate = sr / self.hop_size
+
+        def mean(name: str, default: float = 0.0) -> float:
+            key = f"{name}.mean"
+            return float(means[key]) if key in mean_names else default
+
+        # Spectral tilt from band energies
+        low_energy = mean('frames.energy_low')
+        high_energy = mean('frames.energy_high')
+        tilt_db = 10 * np.log10((high_energy + 1e-10) / (low_energy + 1e-10)) if low_energy > 0 else 0.0
+
+        # THD proxy: harmonics 2-8 over the fundamental, from the tristimulus
+        thd = 0.0
+        if 'frames.tristimulus' in names:
+            first = np.asarray(pool['frames.tristimulus'])[:, 0]
+            first = first[first > 0]
+            if len(first):
+                thd = float(np.mean((1.0 - first) / first))
+
+        rms = np.asarray(pool['frames.rms']) if 'frames.rms' in names else np.zeros(0)
+        onset = np.asarray(pool['frames.onset']) if 'frames.onset' in names else np.zeros(0)
+
+        bpm = None
+        if 'rhythm.bpm' in names:
+            value = float(np.ravel(pool['rhythm.bpm'])[-1])
+            bpm = value if value > 0 else None
+
+        return {
+            'spectral_tilt_db': float(tilt_db),
+            'spectral_centroid_mean': mean('frames.centroid', 2000.0),
+            'thd_proxy': thd,
+            'onset_delay_ms': _delay_from_onsets(onset, frame_rate),
+            'reverb_estimate': _reverb_from_frames(rms, mean('frames.energy_air'), mean('frames.energy'),
+                                                   self.hop_size, self.frame_size, sr),
+            'lfo_rate_hz': _lfo_from_envelope(rms, frame_rate),
+            'tempo_bpm': bpm,
+        }
+
+    def _signal_features(self, y: Any, sr: int) -> Dict[str, Any]:
+        """Analyze *y* once and cache the result for the per-feature methods."""
+        audio = np.ascontiguousarray(y, dtype=np.float32)
+        key = (hashlib.blake2b(audio.tobytes(), digest_size=16).hexdigest(), sr)
+        if key != self._cache_key:
+            try:
+                source = ess.VectorInput(essentia.array(audio))
+                self._cache = self._run(source, source.data, sr)
+            except Exception as e:
+                self.logger.warning(f"Streaming analysis failed: {e}")
+                self._cache = {}
+            self._cache_key = key
+        return self._cache
+
+    def clear_cache(self) -> None:
+        """Forget the analysis of the last signal."""
+        self._cache_key = None
+        self._cache = {}
+
+    def analyze(self, path: str) -> Dict[str, Any]:
+        """
+        Analyze a file in a single streaming pass (loader inside the network).
+
+        Args:
+            path: Path to audio file
+
+        Returns:
+            Dictionary containing all extracted features
+        """
+        self.logger.info(f"Analyzing audio: {path}")
+        loader = ess.MonoLoader(filename=path, sampleRate=self.sample_rate)
+        features = self._run(loader, loader.audio, self.sample_rate)
+        features['sample_rate'] = self.sample_rate
+        self.logger.info("Analysis complete")
+        return features
+
+    def analyze_signal(self, y: Any, sr: int) -> Dict[str, Any]:
+        """
+        Extract all features from an already loaded signal in one network run.
+
+        Args:
+            y: Mono audio signal in [-1, 1]
+            sr: Sample rate
+
+        Returns:
+            Dictionary containing all extracted features
+        """
+        features = dict(self._signal_features(y, sr))
+        features['sample_rate'] = sr
+        features['duration_s'] = len(y) / sr if hasattr(y, '__len__') else 0
+        return features
+
+    def spectral_tilt_db(self, y: Any, sr: int) -> float:
+        """Spectral tilt in dB from framewise band energies."""
+        return self._signal_features(y, sr).get('spectral_tilt_db', 0.0)
+
+    def spectral_centroid_mean(self, y: Any, sr: int) -> float:
+        """Mean framewise spectral centroid in Hz."""
+        return self._signal_features(y, sr).get('spectral_centroid_mean', 2000.0)
+
+    def thd_proxy(self, y: Any, sr: int) -> float:
+        """THD proxy from framewise harmonic peaks."""
+        return self._signal_features(y, sr).get('thd_proxy', 0.0)
+
+    def onset_delay_ms(self, y: Any, sr: int) -> Tuple[float, float]:
+        """Delay time and feedback from the onset detection function."""
+        return self._signal_features(y, sr).get('onset_delay_ms', (0.0, 0.0))
+
+    def reverb_estimate(self, y: Any, sr: int) -> Tuple[float, float]:
+        """Reverb decay and mix from the framewise RMS tail."""
+        return self._signal_features(y, sr).get('reverb_estimate', (0.0, 0.0))
+
+    def lfo_rate_hz(self, y: Any, sr: int) -> Tuple[Optional[float], float]:
+        """LFO rate and strength from the framewise RMS envelope."""
+        return self._signal_features(y, sr).get('lfo_rate_hz', (None, 0.0))
+
+    def tempo_bpm(self, y: Any, sr: int) -> Optional[float]:
+        """Tempo from RhythmExtractor2013 (44.1 kHz only)."""
+        return self._signal_features(y, sr).get('tempo_bpm')
+
+
+def _delay_from_onsets(onset: np.ndarray, frame_rate: float) -> Tuple[float, float]:
+    """Autocorrelation of the onset detection function (as in EssentiaAnalyzer)."""
+    if len(onset) < 2:
+        return 0.0, 0.0
+
+    autocorr = np.correlate(onset, onset, mode='full')[len(onset) - 1:]
+    if np.max(autocorr) > 0:
+        autocorr = autocorr / np.max(autocorr)
+
+    min_delay_frames = int(0.01 * frame_rate)
+    max_delay_frames = int(2.0 * frame_rate)
+    search_window = autocorr[min_delay_frames:min(len(autocorr), max_delay_frames)]
+
+    peaks, _ = signal.find_peaks(search_window, height=0.3, distance=10)
+    if len(peaks) == 0:
+        return 0.0, 0.0
+
+    best_peak_idx = peaks[np.argmax(search_window[peaks])]
+    delay_time_ms = (best_peak_idx + min_delay_frames) * 1000 / frame_rate
+    feedback = min(0.8, search_window[best_peak_idx] * 1.5)
+    return float(delay_time_ms), float(feedback)
+
+
+def _reverb_from_frames(rms: np.ndarray, air_energy: float, total_energy: float,
+                        hop_size: int, frame_size: int, sr: int) -> Tuple[float, float]:
+    """Decay from the last frame above 10% of the peak RMS; mix from HF energy ratio."""
+    if len(rms) == 0 or np.max(rms) <= 0:
+        return 0.0, 0.0
+
+    last_above = np.where(rms > np.max(rms) * 0.1)[0][-1]
+    decay_time_s = (last_above * hop_size + frame_size / 2) / sr
+    high_freq_ratio = air_energy / total_energy if total_energy > 0 else 0.0
+
+    if decay_time_s > 0.8 and high_freq_ratio > 0.1:
+        return float(decay_time_s), float(min(0.3, high_freq_ratio * 2.0))
+    return 0.0, 0.0
+
+
+def _lfo_from_envelope(rms: np.ndarray, frame_rate: float) -> Tuple[Optional[float], float]:
+    """Strongest 0.2-6 Hz component of the framewise RMS envelope."""
+    if len(rms) < 16:
+        return None, 0.0
+
+    envelope = rms - np.mean(rms)
+    low_freq = 8 / (frame_rate / 2)
+    if low_freq < 1.0:
+        b, a = signal.butter(4, low_freq, btype='low')
+        envelope = signal.filtfilt(b, a, envelope)
+
+    mod_fft = np.fft.rfft(envelope)
+    freqs = np.fft.rfftfreq(len(envelope), 1 / frame_rate)
+    lfo_mask = (freqs >= 0.2) & (freqs <= 6.0)
+    mod_spectrum = np.abs(mod_fft[lfo_mask])
+
+    if len(mod_spectrum) > 0 and np.sum(mod_spectrum) > 0:
+        peak_idx = np.argmax(mod_spectrum)
+        lfo_rate = freqs[lfo_mask][peak_idx]
+        modulation_strength = mod_spectrum[peak_idx] / np.sum(mod_spectrum)
+        if modulation_strength > 0.1 and lfo_rate > 0.2:
+            return float(lfo_rate), float(modulation_strength)
+    return None, 0.0
+
+
+_worker_analyzer: Optional[EssentiaStreamingAnalyzer] = None
+
+
+def _init_worker(sample_rate: int) -> None:
+    global _worker_analyzer
+    _worker_analyzer = EssentiaStreamingAnalyzer(sample_rate)
+
+
+def _analyze_in_worker(path: str) -> Dict[str, Any]:
+    try:
+        return _worker_analyzer.analyze(path)
+    except Exception as e:
+        logging.getLogger(__name__).warning(f"Analysis of {path} failed: {e}")
+        return {}
+
+
+def analyze_files(paths: Iterable[str], workers: int = 4, sample_rate: int = 44100) -> List[Dict[str, Any]]:
+    """
+    Analyze many files in parallel, one streaming analyzer per worker process.
+
+    Args:
+        paths: Audio files
+        workers: Number of worker processes
+        sample_rate: Target sample rate for analysis
+
+    Returns:
+        Feature dictionaries in input order (empty dict for failed files)
+    """
+    if not ESSENTIA_STREAMING_AVAILABLE:
+        raise RuntimeError("Essentia streaming mode not available")
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(sample_rate,)) as executor:
+        return list(executor.map(_analyze_in_worker, list(paths)))
@@ -9,10 +9,11 @@ Supports runtime selection via CLI flags, environment variables, or auto-detecti
 
 import os
 import logging
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from argparse import Namespace
 
 from .base import AudioAnalyzer
+from .composite import CompositeAnalyzer
 
 # Try to import backends
 try:
@@ -28,6 +29,12 @@ except ImportError as e:
     ESSENTIA_AVAILABLE = False
     EssentiaAnalyzer = None
 
+try:
+    from .essentia_streaming import EssentiaStreamingAnalyzer, ESSENTIA_STREAMING_AVAILABLE
+except ImportError as e:
+    ESSENTIA_STREAMING_AVAILABLE = False
+    EssentiaStreamingAnalyzer = None
+
 
 class AnalyzerFactory:
     """
@@ -67,7 +74,8 @@ class AnalyzerFactory:
         """
         return {
             'librosa': LIBROSA_AVAILABLE,
-            'essentia': ESSENTIA_AVAILABLE
+            'essentia': ESSENTIA_AVAILABLE,
+            'essentia_streaming': ESSENTIA_STREAMING_AVAILABLE
         }
     
     def create_analyzer(self, preferred: Optional[str] = None, 
@@ -76,7 +84,8 @@ class AnalyzerFactory:
         Create an audio analyzer instance.
         
         Args:
-            preferred: Preferred backend ('librosa', 'essentia', 'auto', or None)
+            preferred: Preferred backend ('librosa', 'essentia', 'essentia_streaming',
+                'composite', 'auto', or None)
             sample_rate: Target sample rate for analysis
             
         Returns:
@@ -101,11 +110,40 @@ class AnalyzerFactory:
             analyzer = EssentiaAnalyzer(sample_rate)
             self.logger.info("Created Essentia analyzer")
             
+        elif backend == 'essentia_streaming':
+            if not ESSENTIA_STREAMING_AVAILABLE:
+                raise RuntimeError("Essentia streaming backend requested but not available")
+            analyzer = EssentiaStreamingAnalyzer(sample_rate)
+            self.logger.info("Created Essentia streaming analyzer")
+            
+        elif backend == 'composite':
+            analyzer = CompositeAnalyzer(self._create_backends(sample_rate), sample_rate)
+            self.logger.info("Created composite analyzer")
+            
         else:
             raise RuntimeError(f"Unknown backend: {backend}")
         
         return analyzer
     
+    def _create_backends(self, sample_rate: int) -> Dict[str, AudioAnalyzer]:
+        """
+        Instantiate every available backend (for the composite analyzer).
+        
+        Args:
+            sample_rate: Target sample rate for analysis
+            
+        Returns:
+            Dictionary mapping backend names to analyzer instances
+        """
+        backends = {}
+        if LIBROSA_AVAILABLE:
+            backends['librosa'] = LibrosaAnalyzer(sample_rate)
+        if ESSENTIA_AVAILABLE:
+            backends['essentia'] = EssentiaAnalyzer(sample_rate)
+        if ESSENTIA_STREAMING_AVAILABLE:
+            backends['essentia_streaming'] = EssentiaStreamingAnalyzer(sample_rate)
+        return backends
+    
     def _select_backend(self, preferred: Optional[str] = None) -> str:
         """
         Select the best available backend based on preference.
@@ -141,6 +179,18 @@ class AnalyzerFactory:
             else:
                 raise RuntimeError("Essentia backend not available")
         
+        elif preferred == 'essentia_streaming':
+            if ESSENTIA_STREAMING_AVAILABLE:
+                return 'essentia_streaming'
+            else:
+                raise RuntimeError("Essentia streaming backend not available")
+        
+        elif preferred == 'composite':
+            if LIBROSA_AVAILABLE or ESSENTIA_AVAILABLE:
+                return 'composite'
+            else:
+                raise RuntimeError("No backends available for composite routing")
+        
         else:
             raise ValueError(f"Invalid backend preference: {preferred}")
 
@@ -172,6 +222,12 @@ def get_analyzer(preferred: Optional[str] = None, sample_rate: int = 44100) -> A
         # Force Librosa backend
         analyzer = get_analyzer('librosa')
         
+        # Single-pass Essentia streaming network
+        analyzer = get_analyzer('essentia_streaming')
+        
+        # Route each feature to the fastest agreeing backend
+        analyzer = get_analyzer('composite')
+        
         # Custom sample rate
         analyzer = get_analyzer('auto', sample_rate=48000)
     """
@@ -188,6 +244,22 @@ def get_available_backends() -> Dict[str, bool]:
     return _factory.get_available_backends()
 
 
+def get_routing_table(sample_rate: int = 44100) -> List[Dict[str, Any]]:
+    """
+    Get the composite analyzer's per-feature routing table.
+    
+    Benchmarks the available backends first if this machine has no
+    up-to-date profile yet.
+    
+    Args:
+        sample_rate: Target sample rate for analysis
+        
+    Returns:
+        One row per feature (see CompositeAnalyzer.routing_table)
+    """
+    return _factory.create_analyzer('composite', sample_rate).routing_table()
+
+
 def select_backend_from_args(args: Namespace) -> str:
     """
     Select backend from command line arguments.
@@ -252,6 +324,11 @@ def create_essentia_analyzer(sample_rate: int = 44100) -> AudioAnalyzer:
     return get_analyzer('essentia', sample_rate)
 
 
+def create_essentia_streaming_analyzer(sample_rate: int = 44100) -> AudioAnalyzer:
+    """Create an Essentia streaming analyzer instance."""
+    return get_analyzer('essentia_streaming', sample_rate)
+
+
 def create_auto_analyzer(sample_rate: int = 44100) -> AudioAnalyzer:
     """Create an auto-selected analyzer instance."""
     return get_analyzer('auto', sample_rate)
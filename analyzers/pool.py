@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Analyzer Pool
+=============
+
+Owns warm analyzer instances and lends each one to a single job at a time.
+
+Analyzer backends keep mutable state (Essentia algorithm objects, loader
+parameters, cached results) and must not be used by two threads at once.
+The pool hands instances out through a context manager, puts them back
+after the job, and caps concurrency at ``size``: at most ``size`` instances
+are ever created, so no job pays initialization twice once the pool is
+warm. Pools are per process (:func:`get_analyzer_pool` keys them by PID),
+so worker processes build their own instances instead of inheriting a
+parent's.
+
+Usage:
+    pool = get_analyzer_pool('auto')
+    with pool.analyzer() as analyzer:
+        features = analyzer.analyze(path)
+"""
+
+import logging
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .base import AudioAnalyzer
+from .factory import get_analyzer
+
+
+class AnalyzerPool:
+    """Bounded pool of reusable analyzer instances."""
+
+    def __init__(self, backend: str = 'auto', sample_rate: int = 44100, size: Optional[int] = None,
+                 prewarm: int = 1, factory: Optional[Callable[[], AudioAnalyzer]] = None):
+        """
+        Initialize the pool.
+
+        Args:
+            backend: Backend passed to get_analyzer ('auto', 'librosa', 'composite'...)
+            sample_rate: Target sample rate for analysis
+            size: Maximum number of instances and concurrent jobs (CPU count by default)
+            prewarm: Instances created immediately (at least one, to fail early
+                if the backend is unavailable)
+            factory: Callable creating one analyzer (overrides backend/sample_rate)
+
+        Raises:
+            RuntimeError: If the backend cannot be created
+        """
+        self.backend = backend
+        self.sample_rate = sample_rate
+        self.size = max(1, size or os.cpu_count() or 1)
+        self.logger = logging.getLogger(__name__)
+
+        self._factory = factory or (lambda: get_analyzer(backend, sample_rate))
+        self._idle: "queue.LifoQueue[AudioAnalyzer]" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._lock = threading.Lock()
+        self._created = 0
+        self._in_use = 0
+
+        first = self._create()
+        self.backend_name = first.get_backend_name()
+        self._idle.put(first)
+        for _ in range(min(self.size, max(1, prewarm)) - 1):
+            self._idle.put(self._create())
+
+    def _create(self) -> AudioAnalyzer:
+        analyzer = self._factory()
+        with self._lock:
+            self._created += 1
+        self.logger.debug(f"Created analyzer instance {self._created}/{self.size} ({self.backend})")
+        return analyzer
+
+    @property
+    def created(self) -> int:
+        """Number of analyzer instances created so far."""
+        return self._created
+
+    @property
+    def in_use(self) -> int:
+        """Number of instances currently lent out."""
+        return self._in_use
+
+    @contextmanager
+    def analyzer(self, timeout: Optional[float] = None) -> Iterator[AudioAnalyzer]:
+        """
+        Borrow an analyzer for the duration of a ``with`` block.
+
+        Blocks while ``size`` jobs are running. The instance is exclusive to
+        the caller until the block exits, then returns to the pool.
+
+        Args:
+            timeout: Seconds to wait for a free slot (None = wait forever)
+
+        Raises:
+            TimeoutError: If no slot frees up within *timeout*
+        """
+        if not self._slots.acquire(timeout=timeout):
+            raise TimeoutError(f"No analyzer available within {timeout}s (pool size {self.size})")
+
+        try:
+            try:
+                instance = self._idle.get_nowait()
+            except queue.Empty:
+                instance = self._create()
+
+            with self._lock:
+                self._in_use += 1
+            try:
+                yield instance
+            finally:
+                with self._lock:
+                    self._in_use -= 1
+                self._idle.put(instance)
+        finally:
+            self._slots.release()
+
+    def run(self, job: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        Run ``job(analyzer, *args, **kwargs)`` with a borrowed analyzer.
+
+        Returns:
+            Result of *job*
+        """
+        with self.analyzer() as instance:
+            return job(instance, *args, **kwargs)
+
+    def analyze(self, path: str) -> Dict[str, Any]:
+        """Analyze one file with a borrowed analyzer."""
+        return self.run(lambda instance: instance.analyze(path))
+
+    def analyze_many(self, paths: Iterable[str]) -> List[Dict[str, Any]]:
+        """
+        Analyze files concurrently, at most ``size`` at a time.
+
+        Args:
+            paths: Audio files
+
+        Returns:
+            Feature dictionaries in input order
+        """
+        with ThreadPoolExecutor(max_workers=self.size, thread_name_prefix="analyzer-pool") as executor:
+            return list(executor.map(self.analyze, paths))
+
+
+_pools: Dict[Tuple[int, str, int], AnalyzerPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_analyzer_pool(backend: str = 'auto', sample_rate: int = 44100,
+                      size: Optional[int] = None) -> AnalyzerPool:
+    """
+    Get the process-wide pool for *backend* and *sample_rate*.
+
+    The pool is created on first use; later calls return the same pool
+    (*size* only applies on creation).
+
+    Args:
+        backend: Backend name
+        sample_rate: Target sample rate for analysis
+        size: Maximum concurrent analyses
+
+    Returns:
+        AnalyzerPool instance
+    """
+    key = (os.getpid(), backend, sample_rate)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = AnalyzerPool(backend, sample_rate, size=size)
+            _pools[key] = pool
+        return pool
@@ -10,12 +10,14 @@ Usage:
     python auto_tone_match_magicstomp.py input.wav --backend auto
     python auto_tone_match_magicstomp.py input.wav --backend essentia --send
     python auto_tone_match_magicstomp.py input.wav --backend librosa --verbose
+    python auto_tone_match_magicstomp.py input.wav --backend composite
 
 Features:
 - Dual backend audio analysis (Essentia + librosa)
 - Automatic effect detection and parameter mapping
 - Magicstomp SysEx generation and USB-MIDI support
 - Runtime backend selection with graceful fallback
+- Composite backend routing each feature to the fastest agreeing backend
 """
 
 import argparse
@@ -23,9 +25,11 @@ import json
 import logging
 import sys
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
-from analyzers.factory import get_analyzer, select_backend_from_args, setup_backend_logging, get_available_backends
+from analyzers.factory import (get_analyzer, select_backend_from_args, setup_backend_logging,
+                               get_available_backends, get_routing_table)
+from analyzers.pool import AnalyzerPool
 from adapter_magicstomp import MagicstompAdapter
 
 
@@ -37,21 +41,29 @@ class AutoToneMatcher:
     using dual backend audio analysis.
     """
     
-    def __init__(self, backend: str = 'auto', sample_rate: int = 44100):
+    def __init__(self, backend: str = 'auto', sample_rate: int = 44100,
+                 pool: Optional[AnalyzerPool] = None):
         """
         Initialize the tone matcher.
         
         Args:
             backend: Audio analysis backend ('auto', 'essentia', 'librosa')
             sample_rate: Target sample rate for analysis
+            pool: Shared analyzer pool; analyses borrow a warm instance from it
+                instead of owning one (backend is then ignored)
         """
         self.sample_rate = sample_rate
         self.logger = logging.getLogger(__name__)
+        self.pool = pool
         
         # Create analyzer
         try:
-            self.analyzer = get_analyzer(backend, sample_rate)
-            self.backend_name = self.analyzer.get_backend_name()
+            if pool is not None:
+                self.analyzer = None
+                self.backend_name = pool.backend_name
+            else:
+                self.analyzer = get_analyzer(backend, sample_rate)
+                self.backend_name = self.analyzer.get_backend_name()
             self.logger.info(f"Initialized analyzer with {self.backend_name} backend")
         except Exception as e:
             self.logger.error(f"Failed to create analyzer: {e}")
@@ -81,7 +93,11 @@ class AutoToneMatcher:
             self.logger.info(f"Using {self.backend_name} backend")
         
         # Perform analysis
-        self.features = self.analyzer.analyze(audio_path)
+        if self.pool is not None:
+            with self.pool.analyzer() as analyzer:
+                self.features = analyzer.analyze(audio_path)
+        else:
+            self.features = self.analyzer.analyze(audio_path)
         
         # Log analysis results
         self._log_analysis_results(verbose)
@@ -386,7 +402,10 @@ Examples:
   # Generate SysEx file with custom patch number
   python auto_tone_match_magicstomp.py guitar.wav --syx output.syx --patch 5
 
-  # Check available backends
+  # Route each feature to the fastest agreeing backend
+  python auto_tone_match_magicstomp.py guitar.wav --backend composite
+
+  # Check available backends and the composite routing table
   python auto_tone_match_magicstomp.py --list-backends
         """
     )
@@ -395,7 +414,7 @@ Examples:
     parser.add_argument('input', nargs='?', help='Input audio file')
     
     # Backend selection
-    parser.add_argument('--backend', choices=['auto', 'essentia', 'librosa'],
+    parser.add_argument('--backend', choices=['auto', 'essentia', 'essentia_streaming', 'librosa', 'composite'],
                        default='auto', help='Audio analysis backend')
     
     # Output options
@@ -412,7 +431,7 @@ Examples:
     parser.add_argument('--verbose', '-v', action='store_true',
                        help='Enable verbose logging')
     parser.add_argument('--list-backends', action='store_true',
-                       help='List available backends and exit')
+                       help='List available backends and the composite routing, then exit')
     
     args = parser.parse_args()
     
@@ -427,6 +446,13 @@ Examples:
         for name, available in backends.items():
             status = "✅ Available" if available else "❌ Not available"
             logger.info(f"  {name}: {status}")
+        
+        if any(backends.values()):
+            logger.info("Composite routing (fastest agreeing backend per feature):")
+            for row in get_routing_table():
+                timings = ", ".join(f"{name}={seconds * 1000:.1f}ms{'' if row['agrees'].get(name) else ' (disagrees)'}"
+                                    for name, seconds in row['timings_s'].items())
+                logger.info(f"  {row['feature']:<24} -> {row['backend']:<10} [{timings}]")
         return
     
     # Check input file
@@ -33,9 +33,15 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from analyzers.factory import get_analyzer
 from adapter_magicstomp import MagicstompAdapter
+from hil.capture_cache import CaptureCache, calibration_fingerprint
 from hil.io import AudioDeviceManager, list_audio_devices
+from hil.loopback import LoopbackBackend
+from hil.settle import SettleDetector
 from optimize.loss import PerceptualLoss
 from optimize.search import CoordinateSearchOptimizer, ParameterSpace
+from optimize.warm_start import FeatureIndex, build_feature_index, sample_parameter_sets
+from optimize.multi_fidelity import Fidelity, MultiFidelityOptimizer
+from simulation.magicstomp import SimulatedMagicstomp
 from auto_tone_match_magicstomp import AutoToneMatcher
 
 
@@ -51,22 +57,28 @@ class HILToneMatcher:
     5. Export results
     """
     
-    def __init__(self, backend: str = 'auto', sample_rate: int = 44100):
+    def __init__(self, backend: str = 'auto', sample_rate: int = 44100,
+                 audio_backend: Any = None):
         """
         Initialize HIL tone matcher.
         
         Args:
             backend: Audio analysis backend
             sample_rate: Audio sample rate
+            audio_backend: sounddevice-compatible audio backend (defaults to
+                sounddevice; see hil.loopback for a simulated device)
         """
         self.sample_rate = sample_rate
         self.logger = logging.getLogger(__name__)
         
         # Initialize components
-        self.audio_manager = AudioDeviceManager(sample_rate)
+        self.audio_manager = AudioDeviceManager(sample_rate, backend=audio_backend)
         self.magicstomp_adapter = MagicstompAdapter()
+        # A simulated device is driven through its own MIDI port
+        self.midi_output = audio_backend.midi_port() if hasattr(audio_backend, 'midi_port') else None
         self.loss_calculator = PerceptualLoss(sample_rate)
         self.parameter_space = ParameterSpace()
+        self.settle_detector = SettleDetector(sample_rate=sample_rate)
         
         # Tone matcher for initial analysis
         self.tone_matcher = AutoToneMatcher(backend, sample_rate)
@@ -77,6 +89,9 @@ class HILToneMatcher:
         self.calibrated = False
         self.current_patch = None
         self.optimization_results = None
+        self.feature_index = None
+        self.sent_patch = None  # Device state after the last send (Patch)
+        self.capture_cache = None
         
         # Output directory
         self.output_dir = Path("out")
@@ -199,6 +214,15 @@ class HILToneMatcher:
         calibration_file = self.output_dir / "calibration.json"
         self.audio_manager.save_calibration(str(calibration_file))
         
+        # Monitor the return signal to detect when patch changes have settled
+        try:
+            self.audio_manager.start_monitor()
+            self.settle_detector.read_monitor = self.audio_manager.read_monitor
+            self.settle_detector.measure_noise_floor()
+        except Exception as e:
+            self.settle_detector.read_monitor = None
+            self.logger.warning(f"Input monitor unavailable, using learned settle times: {e}")
+        
         self.calibrated = True
         
         self.logger.info("System calibration complete")
@@ -220,30 +244,78 @@ class HILToneMatcher:
         """
         self.logger.info(f"Sending patch to Magicstomp (patch #{patch_number})...")
         
-        # Generate SysEx data
-        syx_data = self.magicstomp_adapter.json_to_syx(patch, patch_number)
-        
-        # Send to device
-        if midi_port:
-            # Use specific port
-            success = self.magicstomp_adapter.send_to_device(syx_data)
+        # Generate SysEx data: only the bytes that differ from the last patch
+        # sent, once the device state is known
+        device_state = self.magicstomp_adapter.json_to_patch(patch, base=self.sent_patch)
+        if self.sent_patch is not None:
+            syx_data = device_state.to_parameter_messages(base=self.sent_patch)
+            if not syx_data:
+                self.logger.debug("Patch unchanged, nothing to send")
+                return True
         else:
-            # Auto-detect port
-            success = self.magicstomp_adapter.send_to_device(syx_data)
+            syx_data = self.magicstomp_adapter.json_to_syx(patch, patch_number)
+        
+        # Send to device (specific port, simulated device or auto-detected port)
+        success = self.magicstomp_adapter.send_to_device(syx_data, port_name=midi_port,
+                                                         existing_port=self.midi_output)
         
         if success:
+            self.sent_patch = device_state
             self.logger.info("Patch sent successfully")
         else:
             self.logger.warning("Failed to send patch to Magicstomp")
         
         return success
     
-    def capture_magicstomp_output(self, wait_time: float = 0.1) -> np.ndarray:
+    def enable_capture_cache(self, directory: str = "out/capture_cache",
+                             max_bytes: int = 512 * 1024 * 1024,
+                             capture_format: str = 'npy') -> CaptureCache:
+        """
+        Reuse hardware captures of device states already measured.
+        
+        Captures are keyed by the device state after the last patch sent,
+        the DI content and the calibration, so repeated sessions and A/B
+        comparisons do not replay the DI for a known patch.
+        
+        Args:
+            directory: Cache directory
+            max_bytes: Size budget of the stored captures
+            capture_format: 'npy' (memory-mapped reads) or 'flac'
+            
+        Returns:
+            The capture cache
+        """
+        self.capture_cache = CaptureCache(directory, max_bytes=max_bytes,
+                                          capture_format=capture_format)
+        self.logger.info(f"Capture cache: {directory} ({len(self.capture_cache)} entries)")
+        return self.capture_cache
+    
+    def _capture_key(self, di_signal: np.ndarray) -> Optional[str]:
+        """Cache key of the next capture, None if the device state is unknown."""
+        if self.capture_cache is None:
+            return None
+        if self.sent_patch is None:
+            self.logger.warning("Device state unknown until a patch is sent, capture not cached")
+            return None
+        
+        manager = self.audio_manager
+        calibration = calibration_fingerprint(manager.sample_rate, manager.round_trip_latency,
+                                              manager.gain_compensation, manager.calibration_data)
+        return CaptureCache.make_key(list(bytes(self.sent_patch)),
+                                     self.capture_cache.di_fingerprint(di_signal), calibration)
+    
+    def capture_magicstomp_output(self, wait_time: Optional[float] = None,
+                                  num_samples: Optional[int] = None) -> np.ndarray:
         """
         Capture audio output from Magicstomp.
         
+        With the capture cache enabled, a device state already measured
+        with the same DI and calibration is read from the cache instead.
+        
         Args:
-            wait_time: Wait time after sending patch before capture
+            wait_time: Fixed wait after sending patch before capture; None to
+                wait until the return signal has settled
+            num_samples: Play only the beginning of the DI signal
             
         Returns:
             Captured audio signal
@@ -251,17 +323,37 @@ class HILToneMatcher:
         if self.di_signal is None:
             raise RuntimeError("DI signal not loaded")
         
-        # Wait for patch to take effect
-        if wait_time > 0:
+        di_signal = self.di_signal[:num_samples]
+        key = self._capture_key(di_signal)
+        cached = self.capture_cache.get(key) if key is not None else None
+        if cached is not None:
+            self.logger.debug(f"Capture of {len(cached)} samples read from the cache")
+            return cached
+        
+        # Wait for patch to take effect and for the previous tail to decay
+        if wait_time is None:
+            self.settle_detector.wait(self._settle_key(self.current_patch))
+        elif wait_time > 0:
             time.sleep(wait_time)
         
         # Play DI signal and record return
-        captured_audio = self.audio_manager.play_and_record(self.di_signal)
+        captured_audio = self.audio_manager.play_and_record(di_signal)
         
         self.logger.debug(f"Captured {len(captured_audio)} samples from Magicstomp")
         
+        if key is not None:
+            self.capture_cache.put(key, captured_audio, self.sample_rate)
+        
         return captured_audio
     
+    @staticmethod
+    def _settle_key(patch: Optional[Dict[str, Any]]) -> str:
+        """Settle statistics key: the time-based blocks of the patch."""
+        if not patch:
+            return 'unknown'
+        blocks = [name for name in ('delay', 'reverb', 'mod') if patch.get(name)]
+        return '+'.join(blocks) or 'amp'
+    
     def compute_loss(self, target_audio: np.ndarray, 
                     processed_audio: np.ndarray) -> float:
         """
@@ -276,20 +368,28 @@ class HILToneMatcher:
         """
         return self.loss_calculator.compute_loss(target_audio, processed_audio)
     
-    def create_loss_function(self) -> callable:
+    def create_loss_function(self, num_samples: Optional[int] = None) -> callable:
         """
         Create loss function for optimization.
         
+        Args:
+            num_samples: Evaluate on the beginning of the DI and target only
+                (short probe); None for the full signals
+        
         Returns:
             Loss function that takes parameter dict and returns loss
         """
+        target_audio = self.target_audio[:num_samples]
+        
         def loss_function(parameters: Dict[str, float]) -> float:
             # Update parameter space
             for name, value in parameters.items():
                 self.parameter_space.set_parameter_value(name, value)
             
-            # Generate patch with new parameters
-            patch = self.current_patch.copy()
+            # Generate patch with new parameters (section dicts copied so the
+            # current patch is left untouched)
+            patch = {key: dict(value) if isinstance(value, dict) else value
+                     for key, value in self.current_patch.items()}
             self._update_patch_with_parameters(patch, parameters)
             
             # Send patch to Magicstomp
@@ -297,10 +397,10 @@ class HILToneMatcher:
                 return float('inf')  # High loss if patch send fails
             
             # Capture Magicstomp output
-            captured_audio = self.capture_magicstomp_output()
+            captured_audio = self.capture_magicstomp_output(num_samples=num_samples)
             
             # Compute loss
-            loss = self.compute_loss(self.target_audio, captured_audio)
+            loss = self.compute_loss(target_audio, captured_audio)
             
             self.logger.debug(f"Parameters: {parameters} -> Loss: {loss:.6f}")
             
@@ -341,14 +441,73 @@ class HILToneMatcher:
         if 'mod_mix' in parameters:
             patch['mod']['mix'] = parameters['mod_mix']
     
+    def build_feature_index(self, count: int = 500, seed: Optional[int] = None,
+                            use_mfcc: bool = True) -> FeatureIndex:
+        """
+        Build the warm-start library by rendering random patches of the
+        parameter space on the simulated Magicstomp.
+        
+        Args:
+            count: Number of library patches
+            seed: Random seed
+            use_mfcc: Store MFCC statistics along with the analyzer features
+            
+        Returns:
+            Feature index (also kept as self.feature_index)
+        """
+        if self.di_signal is None:
+            raise RuntimeError("DI signal not loaded")
+        
+        self.logger.info(f"Building warm-start index from {count} simulated patches...")
+        simulator = SimulatedMagicstomp(self.sample_rate)
+        
+        def render(parameters: Dict[str, float]) -> np.ndarray:
+            simulator.set_parameters(parameters)
+            return simulator.process_audio(self.di_signal)
+        
+        analyzer = self.tone_matcher.analyzer
+        self.feature_index = build_feature_index(
+            sample_parameter_sets(self.parameter_space, count, seed=seed),
+            render,
+            lambda audio: analyzer.analyze_signal(audio, self.sample_rate),
+            (lambda audio: self.loss_calculator.extract_features(audio)[1]) if use_mfcc else None
+        )
+        return self.feature_index
+    
+    def load_feature_index(self, path: str) -> None:
+        """Load a warm-start library saved with FeatureIndex.save."""
+        self.feature_index = FeatureIndex.load(path)
+        self.logger.info(f"Warm-start index loaded: {len(self.feature_index)} patches")
+    
+    def get_warm_starts(self, k: int = 3) -> List[Dict[str, float]]:
+        """
+        Library patches whose rendering is closest to the target features.
+        
+        Args:
+            k: Number of warm starts
+            
+        Returns:
+            Parameter dicts, closest first (empty without index or analysis)
+        """
+        if self.feature_index is None or not self.tone_matcher.features or k <= 0:
+            return []
+        
+        mfcc = self.loss_calculator.extract_features(self.target_audio)[1] if self.target_audio is not None else None
+        warm_starts = self.feature_index.warm_starts(self.tone_matcher.features, k, mfcc)
+        self.logger.info(f"{len(warm_starts)} warm start(s) from the feature index")
+        return warm_starts
+    
     def optimize_patch(self, max_iterations: int = 20,
-                      parameters_to_optimize: Optional[List[str]] = None) -> Dict[str, Any]:
+                      parameters_to_optimize: Optional[List[str]] = None,
+                      warm_starts: int = 3) -> Dict[str, Any]:
         """
         Optimize patch parameters using Hardware-in-the-Loop.
         
         Args:
             max_iterations: Maximum optimization iterations
             parameters_to_optimize: List of parameters to optimize
+            warm_starts: Nearest library patches tried as starting points
+                (requires a feature index)
             
         Returns:
             Optimization results
@@ -382,7 +541,7 @@ class HILToneMatcher:
         )
         
         # Run optimization
-        results = optimizer.optimize()
+        results = optimizer.optimize(warm_starts=self.get_warm_starts(warm_starts))
         
         # Update current patch with best parameters
         if results['success']:
@@ -393,6 +552,80 @@ class HILToneMatcher:
         self.logger.info("Hardware-in-the-Loop optimization complete")
         return results
     
+    def create_simulator_loss_function(self) -> callable:
+        """
+        Create a loss function evaluated on the simulated Magicstomp.
+        
+        Returns:
+            Loss function that takes parameter dict and returns loss
+        """
+        simulator = SimulatedMagicstomp(self.sample_rate)
+        
+        def loss_function(parameters: Dict[str, float]) -> float:
+            simulator.set_parameters(parameters)
+            return self.compute_loss(self.target_audio, simulator.process_audio(self.di_signal))
+        
+        return loss_function
+    
+    def optimize_patch_multi_fidelity(self, n_candidates: int = 27, eta: int = 3,
+                                      probe_duration: Optional[float] = 2.0,
+                                      hyperband: bool = False,
+                                      parameters_to_optimize: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Optimize patch parameters with simulator pre-screening.
+        
+        Candidates are screened on the simulated Magicstomp, then on a short
+        hardware probe, and only the best ones are captured in full on the
+        hardware (successive halving, or Hyperband brackets).
+        
+        Args:
+            n_candidates: Candidates sampled for the first rung
+            eta: Reduction factor between fidelities
+            probe_duration: Length of the hardware probe in seconds (None to
+                go straight from the simulator to the full capture)
+            hyperband: Run Hyperband brackets instead of one bracket
+            parameters_to_optimize: List of parameters to optimize
+            
+        Returns:
+            Optimization results
+        """
+        if not self.calibrated:
+            raise RuntimeError("System must be calibrated before optimization")
+        
+        if self.current_patch is None:
+            raise RuntimeError("No patch to optimize")
+        
+        self.logger.info("Starting multi-fidelity optimization...")
+        self._initialize_parameter_space_from_patch()
+        
+        if parameters_to_optimize is None:
+            parameters_to_optimize = [
+                'delay_mix', 'delay_feedback', 'reverb_mix',
+                'treble', 'presence', 'mod_depth', 'mod_mix'
+            ]
+        
+        def batch(loss_function):
+            return lambda candidates: [loss_function(parameters) for parameters in candidates]
+        
+        # Cost relative to a full hardware capture
+        fidelities = [Fidelity('simulator', batch(self.create_simulator_loss_function()), cost=0.05)]
+        probe_samples = int(probe_duration * self.sample_rate) if probe_duration else None
+        if probe_samples and probe_samples < len(self.di_signal):
+            fidelities.append(Fidelity('hardware_probe', batch(self.create_loss_function(probe_samples)),
+                                       cost=probe_samples / len(self.di_signal)))
+        fidelities.append(Fidelity('hardware', batch(self.create_loss_function()), cost=1.0))
+        
+        optimizer = MultiFidelityOptimizer(self.parameter_space, fidelities, eta=eta)
+        results = optimizer.optimize(n_candidates, parameters_to_optimize, hyperband=hyperband)
+        
+        if results['success']:
+            self._update_patch_with_parameters(self.current_patch, results['best_parameters'])
+        
+        self.optimization_results = results
+        
+        self.logger.info("Multi-fidelity optimization complete")
+        return results
+    
     def _initialize_parameter_space_from_patch(self) -> None:
         """Initialize parameter space from current patch."""
         if self.current_patch is None:
@@ -488,6 +721,12 @@ class HILToneMatcher:
     
     def cleanup(self):
         """Cleanup resources."""
+        if self.capture_cache is not None:
+            self.capture_cache.log_statistics()
+            self.capture_cache.close()
+        for effect, stats in self.settle_detector.statistics.summary().items():
+            self.logger.info(f"Settle {effect}: median {stats['median_s'] * 1000:.0f}ms, "
+                             f"p95 {stats['p95_s'] * 1000:.0f}ms over {stats['count']} changes")
         self.audio_manager.close()
         self.logger.info("HIL tone matcher cleaned up")
 
@@ -508,6 +747,9 @@ Examples:
   # Full HIL optimization
   python cli/auto_match_hil.py target.wav --di-signal dry.wav --calibrate --optimize --send-patch
 
+  # Dry run without audio interface (simulated device)
+  python cli/auto_match_hil.py target.wav --di-signal dry.wav --loopback --calibrate --optimize
+
   # Send patch only
   python cli/auto_match_hil.py target.wav --di-signal dry.wav --send-patch --patch-number 5
         """
@@ -522,6 +764,10 @@ Examples:
     parser.add_argument('--out-device', help='Output audio device name or ID')
     parser.add_argument('--in-ch', type=int, nargs='+', default=[1], help='Input channels')
     parser.add_argument('--out-ch', type=int, nargs='+', default=[1], help='Output channels')
+    parser.add_argument('--loopback', action='store_true', help='Use a simulated loopback device instead of the audio interface')
+    parser.add_argument('--loopback-latency', type=int, default=1024, help='Round-trip latency of the loopback device (samples, at least one audio block)')
+    parser.add_argument('--loopback-noise-db', type=float, default=-90.0, help='Noise floor of the loopback device (dBFS)')
+    parser.add_argument('--loopback-drift-ppm', type=float, default=0.0, help='Clock drift of the loopback device (ppm)')
     
     # MIDI configuration
     parser.add_argument('--midi-port', help='MIDI port name for Magicstomp')
@@ -536,9 +782,18 @@ Examples:
     # Optimization parameters
     parser.add_argument('--max-iterations', type=int, default=20, help='Maximum optimization iterations')
     parser.add_argument('--optimize-params', nargs='+', help='Parameters to optimize')
+    parser.add_argument('--multi-fidelity', action='store_true', help='Pre-screen candidates on the simulator and a short hardware probe')
+    parser.add_argument('--mf-candidates', type=int, default=27, help='Candidates of the first multi-fidelity rung')
+    parser.add_argument('--mf-eta', type=int, default=3, help='Reduction factor between fidelities')
+    parser.add_argument('--mf-probe', type=float, default=2.0, help='Duration of the hardware probe fidelity (seconds, 0 to skip)')
+    parser.add_argument('--hyperband', action='store_true', help='Run Hyperband brackets instead of one successive halving bracket')
+    parser.add_argument('--warm-start-index', help='Feature index (.npz) of library patches used as warm starts')
+    parser.add_argument('--build-warm-start-index', type=int, metavar='N', help='Render N simulated patches into the warm-start index (saved to --warm-start-index)')
+    parser.add_argument('--warm-starts', type=int, default=3, help='Nearest library patches tried as starting points')
+    parser.add_argument('--capture-cache', metavar='DIR', help='Reuse hardware captures of already measured patches stored in DIR')
     
     # Backend selection
-    parser.add_argument('--backend', choices=['auto', 'essentia', 'librosa'], default='auto', help='Audio analysis backend')
+    parser.add_argument('--backend', choices=['auto', 'essentia', 'essentia_streaming', 'librosa', 'composite'], default='auto', help='Audio analysis backend')
     
     # Output
     parser.add_argument('--session-name', default='hil_session', help='Session name for output files')
@@ -570,10 +825,20 @@ Examples:
     
     try:
         # Initialize HIL tone matcher
-        hil_matcher = HILToneMatcher(args.backend)
-        
+        audio_backend = None
+        if args.loopback:
+            audio_backend = LoopbackBackend(processor=SimulatedMagicstomp(),
+                                            latency=args.loopback_latency,
+                                            noise_db=args.loopback_noise_db,
+                                            drift_ppm=args.loopback_drift_ppm)
+        hil_matcher = HILToneMatcher(args.backend, audio_backend=audio_backend)
+        if args.capture_cache:
+            hil_matcher.enable_capture_cache(args.capture_cache)
+
         # Setup audio devices
-        if args.in_device or args.out_device:
+        if args.loopback:
+            hil_matcher.setup_audio_devices('Loopback', 'Loopback')
+        elif args.in_device or args.out_device:
             if not hil_matcher.setup_audio_devices(
                 args.in_device, args.out_device,
                 args.in_ch, args.out_ch
@@ -606,12 +871,30 @@ Examples:
                 args.midi_port
             )
         
+        # Warm-start library
+        if args.build_warm_start_index and args.di_signal:
+            hil_matcher.build_feature_index(args.build_warm_start_index)
+            if args.warm_start_index:
+                hil_matcher.feature_index.save(args.warm_start_index)
+        elif args.warm_start_index:
+            hil_matcher.load_feature_index(args.warm_start_index)
+        
         # Run optimization
         if args.optimize and hil_matcher.calibrated:
-            optimization_results = hil_matcher.optimize_patch(
-                args.max_iterations,
-                args.optimize_params
-            )
+            if args.multi_fidelity:
+                optimization_results = hil_matcher.optimize_patch_multi_fidelity(
+                    args.mf_candidates,
+                    args.mf_eta,
+                    args.mf_probe,
+                    args.hyperband,
+                    args.optimize_params
+                )
+            else:
+                optimization_results = hil_matcher.optimize_patch(
+                    args.max_iterations,
+                    args.optimize_params,
+                    args.warm_starts
+                )
             
             if optimization_results['success']:
                 logger.info(f"Optimization complete: improvement={optimization_results['improvement']:.6f}")
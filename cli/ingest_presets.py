@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Preset Bank Ingestion CLI
+=========================
+
+Ingests Magicstomp preset banks (MagicstompFrenzy ``.ini`` files and ``.syx``
+bulk dumps) into the columnar patch store used for fast lookups.
+
+Usage:
+    python cli/ingest_presets.py magicstompfrenzy-master/
+    python cli/ingest_presets.py dump.syx --store out/patch_store
+    python cli/ingest_presets.py --summary
+"""
+
+import argparse
+import logging
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from patch_codec import get_effect_codec
+from patch_store import DEFAULT_STORE_DIR, PatchStore, ingest_files
+
+
+def print_summary(store: PatchStore):
+    """Print the number of patches per effect type."""
+    print(f"📦 {len(store)} patches from {len(store.sources)} source(s) in {store.directory}")
+    for effect_type, count in sorted(store.effect_type_counts().items()):
+        print(f"  0x{effect_type:02X} {get_effect_codec(effect_type).name:<32} {count:>6}")
+
+
+def main():
+    """Main entry point for preset ingestion."""
+    parser = argparse.ArgumentParser(
+        description="Ingest Magicstomp preset banks into the patch store",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Ingest the MagicstompFrenzy factory banks
+  python cli/ingest_presets.py magicstompfrenzy-master/
+
+  # Add a bulk dump to a custom store
+  python cli/ingest_presets.py my_bank.syx --store out/my_store
+
+  # Show the store contents
+  python cli/ingest_presets.py --summary
+        """
+    )
+    parser.add_argument('paths', nargs='*', help='.ini / .syx files or directories to ingest')
+    parser.add_argument('--store', default=str(DEFAULT_STORE_DIR), help='Patch store directory')
+    parser.add_argument('--summary', action='store_true', help='Print patches per effect type')
+    parser.add_argument('--verbose', '-v', action='store_true', help='Verbose output')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO,
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    try:
+        if args.paths:
+            start = time.perf_counter()
+            before = len(PatchStore(args.store)) if (Path(args.store) / "meta.json").exists() else 0
+            store = ingest_files(args.paths, args.store)
+            elapsed = time.perf_counter() - start
+            print(f"✅ {len(store) - before} new patch(es) ingested in {elapsed:.2f}s")
+        elif not args.summary:
+            parser.print_help()
+            return
+
+        if args.summary or args.verbose:
+            print_summary(PatchStore(args.store))
+
+    except (OSError, ValueError) as e:
+        print(f"❌ Error: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -27,18 +27,23 @@ DETECTION_THRESHOLDS = {
     "reverb": {
         "min_decay_time_s": 0.8,
         "min_high_freq_ratio": 0.1,
-        "max_decay_time_s": 5.0
+        "max_decay_time_s": 5.0,
+        "plate_min_decay_s": 1.2,
+        "hall_min_decay_s": 2.0
     },
     "modulation": {
         "min_mod_strength": 0.1,
         "min_mod_rate_hz": 0.3,
         "max_mod_rate_hz": 8.0,
-        "low_freq_cutoff_hz": 20
+        "low_freq_cutoff_hz": 20,
+        "chorus_max_rate_hz": 1.5,
+        "phaser_max_rate_hz": 4.0
     },
     "distortion": {
         "min_clipping_ratio": 0.01,
         "min_thd": 0.1,
-        "clipping_threshold": 0.95
+        "clipping_threshold": 0.95,
+        "heavy_clipping_ratio": 0.05
     }
 }
 
@@ -1,32 +1,261 @@
 #!/usr/bin/env python3
-"""Debug logger pour écrire les logs dans un fichier texte."""
+"""Debug logger asynchrone pour les logs texte et le trafic MIDI.
 
+Les appels de log ne font qu'ajouter un enregistrement brut (horodatage,
+niveau, catégorie, données) dans un tampon circulaire borné ; un thread
+d'écriture vide ce tampon, formate les messages (hexadécimal compris) et les
+écrit dans ``debug.log`` et, optionnellement, sur la console.
+
+Chaque enregistrement appartient à une catégorie hiérarchique
+(``debug``, ``midi.sysex.out``, ``midi.sysex.in``, ``midi.pc``...) qui peut
+être activée ou coupée individuellement. Un enregistrement filtré (niveau ou
+catégorie) coûte un simple test de dictionnaire, sans allocation.
+
+Usage:
+    from debug_logger import debug_logger
+    debug_logger.log("Message")
+    debug_logger.set_category_enabled("midi", False)   # coupe tout le trafic MIDI
+    debug_logger.set_level(logging.INFO)               # ignore les logs DEBUG
+"""
+
+import atexit
+import logging
 import os
+import sys
+import threading
+import time
+from collections import deque
 from datetime import datetime
+from typing import Any, Dict, Optional, Sequence
+
+# Types d'enregistrement (formatés par le thread d'écriture)
+_TEXT = 0
+_SYSEX = 1
+_TRAFFIC = 2
+
 
 class DebugLogger:
-    def __init__(self, log_file="debug.log"):
+    def __init__(self, log_file="debug.log", capacity: int = 8192,
+                 level: int = logging.DEBUG, echo: bool = True,
+                 flush_interval: float = 0.05):
+        """
+        Initialise le logger.
+
+        Args:
+            log_file: Fichier de log (vidé au démarrage), None pour la console seule
+            capacity: Taille du tampon circulaire (les plus anciens sont perdus)
+            level: Niveau minimum enregistré (niveaux du module ``logging``)
+            echo: Afficher aussi les messages dans la console
+            flush_interval: Période de vidage du tampon par le thread d'écriture
+        """
         self.log_file = log_file
+        self.level = level
+        self.echo = echo
+        self.flush_interval = flush_interval
+        self.dropped = 0
+
+        self._buffer: deque = deque(maxlen=capacity)
+        self._category_rules: Dict[str, bool] = {}
+        self._category_cache: Dict[str, bool] = {}
+        self._traffic_cache: Dict[str, Dict[str, str]] = {}
+        self._wakeup = threading.Event()
+        self._drained = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._thread_lock = threading.Lock()
+        self._running = False
+        self._handle = None
+
         # Nettoyer le fichier de log au démarrage
-        if os.path.exists(log_file):
+        if log_file and os.path.exists(log_file):
             os.remove(log_file)
-    
-    def log(self, message):
+
+    # ------------------------------------------------------------------
+    # Configuration
+    # ------------------------------------------------------------------
+
+    def set_level(self, level: int) -> None:
+        """Définit le niveau minimum enregistré."""
+        self.level = level
+
+    def set_category_enabled(self, category: str, enabled: bool = True) -> None:
+        """
+        Active ou coupe une catégorie et ses sous-catégories.
+
+        Args:
+            category: Catégorie (``"midi"`` couvre ``"midi.sysex.out"``...)
+            enabled: True pour activer
+        """
+        self._category_rules[category] = enabled
+        self._category_cache = {}
+        self._traffic_cache = {}
+
+    def _category_enabled(self, category: str) -> bool:
+        enabled = self._category_cache.get(category)
+        if enabled is None:
+            enabled = True
+            name = category
+            while name:
+                if name in self._category_rules:
+                    enabled = self._category_rules[name]
+                    break
+                name = name.rpartition('.')[0]
+            self._category_cache[category] = enabled
+        return enabled
+
+    def is_enabled(self, category: str = "debug", level: int = logging.DEBUG) -> bool:
+        """True si un enregistrement de cette catégorie/niveau serait écrit."""
+        return level >= self.level and self._category_enabled(category)
+
+    # ------------------------------------------------------------------
+    # Enregistrement (chemin rapide, appelé depuis les threads MIDI/GUI)
+    # ------------------------------------------------------------------
+
+    def _push(self, record) -> None:
+        if len(self._buffer) == self._buffer.maxlen:
+            self.dropped += 1
+        self._buffer.append(record)
+        if self._thread is None:
+            self.start()
+
+    def log(self, message, level: int = logging.INFO, category: str = "debug"):
         """Écrit un message dans le fichier de log."""
-        timestamp = datetime.now().strftime("%H:%M:%S.%f")[:-3]
-        with open(self.log_file, "a", encoding="utf-8") as f:
-            f.write(f"[{timestamp}] {message}\n")
-        print(message)  # Afficher aussi dans la console
-    
-    def log_sysex_data(self, data, name="SYSEX"):
-        """Écrit les données SYSEX de manière lisible."""
-        if isinstance(data, (list, tuple)):
-            data_str = " ".join(f"{b:02X}" for b in data[:20])
-            if len(data) > 20:
-                data_str += f"... (total {len(data)} bytes)"
-        else:
-            data_str = str(data)
-        self.log(f"{name}: {data_str}")
+        if level < self.level or not self._category_enabled(category):
+            return
+        self._push((_TEXT, time.time(), level, category, message, None))
+
+    def log_sysex_data(self, data, name="SYSEX", level: int = logging.DEBUG,
+                       category: str = "debug.sysex"):
+        """Écrit les données SYSEX de manière lisible (formatage différé)."""
+        if level < self.level or not self._category_enabled(category):
+            return
+        payload = tuple(data) if isinstance(data, (list, tuple)) else data
+        self._push((_SYSEX, time.time(), level, category, name, payload))
+
+    def log_traffic(self, direction: str, data: Sequence[int],
+                    message_type: str = "SYSEX", level: int = logging.DEBUG):
+        """
+        Enregistre un message MIDI entrant ou sortant.
+
+        La catégorie est ``midi.<type>.<direction>`` (ex. ``midi.sysex.out``) ;
+        la conversion hexadécimale n'a lieu que dans le thread d'écriture.
+        """
+        if level < self.level:
+            return
+        category = self._traffic_cache.get(message_type, {}).get(direction)
+        if category is None:
+            category = self._traffic_category(direction, message_type)
+        if not category:
+            return
+        self._push((_TRAFFIC, time.time(), level, category, (direction, message_type), tuple(data)))
+
+    def _traffic_category(self, direction: str, message_type: str) -> str:
+        """Catégorie d'un type de trafic, chaîne vide si elle est coupée (mise en cache)."""
+        category = f"midi.{message_type.lower()}.{direction.lower()}"
+        if not self._category_enabled(category):
+            category = ""
+        self._traffic_cache.setdefault(message_type, {})[direction] = category
+        return category
+
+    # ------------------------------------------------------------------
+    # Thread d'écriture
+    # ------------------------------------------------------------------
+
+    @property
+    def running(self) -> bool:
+        """True si le thread d'écriture est démarré."""
+        return self._thread is not None
+
+    @property
+    def pending(self) -> int:
+        """Nombre d'enregistrements pas encore écrits."""
+        return len(self._buffer)
+
+    def start(self) -> None:
+        """Démarre le thread d'écriture (automatique au premier enregistrement)."""
+        with self._thread_lock:
+            if self._thread is not None:
+                return
+            self._running = True
+            self._thread = threading.Thread(target=self._writer_loop, name="debug-logger", daemon=True)
+            self._thread.start()
+
+    @staticmethod
+    def _format(record) -> Any:
+        kind, timestamp, level, category, message, data = record
+        if kind == _TEXT:
+            return str(message), str(message)
+        if kind == _SYSEX:
+            if isinstance(data, tuple):
+                data_str = " ".join(f"{b:02X}" for b in data[:20])
+                if len(data) > 20:
+                    data_str += f"... (total {len(data)} bytes)"
+            else:
+                data_str = str(data)
+            text = f"{message}: {data_str}"
+            return text, text
+        direction, message_type = message
+        data_hex = ' '.join(f'{b:02X}' for b in data)
+        text = f"{message_type} {direction} len={len(data)}  {data_hex}"
+        return text, f"[{datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M:%S')}] {text}"
+
+    def _drain(self) -> None:
+        lines = []
+        console = []
+        while self._buffer:
+            try:
+                record = self._buffer.popleft()
+            except IndexError:
+                break
+            text, console_text = self._format(record)
+            stamp = datetime.fromtimestamp(record[1]).strftime("%H:%M:%S.%f")[:-3]
+            lines.append(f"[{stamp}] {text}\n")
+            console.append(console_text)
+
+        if not lines:
+            return
+
+        if self.log_file:
+            try:
+                if self._handle is None:
+                    self._handle = open(self.log_file, "a", encoding="utf-8")
+                self._handle.writelines(lines)
+                self._handle.flush()
+            except OSError:
+                self._handle = None
+        if self.echo:
+            try:
+                sys.stdout.write("\n".join(console) + "\n")
+            except (OSError, ValueError):
+                pass
+
+    def _writer_loop(self) -> None:
+        while self._running:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self._drain()
+            if not self._buffer:
+                self._drained.set()
+        self._drain()
+
+    def flush(self, timeout: float = 1.0) -> None:
+        """Attend que le tampon soit écrit."""
+        if self._thread is None or not self._buffer:
+            return
+        self._drained.clear()
+        self._wakeup.set()
+        self._drained.wait(timeout)
+
+    def close(self) -> None:
+        """Vide le tampon et arrête le thread d'écriture."""
+        if self._thread is not None:
+            self._running = False
+            self._wakeup.set()
+            self._thread.join(timeout=1.0)
+            self._thread = None
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
 
 # Instance globale
 debug_logger = DebugLogger()
+atexit.register(debug_logger.close)
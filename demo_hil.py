@@ -22,128 +22,7 @@ from optimize.loss import PerceptualLoss
 from optimize.search import CoordinateSearchOptimizer, ParameterSpace
 from optimize.constraints import MagicstompConstraints, ParameterValidator
 from analyzers.factory import get_analyzer
-
-
-class SimulatedMagicstomp:
-    """
-    Simulated Magicstomp for demonstration purposes.
-    
-    Applies audio processing effects based on parameter settings
-    to simulate the behavior of real Magicstomp hardware.
-    """
-    
-    def __init__(self, sample_rate: int = 44100):
-        """Initialize simulated Magicstomp."""
-        self.sample_rate = sample_rate
-        self.current_params = {}
-        self.logger = logging.getLogger(__name__)
-    
-    def set_parameters(self, params: dict) -> None:
-        """Set Magicstomp parameters."""
-        self.current_params = params.copy()
-        self.logger.debug(f"Magicstomp parameters set: {params}")
-    
-    def process_audio(self, input_audio: np.ndarray) -> np.ndarray:
-        """
-        Process audio through simulated Magicstomp.
-        
-        Args:
-            input_audio: Input audio signal
-            
-        Returns:
-            Processed audio signal
-        """
-        output_audio = input_audio.copy()
-        
-        # Apply gain
-        if 'gain' in self.current_params:
-            gain = self.current_params['gain']
-            output_audio = output_audio * (0.5 + gain * 0.5)  # 0.5x to 1.0x
-        
-        # Apply treble boost/cut
-        if 'treble' in self.current_params:
-            treble = self.current_params['treble']
-            # Simple high-pass filter simulation
-            from scipy import signal
-            if treble > 0.5:
-                # Treble boost
-                b, a = signal.butter(2, 2000 / (self.sample_rate / 2), btype='high')
-                treble_signal = signal.filtfilt(b, a, output_audio)
-                output_audio = output_audio + treble_signal * (treble - 0.5) * 0.3
-            else:
-                # Treble cut
-                b, a = signal.butter(2, 2000 / (self.sample_rate / 2), btype='low')
-                output_audio = signal.filtfilt(b, a, output_audio)
-        
-        # Apply delay
-        if 'delay_mix' in self.current_params and self.current_params['delay_mix'] > 0:
-            delay_mix = self.current_params['delay_mix']
-            delay_time_ms = self.current_params.get('delay_time_ms', 300)
-            feedback = self.current_params.get('delay_feedback', 0.3)
-            
-            delay_samples = int(delay_time_ms * self.sample_rate / 1000)
-            
-            # Simple delay implementation
-            delayed_signal = np.zeros_like(output_audio)
-            if delay_samples < len(output_audio):
-                delayed_signal[delay_samples:] = output_audio[:-delay_samples] * feedback
-            
-            output_audio = output_audio * (1 - delay_mix) + delayed_signal * delay_mix
-        
-        # Apply reverb (simple)
-        if 'reverb_mix' in self.current_params and self.current_params['reverb_mix'] > 0:
-            reverb_mix = self.current_params['reverb_mix']
-            decay_s = self.current_params.get('reverb_decay_s', 1.5)
-            
-            # Simple reverb simulation using multiple delays
-            reverb_signal = np.zeros_like(output_audio)
-            delays = [37, 59, 83, 127, 149]  # Prime numbers for delay times
-            
-            for delay_samples in delays:
-                if delay_samples < len(output_audio):
-                    decay = np.exp(-delay_samples / (decay_s * self.sample_rate))
-                    delayed = np.zeros_like(output_audio)
-                    delayed[delay_samples:] = output_audio[:-delay_samples] * decay
-                    reverb_signal += delayed
-            
-            reverb_signal /= len(delays)
-            output_audio = output_audio * (1 - reverb_mix) + reverb_signal * reverb_mix
-        
-        # Apply modulation (chorus/phaser)
-        if 'mod_mix' in self.current_params and self.current_params['mod_mix'] > 0:
-            mod_mix = self.current_params['mod_mix']
-            mod_depth = self.current_params.get('mod_depth', 0.35)
-            mod_rate_hz = self.current_params.get('mod_rate_hz', 0.8)
-            
-            # Simple chorus effect
-            t = np.linspace(0, len(output_audio) / self.sample_rate, len(output_audio))
-            lfo = np.sin(2 * np.pi * mod_rate_hz * t) * mod_depth * 0.01  # 10ms max delay
-            
-            # Apply variable delay (simplified)
-            mod_signal = np.zeros_like(output_audio)
-            for i in range(len(output_audio)):
-                delay_samples = int(lfo[i] * self.sample_rate)
-                if i + delay_samples < len(output_audio):
-                    mod_signal[i] = output_audio[i + delay_samples]
-            
-            output_audio = output_audio * (1 - mod_mix) + mod_signal * mod_mix
-        
-        # Apply presence
-        if 'presence' in self.current_params:
-            presence = self.current_params['presence']
-            if presence > 0.5:
-                # Presence boost (2-4 kHz)
-                from scipy import signal
-                b, a = signal.butter(2, [2000, 4000], btype='band', fs=self.sample_rate)
-                presence_signal = signal.filtfilt(b, a, output_audio)
-                output_audio = output_audio + presence_signal * (presence - 0.5) * 0.2
-        
-        # Normalize to prevent clipping
-        max_val = np.max(np.abs(output_audio))
-        if max_val > 0:
-            output_audio = output_audio / max_val * 0.9
-        
-        return output_audio
+from simulation.magicstomp import SimulatedMagicstomp
 
 
 class HILDemo:
@@ -23,6 +23,7 @@ import sys
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from auto_tone_match_magicstomp import AutoToneMatcher
+from analyzers.pool import get_analyzer_pool
 from cli.auto_match_hil import HILToneMatcher
 from hil.io import AudioDeviceManager
 
@@ -702,9 +703,9 @@ class MagicstompHILGUI:
             try:
                 self.update_status("Analyzing target audio...")
                 
-                # Create tone matcher
+                # Create tone matcher on the shared pool of warm analyzers
                 backend = self.backend_var.get()
-                tone_matcher = AutoToneMatcher(backend)
+                tone_matcher = AutoToneMatcher(pool=get_analyzer_pool(backend))
                 
                 # Analyze audio
                 features = tone_matcher.analyze_audio(self.target_file, verbose=True)
@@ -566,7 +566,9 @@ debug_logger.log(f"🔍 DEBUG: Target file: {self.target_file}")
 debug_logger.log(f"🔍 DEBUG: Creating AutoToneMatcher...")
                     
                     from auto_tone_match_magicstomp import AutoToneMatcher
-                    tone_matcher = AutoToneMatcher('essentia')  # Use essentia backend
+                    from analyzers.pool import get_analyzer_pool
+                    # Warm essentia analyzers shared across clicks
+                    tone_matcher = AutoToneMatcher(pool=get_analyzer_pool('essentia'))
 debug_logger.log(f"🔍 DEBUG: AutoToneMatcher created successfully")
                     self.log_status("✅ Tone matcher created")
                     
@@ -30,6 +30,7 @@ from hil.io import AudioDeviceManager
 from magicstomp_effects import EffectRegistry
 from adapter_magicstomp import MagicstompAdapter
 from realtime_magicstomp import RealtimeMagicstomp
+from patch_mirror import PatchMirror
 from gui.impact_visualization import ImpactVisualizer, ParameterImpact, ImpactLevel
 
 
@@ -72,6 +73,8 @@ class TabbedCompactGUI:
         # Enhanced components
         self.magicstomp_adapter = MagicstompAdapter()
         self.realtime_magicstomp = None
+        self.patch_mirror = PatchMirror()
+        self.is_syncing_bank = False
         self.current_effect_widget = None
         self.current_effect_type = None
         self.impact_visualizer = None
@@ -192,6 +195,25 @@ class TabbedCompactGUI:
         download_btn = ttk.Button(selection_frame, text="📥 Download Current",
                                   command=self.download_current_patch)
         download_btn.pack(side=tk.LEFT, padx=(10, 0))
+
+        # User bank (read from the local mirror)
+        bank_frame = ttk.LabelFrame(self.effects_frame, text="User Bank", padding=10)
+        bank_frame.pack(fill=tk.X, padx=10, pady=5)
+
+        self.bank_var = tk.StringVar()
+        self.bank_combo = ttk.Combobox(bank_frame, textvariable=self.bank_var,
+                                       state="readonly", width=40)
+        self.bank_combo.pack(side=tk.LEFT, padx=(0, 10))
+        self.bank_combo.bind("<<ComboboxSelected>>", self.on_bank_slot_selected)
+
+        self.sync_bank_btn = ttk.Button(bank_frame, text="🔄 Sync Bank",
+                                        command=self.sync_bank)
+        self.sync_bank_btn.pack(side=tk.LEFT)
+
+        # Verify re-downloads every slot (changes made on the device itself)
+        self.verify_bank_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(bank_frame, text="Verify all slots",
+                        variable=self.verify_bank_var).pack(side=tk.LEFT, padx=(10, 0))
         
         # Effect parameters (scrollable)
         params_frame = ttk.LabelFrame(self.effects_frame, text="Parameters", padding=10)
@@ -216,6 +238,7 @@ class TabbedCompactGUI:
         
         # Populate effect list
         self.populate_effect_list()
+        self.refresh_bank_list()
     
     def create_analysis_tab(self):
         """Create analysis and impact visualization tab."""
@@ -276,6 +299,12 @@ class TabbedCompactGUI:
                                       command=self.start_optimization)
         self.optimize_btn.pack(pady=10)
         
+        # Hardware captures of already measured patches are read from disk
+        self.capture_cache_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(opt_frame, text="Reuse captures (out/capture_cache)",
+                        variable=self.capture_cache_var,
+                        command=self.toggle_capture_cache).pack()
+        
         # Progress bar
         self.progress_var = tk.DoubleVar()
         self.progress_bar = ttk.Progressbar(self.monitoring_frame, variable=self.progress_var,
@@ -328,6 +357,26 @@ class TabbedCompactGUI:
         except Exception as e:
             self.log_status(f"❌ HIL init error: {e}")
     
+    def toggle_capture_cache(self):
+        """Enable or disable the HIL capture cache."""
+        if self.hil_matcher is None:
+            self.log_status("⚠️ HIL system not initialized")
+            self.capture_cache_var.set(False)
+            return
+        
+        if self.capture_cache_var.get():
+            try:
+                cache = self.hil_matcher.enable_capture_cache()
+                self.log_status(f"💾 Capture cache: {len(cache)} entries")
+            except Exception as e:
+                self.capture_cache_var.set(False)
+                self.log_status(f"❌ Capture cache error: {e}")
+        elif self.hil_matcher.capture_cache is not None:
+            self.hil_matcher.capture_cache.log_statistics()
+            self.hil_matcher.capture_cache.close()
+            self.hil_matcher.capture_cache = None
+            self.log_status("💾 Capture cache disabled")
+    
     def select_target_file(self):
         """Select target audio file."""
         file_path = filedialog.askopenfilename(
@@ -445,6 +494,7 @@ class TabbedCompactGUI:
         if self.realtime_magicstomp is None:
             try:
                 self.realtime_magicstomp = RealtimeMagicstomp()
+                self.realtime_magicstomp.mirror = self.patch_mirror
             except Exception as exc:  # pragma: no cover - dépend du matériel
                 self.log_status(f"❌ MIDI init error: {exc}")
                 messagebox.showerror("Magicstomp", f"Failed to initialize MIDI connection:\n{exc}")
@@ -458,12 +508,21 @@ class TabbedCompactGUI:
             messagebox.showerror("Magicstomp", "Unable to download current patch. Check MIDI connection.")
             return
 
+        if patch_data.get('common') and patch_data.get('effect'):
+            self.patch_mirror.store(patch_data['patch_index'], patch_data['common'], patch_data['effect'])
+            self.refresh_bank_list()
+
+        if self._show_patch_data(patch_data):
+            messagebox.showinfo("Magicstomp", f"Patch '{self.current_patch['patch_name']}' downloaded from Magicstomp.")
+
+    def _show_patch_data(self, patch_data, source: str = "downloaded") -> bool:
+        """Display a patch payload (``common``/``effect`` sections) in the editor."""
         common_section = patch_data.get('common')
         effect_section = patch_data.get('effect')
         if not common_section or not effect_section:
             self.log_status("❌ Invalid patch payload received")
             messagebox.showerror("Magicstomp", "Invalid patch data received from Magicstomp.")
-            return
+            return False
 
         # L'ID de l'effet est à l'octet 1 dans la structure SYSEX du Magicstomp (comme MagicstompFrenzy)
         effect_type = common_section[1] if len(common_section) > 1 else common_section[0]
@@ -472,12 +531,12 @@ class TabbedCompactGUI:
         if not EffectRegistry.is_effect_supported(effect_type):
             self.log_status(f"⚠️ Effect {effect_name} not supported in editor")
             messagebox.showwarning("Magicstomp", f"Effect {effect_name} (0x{effect_type:02X}) is not supported in the editor.")
-            return
+            return False
 
         if not self._set_effect_widget(effect_type, log_load=False):
             self.log_status(f"❌ Effect widget for {effect_name} not available")
             messagebox.showerror("Magicstomp", f"Unable to load widget for effect {effect_name}.")
-            return
+            return False
 
         applied_params = {}
         if hasattr(self.current_effect_widget, 'apply_magicstomp_data'):
@@ -499,13 +558,83 @@ class TabbedCompactGUI:
 
         self._select_effect_in_combo(effect_name, effect_type)
 
-        self.log_status(f"✅ Patch downloaded: {patch_name} ({effect_name})")
+        self.log_status(f"✅ Patch {source}: {patch_name} ({effect_name})")
         if applied_params:
             self.log_status(f"🎚️ Parameters applied: {len(applied_params)} values")
         else:
             self.log_status("ℹ️ Patch applied with default parameter mapping")
 
-        messagebox.showinfo("Magicstomp", f"Patch '{patch_name}' downloaded from Magicstomp.")
+        return True
+
+    def refresh_bank_list(self):
+        """Fill the bank combo from the local patch mirror."""
+        values = []
+        for slot in self.patch_mirror.slots():
+            entry = self.patch_mirror.entry(slot)
+            name = entry.get('name') or "Magicstomp Patch"
+            marker = " *" if entry.get('stale') else ""
+            values.append(f"U{slot + 1:02d} {name}{marker}")
+        self.bank_combo['values'] = values
+
+    def on_bank_slot_selected(self, event=None):
+        """Show a user patch straight from the mirror (no MIDI round-trip)."""
+        selection = self.bank_var.get()
+        if not selection:
+            return
+
+        try:
+            slot = int(selection[1:3]) - 1
+        except ValueError:
+            return
+
+        patch_data = self.patch_mirror.load(slot)
+        if not patch_data:
+            self.log_status(f"⚠️ U{slot + 1:02d} not in local mirror, sync the bank first")
+            return
+
+        self._show_patch_data(patch_data, source=f"loaded from mirror (U{slot + 1:02d})")
+
+    def sync_bank(self):
+        """Download changed/missing user patches (every slot when verifying) in the background."""
+        if self.is_syncing_bank:
+            self.log_status("⚠️ Bank sync already running")
+            return
+
+        if self.realtime_magicstomp is None:
+            try:
+                self.realtime_magicstomp = RealtimeMagicstomp()
+                self.realtime_magicstomp.mirror = self.patch_mirror
+            except Exception as exc:  # pragma: no cover - dépend du matériel
+                self.log_status(f"❌ MIDI init error: {exc}")
+                return
+
+        force = self.verify_bank_var.get()
+        self.is_syncing_bank = True
+        self.sync_bank_btn.config(state=tk.DISABLED)
+        self.log_status("🔄 Verifying every user slot..." if force else "🔄 Syncing user bank...")
+
+        def progress(done, total):
+            self.root.after(0, lambda: self.progress_var.set(100 * done / total))
+
+        def sync_thread():
+            try:
+                result = self.realtime_magicstomp.sync_bank(
+                    self.patch_mirror, force=force, progress_callback=progress)
+                self.root.after(0, lambda: self.log_status(
+                    f"✅ Bank synced: {len(result['changed'])} changed, "
+                    f"{len(result['unchanged'])} unchanged, {len(result['failed'])} failed "
+                    f"({result['elapsed']:.1f}s)"))
+            except Exception as e:
+                self.root.after(0, lambda: self.log_status(f"❌ Bank sync error: {e}"))
+            finally:
+                self.root.after(0, self._on_bank_sync_done)
+
+        threading.Thread(target=sync_thread, daemon=True).start()
+
+    def _on_bank_sync_done(self):
+        self.is_syncing_bank = False
+        self.sync_bank_btn.config(state=tk.NORMAL)
+        self.refresh_bank_list()
     
     def on_parameter_changed(self, param_name: str, user_value, magicstomp_value: int):
         """Handle parameter changes."""
@@ -9,6 +9,15 @@ Modules:
 - io: Audio device I/O and calibration
 - calibration: Latency and gain measurement
 - audio_utils: Audio processing utilities
+- slot_scheduler: Device-resident candidate slots switched by Program Change
+- settle: Adaptive settle detection after parameter changes
+- pipeline: Pipelined evaluation overlapping capture and loss computation
+- probe: Short informative DI excerpts for faster evaluations
+- stream_capture: Multi-candidate capture in one continuous duplex stream
+- loopback: sounddevice-compatible backend simulating the device without hardware
+- capture_cache: Persistent hardware captures keyed by device state, DI and calibration
+- impulse_response: Sweep IR characterization of linear effects and convolution prediction
+- response_table: Per-parameter feature response tables for candidate screening
 """
 
 __version__ = "1.0.0"
@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+Hardware Capture Cache
+======================
+
+Persistent store of hardware recordings, so that a patch already measured
+with the same DI and the same calibration is never played again (repeated
+sessions, resumed optimizations, A/B comparisons).
+
+Entries are keyed by the exact 159-byte device state, a hash of the DI
+content and a fingerprint of the calibration (sample rate, latency, gain
+compensation, devices). Captures are stored as raw float32 ``.npy`` files
+read through memory maps, or as FLAC (smaller, decoded on read). The
+least recently used entries are evicted when the store exceeds its size
+budget.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import soundfile as sf
+
+PATCH_STATE_LENGTH = 159
+
+CAPTURE_FORMATS = ('npy', 'flac')
+
+
+def audio_fingerprint(audio: np.ndarray) -> str:
+    """
+    Hash of the content of an audio signal.
+
+    Args:
+        audio: Audio signal (hashed as float32)
+
+    Returns:
+        Hex digest
+    """
+    data = np.ascontiguousarray(audio, dtype=np.float32)
+    digest = hashlib.sha1(data.tobytes())
+    digest.update(str(data.shape).encode())
+    return digest.hexdigest()
+
+
+def calibration_fingerprint(sample_rate: int, round_trip_latency: int,
+                            gain_compensation: float,
+                            calibration_data: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Fingerprint of the measurement chain a capture depends on.
+
+    Args:
+        sample_rate: Audio sample rate
+        round_trip_latency: Latency compensation in samples
+        gain_compensation: Gain applied to the DI before playback
+        calibration_data: Calibration results (device identifiers are used)
+
+    Returns:
+        Hex digest
+    """
+    calibration_data = calibration_data or {}
+    fields = {
+        'sample_rate': int(sample_rate),
+        'latency': int(round_trip_latency),
+        'gain': round(float(gain_compensation), 4),
+        'input_device': calibration_data.get('input_device'),
+        'output_device': calibration_data.get('output_device'),
+        'input_channels': calibration_data.get('input_channels'),
+        'output_channels': calibration_data.get('output_channels'),
+    }
+    return hashlib.sha1(json.dumps(fields, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class CaptureCache:
+    """
+    Size-bounded on-disk cache of hardware captures.
+    """
+
+    INDEX_FILE = "index.json"
+
+    def __init__(self, directory: str = "out/capture_cache",
+                 max_bytes: int = 512 * 1024 * 1024,
+                 capture_format: str = 'npy'):
+        """
+        Initialize the cache.
+
+        Args:
+            directory: Directory of the store (created if missing)
+            max_bytes: Size budget of the stored captures
+            capture_format: 'npy' (memory-mapped float32) or 'flac'
+        """
+        if capture_format not in CAPTURE_FORMATS:
+            raise ValueError(f"Unknown capture format '{capture_format}', expected one of {CAPTURE_FORMATS}")
+
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.capture_format = capture_format
+        self.logger = logging.getLogger(__name__)
+
+        self._lock = threading.Lock()
+        self._index: Dict[str, Dict[str, Any]] = self._load_index()
+        self._fingerprints: List[tuple] = []
+
+        # Session statistics
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+    # ------------------------------------------------------------------
+    # Keys
+    # ------------------------------------------------------------------
+
+    def di_fingerprint(self, audio: np.ndarray) -> str:
+        """Fingerprint of a DI signal, memoized for the arrays in use."""
+        for array, fingerprint in self._fingerprints:
+            if array is audio:
+                return fingerprint
+        fingerprint = audio_fingerprint(audio)
+        # Keep a reference so that the identity check stays valid
+        self._fingerprints = [(audio, fingerprint)] + self._fingerprints[:3]
+        return fingerprint
+
+    @staticmethod
+    def make_key(patch_state: Sequence[int], di_fingerprint: str, calibration: str) -> str:
+        """
+        Key of a capture.
+
+        Args:
+            patch_state: The 159 bytes of the device state (common + effect)
+            di_fingerprint: Hash of the DI played
+            calibration: Calibration fingerprint
+
+        Returns:
+            Hex digest
+        """
+        if len(patch_state) != PATCH_STATE_LENGTH:
+            raise ValueError(f"Device state must be {PATCH_STATE_LENGTH} bytes, got {len(patch_state)}")
+        digest = hashlib.sha256(bytes(int(b) & 0x7F for b in patch_state))
+        digest.update(di_fingerprint.encode())
+        digest.update(calibration.encode())
+        return digest.hexdigest()
+
+    # ------------------------------------------------------------------
+    # Index
+    # ------------------------------------------------------------------
+
+    def _load_index(self) -> Dict[str, Dict[str, Any]]:
+        index_path = self.directory / self.INDEX_FILE
+        if not index_path.exists():
+            return {}
+        try:
+            with open(index_path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Capture cache index unreadable, starting empty: {e}")
+            return {}
+
+    def _save_index(self) -> None:
+        index_path = self.directory / self.INDEX_FILE
+        temporary = index_path.with_suffix('.tmp')
+        with open(temporary, 'w') as f:
+            json.dump(self._index, f, indent=2)
+        temporary.replace(index_path)
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(entry['bytes'] for entry in self._index.values())
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._index
+
+    # ------------------------------------------------------------------
+    # Access
+    # ------------------------------------------------------------------
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """
+        Cached capture for a key.
+
+        Args:
+            key: Key from :meth:`make_key`
+
+        Returns:
+            Capture (read-only memory map for 'npy' entries), or None
+        """
+        with self._lock:
+            entry = self._index.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            path = self.directory / entry['file']
+            try:
+                if path.suffix == '.npy':
+                    audio = np.load(path, mmap_mode='r')
+                else:
+                    audio, _ = sf.read(str(path), dtype='float32')
+            except (OSError, ValueError, RuntimeError) as e:
+                self.logger.warning(f"Dropping unreadable cached capture {path.name}: {e}")
+                del self._index[key]
+                self._save_index()
+                self.misses += 1
+                return None
+
+            entry['last_access'] = time.time()
+            entry['hits'] = entry.get('hits', 0) + 1
+            self.hits += 1
+            return audio
+
+    def put(self, key: str, audio: np.ndarray, sample_rate: int) -> None:
+        """
+        Store a capture and evict old entries if over budget.
+
+        Args:
+            key: Key from :meth:`make_key`
+            audio: Captured audio
+            sample_rate: Sample rate of the capture
+        """
+        audio = np.ascontiguousarray(audio, dtype=np.float32)
+        with self._lock:
+            path = self.directory / f"{key}.{self.capture_format}"
+            if self.capture_format == 'npy':
+                np.save(path, audio)
+            else:
+                sf.write(str(path), np.clip(audio, -1.0, 1.0), sample_rate, subtype='PCM_24')
+
+            now = time.time()
+            self._index[key] = {
+                'file': path.name,
+                'bytes': path.stat().st_size,
+                'samples': len(audio),
+                'sample_rate': sample_rate,
+                'created': now,
+                'last_access': now,
+                'hits': 0,
+            }
+            self.stores += 1
+            self._evict(keep=key)
+            self._save_index()
+
+    def _evict(self, keep: Optional[str] = None) -> None:
+        """Remove least recently used entries until within budget."""
+        total = self.total_bytes
+        for key in sorted(self._index, key=lambda k: self._index[k]['last_access']):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            entry = self._index.pop(key)
+            try:
+                (self.directory / entry['file']).unlink()
+            except OSError:
+                pass
+            total -= entry['bytes']
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """Remove every cached capture."""
+        with self._lock:
+            for entry in self._index.values():
+                try:
+                    (self.directory / entry['file']).unlink()
+                except OSError:
+                    pass
+            self._index = {}
+            self._save_index()
+
+    def close(self) -> None:
+        """Persist access times of the session."""
+        with self._lock:
+            self._save_index()
+
+    # ------------------------------------------------------------------
+    # Statistics
+    # ------------------------------------------------------------------
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Session statistics of the cache."""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hit_rate,
+            'stores': self.stores,
+            'evictions': self.evictions,
+            'entries': len(self._index),
+            'total_bytes': self.total_bytes,
+        }
+
+    def log_statistics(self) -> None:
+        stats = self.get_statistics()
+        self.logger.info(f"Capture cache: {stats['hits']} hits / {stats['hits'] + stats['misses']} lookups "
+                         f"({stats['hit_rate']:.0%}), {stats['stores']} stored, {stats['evictions']} evicted, "
+                         f"{stats['entries']} entries ({stats['total_bytes'] / 1e6:.1f} MB)")
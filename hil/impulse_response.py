@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+"""
+Impulse Response Characterization
+=================================
+
+Measures the Magicstomp as a linear system for near-linear, time-based
+effects (reverbs, early reflections, plain delays) and predicts its output
+for any DI by FFT convolution.
+
+An exponential sine sweep is played through :class:`hil.io.AudioDeviceManager`
+for a sampled set of parameter values; the impulse responses obtained by
+deconvolution are kept in an :class:`ImpulseResponseBank` indexed by effect
+type and parameter vector. Predictions for unmeasured parameter values blend
+the impulse responses of the nearest measured neighbours, so an optimizer
+can explore these parameters offline and confirm only the winners on
+hardware.
+"""
+
+import json
+import logging
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from scipy import signal
+
+# Effect types of EffectRegistry.EFFECT_WIDGETS that behave (nearly) as
+# linear time-invariant systems
+LINEAR_EFFECT_TYPES = {
+    0x09: "Reverb",
+    0x0A: "Early Ref.",
+    0x0B: "Gate Reverb",
+    0x0D: "Mono Delay",
+    0x0E: "Stereo Delay",
+}
+
+EffectKey = Union[int, str]
+
+
+def exponential_sweep(sample_rate: int, duration: float = 3.0,
+                      f_start: float = 20.0, f_end: Optional[float] = None,
+                      fade_duration: float = 0.02) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Exponential sine sweep and its inverse filter (Farina method).
+
+    Args:
+        sample_rate: Audio sample rate
+        duration: Sweep duration in seconds
+        f_start: Start frequency in Hz
+        f_end: End frequency in Hz (defaults to 99% of Nyquist)
+        fade_duration: Raised-cosine fades at both ends
+
+    Returns:
+        (sweep, inverse filter); convolving them gives a band-limited pulse
+        with unit gain in the band of the sweep
+    """
+    f_end = f_end or 0.99 * sample_rate / 2
+    t = np.arange(int(duration * sample_rate)) / sample_rate
+    rate = np.log(f_end / f_start)
+    sweep = np.sin(2 * np.pi * f_start * duration / rate * (np.exp(t * rate / duration) - 1.0))
+
+    fade = int(fade_duration * sample_rate)
+    if fade > 0:
+        ramp = 0.5 - 0.5 * np.cos(np.linspace(0.0, np.pi, fade))
+        sweep[:fade] *= ramp
+        sweep[-fade:] *= ramp[::-1]
+
+    # Time-reversed sweep with a -6 dB/octave envelope compensating the
+    # energy distribution of the exponential sweep
+    inverse = sweep[::-1] * np.exp(-t * rate / duration)
+
+    # Unit gain in the band of the sweep
+    pulse = signal.fftconvolve(sweep, inverse)
+    magnitude = np.abs(np.fft.rfft(pulse))
+    freqs = np.fft.rfftfreq(len(pulse), 1.0 / sample_rate)
+    in_band = (freqs > 2 * f_start) & (freqs < f_end / 2)
+    return sweep, inverse / np.median(magnitude[in_band])
+
+
+def deconvolve(recording: np.ndarray, inverse: np.ndarray, ir_length: int) -> np.ndarray:
+    """
+    Impulse response from the recording of a sweep.
+
+    Args:
+        recording: Latency-compensated recording of the sweep
+        inverse: Inverse filter from :func:`exponential_sweep`
+        ir_length: Number of samples to keep
+
+    Returns:
+        Linear impulse response (harmonic distortion products fall before it)
+    """
+    response = signal.fftconvolve(recording, inverse)
+    start = len(inverse) - 1
+    ir = response[start:start + ir_length]
+    if len(ir) < ir_length:
+        ir = np.pad(ir, (0, ir_length - len(ir)))
+    return ir.astype(np.float32)
+
+
+def _effect_key(effect_type: EffectKey) -> str:
+    return f"0x{effect_type:02X}" if isinstance(effect_type, int) else str(effect_type)
+
+
+class ImpulseResponseBank:
+    """
+    Impulse responses indexed by effect type and parameter vector.
+    """
+
+    def __init__(self, sample_rate: int = 44100, neighbours: int = 2):
+        """
+        Initialize an empty bank.
+
+        Args:
+            sample_rate: Sample rate of the impulse responses
+            neighbours: Number of measured neighbours blended in predictions
+        """
+        self.sample_rate = sample_rate
+        self.neighbours = neighbours
+        self.logger = logging.getLogger(__name__)
+
+        # effect key -> {'names': [...], 'points': [[...]], 'irs': [array]}
+        self._entries: Dict[str, Dict[str, Any]] = {}
+
+    def add(self, effect_type: EffectKey, parameters: Dict[str, float], ir: np.ndarray) -> None:
+        """
+        Add a measured impulse response.
+
+        Args:
+            effect_type: Magicstomp effect type (or any label)
+            parameters: Parameter values the response was measured with
+            ir: Impulse response
+        """
+        key = _effect_key(effect_type)
+        entry = self._entries.setdefault(key, {'names': sorted(parameters), 'points': [], 'irs': []})
+        if sorted(parameters) != entry['names']:
+            raise ValueError(f"Parameters {sorted(parameters)} differ from {entry['names']} for effect {key}")
+        entry['points'].append([float(parameters[name]) for name in entry['names']])
+        entry['irs'].append(np.asarray(ir, dtype=np.float32))
+
+    def effect_types(self) -> List[str]:
+        return list(self._entries)
+
+    def parameter_names(self, effect_type: EffectKey) -> List[str]:
+        return list(self._entries[_effect_key(effect_type)]['names'])
+
+    def __len__(self) -> int:
+        return sum(len(entry['irs']) for entry in self._entries.values())
+
+    def impulse_response(self, effect_type: EffectKey, parameters: Dict[str, float]) -> np.ndarray:
+        """
+        Impulse response for a parameter vector.
+
+        Blends the ``neighbours`` nearest measurements with inverse-distance
+        weights, distances being normalized by the measured range of each
+        parameter. An exact match returns the measured response.
+
+        Args:
+            effect_type: Magicstomp effect type
+            parameters: Parameter values (all measured parameters required)
+
+        Returns:
+            Impulse response
+        """
+        key = _effect_key(effect_type)
+        if key not in self._entries:
+            raise KeyError(f"No impulse response measured for effect {key}")
+        entry = self._entries[key]
+
+        points = np.asarray(entry['points'])
+        query = np.array([float(parameters[name]) for name in entry['names']])
+        span = np.ptp(points, axis=0)
+        span[span == 0] = 1.0
+        distances = np.sqrt(np.sum(((points - query) / span) ** 2, axis=1))
+
+        nearest = np.argsort(distances)[:max(1, self.neighbours)]
+        if distances[nearest[0]] < 1e-9:
+            return entry['irs'][nearest[0]]
+
+        weights = 1.0 / distances[nearest]
+        weights /= np.sum(weights)
+        length = max(len(entry['irs'][i]) for i in nearest)
+        ir = np.zeros(length, dtype=np.float32)
+        for weight, index in zip(weights, nearest):
+            measured = entry['irs'][index]
+            ir[:len(measured)] += np.float32(weight) * measured
+        return ir
+
+    def predict(self, effect_type: EffectKey, parameters: Dict[str, float],
+                di_audio: np.ndarray) -> np.ndarray:
+        """
+        Predict the device output for a DI.
+
+        Args:
+            effect_type: Magicstomp effect type
+            parameters: Parameter values
+            di_audio: DI signal
+
+        Returns:
+            Predicted capture, same length as the DI (as returned by
+            ``AudioDeviceManager.play_and_record`` before truncation)
+        """
+        ir = self.impulse_response(effect_type, parameters)
+        return signal.oaconvolve(np.asarray(di_audio, dtype=np.float32), ir)[:len(di_audio)]
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def save(self, directory: str) -> None:
+        """
+        Save the bank (one ``.npz`` per effect plus an index).
+
+        Args:
+            directory: Target directory
+        """
+        path = Path(directory)
+        path.mkdir(parents=True, exist_ok=True)
+        index = {'sample_rate': self.sample_rate, 'effects': {}}
+        for key, entry in self._entries.items():
+            length = max(len(ir) for ir in entry['irs'])
+            irs = np.zeros((len(entry['irs']), length), dtype=np.float32)
+            for row, ir in enumerate(entry['irs']):
+                irs[row, :len(ir)] = ir
+            filename = f"ir_{key}.npz"
+            np.savez_compressed(path / filename, points=np.asarray(entry['points']), irs=irs)
+            index['effects'][key] = {'file': filename, 'parameters': entry['names'],
+                                     'count': len(entry['irs'])}
+        with open(path / "index.json", 'w') as f:
+            json.dump(index, f, indent=2)
+        self.logger.info(f"Impulse response bank saved to {directory} ({len(self)} responses)")
+
+    @classmethod
+    def load(cls, directory: str, neighbours: int = 2) -> 'ImpulseResponseBank':
+        """
+        Load a bank saved with :meth:`save`.
+
+        Args:
+            directory: Bank directory
+            neighbours: Number of neighbours blended in predictions
+
+        Returns:
+            Loaded bank
+        """
+        path = Path(directory)
+        with open(path / "index.json", 'r') as f:
+            index = json.load(f)
+        bank = cls(index['sample_rate'], neighbours=neighbours)
+        for key, info in index['effects'].items():
+            data = np.load(path / info['file'])
+            bank._entries[key] = {
+                'names': list(info['parameters']),
+                'points': data['points'].tolist(),
+                'irs': list(data['irs']),
+            }
+        return bank
+
+
+class ImpulseResponseCapture:
+    """
+    Characterization mode: measures impulse responses through the device.
+    """
+
+    def __init__(self, audio_manager, sweep_duration: float = 3.0,
+                 ir_duration: float = 2.0, level: float = 0.5):
+        """
+        Initialize the capture.
+
+        Args:
+            audio_manager: Calibrated AudioDeviceManager
+            sweep_duration: Duration of the exponential sweep
+            ir_duration: Length of the impulse responses kept (covers the
+                longest reverb or delay tail to characterize)
+            level: Peak level of the sweep
+        """
+        self.audio_manager = audio_manager
+        self.sweep_duration = sweep_duration
+        self.ir_duration = ir_duration
+        self.level = level
+        self.logger = logging.getLogger(__name__)
+
+        self.sweep, self.inverse = exponential_sweep(audio_manager.sample_rate, sweep_duration)
+        # The recording is scaled back to a unit sweep by the inverse filter
+        self.inverse = self.inverse / level
+
+    @property
+    def ir_length(self) -> int:
+        return int(self.ir_duration * self.audio_manager.sample_rate)
+
+    def measure(self) -> np.ndarray:
+        """
+        Play the sweep and return the impulse response of the current setting.
+
+        The response includes the gain compensation of the audio manager, so
+        convolving a DI predicts ``play_and_record`` of that DI.
+
+        Returns:
+            Impulse response
+        """
+        # Silence after the sweep lets the tail and the latency come back
+        padding = self.ir_length + int(self.audio_manager.round_trip_latency)
+        playback = np.concatenate([self.level * self.sweep, np.zeros(padding)])
+        recording = self.audio_manager.play_and_record(playback)
+        return deconvolve(recording, self.inverse, self.ir_length)
+
+    def characterize(self, effect_type: EffectKey,
+                     settings: Iterable[Dict[str, float]],
+                     apply_parameters: Callable[[Dict[str, float]], Any],
+                     settle: Optional[Callable[[], Any]] = None,
+                     bank: Optional[ImpulseResponseBank] = None) -> ImpulseResponseBank:
+        """
+        Measure an impulse response for each parameter setting.
+
+        Args:
+            effect_type: Magicstomp effect type being characterized
+            settings: Parameter vectors to measure
+            apply_parameters: Sends a parameter vector to the device
+            settle: Waits until the device output is stable (optional)
+            bank: Bank to fill (a new one by default)
+
+        Returns:
+            The bank with the new responses
+
+        Raises:
+            ValueError: If the bank sample rate differs from the audio manager's
+        """
+        if isinstance(effect_type, int) and effect_type not in LINEAR_EFFECT_TYPES:
+            self.logger.warning(f"Effect 0x{effect_type:02X} is not in the linear effect list, "
+                                f"predictions may be inaccurate")
+        if bank is None:
+            bank = ImpulseResponseBank(self.audio_manager.sample_rate)
+        elif bank.sample_rate != self.audio_manager.sample_rate:
+            raise ValueError(f"Bank sample rate {bank.sample_rate} Hz differs from the capture "
+                             f"sample rate {self.audio_manager.sample_rate} Hz")
+
+        settings = list(settings)
+        for count, parameters in enumerate(settings, 1):
+            apply_parameters(parameters)
+            if settle is not None:
+                settle()
+            bank.add(effect_type, parameters, self.measure())
+            self.logger.info(f"Impulse response {count}/{len(settings)} measured: {parameters}")
+        return bank
+
+
+def parameter_grid(values: Dict[str, Sequence[float]]) -> List[Dict[str, float]]:
+    """
+    Cartesian product of sampled parameter values.
+
+    Args:
+        values: Sampled values per parameter
+
+    Returns:
+        One parameter vector per combination
+    """
+    names = sorted(values)
+    grid = np.meshgrid(*[np.asarray(values[name], dtype=float) for name in names], indexing='ij')
+    return [dict(zip(names, map(float, combination)))
+            for combination in zip(*[axis.ravel() for axis in grid])]
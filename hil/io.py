@@ -8,14 +8,21 @@ Provides calibration, latency measurement, and audio device management.
 """
 
 import numpy as np
-import sounddevice as sd
 import soundfile as sf
 import time
 import json
 import logging
-from typing import Tuple, Optional, Dict, Any, List
+import queue
+import threading
+from typing import Callable, Tuple, Optional, Dict, Any, List
 from pathlib import Path
 
+try:
+    import sounddevice as sd
+except (ImportError, OSError):
+    # No PortAudio: only injected backends (e.g. hil.loopback) are usable
+    sd = None
+
 
 class AudioDeviceManager:
     """
@@ -25,18 +32,27 @@ class AudioDeviceManager:
     processing for Magicstomp optimization.
     """
     
-    def __init__(self, sample_rate: int = 44100, buffer_size: int = 1024):
+    def __init__(self, sample_rate: int = 44100, buffer_size: int = 1024,
+                 backend: Any = None):
         """
         Initialize audio device manager.
         
         Args:
             sample_rate: Audio sample rate
             buffer_size: Audio buffer size for real-time processing
+            backend: Module-like object implementing the ``sounddevice`` API
+                (``query_devices``, ``playrec``, ``Stream``, ...); defaults to
+                ``sounddevice`` itself, see :mod:`hil.loopback` for a
+                simulated device
         """
         self.sample_rate = sample_rate
         self.buffer_size = buffer_size
         self.logger = logging.getLogger(__name__)
         
+        self.backend = backend if backend is not None else sd
+        if self.backend is None:
+            raise RuntimeError("sounddevice is not available; install it or pass an audio backend")
+        
         # Device configuration
         self.input_device = None
         self.output_device = None
@@ -51,6 +67,11 @@ class AudioDeviceManager:
         # Audio streams
         self.input_stream = None
         self.output_stream = None
+        
+        # Ring buffer of the persistent input monitor
+        self._monitor_buffer = None
+        self._monitor_written = 0
+        self._monitor_lock = threading.Lock()
     
     def list_audio_devices(self) -> Dict[str, List[Dict[str, Any]]]:
         """
@@ -59,7 +80,7 @@ class AudioDeviceManager:
         Returns:
             Dictionary with input and output devices
         """
-        devices = sd.query_devices()
+        devices = self.backend.query_devices()
         
         input_devices = []
         output_devices = []
@@ -100,14 +121,14 @@ class AudioDeviceManager:
         """
         try:
             if device_name:
-                devices = sd.query_devices()
+                devices = self.backend.query_devices()
                 for i, device in enumerate(devices):
                     if device_name.lower() in device['name'].lower():
                         device_id = i
                         break
             
             if device_id is not None:
-                device_info = sd.query_devices(device_id)
+                device_info = self.backend.query_devices(device_id)
                 if device_info['max_input_channels'] == 0:
                     self.logger.error(f"Device {device_id} has no input channels")
                     return False
@@ -139,14 +160,14 @@ class AudioDeviceManager:
         """
         try:
             if device_name:
-                devices = sd.query_devices()
+                devices = self.backend.query_devices()
                 for i, device in enumerate(devices):
                     if device_name.lower() in device['name'].lower():
                         device_id = i
                         break
             
             if device_id is not None:
-                device_info = sd.query_devices(device_id)
+                device_info = self.backend.query_devices(device_id)
                 if device_info['max_output_channels'] == 0:
                     self.logger.error(f"Device {device_id} has no output channels")
                     return False
@@ -200,7 +221,7 @@ class AudioDeviceManager:
         # Record while playing
         self.logger.info("Recording calibration signal...")
         
-        recorded_audio = sd.playrec(
+        recorded_audio = self.backend.playrec(
             calibration_signal,
             samplerate=self.sample_rate,
             input_device=self.input_device,
@@ -208,7 +229,7 @@ class AudioDeviceManager:
             channels=max(len(self.input_channels), len(self.output_channels))
         )
         
-        sd.wait()  # Wait for recording to complete
+        self.backend.wait()  # Wait for recording to complete
         
         # Analyze recorded signal
         recorded_audio = recorded_audio.flatten()
@@ -335,16 +356,25 @@ class AudioDeviceManager:
         
         self.logger.debug(f"Playing {len(compensated_audio)} samples, recording {duration:.2f}s")
         
-        # Record while playing
-        recorded = sd.playrec(
-            compensated_audio,
-            samplerate=self.sample_rate,
-            input_device=self.input_device,
-            output_device=self.output_device,
-            channels=max(len(self.input_channels), len(self.output_channels))
-        )
+        # The monitor shares the input device, pause it during the capture
+        monitor_active = self.input_stream is not None and self.input_stream.active
+        if monitor_active:
+            self.input_stream.stop()
         
-        sd.wait()  # Wait for completion
+        try:
+            # Record while playing
+            recorded = self.backend.playrec(
+                compensated_audio,
+                samplerate=self.sample_rate,
+                input_device=self.input_device,
+                output_device=self.output_device,
+                channels=max(len(self.input_channels), len(self.output_channels))
+            )
+            
+            self.backend.wait()  # Wait for completion
+        finally:
+            if monitor_active:
+                self.input_stream.start()
         
         # Convert to mono and apply latency compensation
         recorded = recorded.flatten()
@@ -355,6 +385,246 @@ class AudioDeviceManager:
         
         return recorded
     
+    def play_and_record_streaming(self, audio_data: np.ndarray,
+                                  block_callback: Callable[[np.ndarray], Any]) -> np.ndarray:
+        """
+        Play audio and hand the return signal over block by block.
+        
+        Same signal as :meth:`play_and_record` (gain and latency compensated),
+        but ``block_callback`` receives each recorded block on the calling
+        thread while playback continues, e.g. to accumulate a loss. If the
+        callback returns True, playback is stopped early.
+        
+        Args:
+            audio_data: Audio signal to play
+            block_callback: Called with each new block of recorded samples
+            
+        Returns:
+            Recorded audio signal (shorter if stopped early)
+            
+        Raises:
+            RuntimeError: If the devices are not set or the stream stops
+                delivering blocks
+        """
+        if self.input_device is None or self.output_device is None:
+            raise RuntimeError("Audio devices must be set before play/record")
+        
+        compensated_audio = (audio_data * self.gain_compensation).astype(np.float32)
+        total = len(compensated_audio)
+        blocks: "queue.Queue" = queue.Queue()
+        stop_requested = threading.Event()
+        position = [0]
+        
+        def callback(indata, outdata, frames, time_info, status):
+            start = position[0]
+            chunk = compensated_audio[start:start + frames]
+            outdata.fill(0)
+            outdata[:len(chunk), 0] = chunk
+            blocks.put(indata[:, 0].copy())
+            position[0] = start + frames
+            if position[0] >= total or stop_requested.is_set():
+                raise self.backend.CallbackStop()
+        
+        monitor_active = self.input_stream is not None and self.input_stream.active
+        if monitor_active:
+            self.input_stream.stop()
+        
+        recorded = []
+        received = 0
+        to_skip = self.round_trip_latency
+        try:
+            with self.backend.Stream(samplerate=self.sample_rate,
+                           blocksize=self.buffer_size,
+                           device=(self.input_device, self.output_device),
+                           channels=(len(self.input_channels), len(self.output_channels)),
+                           dtype='float32',
+                           callback=callback) as stream:
+                while received < total:
+                    try:
+                        block = blocks.get(timeout=1.0 + self.buffer_size / self.sample_rate)
+                    except queue.Empty:
+                        stream.abort()
+                        raise RuntimeError(
+                            f"Audio stream stalled after {received / self.sample_rate:.2f}s "
+                            f"of {total / self.sample_rate:.2f}s"
+                        ) from None
+                    received += len(block)
+                    
+                    # Latency compensation, as in play_and_record
+                    if to_skip > 0:
+                        skipped = min(to_skip, len(block))
+                        block = block[skipped:]
+                        to_skip -= skipped
+                    if received > total:
+                        block = block[:len(block) - (received - total)]
+                    if len(block) == 0:
+                        continue
+                    
+                    recorded.append(block)
+                    if block_callback(block):
+                        stop_requested.set()
+                        self.logger.debug(f"Capture stopped after {received / self.sample_rate:.2f}s")
+                        break
+        finally:
+            if monitor_active:
+                self.input_stream.start()
+        
+        return np.concatenate(recorded) if recorded else np.zeros(0, dtype=np.float32)
+    
+    def play_and_record_scheduled(self, audio_data: np.ndarray,
+                                  events: List[Tuple[int, Callable[[], Any]]]) -> np.ndarray:
+        """
+        Play audio in one duplex stream, running actions at given samples.
+        
+        Each event ``(sample, action)`` is run by a dispatcher thread when
+        playback sample ``sample`` reaches the DAC, according to the stream
+        clock. No gain is applied and the recording is returned raw (not
+        latency compensated) so callers can slice it with
+        ``round_trip_latency``.
+        
+        Args:
+            audio_data: Audio signal to play (already gain compensated)
+            events: (playback sample index, callable) pairs
+            
+        Returns:
+            Recorded audio signal, same length as ``audio_data``
+        """
+        if self.input_device is None or self.output_device is None:
+            raise RuntimeError("Audio devices must be set before play/record")
+        
+        playback = np.asarray(audio_data, dtype=np.float32)
+        total = len(playback)
+        recording = np.zeros(total, dtype=np.float32)
+        pending = sorted(events, key=lambda event: event[0])
+        due: "queue.Queue" = queue.Queue()
+        position = [0]
+        next_event = [0]
+        finished = threading.Event()
+        
+        def callback(indata, outdata, frames, time_info, status):
+            start = position[0]
+            count = min(frames, total - start)
+            outdata.fill(0)
+            outdata[:count, 0] = playback[start:start + count]
+            recording[start:start + count] = indata[:count, 0]
+            
+            # Hand over the events falling in this block with their DAC time
+            while next_event[0] < len(pending) and pending[next_event[0]][0] < start + frames:
+                sample, action = pending[next_event[0]]
+                dac_time = time_info.outputBufferDacTime + max(sample - start, 0) / self.sample_rate
+                due.put((dac_time, action))
+                next_event[0] += 1
+            
+            position[0] = start + frames
+            if position[0] >= total:
+                raise self.backend.CallbackStop()
+        
+        monitor_active = self.input_stream is not None and self.input_stream.active
+        if monitor_active:
+            self.input_stream.stop()
+        
+        try:
+            stream = self.backend.Stream(samplerate=self.sample_rate,
+                               blocksize=self.buffer_size,
+                               device=(self.input_device, self.output_device),
+                               channels=(len(self.input_channels), len(self.output_channels)),
+                               dtype='float32',
+                               callback=callback,
+                               finished_callback=finished.set)
+            with stream:
+                dispatched = 0
+                while dispatched < len(pending):
+                    try:
+                        dac_time, action = due.get(timeout=0.05)
+                    except queue.Empty:
+                        if finished.is_set():
+                            break
+                        continue
+                    
+                    while stream.time < dac_time and not finished.is_set():
+                        time.sleep(0.001)
+                    action()
+                    dispatched += 1
+                
+                finished.wait(timeout=total / self.sample_rate + 2.0)
+        finally:
+            if monitor_active:
+                self.input_stream.start()
+        
+        return recording
+    
+    def start_monitor(self, buffer_duration: float = 5.0) -> None:
+        """
+        Open a persistent input stream on the return signal.
+        
+        The most recent samples are kept in a ring buffer and can be read
+        with :meth:`read_monitor`, e.g. to detect when the device output has
+        settled after a parameter change.
+        
+        Args:
+            buffer_duration: Length of the ring buffer in seconds
+        """
+        if self.input_stream is not None:
+            return
+        if self.input_device is None:
+            raise RuntimeError("Input device must be set before starting the monitor")
+        
+        with self._monitor_lock:
+            self._monitor_buffer = np.zeros(int(buffer_duration * self.sample_rate), dtype=np.float32)
+            self._monitor_written = 0
+        
+        def callback(indata, frames, time_info, status):
+            block = indata[:, 0]
+            with self._monitor_lock:
+                size = len(self._monitor_buffer)
+                if frames >= size:
+                    self._monitor_buffer[:] = block[-size:]
+                else:
+                    start = self._monitor_written % size
+                    first = min(frames, size - start)
+                    self._monitor_buffer[start:start + first] = block[:first]
+                    self._monitor_buffer[:frames - first] = block[first:]
+                self._monitor_written += frames
+        
+        self.input_stream = self.backend.InputStream(
+            samplerate=self.sample_rate,
+            blocksize=self.buffer_size,
+            device=self.input_device,
+            channels=len(self.input_channels),
+            dtype='float32',
+            callback=callback
+        )
+        self.input_stream.start()
+        self.logger.info("Input monitor started")
+    
+    def read_monitor(self, num_samples: int) -> np.ndarray:
+        """
+        Read the most recent samples captured by the input monitor.
+        
+        Args:
+            num_samples: Number of samples requested
+            
+        Returns:
+            Up to ``num_samples`` samples, oldest first
+        """
+        with self._monitor_lock:
+            if self._monitor_buffer is None:
+                return np.zeros(0, dtype=np.float32)
+            size = len(self._monitor_buffer)
+            count = min(num_samples, size, self._monitor_written)
+            end = self._monitor_written % size
+            indices = np.arange(end - count, end) % size
+            return self._monitor_buffer[indices]
+    
+    def stop_monitor(self) -> None:
+        """Close the persistent input stream."""
+        if self.input_stream is not None:
+            self.input_stream.close()
+            self.input_stream = None
+        with self._monitor_lock:
+            self._monitor_buffer = None
+            self._monitor_written = 0
+    
     def load_di_signal(self, filepath: str) -> np.ndarray:
         """
         Load a DI (Direct Input) signal for re-amping.
@@ -396,12 +666,11 @@ class AudioDeviceManager:
     
     def close(self):
         """Close audio streams and cleanup."""
-        if self.input_stream:
-            self.input_stream.close()
+        self.stop_monitor()
         if self.output_stream:
             self.output_stream.close()
         
-        sd.stop()
+        self.backend.stop()
         self.logger.info("Audio device manager closed")
 
 
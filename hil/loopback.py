@@ -0,0 +1,381 @@
+#!/usr/bin/env python3
+"""
+Loopback Audio Backend
+======================
+
+A ``sounddevice``-compatible backend that routes playback through a
+simulated Magicstomp and returns it as the recording, so the whole HIL stack
+(calibration, captures, optimizers) runs on any machine without an audio
+interface or a pedal.
+
+The loop adds the impairments of a real setup: round-trip latency, gain,
+white noise and clock drift between the output and input converters.
+
+Usage:
+    from hil.io import AudioDeviceManager
+    from hil.loopback import LoopbackBackend
+    from simulation.magicstomp import SimulatedMagicstomp
+    backend = LoopbackBackend(processor=SimulatedMagicstomp(), latency=1024)
+    manager = AudioDeviceManager(backend=backend)
+    manager.set_input_device(0)
+    manager.set_output_device(0)
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+
+class CallbackStop(Exception):
+    """Raised by a stream callback to stop the stream after this block."""
+
+
+class CallbackAbort(Exception):
+    """Raised by a stream callback to stop the stream immediately."""
+
+
+class LoopbackChannel:
+    """
+    Stateful model of the converters and cables between output and input.
+    """
+
+    def __init__(self, latency: int = 0, gain: float = 1.0,
+                 noise_db: Optional[float] = None, drift_ppm: float = 0.0,
+                 seed: Optional[int] = None):
+        """
+        Initialize the channel.
+
+        Args:
+            latency: Delay in samples
+            gain: Linear gain applied to the signal
+            noise_db: White noise level in dBFS (None for no noise)
+            drift_ppm: Input clock running faster (+) or slower (-) than the
+                output clock, in parts per million (a slower input clock
+                eventually consumes the latency and reads silence)
+            seed: Seed of the noise generator
+        """
+        self.latency = latency
+        self.gain = gain
+        self.noise_db = noise_db
+        self.drift_ppm = drift_ppm
+        self._rng = np.random.default_rng(seed)
+        self.reset()
+
+    def reset(self) -> None:
+        """Clear the delay line."""
+        self._buffer = np.zeros(self.latency, dtype=np.float64)
+        self._buffer_start = 0
+        self._read_position = 0.0
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        """
+        Pass a block through the channel.
+
+        Args:
+            block: Samples leaving the device
+
+        Returns:
+            Same number of samples as received by the input converter
+        """
+        count = len(block)
+        self._buffer = np.concatenate([self._buffer, np.asarray(block, dtype=np.float64)])
+
+        # A faster input clock takes more samples of the same signal
+        rate = 1.0 / (1.0 + self.drift_ppm * 1e-6)
+        positions = self._read_position + np.arange(count) * rate - self._buffer_start
+        indices = np.arange(len(self._buffer))
+        output = np.interp(positions, indices, self._buffer, right=0.0) * self.gain
+        self._read_position += count * rate
+
+        # Drop samples already read (keep one for interpolation)
+        drop = int(self._read_position) - 1 - self._buffer_start
+        if drop > 0:
+            self._buffer = self._buffer[drop:]
+            self._buffer_start += drop
+
+        if self.noise_db is not None:
+            output += self._rng.standard_normal(count) * 10 ** (self.noise_db / 20)
+        return output.astype(np.float32)
+
+
+class _TimeInfo:
+    """Timestamps passed to stream callbacks, like PortAudio's."""
+
+    def __init__(self, current_time: float, output_latency: float):
+        self.currentTime = current_time
+        self.inputBufferAdcTime = current_time
+        self.outputBufferDacTime = current_time + output_latency
+
+
+class LoopbackStream:
+    """
+    Duplex or input-only stream driven by a thread.
+
+    A duplex stream hears each output block one callback later at the
+    earliest, so its round trip can never be shorter than one block.
+    """
+
+    def __init__(self, backend: 'LoopbackBackend', samplerate: float,
+                 blocksize: int, channels: Union[int, Tuple[int, int]],
+                 callback: Callable, finished_callback: Optional[Callable] = None,
+                 duplex: bool = True, **kwargs):
+        self.backend = backend
+        self.samplerate = samplerate
+        self.blocksize = blocksize or 1024
+        if isinstance(channels, (tuple, list)):
+            self.input_channels, self.output_channels = channels
+        else:
+            self.input_channels = self.output_channels = channels
+        self.callback = callback
+        self.finished_callback = finished_callback
+        self.duplex = duplex
+        if duplex and backend.latency < self.blocksize:
+            raise ValueError(f"Loopback latency of {backend.latency} samples is shorter than "
+                             f"the {self.blocksize}-sample block of a duplex stream")
+
+        self.active = False
+        self.closed = False
+        self._frames = 0
+        self._start_clock = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop_requested = threading.Event()
+
+        # Part of the latency not already covered by the one-block loop
+        self._channel = backend.create_channel(
+            latency=backend.latency - self.blocksize if duplex else 0
+        )
+        self._next_input = np.zeros(self.blocksize, dtype=np.float32)
+
+    @property
+    def time(self) -> float:
+        """Stream clock in seconds."""
+        if self._start_clock is None:
+            return 0.0
+        return time.perf_counter() - self._start_clock
+
+    def _run(self) -> None:
+        status = None
+        try:
+            while not self._stop_requested.is_set():
+                frames = self.blocksize
+                if self.duplex:
+                    indata = np.repeat(self._next_input[:, None], self.input_channels, axis=1)
+                else:
+                    idle = self._channel.process(self.backend.process_block(np.zeros(frames)))
+                    indata = np.repeat(idle[:, None], self.input_channels, axis=1)
+                outdata = np.zeros((frames, self.output_channels), dtype=np.float32)
+                time_info = _TimeInfo(self.time, frames / self.samplerate)
+
+                stop = False
+                try:
+                    if self.duplex:
+                        self.callback(indata, outdata, frames, time_info, status)
+                    else:
+                        self.callback(indata, frames, time_info, status)
+                except CallbackStop:
+                    stop = True
+                except CallbackAbort:
+                    break
+
+                if self.duplex:
+                    processed = self.backend.process_block(outdata[:, 0])
+                    self._next_input = self._channel.process(processed)
+
+                # Streams always run on the converter clock: callers schedule
+                # actions against ``time`` and the DAC timestamps
+                self._frames += frames
+                delay = self._frames / self.samplerate - self.time
+                if delay > 0:
+                    time.sleep(delay)
+                if stop:
+                    break
+        finally:
+            self.active = False
+            if self.finished_callback is not None:
+                self.finished_callback()
+
+    def start(self) -> None:
+        if self.active:
+            return
+        self._stop_requested.clear()
+        self._start_clock = time.perf_counter() - self._frames / self.samplerate
+        self.active = True
+        self._thread = threading.Thread(target=self._run, name="loopback-stream", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_requested.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        self._thread = None
+        self.active = False
+
+    abort = stop
+
+    def close(self) -> None:
+        self.stop()
+        self.closed = True
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class LoopbackMidiPort:
+    """
+    MIDI output port delivering messages to the simulated device.
+
+    Assign it to ``RealtimeMagicstomp.output_port`` so that parameter
+    changes reach the processor (if it implements ``handle_sysex``) and
+    Program Changes recall its slots (``handle_program_change``).
+    """
+
+    def __init__(self, backend: 'LoopbackBackend'):
+        self.backend = backend
+        self.name = "Loopback Magicstomp MIDI"
+        self.closed = False
+
+    def send(self, message) -> None:
+        processor = self.backend.processor
+        if message.type == 'sysex':
+            handler = getattr(processor, 'handle_sysex', None)
+            if handler is not None:
+                handler(list(message.data))
+        elif message.type == 'program_change':
+            handler = getattr(processor, 'handle_program_change', None)
+            if handler is not None:
+                handler(message.program)
+
+    def poll(self):
+        return None
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class LoopbackBackend:
+    """
+    Stand-in for the ``sounddevice`` module.
+
+    Implements the subset used by ``AudioDeviceManager``: ``query_devices``,
+    ``playrec``, ``wait``, ``stop``, ``Stream``, ``InputStream`` and
+    ``CallbackStop``.
+    """
+
+    CallbackStop = CallbackStop
+    CallbackAbort = CallbackAbort
+
+    def __init__(self, processor: Any = None, sample_rate: int = 44100,
+                 latency: int = 1024, gain: float = 1.0,
+                 noise_db: Optional[float] = -90.0, drift_ppm: float = 0.0,
+                 realtime: bool = False, seed: Optional[int] = None):
+        """
+        Initialize the loopback.
+
+        Args:
+            processor: Simulated device: an object with ``process_block``
+                (stateful, used for streams) and/or ``process_audio``
+                (whole signal), or a plain callable; None for a wire
+            sample_rate: Default sample rate of the virtual device
+            latency: Round-trip latency in samples (duplex streams reject
+                blocks longer than the latency)
+            gain: Linear gain of the return path
+            noise_db: Noise floor of the return path in dBFS
+            drift_ppm: Clock drift between output and input
+            realtime: Make ``playrec`` last as long as the audio instead of
+                returning immediately (streams always run at the sample rate
+                since callers synchronize with their clock)
+            seed: Seed of the noise generators
+        """
+        self.processor = processor
+        self.sample_rate = sample_rate
+        self.latency = latency
+        self.gain = gain
+        self.noise_db = noise_db
+        self.drift_ppm = drift_ppm
+        self.realtime = realtime
+        self.seed = seed
+
+    # ------------------------------------------------------------------
+    # Simulation
+    # ------------------------------------------------------------------
+
+    def create_channel(self, latency: Optional[int] = None) -> LoopbackChannel:
+        """Create a return path with the configured impairments."""
+        return LoopbackChannel(
+            latency=self.latency if latency is None else latency,
+            gain=self.gain, noise_db=self.noise_db,
+            drift_ppm=self.drift_ppm, seed=self.seed
+        )
+
+    def process_audio(self, audio: np.ndarray) -> np.ndarray:
+        """Process a whole signal through the simulated device."""
+        if self.processor is None:
+            return np.asarray(audio, dtype=np.float64)
+        if hasattr(self.processor, 'process_audio'):
+            return self.processor.process_audio(audio)
+        return self.processor(audio)
+
+    def process_block(self, block: np.ndarray) -> np.ndarray:
+        """Process one stream block, keeping the device state if supported."""
+        if self.processor is not None and hasattr(self.processor, 'process_block'):
+            return self.processor.process_block(block)
+        return self.process_audio(block)
+
+    def midi_port(self) -> LoopbackMidiPort:
+        """MIDI output port connected to the simulated device."""
+        return LoopbackMidiPort(self)
+
+    # ------------------------------------------------------------------
+    # sounddevice API
+    # ------------------------------------------------------------------
+
+    def query_devices(self, device: Optional[int] = None, kind: Optional[str] = None):
+        devices: List[Dict[str, Any]] = [{
+            'name': 'Loopback Magicstomp',
+            'index': 0,
+            'max_input_channels': 2,
+            'max_output_channels': 2,
+            'default_samplerate': float(self.sample_rate),
+        }]
+        if device is not None:
+            if device != 0:
+                raise ValueError(f"No loopback device {device}")
+            return devices[0]
+        if kind is not None:
+            return devices[0]
+        return devices
+
+    def playrec(self, data: np.ndarray, samplerate: Optional[float] = None,
+                channels: int = 1, input_device=None, output_device=None,
+                **kwargs) -> np.ndarray:
+        data = np.asarray(data)
+        if data.ndim > 1:
+            data = data[:, 0]
+
+        processed = self.process_audio(data)
+        recorded = self.create_channel().process(processed[:len(data)])
+        if self.realtime:
+            time.sleep(len(data) / (samplerate or self.sample_rate))
+        return np.repeat(recorded[:, None], channels, axis=1)
+
+    def wait(self) -> None:
+        pass
+
+    def stop(self) -> None:
+        pass
+
+    def Stream(self, samplerate=None, blocksize=None, device=None, channels=1,
+               dtype=None, callback=None, finished_callback=None, **kwargs) -> LoopbackStream:
+        return LoopbackStream(self, samplerate or self.sample_rate, blocksize, channels,
+                              callback, finished_callback=finished_callback, duplex=True)
+
+    def InputStream(self, samplerate=None, blocksize=None, device=None, channels=1,
+                    dtype=None, callback=None, finished_callback=None, **kwargs) -> LoopbackStream:
+        return LoopbackStream(self, samplerate or self.sample_rate, blocksize, channels,
+                              callback, finished_callback=finished_callback, duplex=False)
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Pipelined HIL Evaluation
+========================
+
+Overlaps the hardware part of an evaluation (MIDI send, settle, playback and
+recording) with the loss computation of the previous candidates.
+
+The capture of candidate N+1 runs on the calling thread while a worker pool
+computes the loss of candidate N. The number of captures waiting for their
+loss is bounded, and results are always returned in candidate order.
+"""
+
+import logging
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Tuple
+
+import numpy as np
+
+
+class PipelinedEvaluator:
+    """
+    Evaluates a stream of candidates with capture and loss in parallel.
+
+    ``capture_function`` must run on the thread owning the audio and MIDI
+    devices; ``loss_function`` only receives the captured audio and can run in
+    worker threads (numpy/scipy release the GIL) or processes (it must then be
+    picklable).
+    """
+
+    def __init__(self, capture_function: Callable[[Any], np.ndarray],
+                 loss_function: Callable[[np.ndarray], float],
+                 max_in_flight: int = 2,
+                 workers: int = 1,
+                 use_processes: bool = False):
+        """
+        Initialize the evaluator.
+
+        Args:
+            capture_function: candidate -> captured audio
+            loss_function: captured audio -> loss
+            max_in_flight: Maximum number of captured candidates whose loss
+                is still pending (1 = capture N+1 overlaps loss N only)
+            workers: Number of loss workers
+            use_processes: Compute losses in worker processes instead of
+                threads
+        """
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be at least 1")
+
+        self.capture_function = capture_function
+        self.loss_function = loss_function
+        self.max_in_flight = max_in_flight
+        self.workers = workers
+        self.use_processes = use_processes
+        self.logger = logging.getLogger(__name__)
+
+        # Statistics of the last run
+        self.capture_time = 0.0
+        self.loss_wait_time = 0.0
+        self.wall_time = 0.0
+        self.evaluations = 0
+
+    def _create_executor(self) -> Executor:
+        if self.use_processes:
+            return ProcessPoolExecutor(max_workers=self.workers)
+        return ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="hil-loss")
+
+    def imap(self, candidates: Iterable[Any]) -> Iterator[Tuple[Any, float]]:
+        """
+        Evaluate candidates lazily.
+
+        Candidates are pulled from ``candidates`` only when the pipeline has
+        room, so an optimizer may generate them on the fly.
+
+        Args:
+            candidates: Iterable of candidates
+
+        Yields:
+            (candidate, loss) in candidate order
+        """
+        self.capture_time = 0.0
+        self.loss_wait_time = 0.0
+        self.evaluations = 0
+        start = time.perf_counter()
+
+        pending: deque = deque()
+        with self._create_executor() as executor:
+            try:
+                for candidate in candidates:
+                    capture_start = time.perf_counter()
+                    audio = self.capture_function(candidate)
+                    self.capture_time += time.perf_counter() - capture_start
+
+                    pending.append((candidate, executor.submit(self.loss_function, audio)))
+
+                    # Keep the audio interface busy: only block on a loss when
+                    # the in-flight budget is exhausted
+                    while len(pending) > self.max_in_flight:
+                        yield self._collect(pending.popleft())
+
+                while pending:
+                    yield self._collect(pending.popleft())
+            finally:
+                for _, future in pending:
+                    future.cancel()
+                self.wall_time = time.perf_counter() - start
+
+    def _collect(self, item) -> Tuple[Any, float]:
+        candidate, future = item
+        wait_start = time.perf_counter()
+        loss = future.result()
+        self.loss_wait_time += time.perf_counter() - wait_start
+        self.evaluations += 1
+        return candidate, loss
+
+    def evaluate(self, candidates: Iterable[Any]) -> List[float]:
+        """
+        Evaluate candidates and return their losses in order.
+
+        Args:
+            candidates: Iterable of candidates
+
+        Returns:
+            Losses in candidate order
+        """
+        losses = [loss for _, loss in self.imap(candidates)]
+        self.log_statistics()
+        return losses
+
+    def get_statistics(self) -> Dict[str, float]:
+        """
+        Report how busy the audio interface was during the last run.
+
+        Returns:
+            Statistics dictionary; ``hardware_utilization`` is the share of
+            wall time spent capturing
+        """
+        return {
+            'evaluations': self.evaluations,
+            'wall_time_s': self.wall_time,
+            'capture_time_s': self.capture_time,
+            'loss_wait_time_s': self.loss_wait_time,
+            'hardware_utilization': self.capture_time / self.wall_time if self.wall_time > 0 else 0.0,
+        }
+
+    def log_statistics(self) -> None:
+        """Log a one-line summary of the last run."""
+        stats = self.get_statistics()
+        self.logger.info(
+            f"Pipelined evaluation: {stats['evaluations']} candidates in "
+            f"{stats['wall_time_s']:.2f}s, hardware utilization "
+            f"{stats['hardware_utilization'] * 100:.0f}%, "
+            f"{stats['loss_wait_time_s']:.2f}s waiting for losses"
+        )
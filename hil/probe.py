@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+"""
+DI Probe Design
+===============
+
+Selects a short, informative excerpt of the DI signal to play for every
+evaluation instead of the whole file.
+
+The DI is cut into overlapping windows that are classified as transients,
+palm mutes, sustained notes or gaps following a note (where delay and reverb
+tails are heard). A gap is kept together with the note window before it, so a
+tail is never spliced after audio that did not produce it. The best windows
+of each kind are picked within a duration budget and concatenated with
+equal-power crossfades; the same windows are cut from the target so both
+probes stay aligned. :meth:`ProbeDesigner.validate` reports the speedup and
+how well the probe preserves the ranking of candidate losses against the
+full-length signals.
+"""
+
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy import stats
+
+
+SEGMENT_KINDS = ('transient', 'palm_mute', 'sustain', 'gap')
+
+# Share of the duration budget given to each kind of segment
+# (a gap unit spans two windows: the note and the silence after it)
+DEFAULT_QUOTAS = {
+    'transient': 0.3,
+    'palm_mute': 0.1,
+    'sustain': 0.2,
+    'gap': 0.4,
+}
+
+
+@dataclass
+class ProbeSegment:
+    """
+    A window of the DI selected for the probe.
+
+    For a gap, ``start`` is the start of the note window preceding the
+    silence and ``gap_start`` the start of the silent window itself.
+    """
+    start: int
+    end: int
+    kind: str
+    score: float
+    gap_start: Optional[int] = None
+
+    @property
+    def length(self) -> int:
+        return self.end - self.start
+
+
+@dataclass
+class Probe:
+    """Short DI/target pair built from selected segments."""
+    di: np.ndarray
+    target: Optional[np.ndarray]
+    segments: List[ProbeSegment]
+    sample_rate: int
+    full_length: int
+
+    @property
+    def duration(self) -> float:
+        return len(self.di) / self.sample_rate
+
+    @property
+    def speedup(self) -> float:
+        """Ratio of full DI length to probe length."""
+        return self.full_length / max(len(self.di), 1)
+
+
+class ProbeDesigner:
+    """
+    Designs a short DI probe that preserves the ranking of candidate losses.
+    """
+
+    def __init__(self, sample_rate: int = 44100,
+                 segment_duration: float = 0.4,
+                 max_duration: float = 2.0,
+                 crossfade_duration: float = 0.01,
+                 silence_db: float = -45.0,
+                 quotas: Optional[Dict[str, float]] = None):
+        """
+        Initialize the probe designer.
+
+        Args:
+            sample_rate: Audio sample rate
+            segment_duration: Length of each candidate window
+            max_duration: Duration budget of the probe
+            crossfade_duration: Crossfade between concatenated segments
+            silence_db: Level under which the DI is considered silent
+            quotas: Share of the budget per segment kind
+        """
+        self.sample_rate = sample_rate
+        self.segment_duration = segment_duration
+        self.max_duration = max_duration
+        self.crossfade_duration = crossfade_duration
+        self.silence_db = silence_db
+        self.quotas = dict(quotas or DEFAULT_QUOTAS)
+        self.logger = logging.getLogger(__name__)
+
+        self.hop_length = 512
+        self.n_fft = 2048
+
+    # ------------------------------------------------------------------
+    # Analysis
+    # ------------------------------------------------------------------
+
+    def _frame_features(self, audio: np.ndarray) -> Dict[str, np.ndarray]:
+        """Framewise level (dB), spectral flux and centroid of a signal."""
+        padded = np.pad(audio, (self.n_fft // 2, self.n_fft // 2))
+        frames = np.lib.stride_tricks.sliding_window_view(padded, self.n_fft)[::self.hop_length]
+        magnitude = np.abs(np.fft.rfft(frames * np.hanning(self.n_fft), axis=1))
+
+        rms = np.sqrt(np.mean(frames ** 2, axis=1))
+        level_db = 20 * np.log10(np.maximum(rms, 1e-6))
+
+        log_mag = np.log1p(magnitude)
+        flux = np.zeros(len(frames))
+        flux[1:] = np.sum(np.maximum(np.diff(log_mag, axis=0), 0.0), axis=1)
+
+        freqs = np.fft.rfftfreq(self.n_fft, 1.0 / self.sample_rate)
+        centroid = np.sum(magnitude * freqs, axis=1) / np.maximum(np.sum(magnitude, axis=1), 1e-12)
+
+        return {'level_db': level_db, 'flux': flux, 'centroid': centroid}
+
+    def analyze(self, di: np.ndarray, target: Optional[np.ndarray] = None) -> List[ProbeSegment]:
+        """
+        Classify and score overlapping windows of the DI.
+
+        Args:
+            di: DI signal
+            target: Target signal aligned with the DI; used to score gaps by
+                the tail energy they contain
+
+        Returns:
+            Candidate segments (one per window, best kind only); gaps
+            include the note window before them
+        """
+        features = self._frame_features(di)
+        target_level = self._frame_features(target)['level_db'] if target is not None else None
+
+        level = features['level_db']
+        flux = features['flux']
+        centroid = features['centroid']
+        flux_ref = np.percentile(flux, 95) + 1e-12
+        loud_centroid = np.median(centroid[level > self.silence_db]) if np.any(level > self.silence_db) else 0.0
+
+        window = max(1, int(self.segment_duration * self.sample_rate / self.hop_length))
+        step = max(1, window // 2)
+        segments = []
+
+        for first in range(0, max(len(level) - window, 0) + 1, step):
+            frames = slice(first, first + window)
+            win_level = level[frames]
+            win_flux = flux[frames] / flux_ref
+            start = first * self.hop_length
+            end = min(start + window * self.hop_length, len(di))
+            if end - start < window * self.hop_length // 2:
+                continue
+
+            before = level[max(0, first - window):first]
+            loud_before = len(before) and np.max(before) > self.silence_db + 20
+
+            if np.mean(win_level) < self.silence_db:
+                if not loud_before:
+                    continue
+                # Silence right after a note: tails of time-based effects
+                tail = target_level[frames] if target_level is not None else None
+                score = float(np.mean(tail) - self.silence_db) if tail is not None else float(np.max(before) - self.silence_db)
+                note_start = max(0, first - window) * self.hop_length
+                segments.append(ProbeSegment(note_start, end, 'gap', max(score, 0.0), gap_start=start))
+                continue
+
+            peak = float(np.max(win_flux))
+            peak_frame = int(np.argmax(win_flux))
+            decay_db = float(win_level[peak_frame] - np.min(win_level[peak_frame:]))
+            stability = float(np.std(win_level))
+
+            if peak > 0.5:
+                dark = np.mean(centroid[frames]) < loud_centroid
+                if dark and decay_db > 18:
+                    segments.append(ProbeSegment(start, end, 'palm_mute', peak + decay_db / 20))
+                else:
+                    segments.append(ProbeSegment(start, end, 'transient', peak))
+            else:
+                # Steady, loud notes expose gain and tone settings
+                score = float(np.mean(win_level) - self.silence_db) / (1.0 + stability)
+                segments.append(ProbeSegment(start, end, 'sustain', score))
+
+        return segments
+
+    # ------------------------------------------------------------------
+    # Selection
+    # ------------------------------------------------------------------
+
+    def select(self, segments: Sequence[ProbeSegment]) -> List[ProbeSegment]:
+        """
+        Pick the best non-overlapping segments of each kind within budget.
+
+        Unused quota of a kind is given to the remaining kinds. A gap and
+        the note it follows are one segment, selected or skipped together.
+
+        Args:
+            segments: Candidate segments from :meth:`analyze`
+
+        Returns:
+            Selected segments in time order
+        """
+        budget = int(self.max_duration * self.sample_rate)
+        by_kind = {kind: sorted((s for s in segments if s.kind == kind),
+                                key=lambda s: s.score, reverse=True)
+                   for kind in SEGMENT_KINDS}
+
+        selected: List[ProbeSegment] = []
+        used = 0
+
+        def overlaps(segment):
+            return any(segment.start < other.end and other.start < segment.end for other in selected)
+
+        # First pass honours the quotas, second pass spends what is left
+        for use_quota in (True, False):
+            for kind in SEGMENT_KINDS:
+                kind_budget = int(self.quotas.get(kind, 0.0) * budget) if use_quota else budget
+                kind_used = sum(s.length for s in selected if s.kind == kind) if use_quota else 0
+                for segment in by_kind[kind]:
+                    if used + segment.length > budget:
+                        continue
+                    if use_quota and kind_used + segment.length > kind_budget:
+                        continue
+                    if segment in selected or overlaps(segment):
+                        continue
+                    selected.append(segment)
+                    used += segment.length
+                    kind_used += segment.length
+
+        return sorted(selected, key=lambda s: s.start)
+
+    def _concatenate(self, audio: np.ndarray, segments: Sequence[ProbeSegment]) -> np.ndarray:
+        """Concatenate segments of ``audio`` with equal-power crossfades."""
+        fade = int(self.crossfade_duration * self.sample_rate)
+        output = np.zeros(0)
+        for segment in segments:
+            piece = np.asarray(audio[segment.start:segment.end], dtype=np.float64)
+            overlap = min(fade, len(output), len(piece))
+            if overlap > 0:
+                phase = np.linspace(0.0, np.pi / 2, overlap)
+                mixed = output[-overlap:] * np.cos(phase) + piece[:overlap] * np.sin(phase)
+                output = np.concatenate([output[:-overlap], mixed, piece[overlap:]])
+            else:
+                output = np.concatenate([output, piece])
+        return output
+
+    def design(self, di: np.ndarray, target: Optional[np.ndarray] = None) -> Probe:
+        """
+        Analyze the DI and build the probe.
+
+        Args:
+            di: Full DI signal
+            target: Full target signal, aligned with the DI
+
+        Returns:
+            Probe with the concatenated DI (and target) excerpts
+        """
+        segments = self.select(self.analyze(di, target))
+        if not segments:
+            self.logger.warning("No informative segment found, using the full DI")
+            segments = [ProbeSegment(0, len(di), 'sustain', 0.0)]
+
+        probe = Probe(
+            di=self._concatenate(di, segments),
+            target=self._concatenate(target, segments) if target is not None else None,
+            segments=segments,
+            sample_rate=self.sample_rate,
+            full_length=len(di),
+        )
+
+        kinds = {kind: sum(1 for s in segments if s.kind == kind) for kind in SEGMENT_KINDS}
+        self.logger.info(f"Probe: {probe.duration:.2f}s from {len(di) / self.sample_rate:.2f}s "
+                         f"(x{probe.speedup:.1f}), segments {kinds}")
+        return probe
+
+    # ------------------------------------------------------------------
+    # Validation
+    # ------------------------------------------------------------------
+
+    def validate(self, probe: Probe, full_di: np.ndarray, full_target: np.ndarray,
+                 render: Callable[[Any, np.ndarray], np.ndarray],
+                 candidates: Sequence[Any],
+                 loss_function: Callable[[np.ndarray, np.ndarray], float]) -> Dict[str, Any]:
+        """
+        Compare probe and full-length losses on a validation set.
+
+        Args:
+            probe: Probe from :meth:`design` (with target)
+            full_di: Full DI signal
+            full_target: Full target signal
+            render: (candidate, di) -> processed audio (hardware or simulation)
+            candidates: Validation candidates
+            loss_function: (target, processed) -> loss
+
+        Returns:
+            Report with losses, Spearman/Kendall rank correlations and speedup
+        """
+        if probe.target is None:
+            raise ValueError("Probe must be designed with a target to be validated")
+
+        full_losses, probe_losses = [], []
+        full_time = probe_time = 0.0
+        for candidate in candidates:
+            start = time.perf_counter()
+            full_losses.append(loss_function(full_target, render(candidate, full_di)))
+            full_time += time.perf_counter() - start
+
+            start = time.perf_counter()
+            probe_losses.append(loss_function(probe.target, render(candidate, probe.di)))
+            probe_time += time.perf_counter() - start
+
+        spearman = stats.spearmanr(full_losses, probe_losses).correlation
+        kendall = stats.kendalltau(full_losses, probe_losses).correlation
+        report = {
+            'candidates': len(candidates),
+            'full_duration_s': len(full_di) / self.sample_rate,
+            'probe_duration_s': probe.duration,
+            'speedup': probe.speedup,
+            'compute_speedup': full_time / probe_time if probe_time > 0 else float('inf'),
+            'spearman': float(spearman),
+            'kendall': float(kendall),
+            'best_preserved': int(np.argmin(full_losses)) == int(np.argmin(probe_losses)),
+            'full_losses': full_losses,
+            'probe_losses': probe_losses,
+        }
+
+        self.logger.info(f"Probe validation: x{report['speedup']:.1f} shorter, "
+                         f"Spearman {report['spearman']:.3f}, Kendall {report['kendall']:.3f}, "
+                         f"best candidate preserved: {report['best_preserved']}")
+        return report
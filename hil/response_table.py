@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Per-Parameter Response Tables
+=============================
+
+Automated hardware sweeps of nonlinear blocks (amp gain, treble,
+distortion drive, ...) used to screen candidates without playing them.
+
+Each parameter is stepped across its 0-127 range, the others held at their
+base values, and the log-mel and MFCC features of a short probe recorded
+through the device are stored per step. A candidate is then predicted in
+feature space by interpolating every parameter's table at its value and
+adding the deviations from the base response, and scored against the target
+features with the weights of :class:`optimize.loss.PerceptualLoss`.
+"""
+
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+MIDI_MAX = 127
+
+
+class ResponseTable:
+    """
+    Feature responses of a probe, indexed by parameter and MIDI value.
+    """
+
+    def __init__(self, base_values: Dict[str, int], base_log_mel: np.ndarray,
+                 base_mfcc: np.ndarray):
+        """
+        Initialize a table around a base setting.
+
+        Args:
+            base_values: MIDI value of every swept parameter during the
+                sweeps of the others
+            base_log_mel: Log-mel features of the probe at the base setting
+            base_mfcc: MFCC features of the probe at the base setting
+        """
+        self.base_values = {name: int(value) for name, value in base_values.items()}
+        self.base_log_mel = np.asarray(base_log_mel, dtype=np.float32)
+        self.base_mfcc = np.asarray(base_mfcc, dtype=np.float32)
+
+        # name -> (sorted MIDI values, log-mel stack, MFCC stack)
+        self._sweeps: Dict[str, Tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+
+    @property
+    def parameters(self) -> List[str]:
+        return list(self._sweeps)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(values.nbytes + mel.nbytes + mfcc.nbytes for values, mel, mfcc in self._sweeps.values())
+
+    def add_sweep(self, name: str, values: Sequence[int], log_mels: Sequence[np.ndarray],
+                  mfccs: Sequence[np.ndarray]) -> None:
+        """
+        Store the features measured along one parameter.
+
+        Args:
+            name: Parameter name
+            values: MIDI values of the steps
+            log_mels: Log-mel features of each step
+            mfccs: MFCC features of each step
+        """
+        order = np.argsort(values)
+        self._sweeps[name] = (
+            np.asarray(values, dtype=np.int16)[order],
+            np.asarray(log_mels, dtype=np.float32)[order],
+            np.asarray(mfccs, dtype=np.float32)[order],
+        )
+
+    def _deviation(self, name: str, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Interpolated deviation from the base response for MIDI values."""
+        grid, log_mels, mfccs = self._sweeps[name]
+        values = np.clip(np.asarray(values, dtype=np.float32), grid[0], grid[-1])
+        upper = np.clip(np.searchsorted(grid, values, side='left'), 1, len(grid) - 1)
+        lower = upper - 1
+        span = (grid[upper] - grid[lower]).astype(np.float32)
+        frac = ((values - grid[lower]) / np.where(span > 0, span, 1.0))[:, None, None]
+
+        mel = log_mels[lower] * (1.0 - frac) + log_mels[upper] * frac - self.base_log_mel
+        mfcc = mfccs[lower] * (1.0 - frac) + mfccs[upper] * frac - self.base_mfcc
+        return mel, mfcc
+
+    def predict_many(self, candidates: Sequence[Dict[str, int]]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Predict the features of several candidates.
+
+        Parameters absent from a candidate keep their base value; parameters
+        without a sweep are ignored.
+
+        Args:
+            candidates: MIDI values per parameter
+
+        Returns:
+            (log-mel, MFCC) stacks of shape (candidates, bins, frames)
+        """
+        count = len(candidates)
+        log_mel = np.repeat(self.base_log_mel[None], count, axis=0)
+        mfcc = np.repeat(self.base_mfcc[None], count, axis=0)
+        for name in self._sweeps:
+            values = np.array([candidate.get(name, self.base_values[name]) for candidate in candidates])
+            mel_deviation, mfcc_deviation = self._deviation(name, values)
+            log_mel += mel_deviation
+            mfcc += mfcc_deviation
+        return log_mel, mfcc
+
+    def score_many(self, candidates: Sequence[Dict[str, int]],
+                   target_log_mel: np.ndarray, target_mfcc: np.ndarray,
+                   mel_weight: float = 0.6, mfcc_weight: float = 0.4) -> np.ndarray:
+        """
+        Screening loss of several candidates.
+
+        Same form as ``PerceptualLoss.compute_loss`` (weighted mean squared
+        error of log-mel and MFCC frames) on the predicted features.
+
+        Args:
+            candidates: MIDI values per parameter
+            target_log_mel: Log-mel features of the target probe
+            target_mfcc: MFCC features of the target probe
+            mel_weight: Weight of the log-mel error
+            mfcc_weight: Weight of the MFCC error
+
+        Returns:
+            Predicted loss of each candidate
+        """
+        log_mel, mfcc = self.predict_many(candidates)
+        frames = min(log_mel.shape[2], target_log_mel.shape[1])
+        mel_error = np.mean((log_mel[:, :, :frames] - target_log_mel[None, :, :frames]) ** 2, axis=(1, 2))
+        mfcc_error = np.mean((mfcc[:, :, :frames] - target_mfcc[None, :, :frames]) ** 2, axis=(1, 2))
+        return mel_weight * mel_error + mfcc_weight * mfcc_error
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def save(self, filepath: str) -> None:
+        """Save the table to a single ``.npz`` file."""
+        arrays = {
+            'base_names': np.array(list(self.base_values)),
+            'base_values': np.array(list(self.base_values.values()), dtype=np.int16),
+            'base_log_mel': self.base_log_mel,
+            'base_mfcc': self.base_mfcc,
+            'sweep_names': np.array(self.parameters),
+        }
+        for index, (values, log_mels, mfccs) in enumerate(self._sweeps.values()):
+            arrays[f'values_{index}'] = values
+            arrays[f'log_mel_{index}'] = log_mels
+            arrays[f'mfcc_{index}'] = mfccs
+        np.savez_compressed(filepath, **arrays)
+
+    @classmethod
+    def load(cls, filepath: str) -> 'ResponseTable':
+        """Load a table saved with :meth:`save`."""
+        data = np.load(filepath)
+        table = cls(dict(zip(data['base_names'].tolist(), data['base_values'].tolist())),
+                    data['base_log_mel'], data['base_mfcc'])
+        for index, name in enumerate(data['sweep_names'].tolist()):
+            table.add_sweep(name, data[f'values_{index}'], data[f'log_mel_{index}'], data[f'mfcc_{index}'])
+        return table
+
+
+class ResponseSweep:
+    """
+    Automated sweep mode building a :class:`ResponseTable` on the hardware.
+    """
+
+    def __init__(self, audio_manager, loss, resolution: int = 8):
+        """
+        Initialize the sweep.
+
+        Args:
+            audio_manager: Calibrated AudioDeviceManager
+            loss: PerceptualLoss providing the feature extraction
+            resolution: Step between swept MIDI values
+        """
+        self.audio_manager = audio_manager
+        self.loss = loss
+        self.resolution = resolution
+        self.logger = logging.getLogger(__name__)
+
+    def sweep_values(self) -> List[int]:
+        """MIDI values visited for each parameter (both ends included)."""
+        values = list(range(0, MIDI_MAX + 1, max(1, self.resolution)))
+        if values[-1] != MIDI_MAX:
+            values.append(MIDI_MAX)
+        return values
+
+    def _measure(self, probe: np.ndarray, settle: Optional[Callable[[], Any]]) -> Tuple[np.ndarray, np.ndarray]:
+        if settle is not None:
+            settle()
+        captured = self.audio_manager.play_and_record(probe)
+        return self.loss.extract_features(captured[:len(probe)])
+
+    def run(self, probe: np.ndarray, base_values: Dict[str, int],
+            apply_value: Callable[[str, int], Any],
+            settle: Optional[Callable[[], Any]] = None) -> ResponseTable:
+        """
+        Sweep every parameter of ``base_values`` and build the table.
+
+        Args:
+            probe: Short DI excerpt played at each step
+            base_values: MIDI value of each parameter to sweep (held while
+                the others are swept)
+            apply_value: Sends one parameter value to the device
+            settle: Waits until the device output is stable (optional)
+
+        Returns:
+            The response table
+        """
+        start = time.time()
+        for name, value in base_values.items():
+            apply_value(name, value)
+        base_log_mel, base_mfcc = self._measure(probe, settle)
+        table = ResponseTable(base_values, base_log_mel, base_mfcc)
+
+        values = self.sweep_values()
+        for name, base_value in base_values.items():
+            log_mels, mfccs = [], []
+            for value in values:
+                apply_value(name, value)
+                log_mel, mfcc = self._measure(probe, settle)
+                log_mels.append(log_mel)
+                mfccs.append(mfcc)
+            apply_value(name, base_value)
+            table.add_sweep(name, values, log_mels, mfccs)
+            self.logger.info(f"Swept {name}: {len(values)} steps")
+
+        self.logger.info(f"Response table built in {time.time() - start:.1f}s: "
+                         f"{len(base_values)} parameters x {len(values)} steps, "
+                         f"{table.nbytes / 1024:.0f} KB")
+        return table
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Adaptive Settle Detection
+=========================
+
+Waits after a parameter change until the Magicstomp return signal has
+stabilized, instead of sleeping a fixed amount of time.
+
+The return signal is read from a persistent input monitor (see
+``AudioDeviceManager.start_monitor``). The device is considered settled once
+the level of the last blocks is either below the noise floor (the tail of the
+previous candidate has decayed) or flat (no decay or build-up left). Settle
+times are learned per effect type over the session and used to bound the wait
+and as a fallback when no monitor is available.
+"""
+
+import logging
+import time
+from collections import defaultdict, deque
+from typing import Any, Callable, Dict, Hashable, Optional
+
+import numpy as np
+
+
+# Conservative waits used before anything has been learned for an effect type
+DEFAULT_FALLBACK_WAIT = 0.1
+DEFAULT_MAX_WAIT = 4.0
+
+
+def rms_db(block: np.ndarray) -> float:
+    """RMS level of a block in dBFS."""
+    if len(block) == 0:
+        return -120.0
+    rms = float(np.sqrt(np.mean(np.square(block, dtype=np.float64))))
+    return 20.0 * np.log10(max(rms, 1e-6))
+
+
+class SettleStatistics:
+    """Per-effect-type settle times observed during the session."""
+
+    def __init__(self, history: int = 50):
+        """
+        Initialize the statistics.
+
+        Args:
+            history: Number of settle times kept per effect type
+        """
+        self._times: Dict[Hashable, deque] = defaultdict(lambda: deque(maxlen=history))
+        self._timeouts: Dict[Hashable, int] = defaultdict(int)
+
+    def observe(self, effect_type: Hashable, seconds: float, timed_out: bool = False) -> None:
+        """Record the settle time of one parameter change."""
+        self._times[effect_type].append(seconds)
+        if timed_out:
+            self._timeouts[effect_type] += 1
+
+    def count(self, effect_type: Hashable) -> int:
+        """Number of settle times recorded for an effect type."""
+        return len(self._times.get(effect_type, ()))
+
+    def percentile(self, effect_type: Hashable, q: float) -> Optional[float]:
+        """Percentile of the recorded settle times, None if nothing recorded."""
+        times = self._times.get(effect_type)
+        if not times:
+            return None
+        return float(np.percentile(np.array(times), q))
+
+    def summary(self) -> Dict[Hashable, Dict[str, Any]]:
+        """
+        Summarize the settle times of every effect type.
+
+        Returns:
+            effect type -> count, median, p95, max (seconds) and timeouts
+        """
+        summary = {}
+        for effect_type, times in self._times.items():
+            values = np.array(times)
+            summary[effect_type] = {
+                'count': len(values),
+                'median_s': float(np.median(values)),
+                'p95_s': float(np.percentile(values, 95)),
+                'max_s': float(np.max(values)),
+                'timeouts': self._timeouts[effect_type],
+            }
+        return summary
+
+
+class SettleDetector:
+    """
+    Detects when the return signal has settled after a parameter change.
+    """
+
+    def __init__(self, read_monitor: Optional[Callable[[int], np.ndarray]] = None,
+                 sample_rate: int = 44100,
+                 block_duration: float = 0.02,
+                 window_duration: float = 0.1,
+                 floor_margin_db: float = 6.0,
+                 max_slope_db_per_s: float = 4.0,
+                 max_ripple_db: float = 3.0,
+                 max_wait: float = DEFAULT_MAX_WAIT,
+                 fallback_wait: float = DEFAULT_FALLBACK_WAIT,
+                 statistics: Optional[SettleStatistics] = None):
+        """
+        Initialize the detector.
+
+        Args:
+            read_monitor: Callable returning the most recent ``n`` samples of
+                the return signal; None to only use learned/fallback waits
+            sample_rate: Sample rate of the monitor
+            block_duration: Polling period and level block length
+            window_duration: Span of blocks that must satisfy the criteria
+            floor_margin_db: Level above the noise floor still counted as quiet
+            max_slope_db_per_s: Level slope below which the output is flat
+            max_ripple_db: Level spread allowed in a flat window (rejects
+                echo repeats whose average slope happens to be small)
+            max_wait: Upper bound of a single wait
+            fallback_wait: Wait used without monitor before anything is learned
+            statistics: Shared statistics (a new instance by default)
+        """
+        self.read_monitor = read_monitor
+        self.sample_rate = sample_rate
+        self.block_duration = block_duration
+        self.window_blocks = max(2, int(round(window_duration / block_duration)))
+        self.floor_margin_db = floor_margin_db
+        self.max_slope_db_per_s = max_slope_db_per_s
+        self.max_ripple_db = max_ripple_db
+        self.max_wait = max_wait
+        self.fallback_wait = fallback_wait
+        self.statistics = statistics or SettleStatistics()
+        self.noise_floor_db: Optional[float] = None
+        self.logger = logging.getLogger(__name__)
+
+        self._block_samples = max(1, int(block_duration * sample_rate))
+        self._sleep = time.sleep
+        self._clock = time.perf_counter
+
+    def measure_noise_floor(self, duration: float = 0.5) -> float:
+        """
+        Measure the noise floor of the return signal while nothing is playing.
+
+        Args:
+            duration: Length of silence to analyze
+
+        Returns:
+            Noise floor in dBFS
+        """
+        if self.read_monitor is None:
+            raise RuntimeError("Noise floor measurement requires an input monitor")
+
+        self._sleep(duration)
+        samples = self.read_monitor(int(duration * self.sample_rate))
+        blocks = [samples[i:i + self._block_samples]
+                  for i in range(0, len(samples) - self._block_samples + 1, self._block_samples)]
+        levels = [rms_db(block) for block in blocks] or [rms_db(samples)]
+        # Median of block levels ignores isolated clicks
+        self.noise_floor_db = float(np.median(levels))
+        self.logger.info(f"Noise floor: {self.noise_floor_db:.1f} dBFS")
+        return self.noise_floor_db
+
+    def _learned_wait(self, effect_type: Hashable) -> float:
+        learned = self.statistics.percentile(effect_type, 90)
+        if learned is None:
+            return self.fallback_wait
+        return min(learned, self.max_wait)
+
+    def _max_wait(self, effect_type: Hashable) -> float:
+        # Allow well beyond anything seen so far, never beyond max_wait
+        p95 = self.statistics.percentile(effect_type, 95)
+        if p95 is None or self.statistics.count(effect_type) < 5:
+            return self.max_wait
+        return min(self.max_wait, max(3.0 * p95, 4 * self.block_duration * self.window_blocks))
+
+    def _is_settled(self, levels: deque, new_blocks: int) -> bool:
+        if len(levels) < self.window_blocks:
+            return False
+
+        window = np.array(levels)
+        if self.noise_floor_db is not None:
+            if np.all(window <= self.noise_floor_db + self.floor_margin_db):
+                return True
+
+        # A flat level only counts once observed entirely after the change
+        if new_blocks < self.window_blocks or np.ptp(window) > self.max_ripple_db:
+            return False
+        t = np.arange(len(window)) * self.block_duration
+        slope = np.polyfit(t, window, 1)[0]
+        return abs(slope) <= self.max_slope_db_per_s
+
+    def wait(self, effect_type: Hashable = None) -> float:
+        """
+        Block until the output has settled after a parameter change.
+
+        Args:
+            effect_type: Key used for the learned statistics (effect type id
+                or name of the patch being tweaked)
+
+        Returns:
+            Time waited in seconds
+        """
+        if self.read_monitor is None:
+            wait_time = self._learned_wait(effect_type)
+            self._sleep(wait_time)
+            return wait_time
+
+        start = self._clock()
+        deadline = self._max_wait(effect_type)
+
+        # Seed the window with the signal just before the change so that a
+        # silent, already decayed output settles after a single new block
+        history = self.read_monitor(self.window_blocks * self._block_samples)
+        levels: deque = deque(
+            (rms_db(history[i:i + self._block_samples])
+             for i in range(0, len(history) - self._block_samples + 1, self._block_samples)),
+            maxlen=self.window_blocks,
+        )
+        timed_out = True
+        new_blocks = 0
+
+        while True:
+            self._sleep(self.block_duration)
+            elapsed = self._clock() - start
+            levels.append(rms_db(self.read_monitor(self._block_samples)))
+            new_blocks += 1
+            if self._is_settled(levels, new_blocks):
+                timed_out = False
+                break
+            if elapsed >= deadline:
+                break
+
+        elapsed = self._clock() - start
+        self.statistics.observe(effect_type, elapsed, timed_out=timed_out)
+        if timed_out:
+            self.logger.warning(f"Settle timeout for effect {effect_type!r} after {elapsed:.2f}s")
+        else:
+            self.logger.debug(f"Settled in {elapsed * 1000:.0f}ms (effect {effect_type!r})")
+        return elapsed
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Device-Resident Candidate Slots
+===============================
+
+Keeps precomputed optimization candidates resident in spare Magicstomp user
+slots so that switching between them costs one Program Change instead of a
+stream of parameter SysEx messages.
+
+Candidates are bulk-written into a configurable pool of slots; an LRU policy
+decides which candidates stay resident when the pool is full. Batches larger
+than the pool are preloaded and evaluated in chunks of ``len(slots)`` (see
+:meth:`DeviceSlotScheduler.chunks`) so that no candidate is evicted before it
+has been used.
+"""
+
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from magicstomp_sysex import PATCH_COMMON_LENGTH
+
+
+PatchBytes = Tuple[Sequence[int], Sequence[int]]
+
+
+class DeviceSlotScheduler:
+    """
+    LRU scheduler for candidate patches stored in spare user slots.
+
+    The slot pool must only contain slots the user is willing to overwrite
+    (for example U90-U99).
+    """
+
+    def __init__(self, realtime_adapter, slots: Sequence[int],
+                 midi_channel: int = 0, mirror=None,
+                 write_interval: float = 0.07,
+                 parameter_send_interval: float = 0.01):
+        """
+        Initialize the scheduler.
+
+        Args:
+            realtime_adapter: Connected RealtimeMagicstomp instance
+            slots: Spare user slots (0 = U01) available for candidates
+            midi_channel: MIDI channel used for Program Changes
+            mirror: Optional PatchMirror updated with the written patches
+            write_interval: Delay between bulk-write messages
+            parameter_send_interval: Per-message interval of the parameter
+                SysEx path, used to report the avoided upload time
+        """
+        if not slots:
+            raise ValueError("At least one spare slot is required")
+
+        self.realtime_adapter = realtime_adapter
+        self.slots = list(slots)
+        self.midi_channel = midi_channel
+        self.mirror = mirror
+        self.write_interval = write_interval
+        self.parameter_send_interval = parameter_send_interval
+        self.logger = logging.getLogger(__name__)
+
+        # patch key -> slot, least recently used first
+        self._resident: "OrderedDict[bytes, int]" = OrderedDict()
+        self._free_slots = list(self.slots)
+        self._active_key: Optional[bytes] = None
+
+        # Statistics
+        self.dispatch_latencies: List[float] = []
+        self.switch_latencies: List[float] = []
+        self.avoided_messages = 0
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+
+    @staticmethod
+    def patch_key(common: Sequence[int], effect: Sequence[int]) -> bytes:
+        """Key identifying a candidate by its exact 159 device bytes."""
+        return bytes(common) + bytes(effect)
+
+    def is_resident(self, common: Sequence[int], effect: Sequence[int]) -> bool:
+        """Check whether a candidate is already stored on the device."""
+        return self.patch_key(common, effect) in self._resident
+
+    def chunks(self, items: Sequence[Any]) -> List[Sequence[Any]]:
+        """
+        Split a batch into pool-sized chunks.
+
+        Each chunk fits in the slot pool, so preloading a chunk and then
+        activating its candidates writes every candidate exactly once.
+
+        Args:
+            items: Candidates in evaluation order
+
+        Returns:
+            Consecutive chunks of at most ``len(slots)`` items
+        """
+        size = len(self.slots)
+        return [items[i:i + size] for i in range(0, len(items), size)]
+
+    def _allocate_slot(self, protected: Sequence[bytes] = ()) -> int:
+        if self._free_slots:
+            return self._free_slots.pop(0)
+
+        # Evict the least recently used candidate, the active one last;
+        # candidates of the batch being preloaded are never evicted
+        victims = [key for key in self._resident
+                   if key != self._active_key and key not in protected]
+        if not victims and self._active_key in self._resident and self._active_key not in protected:
+            victims = [self._active_key]
+            self._active_key = None
+        if not victims:
+            raise RuntimeError("No slot available for a new candidate")
+
+        self.evictions += 1
+        return self._resident.pop(victims[0])
+
+    def _write(self, key: bytes, protected: Sequence[bytes] = ()) -> int:
+        slot = self._allocate_slot(protected)
+        common = list(key[:PATCH_COMMON_LENGTH])
+        effect = list(key[PATCH_COMMON_LENGTH:])
+
+        if not self.realtime_adapter.write_patch(slot, common, effect,
+                                                 interval=self.write_interval):
+            self._free_slots.insert(0, slot)
+            raise RuntimeError(f"Bulk write to slot U{slot + 1:02d} failed")
+
+        if self.mirror is not None:
+            self.mirror.store(slot, common, effect)
+
+        self._resident[key] = slot
+        self.writes += 1
+        return slot
+
+    def preload(self, candidates: Sequence[PatchBytes]) -> List[int]:
+        """
+        Bulk-write a batch of candidates into the slot pool.
+
+        Candidates already resident are not rewritten, and no candidate of
+        the batch evicts another one. Larger batches must be split with
+        :meth:`chunks` and preloaded chunk by chunk, right before the
+        chunk is evaluated.
+
+        Args:
+            candidates: Sequence of (common, effect) byte sections
+
+        Returns:
+            Slot assigned to each candidate
+
+        Raises:
+            ValueError: If the batch has more distinct candidates than slots
+        """
+        keys = [self.patch_key(common, effect) for common, effect in candidates]
+        batch = set(keys)
+        if len(batch) > len(self.slots):
+            raise ValueError(f"{len(batch)} candidates do not fit in {len(self.slots)} slots, "
+                             f"preload them in chunks")
+
+        assigned = []
+        for key in keys:
+            if key in self._resident:
+                self._resident.move_to_end(key)
+            else:
+                self._write(key, protected=batch)
+            assigned.append(self._resident[key])
+
+        self.logger.info(f"Preloaded {len(candidates)} candidates "
+                         f"({self.writes} slot writes so far)")
+        return assigned
+
+    def activate(self, common: Sequence[int], effect: Sequence[int],
+                 changed_bytes: Optional[int] = None) -> float:
+        """
+        Switch the device to a candidate.
+
+        A resident candidate costs one Program Change; otherwise it is first
+        written into the least recently used slot.
+
+        Args:
+            common: Common section of the candidate
+            effect: Effect section of the candidate
+            changed_bytes: Number of parameter messages the SysEx path would
+                have sent for this switch (for reporting)
+
+        Returns:
+            Program Change dispatch time in seconds. The switch latency as
+            heard at the output is reported with :meth:`record_switch`.
+        """
+        key = self.patch_key(common, effect)
+        if key in self._resident:
+            self.hits += 1
+            self._resident.move_to_end(key)
+        else:
+            self.misses += 1
+            self._write(key)
+
+        slot = self._resident[key]
+        start = time.perf_counter()
+        self.realtime_adapter.program_change(slot, channel=self.midi_channel)
+        latency = time.perf_counter() - start
+
+        self._active_key = key
+        self.dispatch_latencies.append(latency)
+        if changed_bytes:
+            self.avoided_messages += changed_bytes
+
+        return latency
+
+    def record_switch(self, seconds: float) -> None:
+        """
+        Record the latency of a switch measured through the audio settle.
+
+        Args:
+            seconds: Time from :meth:`activate` until the output settled
+        """
+        self.switch_latencies.append(seconds)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """
+        Report switch latency and slot usage.
+
+        Returns:
+            Statistics dictionary
+        """
+        switches = len(self.dispatch_latencies)
+
+        stats = {
+            'switches': switches,
+            'hits': self.hits,
+            'misses': self.misses,
+            'slot_writes': self.writes,
+            'evictions': self.evictions,
+            'resident': len(self._resident),
+            'messages_per_switch': 1,
+            'avoided_parameter_messages': self.avoided_messages,
+            'avoided_upload_s': self.avoided_messages * self.parameter_send_interval,
+        }
+
+        for name, latencies in (('dispatch', self.dispatch_latencies),
+                                ('switch', self.switch_latencies)):
+            if latencies:
+                latencies_ms = np.array(latencies) * 1000.0
+                stats.update({
+                    f'{name}_latency_mean_ms': float(np.mean(latencies_ms)),
+                    f'{name}_latency_p95_ms': float(np.percentile(latencies_ms, 95)),
+                    f'{name}_latency_max_ms': float(np.max(latencies_ms)),
+                })
+
+        return stats
+
+    def log_statistics(self) -> None:
+        """Log a one-line summary of the scheduler statistics."""
+        stats = self.get_statistics()
+        if not stats['switches']:
+            self.logger.info("Device slots: no switch performed")
+            return
+
+        settled = (
+            f"settled switch mean={stats['switch_latency_mean_ms']:.2f}ms "
+            f"p95={stats['switch_latency_p95_ms']:.2f}ms, "
+            if 'switch_latency_mean_ms' in stats else ""
+        )
+        self.logger.info(
+            f"Device slots: {stats['switches']} switches "
+            f"(hits={stats['hits']}, misses={stats['misses']}, "
+            f"writes={stats['slot_writes']}, evictions={stats['evictions']}), "
+            f"Program Change dispatch mean={stats['dispatch_latency_mean_ms']:.2f}ms "
+            f"p95={stats['dispatch_latency_p95_ms']:.2f}ms, {settled}"
+            f"{stats['avoided_parameter_messages']} parameter messages avoided"
+        )
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Continuous Multi-Candidate Capture
+==================================
+
+Captures many candidates in a single long duplex stream instead of opening
+one stream per candidate.
+
+The probe is repeated once per candidate, each repetition preceded by a
+silent gap. The change to the next candidate (parameter SysEx or Program
+Change) is scheduled on the audio clock inside the gap, once the previous
+repetition has left the device, and the gap leaves time for the previous
+tail to decay and the new parameters to settle. The recording is sliced per
+candidate afterwards using the calibrated round-trip latency.
+"""
+
+import logging
+import time
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+
+class ContinuousCaptureSession:
+    """
+    Plays a probe once per candidate in one stream and slices the result.
+    """
+
+    def __init__(self, audio_manager, gap_duration: float = 0.3,
+                 switch_margin: float = 0.01):
+        """
+        Initialize the session.
+
+        Args:
+            audio_manager: Calibrated AudioDeviceManager (provides
+                ``play_and_record_scheduled``, ``round_trip_latency``,
+                ``gain_compensation`` and ``sample_rate``)
+            gap_duration: Silence before each probe repetition, covering the
+                previous tail, the parameter send and the settle time
+            switch_margin: Delay after the previous repetition has returned
+                from the device before switching candidate
+        """
+        self.audio_manager = audio_manager
+        self.gap_duration = gap_duration
+        self.switch_margin = switch_margin
+        self.logger = logging.getLogger(__name__)
+
+        # Statistics of the last capture
+        self.wall_time = 0.0
+        self.candidates = 0
+
+    @property
+    def sample_rate(self) -> int:
+        return self.audio_manager.sample_rate
+
+    def build_timeline(self, probe: np.ndarray, count: int) -> Tuple[np.ndarray, List[int], List[int]]:
+        """
+        Build the playback signal and the schedule.
+
+        Args:
+            probe: Probe signal (gain compensation applied here)
+            count: Number of candidates
+
+        Returns:
+            (playback, probe start samples, switch event samples)
+        """
+        latency = int(self.audio_manager.round_trip_latency)
+        gap = int(self.gap_duration * self.sample_rate)
+        margin = int(self.switch_margin * self.sample_rate)
+        if gap <= latency + margin:
+            self.logger.warning(f"Gap ({gap} samples) shorter than latency + margin "
+                                f"({latency + margin}), candidates will overlap")
+
+        probe = np.asarray(probe, dtype=np.float32) * self.audio_manager.gain_compensation
+        period = gap + len(probe)
+
+        # Trailing silence lets the last repetition come back
+        playback = np.zeros(count * period + latency, dtype=np.float32)
+        probe_starts, switch_samples = [], []
+        for index in range(count):
+            gap_start = index * period
+            probe_start = gap_start + gap
+            playback[probe_start:probe_start + len(probe)] = probe
+            probe_starts.append(probe_start)
+            # The first switch happens before any audio; the next ones once
+            # the previous repetition has been played back through the device
+            switch_samples.append(0 if index == 0 else gap_start + latency + margin)
+
+        return playback, probe_starts, switch_samples
+
+    def slice_recording(self, recording: np.ndarray, probe_starts: Sequence[int],
+                        probe_length: int) -> List[np.ndarray]:
+        """
+        Cut the recording into one capture per candidate.
+
+        Args:
+            recording: Raw recording of the whole stream
+            probe_starts: Playback start sample of each repetition
+            probe_length: Length of the probe
+
+        Returns:
+            Latency-compensated capture of each candidate
+        """
+        latency = int(self.audio_manager.round_trip_latency)
+        return [recording[start + latency:start + latency + probe_length].copy()
+                for start in probe_starts]
+
+    def capture(self, probe: np.ndarray,
+                apply_candidates: Sequence[Callable[[], Any]]) -> List[np.ndarray]:
+        """
+        Capture every candidate in one stream.
+
+        Args:
+            probe: Probe (DI excerpt) played for every candidate
+            apply_candidates: One callable per candidate sending its
+                parameters to the device (only the diffs with the previous
+                candidate need to be sent)
+
+        Returns:
+            Captured audio of each candidate, in order
+        """
+        count = len(apply_candidates)
+        if count == 0:
+            return []
+
+        playback, probe_starts, switch_samples = self.build_timeline(probe, count)
+
+        # The first candidate is applied before the stream starts
+        apply_candidates[0]()
+        events = list(zip(switch_samples[1:], apply_candidates[1:]))
+
+        start = time.perf_counter()
+        recording = self.audio_manager.play_and_record_scheduled(playback, events)
+        self.wall_time = time.perf_counter() - start
+        self.candidates = count
+
+        self.logger.info(f"Continuous capture: {count} candidates in {self.wall_time:.2f}s "
+                         f"({self.candidates_per_minute():.1f} candidates/min)")
+        return self.slice_recording(recording, probe_starts, len(probe))
+
+    def candidates_per_minute(self) -> float:
+        """Throughput of the last capture."""
+        if self.wall_time <= 0:
+            return 0.0
+        return self.candidates * 60.0 / self.wall_time
+
+    def get_statistics(self) -> Dict[str, float]:
+        """Statistics of the last capture."""
+        return {
+            'candidates': self.candidates,
+            'wall_time_s': self.wall_time,
+            'candidates_per_minute': self.candidates_per_minute(),
+        }
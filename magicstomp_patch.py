@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+"""
+Patch Magicstomp canonique
+==========================
+
+Type :class:`Patch` unique pour les 159 octets d'un patch (32 octets
+*common* + 127 octets *effect*), stockés dans un ``bytearray`` :
+
+* ``common`` / ``effect`` sont des vues ``memoryview`` en lecture seule,
+  sans copie ;
+* ``clone()`` est une copie sur écriture : le tampon n'est dupliqué qu'à la
+  première modification de l'un des deux patches ;
+* ``diff()`` compare deux patches en une opération vectorisée et
+  ``to_parameter_messages()`` n'émet que les octets modifiés ;
+* ``params`` expose des accesseurs typés, générés pour chaque type d'effet
+  à partir du codec (:mod:`patch_codec`) : ``patch.params.depth = 0.5``.
+
+Les autres représentations se convertissent vers et depuis ce type :
+dump de ``request_patch`` (``from_dump`` / ``to_dump``), messages bulk
+(``from_messages`` / ``to_bulk_messages``), messages « parameter send »
+de ``json_to_syx`` (``apply_messages``) et patch JSON imbriqué
+(``MagicstompAdapter.json_to_patch`` / ``patch_to_json``).
+
+Usage:
+    patch = Patch.from_dump(realtime.request_patch(0))
+    candidate = patch.clone()
+    candidate.set_parameter('Depth', 0.8)
+    messages = candidate.to_parameter_messages(base=patch)
+"""
+
+import re
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Union
+
+import numpy as np
+
+from magicstomp_sysex import (
+    PATCH_COMMON_LENGTH,
+    PATCH_EFFECT_LENGTH,
+    PATCH_TOTAL_LENGTH,
+    build_bulk_patch_messages,
+    build_parameter_message,
+    parse_bulk_message,
+    parse_parameter_message,
+)
+from patch_codec import EffectCodec, get_effect_codec
+
+NAME_OFFSET = 16
+NAME_LENGTH = 12
+
+PatchData = Union[bytes, bytearray, memoryview, Sequence[int], np.ndarray]
+
+
+class Patch:
+    """159 octets d'un patch Magicstomp, avec vues et accesseurs typés."""
+
+    __slots__ = ('_buffer', '_shared', 'patch_index')
+
+    def __init__(self, data: Optional[PatchData] = None, patch_index: Optional[int] = None):
+        """
+        Crée un patch.
+
+        Args:
+            data: 159 octets (common + effect) ; patch vide par défaut
+            patch_index: Slot d'origine (0 = U01), le cas échéant
+        """
+        if data is None:
+            buffer = bytearray(PATCH_TOTAL_LENGTH)
+        else:
+            buffer = bytearray(np.asarray(data, dtype=np.uint8).tobytes()
+                               if not isinstance(data, (bytes, bytearray, memoryview)) else data)
+            if len(buffer) != PATCH_TOTAL_LENGTH:
+                raise ValueError(f"Un patch fait {PATCH_TOTAL_LENGTH} octets, reçu {len(buffer)}")
+        self._buffer = buffer
+        self._shared = False
+        self.patch_index = patch_index
+
+    # ------------------------------------------------------------------
+    # Conversions
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def from_sections(cls, common: PatchData, effect: PatchData,
+                      patch_index: Optional[int] = None) -> 'Patch':
+        """Patch à partir des sections common (32 octets) et effect (127 octets)."""
+        if len(common) != PATCH_COMMON_LENGTH or len(effect) != PATCH_EFFECT_LENGTH:
+            raise ValueError(f"Taille de patch invalide: {len(common)}+{len(effect)} octets")
+        return cls(bytes(bytearray(common)) + bytes(bytearray(effect)), patch_index)
+
+    @classmethod
+    def from_dump(cls, dump: Dict[str, Any]) -> 'Patch':
+        """Patch à partir du dict de :meth:`RealtimeMagicstomp.request_patch`."""
+        return cls.from_sections(dump['common'], dump['effect'], dump.get('patch_index'))
+
+    def to_dump(self) -> Dict[str, Any]:
+        """Dict au format de :meth:`RealtimeMagicstomp.request_patch`."""
+        return {
+            'patch_index': self.patch_index,
+            'common': list(self.common),
+            'effect': list(self.effect),
+        }
+
+    @classmethod
+    def from_messages(cls, messages: Iterable[Sequence[int]]) -> 'Patch':
+        """
+        Patch à partir des messages bulk d'un patch (début, common, effect, fin).
+
+        Raises:
+            ValueError: Si la section common ou effect manque
+        """
+        common = effect = None
+        patch_index = None
+        for message in messages:
+            data = list(message)
+            parsed = parse_bulk_message(data[1:-1] if data and data[0] == 0xF0 else data)
+            if parsed is None:
+                continue
+            kind, value = parsed
+            if kind == 'start':
+                patch_index = value
+            elif kind == 'common':
+                common = value
+            elif kind == 'effect':
+                effect = value
+        if common is None or effect is None:
+            raise ValueError("Messages bulk incomplets (section common ou effect absente)")
+        return cls.from_sections(common, effect, patch_index)
+
+    def to_bulk_messages(self, patch_index: Optional[int] = None, *,
+                         edit_buffer: bool = False) -> List[List[int]]:
+        """Messages bulk écrivant le patch (voir build_bulk_patch_messages)."""
+        index = patch_index if patch_index is not None else (self.patch_index or 0)
+        return build_bulk_patch_messages(index, self.common, self.effect, edit_buffer=edit_buffer)
+
+    def apply_messages(self, messages: Iterable[Sequence[int]]) -> int:
+        """
+        Applique des messages « parameter send » (ex. sortie de json_to_syx).
+
+        Returns:
+            Nombre de messages appliqués (les autres sont ignorés)
+        """
+        applied = 0
+        for message in messages:
+            parsed = parse_parameter_message(message)
+            if parsed is None:
+                continue
+            offset, values = parsed
+            self.write(offset, values)
+            applied += 1
+        return applied
+
+    def to_parameter_messages(self, base: Optional['Patch'] = None) -> List[List[int]]:
+        """
+        Messages « parameter send » amenant ``base`` à ce patch.
+
+        Les octets modifiés consécutifs d'une même section sont regroupés en
+        un seul message.
+
+        Args:
+            base: Patch présent sur l'appareil (patch vide par défaut)
+
+        Returns:
+            Messages SysEx
+        """
+        offsets = self.diff(base if base is not None else Patch())
+        messages = []
+        start = 0
+        for i in range(1, len(offsets) + 1):
+            if (i == len(offsets) or offsets[i] != offsets[i - 1] + 1
+                    or offsets[i] == PATCH_COMMON_LENGTH):
+                first, last = int(offsets[start]), int(offsets[i - 1])
+                messages.append(build_parameter_message(first, self._buffer[first:last + 1]))
+                start = i
+        return messages
+
+    def __bytes__(self) -> bytes:
+        return bytes(self._buffer)
+
+    # ------------------------------------------------------------------
+    # Vues et accès bruts
+    # ------------------------------------------------------------------
+
+    @property
+    def data(self) -> memoryview:
+        """Vue en lecture seule des 159 octets."""
+        return memoryview(self._buffer).toreadonly()
+
+    @property
+    def common(self) -> memoryview:
+        """Vue en lecture seule de la section common (32 octets)."""
+        return self.data[:PATCH_COMMON_LENGTH]
+
+    @property
+    def effect(self) -> memoryview:
+        """Vue en lecture seule de la section effet (127 octets)."""
+        return self.data[PATCH_COMMON_LENGTH:]
+
+    @property
+    def array(self) -> np.ndarray:
+        """Tableau uint8 en lecture seule partageant le tampon."""
+        array = np.frombuffer(self._buffer, dtype=np.uint8)
+        array.flags.writeable = False
+        return array
+
+    def __len__(self) -> int:
+        return PATCH_TOTAL_LENGTH
+
+    def __getitem__(self, offset: Union[int, slice]) -> Union[int, bytes]:
+        value = self._buffer[offset]
+        return bytes(value) if isinstance(offset, slice) else value
+
+    def __setitem__(self, offset: int, value: int) -> None:
+        self.write(offset, [value])
+
+    def write(self, offset: int, values: Iterable[int]) -> None:
+        """Écrit des valeurs 7 bits à partir d'un offset global."""
+        values = bytes(v & 0x7F for v in values)
+        if offset < 0 or offset + len(values) > PATCH_TOTAL_LENGTH:
+            raise IndexError(f"Écriture hors du patch: offset {offset}, {len(values)} octet(s)")
+        self._own()[offset:offset + len(values)] = values
+
+    def _own(self) -> bytearray:
+        """Tampon modifiable (copié s'il est partagé avec un clone)."""
+        if self._shared:
+            self._buffer = bytearray(self._buffer)
+            self._shared = False
+        return self._buffer
+
+    # ------------------------------------------------------------------
+    # Copie et comparaison
+    # ------------------------------------------------------------------
+
+    def clone(self) -> 'Patch':
+        """Copie sur écriture : aucun octet n'est copié avant une modification."""
+        clone = Patch.__new__(Patch)
+        clone._buffer = self._buffer
+        clone._shared = self._shared = True
+        clone.patch_index = self.patch_index
+        return clone
+
+    copy = clone
+
+    def diff(self, other: 'Patch') -> np.ndarray:
+        """Offsets globaux des octets différents de ``other``."""
+        if self._buffer is other._buffer:
+            return np.empty(0, dtype=np.intp)
+        return np.flatnonzero(self.array != other.array)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Patch):
+            return NotImplemented
+        return self._buffer == other._buffer
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"Patch({self.name!r}, effet 0x{self.effect_type:02X})"
+
+    # ------------------------------------------------------------------
+    # Champs et paramètres
+    # ------------------------------------------------------------------
+
+    @property
+    def effect_type(self) -> int:
+        """Type d'effet (octet 1 de la section common)."""
+        return self._buffer[1]
+
+    @property
+    def name(self) -> str:
+        """Nom du patch (octets 16-27 de la section common)."""
+        raw = self._buffer[NAME_OFFSET:NAME_OFFSET + NAME_LENGTH]
+        return ''.join(chr(b) for b in raw if 32 <= b <= 126).strip()
+
+    @name.setter
+    def name(self, value: str) -> None:
+        encoded = value.encode('ascii', errors='replace')[:NAME_LENGTH].ljust(NAME_LENGTH)
+        self.write(NAME_OFFSET, encoded)
+
+    @property
+    def codec(self) -> EffectCodec:
+        """Codec du type d'effet courant."""
+        return get_effect_codec(self.effect_type)
+
+    def parameters(self) -> Dict[str, Any]:
+        """Paramètres utilisateur de la section effet."""
+        return self.codec.decode(self.effect)
+
+    def get_parameter(self, name: str) -> Any:
+        """Valeur utilisateur d'un paramètre (KeyError si inconnu)."""
+        return self.parameters()[name]
+
+    def set_parameter(self, name: str, value: Any) -> None:
+        """Encode une valeur utilisateur (libellé ou nombre) dans la section effet."""
+        self.set_parameters({name: value})
+
+    def set_parameters(self, params: Dict[str, Any]) -> None:
+        """Encode plusieurs valeurs utilisateur dans la section effet."""
+        self.write(PATCH_COMMON_LENGTH, self.codec.encode(params, base=self.effect))
+
+    @property
+    def params(self) -> '_ParameterAccessor':
+        """Accesseurs typés du type d'effet courant (``patch.params.depth``)."""
+        return _accessor_class(self.effect_type)(self)
+
+
+# ---------------------------------------------------------------------------
+# Accesseurs générés
+# ---------------------------------------------------------------------------
+
+
+class _ParameterAccessor:
+    """Base des accesseurs générés par type d'effet."""
+
+    __slots__ = ('_patch',)
+    parameter_names: Dict[str, str] = {}
+
+    def __init__(self, patch: Patch):
+        self._patch = patch
+
+    def __dir__(self) -> List[str]:
+        return list(self.parameter_names)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self._patch.parameters()!r})"
+
+
+def attribute_name(label: str) -> str:
+    """Nom d'attribut Python d'un libellé de paramètre (``'Freq.'`` → ``freq``)."""
+    name = re.sub(r'[^0-9a-zA-Z]+', '_', label).strip('_').lower()
+    if not name or name[0].isdigit():
+        name = f"p_{name}"
+    return name
+
+
+def _parameter_property(label: str) -> property:
+    def getter(accessor: _ParameterAccessor) -> Any:
+        return accessor._patch.get_parameter(label)
+
+    def setter(accessor: _ParameterAccessor, value: Any) -> None:
+        accessor._patch.set_parameter(label, value)
+
+    return property(getter, setter, doc=f"Paramètre « {label} »")
+
+
+@lru_cache(maxsize=None)
+def _accessor_class(effect_type: int) -> type:
+    """Classe d'accesseurs générée à partir du codec d'un type d'effet."""
+    codec = get_effect_codec(effect_type)
+    names: Dict[str, str] = {}
+    for label in codec.names:
+        names.setdefault(attribute_name(label), label)
+
+    namespace: Dict[str, Any] = {'__slots__': (), 'parameter_names': names}
+    namespace.update({attribute: _parameter_property(label) for attribute, label in names.items()})
+    class_name = re.sub(r'[^0-9a-zA-Z]', '', codec.name.title()) or f"Effect{effect_type:02X}"
+    return type(f"{class_name}Parameters", (_ParameterAccessor,), namespace)
@@ -7,7 +7,7 @@ messages in exactly the same way.
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Iterable, List
+from typing import Iterable, List, Optional, Sequence, Tuple
 
 SYSEX_HEADER: List[int] = [0xF0, 0x43, 0x7D, 0x40, 0x55, 0x42]
 """Prefix used for parameter-send messages (MagicstompFrenzy format)."""
@@ -84,3 +84,130 @@ class ParameterLocation:
         if self.section == 0:
             return self.global_offset
         return self.global_offset - PATCH_COMMON_LENGTH
+
+
+# ---------------------------------------------------------------------------
+# Bulk dump (patch transfer) messages
+# ---------------------------------------------------------------------------
+
+BULK_HEADER: List[int] = [0xF0, 0x43, 0x7D, 0x30, 0x55, 0x42, 0x39, 0x39]
+"""Prefix of bulk-dump messages sent and received by the Magicstomp."""
+
+DUMP_REQUEST_HEADER: List[int] = [0xF0, 0x43, 0x7D, 0x50, 0x55, 0x42, 0x30, 0x01]
+"""Prefix of a patch dump request (followed by the patch index)."""
+
+NUM_USER_PATCHES: int = 99
+"""Number of user patch slots (U01-U99)."""
+
+
+def build_dump_request(patch_index: int) -> List[int]:
+    """Build the SysEx message asking the device to dump *patch_index*."""
+
+    return [*DUMP_REQUEST_HEADER, patch_index & 0x7F, SYSEX_FOOTER]
+
+
+def parse_bulk_message(data: Sequence[int]) -> Optional[Tuple[str, object]]:
+    """Decode one incoming bulk-dump message.
+
+    *data* is the message body without ``F0``/``F7``, as delivered by
+    :mod:`mido`.  Returns ``('start', index)``, ``('end', index)``,
+    ``('common', payload)`` or ``('effect', payload)``; ``None`` for anything
+    else, including messages whose checksum does not match.
+    """
+
+    if len(data) < 12 or list(data[:7]) != BULK_HEADER[1:]:
+        return None
+
+    if calculate_checksum(data[7:-1]) != data[-1]:
+        return None
+
+    length = data[8]
+    command = data[9]
+
+    if length == 0 and command == 0x30:
+        if data[10] == 0x01:
+            return ('start', data[11])
+        if data[10] == 0x11:
+            return ('end', data[11])
+        return None
+
+    if command != 0x20 or data[11] != 0x00:
+        return None
+
+    payload = list(data[12:12 + length])
+    if data[10] == 0x00 and length == PATCH_COMMON_LENGTH:
+        return ('common', payload)
+    if data[10] == 0x01 and length == PATCH_EFFECT_LENGTH:
+        return ('effect', payload)
+    return None
+
+
+def parse_parameter_message(message: Sequence[int]) -> Optional[Tuple[int, List[int]]]:
+    """Decode a parameter-send message built by :func:`build_parameter_message`.
+
+    *message* may include or omit the ``F0``/``F7`` framing.  Returns
+    ``(global_offset, values)``; ``None`` for other messages, including
+    messages whose checksum does not match.
+    """
+
+    data = list(message)
+    if data and data[0] == SYSEX_HEADER[0]:
+        data = data[1:]
+    if data and data[-1] == SYSEX_FOOTER:
+        data = data[:-1]
+
+    header = SYSEX_HEADER[1:]
+    if len(data) < len(header) + 4 or data[:len(header)] != header:
+        return None
+    if data[len(header)] != PARAMETER_SEND_CMD:
+        return None
+    if calculate_checksum(data[:-1]) != data[-1]:
+        return None
+
+    section, section_offset = data[len(header) + 1], data[len(header) + 2]
+    if section not in (0x00, 0x01):
+        return None
+    global_offset = section_offset + (PATCH_COMMON_LENGTH if section == 0x01 else 0)
+    return global_offset, data[len(header) + 3:-1]
+
+
+def _build_bulk_message(body: Sequence[int]) -> List[int]:
+    return [*BULK_HEADER, *body, calculate_checksum(body), SYSEX_FOOTER]
+
+
+def build_bulk_patch_messages(
+    patch_index: int,
+    common: Sequence[int],
+    effect: Sequence[int],
+    *,
+    edit_buffer: bool = False,
+) -> List[List[int]]:
+    """Build the four messages that bulk-write a whole patch.
+
+    Mirrors ``MainWindow::sendPatch`` in MagicstompFrenzy: start marker,
+    common section, effect section, end marker.
+
+    Args:
+        patch_index: Destination user slot (0 = U01).
+        common: Common section (32 bytes).
+        effect: Effect section (127 bytes).
+        edit_buffer: Write to the temporary edit area instead of the slot.
+    """
+
+    if len(common) != PATCH_COMMON_LENGTH or len(effect) != PATCH_EFFECT_LENGTH:
+        raise ValueError(
+            f"Invalid patch size: {len(common)}+{len(effect)} bytes"
+        )
+
+    start_cmd, end_cmd = (0x03, 0x13) if edit_buffer else (0x01, 0x11)
+    index = patch_index & 0x7F
+    return [
+        _build_bulk_message([0x00, 0x00, 0x30, start_cmd, index]),
+        _build_bulk_message(
+            [0x00, PATCH_COMMON_LENGTH, 0x20, 0x00, 0x00, *(b & 0x7F for b in common)]
+        ),
+        _build_bulk_message(
+            [0x00, PATCH_EFFECT_LENGTH, 0x20, 0x01, 0x00, *(b & 0x7F for b in effect)]
+        ),
+        _build_bulk_message([0x00, 0x00, 0x30, end_cmd, index]),
+    ]
@@ -9,6 +9,9 @@ Modules:
 - loss: Perceptual loss functions (log-mel, MFCC)
 - search: Coordinate search optimization algorithms
 - constraints: Parameter bounds and constraints
+- early_stop: Early abort of hopeless candidates (censored evaluations)
+- multi_fidelity: Successive halving / Hyperband from simulator to hardware
+- warm_start: Nearest-neighbour starting patches from analyzer features
 """
 
 __version__ = "1.0.0"
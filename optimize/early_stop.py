@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Early Termination of Hopeless Candidates
+========================================
+
+Decides, from the partial loss of a capture still being recorded, whether a
+candidate can still beat the best loss found so far. Captures stopped early
+return a :class:`CensoredLoss`: a float that only bounds the true loss from
+below (approximately, see :class:`EarlyAbortPolicy`), tagged so optimizers
+can tell it apart from a complete evaluation.
+"""
+
+import math
+from typing import Any
+
+
+class CensoredLoss(float):
+    """Loss of an evaluation stopped before the end of the capture."""
+
+    censored = True
+
+    def __new__(cls, value: float, fraction_evaluated: float):
+        loss = super().__new__(cls, value)
+        loss.fraction_evaluated = fraction_evaluated
+        return loss
+
+    def __repr__(self) -> str:
+        return f"CensoredLoss({float(self)!r}, fraction_evaluated={self.fraction_evaluated:.2f})"
+
+
+def is_censored(loss: Any) -> bool:
+    """True if ``loss`` comes from an evaluation stopped early."""
+    return getattr(loss, 'censored', False)
+
+
+class EarlyAbortPolicy:
+    """
+    Stop rule for a capture whose loss accumulates frame by frame.
+
+    The accumulated squared error only grows, so
+    ``partial_loss * frames_done / total_frames`` is a hard lower bound of the
+    final loss: once it reaches ``best_loss`` the candidate cannot win. The
+    partial loss itself is also an estimate of the final loss; the candidate
+    is abandoned when it exceeds ``best_loss`` by a confidence margin that
+    shrinks as more of the capture has been heard.
+    """
+
+    def __init__(self, margin: float = 0.25, min_fraction: float = 0.1):
+        """
+        Initialize the policy.
+
+        Args:
+            margin: Relative margin over ``best_loss`` required at
+                ``min_fraction``; scaled by ``sqrt(min_fraction / fraction)``
+                afterwards
+            min_fraction: Share of the frames to hear before trusting the
+                estimate (the hard bound applies from the start)
+        """
+        self.margin = margin
+        self.min_fraction = min_fraction
+
+    def threshold(self, best_loss: float, fraction: float) -> float:
+        """Partial loss above which a candidate is abandoned."""
+        return best_loss * (1.0 + self.margin * math.sqrt(self.min_fraction / fraction))
+
+    def should_abort(self, partial_loss: float, frames_done: int,
+                     total_frames: int, best_loss: float) -> bool:
+        """
+        Decide whether to stop the capture.
+
+        Args:
+            partial_loss: Mean loss over the frames accumulated so far
+            frames_done: Number of frames accumulated
+            total_frames: Number of frames of a complete capture
+            best_loss: Best (complete) loss found so far
+
+        Returns:
+            True if the candidate cannot win
+        """
+        if not math.isfinite(best_loss) or frames_done <= 0 or total_frames <= 0:
+            return False
+
+        fraction = min(frames_done / total_frames, 1.0)
+        if partial_loss * fraction >= best_loss:
+            return True
+        if fraction < self.min_fraction:
+            return False
+        return partial_loss > self.threshold(best_loss, fraction)
+
+    def censor(self, partial_loss: float, frames_done: int, total_frames: int) -> CensoredLoss:
+        """
+        Build the censored result of an aborted capture.
+
+        The value is the partial loss, which exceeded the abort threshold and
+        therefore compares worse than the best loss.
+        """
+        fraction = min(frames_done / total_frames, 1.0) if total_frames > 0 else 0.0
+        return CensoredLoss(partial_loss, fraction)
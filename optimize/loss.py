@@ -9,11 +9,15 @@ Implements perceptual loss functions for audio comparison:
 
 Used to compare target audio with Magicstomp processed audio
 in Hardware-in-the-Loop optimization.
+
+StreamingLossAccumulator computes the same loss block by block while a
+capture is still being recorded.
 """
 
 import numpy as np
 import librosa
 import logging
+import scipy.fft
 from typing import Tuple, Optional
 from scipy import signal
 
@@ -121,6 +125,23 @@ class PerceptualLoss:
         
         return total_loss
     
+    def streaming(self, target_audio: np.ndarray, align_signals: bool = True,
+                  align_window: Optional[int] = None) -> 'StreamingLossAccumulator':
+        """
+        Create a streaming accumulator for this loss.
+        
+        Args:
+            target_audio: Target (reference) audio signal
+            align_signals: Whether to align the signals, as in compute_loss
+            align_window: Samples of processed audio used to estimate the
+                alignment (half a second by default)
+            
+        Returns:
+            Accumulator fed with blocks of the processed audio
+        """
+        return StreamingLossAccumulator(self, target_audio, align_signals=align_signals,
+                                        align_window=align_window)
+    
     def _compute_l2_loss(self, target: np.ndarray, processed: np.ndarray) -> float:
         """
         Compute L2 loss between feature matrices.
@@ -159,11 +180,7 @@ class PerceptualLoss:
         target = target[:min_length]
         processed = processed[:min_length]
         
-        # Cross-correlation
-        correlation = signal.correlate(processed, target, mode='full')
-        
-        # Find best alignment
-        best_lag = np.argmax(np.abs(correlation)) - (len(processed) - 1)
+        best_lag = self._estimate_lag(target, processed)
         
         # Apply alignment
         if best_lag > 0:
@@ -177,6 +194,21 @@ class PerceptualLoss:
         
         return target, processed
     
+    @staticmethod
+    def _estimate_lag(target: np.ndarray, processed: np.ndarray) -> int:
+        """
+        Lag of the cross-correlation peak between two same-length signals.
+        
+        Args:
+            target: Target audio signal
+            processed: Processed audio signal
+            
+        Returns:
+            Lag in samples (> 0 when the target must be trimmed)
+        """
+        correlation = signal.correlate(processed, target, mode='full')
+        return int(np.argmax(np.abs(correlation)) - (len(processed) - 1))
+    
     def compute_detailed_loss(self, target_audio: np.ndarray,
                             processed_audio: np.ndarray) -> dict:
         """
@@ -215,6 +247,211 @@ class PerceptualLoss:
         }
 
 
+class StreamingLossAccumulator:
+    """
+    Perceptual loss accumulated while the processed audio is recorded.
+    
+    Blocks of processed audio are framed as they arrive (same centered,
+    zero-padded STFT as :meth:`PerceptualLoss.extract_features`), projected
+    to log-mel and MFCC, and their squared error against the precomputed
+    target frames is accumulated. :meth:`finish` returns the value of
+    ``PerceptualLoss.compute_loss(target, processed, align_signals)``.
+    
+    With alignment, the first ``align_window`` samples are buffered and the
+    lag is estimated on them with the batch cross-correlation; the target
+    (or the start of the processed signal) is then trimmed exactly as
+    :meth:`PerceptualLoss._align_signals` does. The result equals the batch
+    loss when the lag found on the window is the lag of the whole signal
+    and ``expected_samples`` (see :meth:`reset`) is the processed length.
+    """
+    
+    N_FFT = 2048
+    HOP_LENGTH = 512
+    
+    def __init__(self, loss: PerceptualLoss, target_audio: np.ndarray,
+                 align_signals: bool = True, align_window: Optional[int] = None):
+        """
+        Initialize the accumulator and precompute the target features.
+        
+        Args:
+            loss: Perceptual loss providing the mel basis and weights
+            target_audio: Target (reference) audio signal
+            align_signals: Whether to align the signals, as in compute_loss
+            align_window: Samples of processed audio used to estimate the
+                alignment (half a second by default)
+        """
+        self.loss = loss
+        target_audio = np.asarray(target_audio)
+        self.target_audio = np.mean(target_audio, axis=1) if target_audio.ndim > 1 else target_audio
+        self.align_signals = align_signals
+        self.align_window = align_window or loss.sample_rate // 2
+        self.window = librosa.filters.get_window('hann', self.N_FFT, fftbins=True)
+        
+        # Target features by (target length, lag)
+        self._target_features = {}
+        self.lag: Optional[int] = None
+        self.reset()
+    
+    def reset(self, expected_samples: Optional[int] = None) -> None:
+        """
+        Start accumulating a new processed signal.
+        
+        Args:
+            expected_samples: Length of the processed signal if known; the
+                batch loss crops the target to it before aligning
+        """
+        # Padded signal (N_FFT // 2 leading zeros) from sample _buffer_start
+        self._buffer = np.zeros(self.N_FFT // 2)
+        self._buffer_start = 0
+        self._next_frame = 0
+        self._samples = 0
+        self._mel_error = 0.0
+        self._mfcc_error = 0.0
+        self._finished = False
+        
+        # Processed samples kept (None = all) and blocks waiting for the alignment
+        self._limit: Optional[int] = None
+        self._pending = []
+        self._pending_samples = 0
+        self._expected_samples = expected_samples
+        self.lag = None if self.align_signals else 0
+        self._set_target(len(self.target_audio), 0)
+    
+    def _set_target(self, length: int, lag: int) -> None:
+        """Use the features of the target cropped to *length* and trimmed by *lag*."""
+        key = (length, lag)
+        if key not in self._target_features:
+            target = self.target_audio[:length]
+            if lag > 0:
+                target = target[lag:]
+            elif lag < 0:
+                target = target[:len(target) + lag]
+            self._target_features[key] = self.loss.extract_features(target)
+        self.target_log_mel, self.target_mfcc = self._target_features[key]
+    
+    def _align(self, head: np.ndarray) -> np.ndarray:
+        """Estimate the lag on the first processed samples and trim accordingly."""
+        length = len(self.target_audio)
+        if self._expected_samples is not None:
+            length = min(length, self._expected_samples)
+        
+        window = min(len(head), length, self.align_window)
+        lag = self.loss._estimate_lag(self.target_audio[:window], head[:window]) if window else 0
+        self.lag = lag
+        self._set_target(length, lag)
+        self._limit = length - abs(lag)
+        
+        # Processed is trimmed at the start when the target is delayed
+        return head[-lag:] if lag < 0 else head
+    
+    @property
+    def frames_processed(self) -> int:
+        """Number of frames accumulated so far."""
+        return self._next_frame
+    
+    @property
+    def target_frames(self) -> int:
+        """Number of frames of the target signal."""
+        return self.target_log_mel.shape[1]
+    
+    def _process_frames(self, stop_frame: int) -> None:
+        """Accumulate the error of frames [_next_frame, stop_frame)."""
+        stop_frame = min(stop_frame, self.target_frames)
+        if stop_frame <= self._next_frame:
+            return
+        
+        offset = self._next_frame * self.HOP_LENGTH - self._buffer_start
+        count = stop_frame - self._next_frame
+        windows = np.lib.stride_tricks.sliding_window_view(
+            self._buffer[offset:offset + (count - 1) * self.HOP_LENGTH + self.N_FFT], self.N_FFT
+        )[::self.HOP_LENGTH]
+        
+        magnitude = np.abs(scipy.fft.rfft(windows * self.window, axis=-1)).T
+        mel_spec = np.dot(self.loss.mel_basis, magnitude)
+        log_mel = np.log(mel_spec + 1e-10)
+        mfcc = scipy.fft.dct(mel_spec, axis=0, type=2, norm='ortho')[:self.loss.n_mfcc]
+        
+        frames = slice(self._next_frame, stop_frame)
+        self._mel_error += float(np.sum((self.target_log_mel[:, frames] - log_mel) ** 2))
+        self._mfcc_error += float(np.sum((self.target_mfcc[:, frames] - mfcc) ** 2))
+        self._next_frame = stop_frame
+    
+    def push(self, block: np.ndarray) -> None:
+        """
+        Add a block of processed audio.
+        
+        Args:
+            block: Next samples of the processed signal (mono or
+                samples x channels)
+        """
+        if self._finished:
+            raise RuntimeError("Accumulator already finished, call reset()")
+        if block.ndim > 1:
+            block = np.mean(block, axis=1)
+        
+        if self.lag is None:
+            self._pending.append(block)
+            self._pending_samples += len(block)
+            if self._pending_samples < self.align_window:
+                return
+            block = self._align(np.concatenate(self._pending))
+            self._pending = []
+        
+        if self._limit is not None:
+            block = block[:max(self._limit - self._samples, 0)]
+        self._append(block)
+    
+    def _append(self, block: np.ndarray) -> None:
+        """Frame newly received (aligned) samples."""
+        self._buffer = np.concatenate([self._buffer, block])
+        self._samples += len(block)
+        
+        # Frames whose window lies entirely within the received samples
+        available = self._buffer_start + len(self._buffer)
+        self._process_frames((available - self.N_FFT) // self.HOP_LENGTH + 1)
+        
+        # Drop samples no longer needed by the next frame
+        if self._next_frame >= self.target_frames:
+            drop = len(self._buffer)
+        else:
+            drop = self._next_frame * self.HOP_LENGTH - self._buffer_start
+        if drop > 0:
+            self._buffer = self._buffer[drop:]
+            self._buffer_start += drop
+    
+    def partial_loss(self) -> float:
+        """
+        Loss over the frames accumulated so far.
+        
+        Returns:
+            Weighted loss of the processed frames (0.0 before the first frame)
+        """
+        if self._next_frame == 0:
+            return 0.0
+        mel_loss = self._mel_error / (self.loss.n_mels * self._next_frame)
+        mfcc_loss = self._mfcc_error / (self.loss.n_mfcc * self._next_frame)
+        return self.loss.mel_weight * mel_loss + self.loss.mfcc_weight * mfcc_loss
+    
+    def finish(self) -> float:
+        """
+        Flush the trailing frames (end padding) and return the loss.
+        
+        Returns:
+            Perceptual loss of the whole processed signal
+        """
+        if not self._finished:
+            if self.lag is None:
+                # Shorter than the alignment window: align on what was received
+                head = np.concatenate(self._pending) if self._pending else np.zeros(0)
+                self._pending = []
+                self._append(self._align(head)[:self._limit])
+            self._buffer = np.concatenate([self._buffer, np.zeros(self.N_FFT // 2)])
+            total_frames = 1 + self._samples // self.HOP_LENGTH
+            self._process_frames(total_frames)
+            self._finished = True
+        return self.partial_loss()
+
+
 class SpectralLoss:
     """
     Additional spectral loss functions for audio comparison.
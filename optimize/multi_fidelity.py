@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""
+Multi-Fidelity Optimization
+===========================
+
+Successive halving and Hyperband over evaluators of increasing cost, e.g.
+the simulated Magicstomp, a short probe played on the hardware and the full
+hardware capture.
+
+Candidates are sampled in the parameter space and evaluated at the cheapest
+fidelity; only the best ``1 / eta`` of each rung is promoted to the next
+fidelity, so the last (hardware) fidelity only sees a few candidates. As
+candidates reach the last fidelity, a correction from each cheaper fidelity
+to the last one is learned (ridge regression on the cheap loss and the
+normalized parameters) and used to rank the following rungs.
+"""
+
+import logging
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .search import ParameterSpace
+
+
+@dataclass
+class Fidelity:
+    """An evaluator of candidates and its relative cost."""
+    name: str
+    evaluate: Callable[[List[Dict[str, float]]], List[float]]
+    cost: float = 1.0
+
+    # Budget spent during the optimization
+    evaluations: int = field(default=0, init=False)
+    elapsed_s: float = field(default=0.0, init=False)
+
+    @property
+    def spent(self) -> float:
+        """Budget spent in cost units."""
+        return self.evaluations * self.cost
+
+
+class FidelityCorrection:
+    """
+    Learned mapping from the loss at a cheap fidelity to the final loss.
+
+    Uses an offset with one pair, a linear fit of the cheap loss with a few
+    pairs, and adds the normalized parameters as regressors once there are
+    enough pairs to fit them.
+    """
+
+    def __init__(self, parameter_space: ParameterSpace, parameter_names: Sequence[str],
+                 ridge: float = 1e-3):
+        """
+        Initialize the correction.
+
+        Args:
+            parameter_space: Parameter space (bounds used for normalization)
+            parameter_names: Parameters used as regressors
+            ridge: Regularization of the fit
+        """
+        self.parameter_space = parameter_space
+        self.parameter_names = list(parameter_names)
+        self.ridge = ridge
+
+        self._low: List[float] = []
+        self._high: List[float] = []
+        self._parameters: List[np.ndarray] = []
+        self._coefficients: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self._low)
+
+    def _normalized(self, parameters: Dict[str, float]) -> np.ndarray:
+        values = []
+        for name in self.parameter_names:
+            bounds = self.parameter_space.get_parameter_bounds(name)
+            span = bounds.max_val - bounds.min_val
+            values.append((parameters.get(name, bounds.current_val) - bounds.min_val) / span if span else 0.0)
+        return np.array(values)
+
+    def _design(self, low: np.ndarray, parameters: np.ndarray) -> np.ndarray:
+        columns = [np.ones_like(low), low]
+        if len(self) > len(self.parameter_names) + 2:
+            columns.extend(parameters.T)
+        return np.column_stack(columns)
+
+    def add(self, low_loss: float, high_loss: float, parameters: Dict[str, float]) -> None:
+        """
+        Record a candidate evaluated at both fidelities and refit.
+
+        Args:
+            low_loss: Loss at the cheap fidelity
+            high_loss: Loss at the final fidelity
+            parameters: Candidate parameters
+        """
+        if not (math.isfinite(low_loss) and math.isfinite(high_loss)):
+            return
+        self._low.append(low_loss)
+        self._high.append(high_loss)
+        self._parameters.append(self._normalized(parameters))
+
+        if len(self) >= 3:
+            design = self._design(np.array(self._low), np.array(self._parameters))
+            regularization = self.ridge * np.eye(design.shape[1])
+            regularization[0, 0] = 0.0
+            self._coefficients = np.linalg.solve(design.T @ design + regularization,
+                                                 design.T @ np.array(self._high))
+        else:
+            self._coefficients = None
+
+    def predict(self, low_losses: Sequence[float],
+                candidates: Sequence[Dict[str, float]]) -> np.ndarray:
+        """
+        Estimate the final losses of candidates from their cheap losses.
+
+        Args:
+            low_losses: Losses at the cheap fidelity
+            candidates: Candidate parameters
+
+        Returns:
+            Estimated final losses (the cheap losses until a pair is known)
+        """
+        low = np.asarray(low_losses, dtype=float)
+        if not len(self):
+            return low
+        if self._coefficients is None:
+            return low + float(np.mean(np.array(self._high) - np.array(self._low)))
+        parameters = np.array([self._normalized(candidate) for candidate in candidates])
+        estimate = self._design(low, parameters.reshape(len(low), -1)) @ self._coefficients
+        return np.where(np.isfinite(low), estimate, np.inf)
+
+
+class MultiFidelityOptimizer:
+    """
+    Successive halving / Hyperband optimizer over several fidelities.
+
+    Fidelities are ordered from the cheapest to the reference one (usually
+    the full hardware capture); the best parameters are chosen on the
+    reference fidelity only.
+    """
+
+    def __init__(self, parameter_space: ParameterSpace,
+                 fidelities: List[Fidelity],
+                 eta: int = 3,
+                 seed: Optional[int] = None):
+        """
+        Initialize the optimizer.
+
+        Args:
+            parameter_space: Parameter space to sample
+            fidelities: Evaluators from the cheapest to the reference one
+            eta: Reduction factor between rungs (keep the best 1/eta)
+            seed: Seed of the candidate sampling
+        """
+        if not fidelities:
+            raise ValueError("At least one fidelity is required")
+        if eta < 2:
+            raise ValueError(f"eta must be at least 2, got {eta}")
+
+        self.parameter_space = parameter_space
+        self.fidelities = fidelities
+        self.eta = eta
+        self.rng = np.random.default_rng(seed)
+
+        self.logger = logging.getLogger(__name__)
+
+        # Optimization state
+        self.corrections: List[FidelityCorrection] = []
+        self.promotions: List[Dict[str, Any]] = []
+        self.best_loss = float('inf')
+        self.best_parameters: Dict[str, float] = {}
+        self.first_rung_losses: List[float] = []
+
+    def sample_candidates(self, count: int, center: Dict[str, float],
+                          parameters_to_optimize: List[str],
+                          include_center: bool = True) -> List[Dict[str, float]]:
+        """
+        Draw candidates uniformly within the bounds, on the parameter steps.
+
+        Args:
+            count: Number of candidates
+            center: Values of the parameters not optimized
+            parameters_to_optimize: Parameters to sample
+            include_center: Make the center the first candidate
+
+        Returns:
+            Candidate parameter dicts
+        """
+        candidates = [dict(center)] if include_center else []
+        while len(candidates) < count:
+            candidate = dict(center)
+            for name in parameters_to_optimize:
+                bounds = self.parameter_space.get_parameter_bounds(name)
+                value = self.rng.uniform(bounds.min_val, bounds.max_val)
+                if bounds.step_size > 0:
+                    value = bounds.min_val + round((value - bounds.min_val) / bounds.step_size) * bounds.step_size
+                candidate[name] = bounds.clamp(value)
+            candidates.append(candidate)
+        return candidates
+
+    def _evaluate(self, level: int, candidates: List[Dict[str, float]]) -> List[float]:
+        fidelity = self.fidelities[level]
+        start = time.time()
+        losses = [float(loss) for loss in fidelity.evaluate(candidates)]
+        fidelity.elapsed_s += time.time() - start
+        fidelity.evaluations += len(candidates)
+        return losses
+
+    def successive_halving(self, candidates: List[Dict[str, float]],
+                           start_level: int = 0) -> List[Tuple[Dict[str, float], float]]:
+        """
+        Run one successive halving bracket.
+
+        Args:
+            candidates: Candidates of the first rung
+            start_level: Fidelity of the first rung
+
+        Returns:
+            (parameters, loss) of the candidates evaluated at the reference
+            fidelity
+        """
+        last = len(self.fidelities) - 1
+        # Loss of each surviving candidate at every fidelity it went through
+        history: List[List[float]] = [[] for _ in candidates]
+        survivors = list(range(len(candidates)))
+
+        for level in range(start_level, last + 1):
+            losses = self._evaluate(level, [candidates[i] for i in survivors])
+            for index, loss in zip(survivors, losses):
+                history[index].append(loss)
+            if level == start_level:
+                self.first_rung_losses = losses
+            if level == last:
+                break
+
+            keep = max(1, math.ceil(len(survivors) / self.eta))
+            estimates = self.corrections[level].predict(losses, [candidates[i] for i in survivors])
+            order = np.argsort(estimates, kind='stable')
+            promoted = [survivors[i] for i in order[:keep]]
+            threshold = float(estimates[order[keep - 1]])
+
+            self.promotions.append({
+                'from': self.fidelities[level].name,
+                'to': self.fidelities[level + 1].name,
+                'candidates': len(survivors),
+                'promoted': keep,
+                'threshold': threshold,
+                'corrected': len(self.corrections[level]) > 0,
+            })
+            self.logger.info(f"Promoting {keep}/{len(survivors)} candidates "
+                             f"{self.fidelities[level].name} -> {self.fidelities[level + 1].name} "
+                             f"(estimated loss <= {threshold:.6f})")
+            survivors = promoted
+
+        # Learn the corrections from the candidates measured at the reference fidelity
+        results = []
+        for index in survivors:
+            final_loss = history[index][-1]
+            for offset, low_loss in enumerate(history[index][:-1]):
+                self.corrections[start_level + offset].add(low_loss, final_loss, candidates[index])
+            results.append((candidates[index], final_loss))
+            if final_loss < self.best_loss:
+                self.best_loss = final_loss
+                self.best_parameters = dict(candidates[index])
+        return results
+
+    def optimize(self, n_candidates: int = 27,
+                 parameters_to_optimize: Optional[List[str]] = None,
+                 hyperband: bool = False) -> Dict[str, Any]:
+        """
+        Run successive halving (or Hyperband) from the current parameters.
+
+        Args:
+            n_candidates: Candidates of the first rung (of the most
+                exploratory bracket with Hyperband)
+            parameters_to_optimize: Parameters to sample (all by default)
+            hyperband: Run Hyperband brackets starting at every fidelity
+                instead of a single bracket starting at the cheapest one
+
+        Returns:
+            Optimization results dictionary
+        """
+        if parameters_to_optimize is None:
+            parameters_to_optimize = self.parameter_space.list_parameters()
+        center = self.parameter_space.get_parameter_dict()
+        last = len(self.fidelities) - 1
+
+        self.corrections = [FidelityCorrection(self.parameter_space, parameters_to_optimize)
+                            for _ in self.fidelities[:-1]]
+        self.promotions = []
+        self.best_loss = float('inf')
+        self.best_parameters = dict(center)
+        for fidelity in self.fidelities:
+            fidelity.evaluations = 0
+            fidelity.elapsed_s = 0.0
+
+        # Bracket s starts at fidelity last - s with n_s candidates
+        if hyperband:
+            brackets = [(last - s, max(1, math.ceil(n_candidates * (last + 1) / (s + 1) / self.eta ** (last - s))))
+                        for s in range(last, -1, -1)]
+        else:
+            brackets = [(0, n_candidates)]
+
+        self.logger.info(f"Starting multi-fidelity optimization: {len(brackets)} bracket(s), eta={self.eta}, "
+                         f"fidelities {[fidelity.name for fidelity in self.fidelities]}")
+
+        initial_loss = None
+        center_loss = None
+        for bracket, (start_level, count) in enumerate(brackets):
+            self.logger.info(f"Bracket {bracket + 1}/{len(brackets)}: {count} candidates "
+                             f"from {self.fidelities[start_level].name}")
+            candidates = self.sample_candidates(count, center, parameters_to_optimize,
+                                                include_center=bracket == 0)
+            for parameters, loss in self.successive_halving(candidates, start_level):
+                if parameters == center and initial_loss is None:
+                    initial_loss = loss
+            if bracket == 0:
+                center_loss = (start_level, self.first_rung_losses[0])
+
+        # Center not promoted to the reference fidelity: corrected estimate
+        initial_loss_estimated = initial_loss is None
+        if initial_loss_estimated:
+            level, loss = center_loss
+            initial_loss = loss if level == last else float(self.corrections[level].predict([loss], [center])[0])
+
+        budget = {fidelity.name: {'evaluations': fidelity.evaluations,
+                                  'cost': fidelity.spent,
+                                  'time_s': fidelity.elapsed_s}
+                  for fidelity in self.fidelities}
+
+        results = {
+            'success': math.isfinite(self.best_loss),
+            'iterations': len(brackets),
+            'initial_loss': initial_loss,
+            'initial_loss_estimated': initial_loss_estimated,
+            'final_loss': self.best_loss,
+            'improvement': initial_loss - self.best_loss,
+            'best_parameters': self.best_parameters,
+            'evaluations': sum(fidelity.evaluations for fidelity in self.fidelities),
+            'budget': budget,
+            'promotions': self.promotions,
+        }
+
+        self.logger.info("Multi-fidelity optimization complete:")
+        for name, spent in budget.items():
+            self.logger.info(f"  {name}: {spent['evaluations']} evaluations, "
+                             f"cost {spent['cost']:.2f}, {spent['time_s']:.2f}s")
+        self.logger.info(f"  Final loss: {self.best_loss:.6f}")
+
+        return results
@@ -14,6 +14,8 @@ import time
 from typing import Dict, Any, List, Tuple, Optional, Callable
 from dataclasses import dataclass
 
+from .early_stop import is_censored
+
 
 @dataclass
 class ParameterBounds:
@@ -110,7 +112,8 @@ class CoordinateSearchOptimizer:
     def __init__(self, parameter_space: ParameterSpace,
                  loss_function: Callable[[Dict[str, float]], float],
                  max_iterations: int = 20,
-                 min_improvement: float = 1e-6):
+                 min_improvement: float = 1e-6,
+                 bounded_loss: bool = False):
         """
         Initialize coordinate search optimizer.
         
@@ -119,11 +122,15 @@ class CoordinateSearchOptimizer:
             loss_function: Function that takes parameter dict and returns loss
             max_iterations: Maximum number of optimization iterations
             min_improvement: Minimum improvement threshold for stopping
+            bounded_loss: Pass the best loss so far as ``bound=`` to the loss
+                function, which may then stop hopeless evaluations early and
+                return a censored loss
         """
         self.parameter_space = parameter_space
         self.loss_function = loss_function
         self.max_iterations = max_iterations
         self.min_improvement = min_improvement
+        self.bounded_loss = bounded_loss
         
         self.logger = logging.getLogger(__name__)
         
@@ -133,13 +140,33 @@ class CoordinateSearchOptimizer:
         self.best_parameters = {}
         self.iteration = 0
         self.history = []
+        self.evaluations = 0
+        self.censored_evaluations = 0
+    
+    def _evaluate(self, parameters: Dict[str, float]) -> float:
+        """Evaluate the loss, bounded by the best loss when enabled."""
+        if self.bounded_loss:
+            loss = self.loss_function(parameters, bound=self.best_loss)
+        else:
+            loss = self.loss_function(parameters)
+        
+        self.evaluations += 1
+        if is_censored(loss):
+            self.censored_evaluations += 1
+            self.logger.debug(f"  censored evaluation: loss >= {loss:.6f} "
+                              f"after {loss.fraction_evaluated:.0%} of the capture")
+        return loss
     
-    def optimize(self, initial_parameters: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+    def optimize(self, initial_parameters: Optional[Dict[str, float]] = None,
+                 warm_starts: Optional[List[Dict[str, float]]] = None) -> Dict[str, Any]:
         """
         Perform coordinate search optimization.
         
         Args:
             initial_parameters: Starting parameter values
+            warm_starts: Alternative starting points (e.g. nearest library
+                patches); the search starts from the best of these and the
+                initial parameters
             
         Returns:
             Optimization results dictionary
@@ -152,12 +179,14 @@ class CoordinateSearchOptimizer:
                 self.parameter_space.set_parameter_value(name, value)
         
         # Get initial loss
-        self.current_loss = self.loss_function(self.parameter_space.get_parameter_dict())
+        self.current_loss = self._evaluate(self.parameter_space.get_parameter_dict())
         self.best_loss = self.current_loss
         self.best_parameters = self.parameter_space.get_parameter_dict().copy()
         
         self.logger.info(f"Initial loss: {self.current_loss:.6f}")
         
+        warm_start = self._select_warm_start(warm_starts) if warm_starts else None
+        
         # Main optimization loop
         for iteration in range(self.max_iterations):
             self.iteration = iteration
@@ -199,7 +228,10 @@ class CoordinateSearchOptimizer:
             'final_loss': self.best_loss,
             'improvement': self.history[0]['loss'] - self.best_loss if self.history else 0.0,
             'best_parameters': self.best_parameters,
-            'history': self.history
+            'history': self.history,
+            'evaluations': self.evaluations,
+            'censored_evaluations': self.censored_evaluations,
+            'warm_start': warm_start
         }
         
         self.logger.info(f"Optimization complete:")
@@ -207,9 +239,45 @@ class CoordinateSearchOptimizer:
         self.logger.info(f"  Initial loss: {results['initial_loss']:.6f}")
         self.logger.info(f"  Final loss: {results['final_loss']:.6f}")
         self.logger.info(f"  Improvement: {results['improvement']:.6f}")
+        if self.censored_evaluations:
+            self.logger.info(f"  Censored evaluations: {self.censored_evaluations}/{self.evaluations}")
         
         return results
     
+    def _select_warm_start(self, warm_starts: List[Dict[str, float]]) -> Optional[int]:
+        """
+        Evaluate the warm starts and move to the best one if it beats the
+        current parameters.
+        
+        Returns:
+            Index of the selected warm start, or None if none was better
+        """
+        # The loss function may move the parameter space: every candidate
+        # starts from the parameters current before the first evaluation
+        base = self.parameter_space.get_parameter_dict()
+        selected = None
+        for i, start in enumerate(warm_starts):
+            candidate = dict(base)
+            for name, value in start.items():
+                bounds = self.parameter_space.get_parameter_bounds(name)
+                if bounds is not None:
+                    candidate[name] = bounds.clamp(value)
+            
+            loss = self._evaluate(candidate)
+            self.logger.debug(f"  warm start {i}: loss={loss:.6f}")
+            if loss < self.best_loss:
+                self.best_loss = loss
+                self.best_parameters = candidate
+                selected = i
+        
+        # The loss function may have moved the parameter space
+        for name, value in self.best_parameters.items():
+            self.parameter_space.set_parameter_value(name, value)
+        self.current_loss = self.best_loss
+        if selected is not None:
+            self.logger.info(f"Starting from warm start {selected}: loss={self.best_loss:.6f}")
+        return selected
+    
     def _optimize_parameter(self, param_name: str) -> bool:
         """
         Optimize a single parameter using coordinate search.
@@ -233,7 +301,7 @@ class CoordinateSearchOptimizer:
         positive_value = param_bounds.clamp(current_value + param_bounds.step_size)
         if positive_value != current_value:
             self.parameter_space.set_parameter_value(param_name, positive_value)
-            positive_loss = self.loss_function(self.parameter_space.get_parameter_dict())
+            positive_loss = self._evaluate(self.parameter_space.get_parameter_dict())
             
             if positive_loss < self.best_loss:
                 self.best_loss = positive_loss
@@ -245,7 +313,7 @@ class CoordinateSearchOptimizer:
         negative_value = param_bounds.clamp(current_value - param_bounds.step_size)
         if negative_value != current_value:
             self.parameter_space.set_parameter_value(param_name, negative_value)
-            negative_loss = self.loss_function(self.parameter_space.get_parameter_dict())
+            negative_loss = self._evaluate(self.parameter_space.get_parameter_dict())
             
             if negative_loss < self.best_loss:
                 self.best_loss = negative_loss
@@ -269,7 +337,9 @@ class GridSearchOptimizer:
     
     def __init__(self, parameter_space: ParameterSpace,
                  loss_function: Callable[[Dict[str, float]], float],
-                 grid_size: int = 3):
+                 grid_size: int = 3,
+                 batch_loss_function: Optional[Callable[[List[Dict[str, float]]], List[float]]] = None,
+                 bounded_loss: bool = False):
         """
         Initialize grid search optimizer.
         
@@ -277,10 +347,16 @@ class GridSearchOptimizer:
             parameter_space: Parameter space to optimize
             loss_function: Function that takes parameter dict and returns loss
             grid_size: Number of grid points per parameter (odd number)
+            batch_loss_function: Optional function evaluating all grid points
+                at once (e.g. with candidates preloaded into device slots)
+            bounded_loss: Pass the best loss so far as ``bound=`` to the loss
+                function when points are evaluated one by one
         """
         self.parameter_space = parameter_space
         self.loss_function = loss_function
         self.grid_size = grid_size
+        self.batch_loss_function = batch_loss_function
+        self.bounded_loss = bounded_loss
         
         self.logger = logging.getLogger(__name__)
     
@@ -303,12 +379,25 @@ class GridSearchOptimizer:
         
         best_loss = float('inf')
         best_parameters = center_parameters.copy()
+        censored = 0
+        
+        # Evaluate all grid points (in one batch when supported)
+        if self.batch_loss_function is not None:
+            losses = self.batch_loss_function(grid_points)
+        else:
+            losses = None
         
-        # Evaluate all grid points
         for i, grid_point in enumerate(grid_points):
             self.logger.debug(f"Evaluating grid point {i+1}/{len(grid_points)}")
             
-            loss = self.loss_function(grid_point)
+            if losses is not None:
+                loss = losses[i]
+            elif self.bounded_loss:
+                loss = self.loss_function(grid_point, bound=best_loss)
+            else:
+                loss = self.loss_function(grid_point)
+            if is_censored(loss):
+                censored += 1
             
             if loss < best_loss:
                 best_loss = loss
@@ -318,6 +407,7 @@ class GridSearchOptimizer:
         results = {
             'success': True,
             'grid_points_evaluated': len(grid_points),
+            'censored_evaluations': censored,
             'initial_loss': self.loss_function(center_parameters),
             'final_loss': best_loss,
             'improvement': self.loss_function(center_parameters) - best_loss,
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Feature-Space Warm Starts
+=========================
+
+Nearest-neighbour index from analyzer features to patch parameters.
+
+A library of patches is rendered through the Magicstomp (or the simulator)
+and analyzed once; each entry stores the analyzer feature vector (tilt,
+centroid, THD proxy, delay, reverb, LFO and optionally MFCC statistics) and
+the parameters that produced it. For a new target, the patches whose
+rendering sounds closest are returned in milliseconds (KD-tree over
+z-scored features) and used as starting points of the optimizer instead of
+the heuristic mapping only.
+"""
+
+import logging
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+from .search import ParameterSpace
+
+FEATURE_NAMES = [
+    'spectral_tilt_db',
+    'spectral_centroid_mean',
+    'thd_proxy',
+    'delay_ms',
+    'delay_feedback',
+    'reverb_decay_s',
+    'reverb_mix',
+    'lfo_rate_hz',
+    'lfo_strength',
+]
+
+
+def mfcc_statistics(mfcc: np.ndarray) -> np.ndarray:
+    """Mean and standard deviation of each MFCC coefficient over time."""
+    mfcc = np.asarray(mfcc, dtype=np.float64)
+    return np.concatenate([mfcc.mean(axis=1), mfcc.std(axis=1)])
+
+
+def feature_vector(features: Dict[str, Any], mfcc: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Flatten analyzer features into a vector (see FEATURE_NAMES).
+
+    Args:
+        features: Output of AudioAnalyzer.analyze / analyze_signal
+        mfcc: Optional MFCC matrix (n_mfcc, frames) appended as statistics
+
+    Returns:
+        Feature vector
+    """
+    delay_ms, delay_feedback = features.get('onset_delay_ms', (0.0, 0.0))
+    reverb_decay, reverb_mix = features.get('reverb_estimate', (0.0, 0.0))
+    lfo_rate, lfo_strength = features.get('lfo_rate_hz', (None, 0.0))
+    vector = [
+        features.get('spectral_tilt_db', 0.0),
+        features.get('spectral_centroid_mean', 0.0),
+        features.get('thd_proxy', 0.0),
+        delay_ms,
+        delay_feedback,
+        reverb_decay,
+        reverb_mix,
+        lfo_rate if lfo_rate is not None else 0.0,
+        lfo_strength,
+    ]
+    vector = np.nan_to_num(np.asarray(vector, dtype=np.float64))
+    if mfcc is not None:
+        vector = np.concatenate([vector, mfcc_statistics(mfcc)])
+    return vector
+
+
+class FeatureIndex:
+    """
+    k-nearest-neighbour index from feature vectors to patch parameters.
+
+    Features are z-scored over the library before building the tree; the
+    MFCC statistics, when present, are down-weighted so that, as a block,
+    they weigh as much as the scalar analyzer features.
+    """
+
+    def __init__(self, parameter_names: Sequence[str]):
+        """
+        Initialize an empty index.
+
+        Args:
+            parameter_names: Names of the stored parameters (column order)
+        """
+        self.parameter_names = list(parameter_names)
+        self.logger = logging.getLogger(__name__)
+
+        self._features: List[np.ndarray] = []
+        self._parameters: List[np.ndarray] = []
+        self._tree: Optional[cKDTree] = None
+        self.mean: Optional[np.ndarray] = None
+        self.scale: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self._features)
+
+    @property
+    def dimension(self) -> Optional[int]:
+        return len(self._features[0]) if self._features else None
+
+    def add(self, features: np.ndarray, parameters: Dict[str, float]) -> None:
+        """
+        Add a library entry.
+
+        Args:
+            features: Feature vector of the rendered patch (see feature_vector)
+            parameters: Parameters of the patch
+        """
+        features = np.asarray(features, dtype=np.float64)
+        if self._features and len(features) != self.dimension:
+            raise ValueError(f"Feature vector of size {len(features)}, index uses {self.dimension}")
+        self._features.append(features)
+        self._parameters.append(np.array([parameters.get(name, np.nan) for name in self.parameter_names],
+                                         dtype=np.float64))
+        self._tree = None
+
+    def build(self) -> None:
+        """Normalize the library and build the KD-tree."""
+        if not self._features:
+            raise RuntimeError("Feature index is empty")
+
+        matrix = np.vstack(self._features)
+        self.mean = matrix.mean(axis=0)
+        std = matrix.std(axis=0)
+        self.scale = np.where(std > 1e-12, std, 1.0)
+
+        extra = matrix.shape[1] - len(FEATURE_NAMES)
+        if extra > 0:
+            self.scale[len(FEATURE_NAMES):] *= np.sqrt(extra / len(FEATURE_NAMES))
+
+        start = time.time()
+        self._tree = cKDTree((matrix - self.mean) / self.scale)
+        self.logger.debug(f"Feature index built: {len(self)} entries in {time.time() - start:.3f}s")
+
+    def query(self, features: np.ndarray, k: int = 5) -> List[Dict[str, Any]]:
+        """
+        Find the library patches whose features are closest.
+
+        Args:
+            features: Feature vector of the target
+            k: Number of neighbours
+
+        Returns:
+            Neighbours sorted by distance: {'index', 'distance', 'parameters'}
+        """
+        if self._tree is None:
+            self.build()
+
+        features = np.asarray(features, dtype=np.float64)
+        if len(features) != self.dimension:
+            raise ValueError(f"Feature vector of size {len(features)}, index uses {self.dimension}")
+
+        k = min(k, len(self))
+        distances, indices = self._tree.query((features - self.mean) / self.scale, k=k)
+        distances, indices = np.atleast_1d(distances), np.atleast_1d(indices)
+
+        neighbours = []
+        for distance, index in zip(distances, indices):
+            values = self._parameters[index]
+            neighbours.append({
+                'index': int(index),
+                'distance': float(distance),
+                'parameters': {name: float(value) for name, value in zip(self.parameter_names, values)
+                               if not np.isnan(value)},
+            })
+        return neighbours
+
+    def warm_starts(self, features: Dict[str, Any], k: int = 3,
+                    mfcc: Optional[np.ndarray] = None) -> List[Dict[str, float]]:
+        """
+        Starting parameters for a target, closest first.
+
+        Args:
+            features: Analyzer features of the target
+            k: Number of starting points
+            mfcc: MFCC matrix of the target (when the index stores MFCC statistics)
+
+        Returns:
+            Parameter dicts
+        """
+        if self.dimension == len(FEATURE_NAMES):
+            mfcc = None
+        return [neighbour['parameters'] for neighbour in self.query(feature_vector(features, mfcc), k)]
+
+    def save(self, path: Union[str, Path]) -> None:
+        """Save the library (features and parameters) to an .npz file."""
+        np.savez(path,
+                 parameter_names=np.array(self.parameter_names),
+                 features=np.vstack(self._features),
+                 parameters=np.vstack(self._parameters))
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> 'FeatureIndex':
+        """Load a library saved with save() and build its tree."""
+        with np.load(path) as data:
+            index = cls(data['parameter_names'].tolist())
+            index._features = list(data['features'])
+            index._parameters = list(data['parameters'])
+        index.build()
+        return index
+
+
+def sample_parameter_sets(parameter_space: ParameterSpace, count: int,
+                          parameter_names: Optional[Sequence[str]] = None,
+                          seed: Optional[int] = None) -> List[Dict[str, float]]:
+    """
+    Draw parameter sets uniformly within the bounds.
+
+    Args:
+        parameter_space: Parameter space (provides bounds and defaults)
+        count: Number of parameter sets
+        parameter_names: Parameters to sample (others keep their current value)
+        seed: Random seed
+
+    Returns:
+        Parameter dicts
+    """
+    rng = np.random.default_rng(seed)
+    names = list(parameter_names or parameter_space.list_parameters())
+    base = parameter_space.get_parameter_dict()
+    parameter_sets = []
+    for _ in range(count):
+        parameters = dict(base)
+        for name in names:
+            bounds = parameter_space.get_parameter_bounds(name)
+            parameters[name] = float(rng.uniform(bounds.min_val, bounds.max_val))
+        parameter_sets.append(parameters)
+    return parameter_sets
+
+
+def build_feature_index(parameter_sets: Sequence[Dict[str, float]],
+                        render: Callable[[Dict[str, float]], np.ndarray],
+                        analyze: Callable[[np.ndarray], Dict[str, Any]],
+                        mfcc: Optional[Callable[[np.ndarray], np.ndarray]] = None) -> FeatureIndex:
+    """
+    Render and analyze a library of patches.
+
+    Args:
+        parameter_sets: Patches of the library
+        render: Function returning the audio of a patch (device or simulator)
+        analyze: Function returning analyzer features of an audio signal
+        mfcc: Optional function returning the MFCC matrix of an audio signal
+
+    Returns:
+        Built feature index
+    """
+    logger = logging.getLogger(__name__)
+    index = FeatureIndex(sorted({name for parameters in parameter_sets for name in parameters}))
+
+    start = time.time()
+    for i, parameters in enumerate(parameter_sets):
+        audio = render(parameters)
+        index.add(feature_vector(analyze(audio), mfcc(audio) if mfcc else None), parameters)
+        if (i + 1) % 100 == 0:
+            logger.info(f"  {i + 1}/{len(parameter_sets)} patches analyzed")
+
+    index.build()
+    logger.info(f"Feature index: {len(index)} patches in {time.time() - start:.1f}s")
+    return index
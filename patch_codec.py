@@ -0,0 +1,491 @@
+#!/usr/bin/env python3
+"""
+Codec de patches Magicstomp sans interface graphique
+====================================================
+
+Décode la section effet (127 octets) d'un patch en paramètres utilisateur,
+et encode des paramètres en octets, sans instancier de widget Tk.
+
+Le codec d'un type d'effet est compilé une seule fois à partir des
+métadonnées des widgets de :mod:`magicstomp_effects` (offset, longueur,
+conversion ``scaleAndAdd`` / ``logScale`` / ``freqHz`` / ``timeMs``, bornes,
+valeurs des listes), lues dans le code source sans importer Tk, et complété
+par les offsets de l'inventaire SysEx (:mod:`sysex_inventory`). Chaque paramètre dispose de
+tables précalculées dans les deux sens :
+
+* valeur brute (0-127, ou 0-16383 sur deux octets) → valeur utilisateur ;
+* valeur utilisateur → valeur brute la plus proche (bornes de décision).
+
+Le décodage et l'encodage d'une section (ou d'un lot de sections) se font
+ainsi en une seule indexation vectorisée. Les conversions reproduisent
+exactement celles de :meth:`BaseEffectWidget._convert_from_magicstomp`.
+
+Usage:
+    from patch_codec import get_effect_codec, decode_patch
+    codec = get_effect_codec(0x12)            # Chorus
+    params = codec.decode(patch['effect'])    # {'Freq.': 1.2, 'Wave': 'Sine', ...}
+    effect = codec.encode({'Freq.': 2.0}, base=patch['effect'])
+"""
+
+import ast
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from magicstomp_sysex import PATCH_COMMON_LENGTH, PATCH_EFFECT_LENGTH
+from sysex_inventory import load_inventory
+
+EFFECTS_DIR = Path(__file__).with_name("magicstomp_effects")
+
+# Valeurs par défaut de BaseEffectWidget.create_parameter_widget
+_WIDGET_DEFAULTS = {
+    'param_type': "spinbox",
+    'min_val': 0,
+    'max_val': 100,
+    'offset': None,
+    'length': 1,
+    'conversion': None,
+    'values': None,
+}
+
+_SCALE_AND_ADD = re.compile(r"scaleAndAdd\(\s*([^,]+),\s*([^)]+)\)")
+
+
+@dataclass(frozen=True)
+class ParameterSpec:
+    """Emplacement et conversion d'un paramètre dans la section effet."""
+
+    name: str
+    offset: int
+    length: int = 1
+    conversion: Optional[str] = None
+    min_val: Optional[float] = 0
+    max_val: Optional[float] = 100
+    param_type: str = "spinbox"
+    values: Optional[Tuple[str, ...]] = None
+
+    @property
+    def raw_range(self) -> int:
+        """Nombre de valeurs brutes (7 bits par octet)."""
+        return 128 ** self.length
+
+
+# ---------------------------------------------------------------------------
+# Conversions (identiques à BaseEffectWidget._convert_from_magicstomp)
+# ---------------------------------------------------------------------------
+
+
+def _log_scale(raw: np.ndarray, min_val: float, max_val: float) -> np.ndarray:
+    if min_val <= 0 or max_val <= 0 or min_val == max_val:
+        return np.full(raw.shape, float(min_val))
+    values = min_val * 10 ** ((raw / 127.0) * np.log10(max_val / min_val))
+    return np.where(raw <= 0, float(min_val), values)
+
+
+def _magicstomp_to_ms(raw: np.ndarray) -> np.ndarray:
+    return np.where(raw <= 127, raw / 2.54,
+                    np.where(raw <= 255, 50.0 + (raw - 127) / 0.28, 500.0 + (raw - 255) / 0.1))
+
+
+def convert_raw_values(spec: ParameterSpec, raw: np.ndarray) -> np.ndarray:
+    """
+    Convertit des valeurs brutes en valeurs utilisateur (bornées).
+
+    Args:
+        spec: Paramètre
+        raw: Valeurs brutes
+
+    Returns:
+        Valeurs utilisateur (float)
+    """
+    raw = np.asarray(raw, dtype=np.float64)
+    conversion = spec.conversion
+    values = raw
+
+    if conversion:
+        match = _SCALE_AND_ADD.fullmatch(conversion)
+        if match:
+            try:
+                values = raw * float(match.group(1)) + float(match.group(2))
+            except ValueError:
+                values = raw
+        elif conversion in ("logScale", "freqHz"):
+            min_val = 1.0 if spec.min_val is None else spec.min_val
+            max_val = max(min_val, 1.0) if spec.max_val is None else spec.max_val
+            values = _log_scale(raw, min_val, max_val)
+        elif conversion == "timeMs":
+            values = _magicstomp_to_ms(raw)
+
+    if spec.min_val is not None:
+        values = np.maximum(values, spec.min_val)
+    if spec.max_val is not None:
+        values = np.minimum(values, spec.max_val)
+    return values
+
+
+# ---------------------------------------------------------------------------
+# Codec d'un type d'effet
+# ---------------------------------------------------------------------------
+
+
+class EffectCodec:
+    """
+    Codec compilé d'un type d'effet.
+
+    Les paramètres sont regroupés par longueur ; pour chaque groupe, une
+    matrice ``(paramètres, valeurs brutes)`` donne la valeur utilisateur et
+    une matrice de bornes de décision donne la valeur brute la plus proche
+    d'une valeur utilisateur.
+    """
+
+    def __init__(self, effect_type: int, name: str, parameters: Sequence[ParameterSpec]):
+        """
+        Compile les tables du codec.
+
+        Args:
+            effect_type: Type d'effet (octet 1 de la section common)
+            name: Nom de l'effet
+            parameters: Paramètres de la section effet
+        """
+        self.effect_type = effect_type
+        self.name = name
+        self.parameters: List[ParameterSpec] = [
+            spec for spec in parameters if 0 <= spec.offset and spec.offset + spec.length <= PATCH_EFFECT_LENGTH
+        ]
+        self.names = [spec.name for spec in self.parameters]
+        self.offsets = np.array([spec.offset for spec in self.parameters], dtype=np.intp)
+        self.lengths = np.array([spec.length for spec in self.parameters], dtype=np.intp)
+
+        # Groupes par longueur : indices des paramètres, tables et bornes
+        self._groups: List[Tuple[int, np.ndarray, np.ndarray, np.ndarray]] = []
+        for length in sorted(set(self.lengths.tolist())):
+            indices = np.flatnonzero(self.lengths == length)
+            raw = np.arange(128 ** length)
+            tables = np.stack([convert_raw_values(self.parameters[i], raw) for i in indices])
+            # Valeur brute la plus proche : nombre de bornes (milieux) dépassées
+            boundaries = (tables[:, 1:] + tables[:, :-1]) / 2.0
+            self._groups.append((length, indices, tables, boundaries))
+
+        self._labels: Dict[int, Tuple[str, ...]] = {
+            i: spec.values for i, spec in enumerate(self.parameters) if spec.values
+        }
+        self._index: Dict[str, List[int]] = {}
+        for i, name in enumerate(self.names):
+            self._index.setdefault(name, []).append(i)
+
+    def __len__(self) -> int:
+        return len(self.parameters)
+
+    def __repr__(self) -> str:
+        return f"EffectCodec(0x{self.effect_type:02X} {self.name!r}, {len(self)} paramètres)"
+
+    # ------------------------------------------------------------------
+    # Décodage
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _as_sections(sections: Any) -> np.ndarray:
+        data = np.asarray(bytearray(sections) if isinstance(sections, (bytes, bytearray)) else sections,
+                          dtype=np.int64)
+        if data.shape[-1] < PATCH_EFFECT_LENGTH:
+            padding = [(0, 0)] * (data.ndim - 1) + [(0, PATCH_EFFECT_LENGTH - data.shape[-1])]
+            data = np.pad(data, padding)
+        return data[..., :PATCH_EFFECT_LENGTH] & 0x7F
+
+    def decode_raw(self, sections: Any) -> np.ndarray:
+        """
+        Valeurs brutes de tous les paramètres.
+
+        Args:
+            sections: Section effet (127 octets) ou lot de sections ``(N, 127)``
+
+        Returns:
+            Valeurs brutes ``(paramètres,)`` ou ``(N, paramètres)``
+        """
+        data = self._as_sections(sections)
+        raw = np.zeros(data.shape[:-1] + (len(self),), dtype=np.int64)
+        for length, indices, _, _ in self._groups:
+            value = np.zeros(data.shape[:-1] + (len(indices),), dtype=np.int64)
+            for byte in range(length):
+                value = (value << 7) | data[..., self.offsets[indices] + byte]
+            raw[..., indices] = value
+        return raw
+
+    def decode_values(self, sections: Any) -> np.ndarray:
+        """
+        Valeurs utilisateur numériques de tous les paramètres.
+
+        Les listes (combobox) donnent l'index de la valeur.
+
+        Args:
+            sections: Section effet ou lot de sections ``(N, 127)``
+
+        Returns:
+            Valeurs ``(paramètres,)`` ou ``(N, paramètres)``
+        """
+        raw = self.decode_raw(sections)
+        values = np.zeros(raw.shape, dtype=np.float64)
+        for _, indices, tables, _ in self._groups:
+            values[..., indices] = tables[np.arange(len(indices)), raw[..., indices]]
+        return values
+
+    def decode(self, section: Any) -> Dict[str, Any]:
+        """
+        Décode une section effet en paramètres utilisateur.
+
+        Args:
+            section: Section effet (127 octets)
+
+        Returns:
+            Dict nom → valeur (libellé pour les listes, entier si la valeur
+            est entière), comme ``BaseEffectWidget.apply_magicstomp_data``
+        """
+        values = self.decode_values(section)
+        params: Dict[str, Any] = {}
+        for i, value in enumerate(values.tolist()):
+            if float(value).is_integer() and not self.parameters[i].conversion:
+                value = int(value)
+            labels = self._labels.get(i)
+            if labels is not None and isinstance(value, int) and 0 <= value < len(labels):
+                value = labels[value]
+            params[self.names[i]] = value
+        return params
+
+    # ------------------------------------------------------------------
+    # Encodage
+    # ------------------------------------------------------------------
+
+    def to_raw(self, values: Any) -> np.ndarray:
+        """
+        Valeurs brutes les plus proches de valeurs utilisateur.
+
+        Args:
+            values: Valeurs ``(paramètres,)`` ou ``(N, paramètres)`` dans
+                l'ordre de :attr:`names` (index pour les listes)
+
+        Returns:
+            Valeurs brutes de même forme
+        """
+        values = np.asarray(values, dtype=np.float64)
+        raw = np.zeros(values.shape, dtype=np.int64)
+        for _, indices, _, boundaries in self._groups:
+            group_values = values[..., indices]
+            raw[..., indices] = (boundaries < group_values[..., None]).sum(axis=-1)
+        return raw
+
+    def encode_values(self, values: Any, base: Any = None) -> np.ndarray:
+        """
+        Encode des valeurs numériques de tous les paramètres.
+
+        Args:
+            values: Valeurs ``(paramètres,)`` ou ``(N, paramètres)``; NaN
+                conserve l'octet de ``base``
+            base: Section(s) effet de départ (zéros par défaut)
+
+        Returns:
+            Section(s) effet ``(127,)`` ou ``(N, 127)`` en uint8
+        """
+        values = np.asarray(values, dtype=np.float64)
+        shape = values.shape[:-1] + (PATCH_EFFECT_LENGTH,)
+        sections = np.zeros(shape, dtype=np.int64) if base is None else \
+            np.broadcast_to(self._as_sections(base), shape).copy()
+
+        raw = self.to_raw(np.nan_to_num(values))
+        keep = np.isnan(values)
+        for byte in range(int(self.lengths.max(initial=1))):
+            selected = self.lengths > byte
+            shift = 7 * (self.lengths[selected] - 1 - byte)
+            byte_values = (raw[..., selected] >> shift) & 0x7F
+            current = sections[..., self.offsets[selected] + byte]
+            sections[..., self.offsets[selected] + byte] = np.where(keep[..., selected], current, byte_values)
+        return sections.astype(np.uint8)
+
+    def value_vector(self, params: Dict[str, Any]) -> np.ndarray:
+        """
+        Vecteur de valeurs (ordre de :attr:`names`) d'un dict de paramètres.
+
+        Les paramètres absents valent NaN ; les libellés de listes sont
+        remplacés par leur index.
+        """
+        vector = np.full(len(self), np.nan)
+        for name, value in params.items():
+            for i in self._index.get(name, ()):
+                labels = self._labels.get(i)
+                if isinstance(value, str):
+                    if labels is None or value not in labels:
+                        raise ValueError(f"Valeur '{value}' inconnue pour le paramètre '{name}'")
+                    vector[i] = labels.index(value)
+                else:
+                    vector[i] = float(value)
+        return vector
+
+    def encode(self, params: Dict[str, Any], base: Any = None) -> bytes:
+        """
+        Encode des paramètres utilisateur dans une section effet.
+
+        Args:
+            params: Dict nom → valeur (libellé ou index pour les listes)
+            base: Section effet de départ ; les paramètres absents gardent
+                ses octets (zéros par défaut)
+
+        Returns:
+            Section effet (127 octets)
+        """
+        unknown = set(params) - set(self._index)
+        if unknown:
+            raise KeyError(f"Paramètres inconnus pour l'effet {self.name}: {sorted(unknown)}")
+        return bytes(self.encode_values(self.value_vector(params), base))
+
+
+# ---------------------------------------------------------------------------
+# Compilation depuis les métadonnées
+# ---------------------------------------------------------------------------
+
+
+def _literal_kwargs(call: ast.Call) -> Dict[str, Any]:
+    """Arguments de create_parameter_widget (littéraux uniquement)."""
+    kwargs = dict(_WIDGET_DEFAULTS)
+    if call.args:
+        kwargs['name'] = ast.literal_eval(call.args[0])
+    for keyword in call.keywords:
+        try:
+            kwargs[keyword.arg] = ast.literal_eval(keyword.value)
+        except ValueError:
+            continue
+    return kwargs
+
+
+def _spec_from_kwargs(kwargs: Dict[str, Any]) -> Optional[ParameterSpec]:
+    if kwargs.get('name') is None or kwargs['offset'] is None:
+        return None
+    min_val, max_val, values = kwargs['min_val'], kwargs['max_val'], kwargs['values']
+    if isinstance(min_val, list):
+        # Ancienne forme : liste de valeurs passée comme min_val
+        values, min_val, max_val = min_val, None, None
+    if kwargs['param_type'] == "combobox" and values is None:
+        values = [str(v) for v in range(int(min_val), int(max_val) + 1)]
+    return ParameterSpec(
+        name=kwargs['name'],
+        offset=int(kwargs['offset']),
+        length=max(1, int(kwargs['length'])),
+        conversion=kwargs['conversion'],
+        min_val=min_val,
+        max_val=max_val,
+        param_type=kwargs['param_type'],
+        values=tuple(str(v) for v in values) if values is not None else None,
+    )
+
+
+@lru_cache(maxsize=None)
+def _widget_parameters() -> Dict[str, Tuple[ParameterSpec, ...]]:
+    """Paramètres déclarés par chaque classe de widget (nom de classe → specs)."""
+    widgets: Dict[str, Tuple[ParameterSpec, ...]] = {}
+    for path in sorted(EFFECTS_DIR.glob("*.py")):
+        tree = ast.parse(path.read_text(encoding="utf-8"))
+        for node in tree.body:
+            if not isinstance(node, ast.ClassDef):
+                continue
+            specs = []
+            for call in ast.walk(node):
+                if isinstance(call, ast.Call) and getattr(call.func, 'attr', None) == "create_parameter_widget":
+                    spec = _spec_from_kwargs(_literal_kwargs(call))
+                    if spec is not None:
+                        specs.append(spec)
+            if specs:
+                widgets[node.name] = tuple(specs)
+    return widgets
+
+
+@lru_cache(maxsize=None)
+def _registry() -> Tuple[Dict[int, str], Dict[int, str]]:
+    """Types d'effets → classe de widget et nom, lus dans effect_registry.py."""
+    tree = ast.parse((EFFECTS_DIR / "effect_registry.py").read_text(encoding="utf-8"))
+    widget_classes: Dict[int, str] = {}
+    names: Dict[int, str] = {}
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.AnnAssign) or not isinstance(node.value, ast.Dict):
+            continue
+        target = getattr(node.target, 'id', None)
+        for key, value in zip(node.value.keys, node.value.values):
+            if target == "EFFECT_WIDGETS" and isinstance(value, ast.Name):
+                widget_classes[ast.literal_eval(key)] = value.id
+            elif target == "EFFECT_NAMES":
+                names[ast.literal_eval(key)] = ast.literal_eval(value)
+    return widget_classes, names
+
+
+@lru_cache(maxsize=None)
+def _inventory_parameters() -> Dict[int, Tuple[str, Tuple[ParameterSpec, ...]]]:
+    """Paramètres bruts de l'inventaire SysEx précompilé par type d'effet."""
+    inventory = {}
+    for effect_type, friendly_name, parameters in load_inventory().values():
+        specs = tuple(
+            ParameterSpec(name=label, offset=offset - PATCH_COMMON_LENGTH, min_val=0, max_val=127)
+            for label, offset in parameters if offset >= PATCH_COMMON_LENGTH
+        )
+        inventory[effect_type] = (friendly_name, specs)
+    return inventory
+
+
+def compile_codec(effect_type: int) -> EffectCodec:
+    """
+    Compile le codec d'un type d'effet.
+
+    Les paramètres des widgets sont complétés par les offsets de l'inventaire
+    SysEx qu'aucun widget ne couvre (valeurs brutes 0-127).
+
+    Args:
+        effect_type: Type d'effet
+
+    Returns:
+        Le codec
+    """
+    widget_classes, names = _registry()
+    specs = list(_widget_parameters().get(widget_classes.get(effect_type), ()))
+
+    inventory_name, inventory_specs = _inventory_parameters().get(effect_type, ("", ()))
+    covered = {spec.offset + byte for spec in specs for byte in range(spec.length)}
+    known = {spec.name for spec in specs}
+    specs.extend(spec for spec in inventory_specs if spec.offset not in covered and spec.name not in known)
+
+    name = names.get(effect_type) or inventory_name or f"Effect 0x{effect_type:02X}"
+    return EffectCodec(effect_type, name, specs)
+
+
+@lru_cache(maxsize=None)
+def get_effect_codec(effect_type: int) -> EffectCodec:
+    """Codec d'un type d'effet, compilé au premier appel."""
+    return compile_codec(effect_type)
+
+
+@lru_cache(maxsize=None)
+def get_widget_codec(widget_class: str) -> Optional[EffectCodec]:
+    """Codec des paramètres déclarés par une classe de widget (ou None)."""
+    specs = _widget_parameters().get(widget_class)
+    if specs is None:
+        return None
+    return EffectCodec(-1, widget_class, specs)
+
+
+def decode_patch(common: Sequence[int], effect: Sequence[int]) -> Dict[str, Any]:
+    """
+    Décode un patch complet.
+
+    Args:
+        common: Section common (32 octets)
+        effect: Section effet (127 octets)
+
+    Returns:
+        Dict avec ``effect_type``, ``effect_name`` et ``parameters``
+    """
+    effect_type = common[1] if len(common) > 1 else common[0]
+    codec = get_effect_codec(effect_type)
+    return {
+        'effect_type': effect_type,
+        'effect_name': codec.name,
+        'parameters': codec.decode(effect),
+    }
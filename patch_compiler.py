@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Compilation vectorisée de patches en SysEx
+==========================================
+
+Compile en une fois une matrice de candidats ``N × P`` (une colonne par
+paramètre JSON de :class:`MagicstompAdapter`, ex. ``"delay.time_ms"``) au
+lieu d'appeler ``json_to_syx`` patch par patch :
+
+* chaque transformation de l'adaptateur est appliquée à toute une colonne
+  (formule numpy, ou table de correspondance pour les listes comme
+  ``amp.model``) ;
+* le résultat est un tableau ``N × 159`` d'états de l'appareil
+  (:meth:`BulkPatchCompiler.compile_states`) ;
+* ou directement les dumps bulk concaténés, checksums calculés en colonne
+  (:meth:`BulkPatchCompiler.bulk_dump`), prêts pour un fichier ``.syx``,
+  la banque ou l'ordonnanceur de slots.
+
+Usage:
+    compiler = BulkPatchCompiler()
+    states = compiler.compile_states(matrix, ["amp.gain", "delay.time_ms"], base=patch)
+    Path("bank.syx").write_bytes(compiler.bulk_dump(states).tobytes())
+"""
+
+from typing import Any, Callable, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+from adapter_magicstomp import MagicstompAdapter
+from magicstomp_patch import Patch
+from magicstomp_sysex import BULK_HEADER, PATCH_COMMON_LENGTH, PATCH_EFFECT_LENGTH, PATCH_TOTAL_LENGTH, SYSEX_FOOTER
+
+
+def _to_7bit(values: np.ndarray) -> np.ndarray:
+    """Équivalent vectorisé de ``MagicstompAdapter._clamp_7bit`` (NaN conservé)."""
+    return np.clip(np.round(values), 0, 127)
+
+
+def _log_ratio(values: np.ndarray, low: float, high: float) -> np.ndarray:
+    values = np.clip(values, low, high)
+    return (np.log(values) - np.log(low)) / (np.log(high) - np.log(low))
+
+
+# Formules vectorisées des transformations numériques de l'adaptateur
+_VECTOR_TRANSFORMS: Dict[str, Callable[[np.ndarray], np.ndarray]] = {
+    '_transform_normalized': lambda v: _to_7bit(v * 127),
+    '_transform_delay_time': lambda v: _to_7bit(_log_ratio(v, 1.0, 2000.0) * 127),
+    '_transform_reverb_decay': lambda v: _to_7bit(np.clip(v, 0.0, 6.0) / 6.0 * 127),
+    '_transform_mod_rate': lambda v: _to_7bit(_log_ratio(v, 0.1, 10.0) * 127),
+}
+
+# Tailles des messages bulk d'un patch (voir build_bulk_patch_messages)
+_MARKER_LENGTH = len(BULK_HEADER) + 5 + 2
+_COMMON_LENGTH = len(BULK_HEADER) + 5 + PATCH_COMMON_LENGTH + 2
+_EFFECT_LENGTH = len(BULK_HEADER) + 5 + PATCH_EFFECT_LENGTH + 2
+BULK_PATCH_LENGTH = 2 * _MARKER_LENGTH + _COMMON_LENGTH + _EFFECT_LENGTH
+
+
+class BulkPatchCompiler:
+    """Compile des matrices de paramètres JSON en états et dumps SysEx."""
+
+    def __init__(self, adapter: Optional[MagicstompAdapter] = None):
+        """
+        Prépare les offsets et transformations de chaque paramètre.
+
+        Args:
+            adapter: Adaptateur dont les correspondances sont utilisées
+        """
+        self.adapter = adapter or MagicstompAdapter()
+        self.offsets: Dict[str, int] = {}
+        self._transforms: Dict[str, Callable[[np.ndarray], np.ndarray]] = {}
+        self._scalar: Dict[str, Callable[[Any], Optional[int]]] = {}
+
+        for (section, key), mapping in self.adapter.parameter_mappings.items():
+            column = f"{section}.{key}"
+            self.offsets[column] = self.adapter.inventory.get(mapping.effect, mapping.label).global_offset
+            self._scalar[column] = mapping.transform
+            vector = _VECTOR_TRANSFORMS.get(getattr(mapping.transform, '__name__', ''))
+            if vector is not None:
+                self._transforms[column] = vector
+
+    @property
+    def columns(self) -> List[str]:
+        """Colonnes acceptées (``"section.clé"``)."""
+        return list(self.offsets)
+
+    def transform_column(self, column: str, values: Any) -> np.ndarray:
+        """
+        Valeurs brutes (0-127) d'une colonne ; NaN / None là où le scalaire
+        ne produit rien (l'octet de base est alors conservé).
+
+        Args:
+            column: Paramètre (``"section.clé"``)
+            values: Valeurs JSON (nombres, ou libellés pour les listes)
+
+        Returns:
+            Tableau float (NaN = inchangé)
+        """
+        if column not in self.offsets:
+            raise KeyError(f"Paramètre inconnu: {column}")
+
+        values = np.asarray(values)
+        transform = self._transforms.get(column)
+        if transform is not None:
+            try:
+                numeric = values.astype(np.float64)
+            except (TypeError, ValueError):
+                numeric = None
+            if numeric is not None:
+                with np.errstate(invalid='ignore'):
+                    return transform(numeric)
+
+        # Listes (modèle d'ampli, type de reverb...) : transformation scalaire
+        # une seule fois par valeur distincte
+        table: Dict[Any, float] = {}
+        raw = np.empty(values.shape, dtype=np.float64)
+        for i, value in enumerate(values.tolist()):
+            if value not in table:
+                result = self._scalar[column](value)
+                table[value] = np.nan if result is None else float(result)
+            raw[i] = table[value]
+        return raw
+
+    def compile_states(self, matrix: Any, columns: Sequence[str],
+                       base: Union[Patch, Sequence[int], np.ndarray, None] = None) -> np.ndarray:
+        """
+        États de l'appareil pour N candidats.
+
+        Contrairement à ``json_to_syx``, aucun bloc n'est désactivé : chaque
+        colonne est écrite pour chaque ligne (NaN laisse l'octet de base).
+
+        Args:
+            matrix: Valeurs ``N × P`` (tableau numérique, ou objet pour des libellés)
+            columns: Nom des P colonnes
+            base: Patch de départ commun (159 octets, ou ``N × 159``)
+
+        Returns:
+            Tableau uint8 ``N × 159``
+        """
+        matrix = np.asarray(matrix)
+        if matrix.ndim != 2 or matrix.shape[1] != len(columns):
+            raise ValueError(f"Matrice {matrix.shape} incompatible avec {len(columns)} colonne(s)")
+
+        if base is None:
+            base = np.zeros(PATCH_TOTAL_LENGTH, dtype=np.uint8)
+        elif isinstance(base, Patch):
+            base = base.array
+        states = np.array(np.broadcast_to(np.asarray(base, dtype=np.uint8), (len(matrix), PATCH_TOTAL_LENGTH)))
+
+        for j, column in enumerate(columns):
+            raw = self.transform_column(column, matrix[:, j])
+            keep = np.isnan(raw)
+            offset = self.offsets[column]
+            states[:, offset] = np.where(keep, states[:, offset], np.nan_to_num(raw)).astype(np.uint8)
+        return states
+
+    def compile_patches(self, matrix: Any, columns: Sequence[str],
+                        base: Union[Patch, Sequence[int], None] = None) -> List[Patch]:
+        """Comme :meth:`compile_states`, en objets :class:`Patch`."""
+        return [Patch(row) for row in self.compile_states(matrix, columns, base)]
+
+    @staticmethod
+    def bulk_dump(states: np.ndarray, patch_indices: Optional[Sequence[int]] = None,
+                  edit_buffer: bool = False) -> np.ndarray:
+        """
+        Messages bulk de N patches, identiques à ``build_bulk_patch_messages``.
+
+        Args:
+            states: Tableau ``N × 159``
+            patch_indices: Slot de chaque patch (0, 1, 2... par défaut)
+            edit_buffer: Écrire dans la zone d'édition au lieu du slot
+
+        Returns:
+            Tableau uint8 ``N × BULK_PATCH_LENGTH`` ; ``.tobytes()`` donne le
+            contenu d'un fichier ``.syx``
+        """
+        states = np.asarray(states, dtype=np.uint8) & 0x7F
+        count = len(states)
+        if states.ndim != 2 or states.shape[1] != PATCH_TOTAL_LENGTH:
+            raise ValueError(f"États {states.shape}, attendu N × {PATCH_TOTAL_LENGTH}")
+        indices = (np.arange(count) if patch_indices is None else np.asarray(patch_indices)) & 0x7F
+        start_cmd, end_cmd = (0x03, 0x13) if edit_buffer else (0x01, 0x11)
+
+        out = np.empty((count, BULK_PATCH_LENGTH), dtype=np.uint8)
+        position = 0
+
+        def write(body_prefix: np.ndarray, payload: Optional[np.ndarray] = None) -> None:
+            nonlocal position
+            width = body_prefix.shape[1] + (payload.shape[1] if payload is not None else 0)
+            end = position + len(BULK_HEADER) + width
+            out[:, position:position + len(BULK_HEADER)] = BULK_HEADER
+            body = out[:, position + len(BULK_HEADER):end]
+            body[:, :body_prefix.shape[1]] = body_prefix
+            if payload is not None:
+                body[:, body_prefix.shape[1]:] = payload
+            out[:, end] = (-body.sum(axis=1, dtype=np.int64)) & 0x7F
+            out[:, end + 1] = SYSEX_FOOTER
+            position = end + 2
+
+        def prefix(*columns: Any) -> np.ndarray:
+            return np.column_stack(np.broadcast_arrays(*columns))
+
+        write(prefix(0x00, 0x00, 0x30, start_cmd, indices))
+        write(prefix(0x00, PATCH_COMMON_LENGTH, 0x20, 0x00, np.zeros(count)), states[:, :PATCH_COMMON_LENGTH])
+        write(prefix(0x00, PATCH_EFFECT_LENGTH, 0x20, 0x01, np.zeros(count)), states[:, PATCH_COMMON_LENGTH:])
+        write(prefix(0x00, 0x00, 0x30, end_cmd, indices))
+        return out
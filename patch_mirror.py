@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Miroir local de la banque Magicstomp
+====================================
+
+Conserve sur disque une copie des patches utilisateur (U01-U99) téléchargés
+depuis le Magicstomp afin que l'interface puisse les parcourir sans refaire
+un aller-retour MIDI par slot.
+
+Le miroir est un répertoire contenant :
+
+* ``index.json`` : slot → checksum du contenu, nom, type d'effet, état, et
+  le port MIDI de l'appareil synchronisé ;
+* ``patches/<checksum>.bin`` : les 159 octets (common + effect) du patch.
+
+Les données sont adressées par leur contenu : un slot dont le checksum ne
+change pas n'est pas réécrit, et deux slots identiques partagent le même
+fichier.
+
+Usage:
+    from patch_mirror import PatchMirror
+    mirror = PatchMirror()
+    rt.sync_bank(mirror)          # voir RealtimeMagicstomp.sync_bank
+    patch = mirror.load(4)        # {'patch_index', 'common', 'effect'}
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from magicstomp_sysex import (
+    NUM_USER_PATCHES,
+    PATCH_COMMON_LENGTH,
+    PATCH_EFFECT_LENGTH,
+)
+from patch_codec import decode_patch
+
+DEFAULT_MIRROR_DIR = Path(__file__).with_name("patch_mirror")
+
+
+class PatchMirror:
+    """Copie disque de la banque utilisateur, indexée par slot et checksum."""
+
+    INDEX_VERSION = 1
+
+    def __init__(self, directory: Optional[Path] = None):
+        """
+        Ouvre (ou crée) un miroir.
+
+        Args:
+            directory: Répertoire du miroir (par défaut ``patch_mirror/``
+                à côté de ce module)
+        """
+        self.directory = Path(directory) if directory is not None else DEFAULT_MIRROR_DIR
+        self.patches_dir = self.directory / "patches"
+        self.index_path = self.directory / "index.json"
+        self.patches_dir.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._slots: Dict[int, Dict[str, Any]] = {}
+        self._device: Optional[str] = None
+        self._dirty = False
+        self._load_index()
+
+    # ------------------------------------------------------------------
+    # Index
+    # ------------------------------------------------------------------
+
+    def _load_index(self) -> None:
+        if not self.index_path.exists():
+            return
+        try:
+            with self.index_path.open(encoding="utf-8") as handle:
+                data = json.load(handle)
+        except (OSError, ValueError) as exc:
+            print(f"⚠️ Index du miroir illisible, reconstruction: {exc}")
+            return
+
+        if data.get("version") != self.INDEX_VERSION:
+            return
+        self._slots = {int(slot): entry for slot, entry in data.get("slots", {}).items()}
+        self._device = data.get("device")
+
+    def _save_index(self) -> None:
+        data = {
+            "version": self.INDEX_VERSION,
+            "device": self._device,
+            "slots": {str(slot): entry for slot, entry in sorted(self._slots.items())},
+        }
+        tmp_path = self.index_path.with_suffix(".tmp")
+        with tmp_path.open("w", encoding="utf-8") as handle:
+            json.dump(data, handle, indent=2)
+        os.replace(tmp_path, self.index_path)
+        self._dirty = False
+
+    def flush(self) -> None:
+        """Écrit l'index s'il reste des modifications différées (``store(save=False)``)."""
+        with self._lock:
+            if self._dirty:
+                self._save_index()
+
+    # ------------------------------------------------------------------
+    # Accès
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def content_checksum(common: Sequence[int], effect: Sequence[int]) -> str:
+        """Checksum (SHA-1) des 159 octets du patch."""
+        return hashlib.sha1(bytes(common) + bytes(effect)).hexdigest()
+
+    @staticmethod
+    def _extract_name(common: Sequence[int]) -> str:
+        name_bytes = common[16:28]
+        return ''.join(chr(b) for b in name_bytes if 32 <= b <= 126).strip()
+
+    def slots(self) -> List[int]:
+        """Liste triée des slots présents dans le miroir."""
+        with self._lock:
+            return sorted(self._slots)
+
+    def entry(self, slot: int) -> Optional[Dict[str, Any]]:
+        """Métadonnées d'un slot (checksum, nom, type d'effet...)."""
+        with self._lock:
+            entry = self._slots.get(slot)
+            return dict(entry) if entry else None
+
+    def needs_refresh(self, slot: int) -> bool:
+        """True si le slot est absent, invalidé ou son fichier manquant."""
+        with self._lock:
+            entry = self._slots.get(slot)
+        if entry is None or entry.get("stale", False):
+            return True
+        return not (self.patches_dir / f"{entry['checksum']}.bin").exists()
+
+    def stale_slots(self, slots: Optional[Sequence[int]] = None) -> List[int]:
+        """Slots à (re)télécharger parmi *slots* (toute la banque par défaut)."""
+        if slots is None:
+            slots = range(NUM_USER_PATCHES)
+        return [slot for slot in slots if self.needs_refresh(slot)]
+
+    def mark_stale(self, slot: int) -> None:
+        """Invalide un slot, par exemple après une écriture vers le device."""
+        with self._lock:
+            if slot in self._slots:
+                self._slots[slot]["stale"] = True
+                self._save_index()
+
+    def bind_device(self, device: Optional[str]) -> bool:
+        """
+        Associe le miroir au port MIDI de l'appareil synchronisé.
+
+        Un miroir rempli depuis un autre appareil ne décrit pas sa banque :
+        tous les slots sont alors invalidés.
+
+        Args:
+            device: Nom du port MIDI (None si inconnu, sans effet)
+
+        Returns:
+            True si l'appareil a changé et la banque a été invalidée
+        """
+        if device is None:
+            return False
+        with self._lock:
+            if self._device == device:
+                return False
+            changed = self._device is not None
+            if changed:
+                for entry in self._slots.values():
+                    entry["stale"] = True
+            self._device = device
+            self._save_index()
+        return changed
+
+    def store(self, slot: int, common: Sequence[int], effect: Sequence[int],
+              save: bool = True) -> bool:
+        """
+        Enregistre le contenu d'un slot.
+
+        Args:
+            slot: Index du patch (0 = U01)
+            common: Section common (32 octets)
+            effect: Section effet (127 octets)
+            save: Réécrit l'index immédiatement ; False pour une série
+                d'écritures terminée par :meth:`flush`
+
+        Returns:
+            True si le contenu du slot a changé
+        """
+        if len(common) != PATCH_COMMON_LENGTH or len(effect) != PATCH_EFFECT_LENGTH:
+            raise ValueError(
+                f"Patch invalide pour le slot {slot}: "
+                f"{len(common)}+{len(effect)} octets"
+            )
+
+        checksum = self.content_checksum(common, effect)
+        blob_path = self.patches_dir / f"{checksum}.bin"
+        if not blob_path.exists():
+            tmp_path = blob_path.with_suffix(".tmp")
+            tmp_path.write_bytes(bytes(common) + bytes(effect))
+            os.replace(tmp_path, blob_path)
+
+        with self._lock:
+            previous = self._slots.get(slot)
+            changed = previous is None or previous.get("checksum") != checksum
+            self._slots[slot] = {
+                "checksum": checksum,
+                "name": self._extract_name(common),
+                "effect_type": common[1],
+                "updated": time.time(),
+                "stale": False,
+            }
+            if save:
+                self._save_index()
+            else:
+                self._dirty = True
+        return changed
+
+    def load(self, slot: int) -> Optional[Dict[str, Any]]:
+        """
+        Lit un slot depuis le miroir.
+
+        Returns:
+            Dict au format de :meth:`RealtimeMagicstomp.request_patch`
+            (``patch_index``, ``common``, ``effect``) ou None
+        """
+        with self._lock:
+            entry = self._slots.get(slot)
+        if entry is None:
+            return None
+
+        blob_path = self.patches_dir / f"{entry['checksum']}.bin"
+        try:
+            data = blob_path.read_bytes()
+        except OSError:
+            return None
+
+        return {
+            'patch_index': slot,
+            'common': list(data[:PATCH_COMMON_LENGTH]),
+            'effect': list(data[PATCH_COMMON_LENGTH:]),
+            'stale': entry.get("stale", False),
+        }
+
+    def decode(self, slot: int) -> Optional[Dict[str, Any]]:
+        """
+        Paramètres d'un slot du miroir, décodés sans interface graphique.
+
+        Returns:
+            Dict de :func:`patch_codec.decode_patch` (``effect_type``,
+            ``effect_name``, ``parameters``) ou None
+        """
+        patch = self.load(slot)
+        if patch is None:
+            return None
+        return decode_patch(patch['common'], patch['effect'])
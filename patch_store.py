@@ -0,0 +1,398 @@
+#!/usr/bin/env python3
+"""
+Magasin compact de patches Magicstomp
+=====================================
+
+Ingestion en masse des banques de presets (fichiers ``.ini`` de
+MagicstompFrenzy, littéraux Qt ``@ByteArray(...)``) et des dumps ``.syx``
+dans un magasin colonnaire lisible par memory map.
+
+Le magasin est un répertoire contenant :
+
+* ``patches.npy`` : tableau uint8 ``N × 159`` (common + effect) ;
+* ``names.npy`` / ``hashes.npy`` : nom (12 octets) et SHA-1 de chaque patch ;
+* ``type_order.npy`` / ``type_offsets.npy`` : lignes triées par type d'effet
+  (octet 1 de la section common) et bornes de chaque type, soit une
+  recherche O(1) par type ;
+* ``name_order.npy`` / ``hash_order.npy`` : tris pour les recherches par nom
+  et par contenu, et ``sorted_names.npy`` / ``sorted_hashes.npy`` : noms et
+  hashes dans cet ordre (recherche dichotomique sans copie) ;
+* ``sources.npy`` / ``slots.npy`` et ``meta.json`` : origine de chaque patch.
+
+Tous les tableaux sont ouverts en memory map : l'ouverture d'un magasin de
+100k patches ne lit que les en-têtes. Les patches identiques (même contenu)
+ne sont stockés qu'une fois.
+
+Usage:
+    from patch_store import PatchStore, ingest_files
+    store = ingest_files(["magicstompfrenzy-master/guitarpresets.ini"], "out/patch_store")
+    rows = store.by_effect_type(0x0D)           # Mono Delay
+    patch = store.patch(rows[0])                # {'common', 'effect', 'name', ...}
+"""
+
+import hashlib
+import json
+import os
+import re
+import string
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from magicstomp_sysex import (
+    PATCH_COMMON_LENGTH,
+    PATCH_EFFECT_LENGTH,
+    PATCH_TOTAL_LENGTH,
+    parse_bulk_message,
+)
+
+DEFAULT_STORE_DIR = Path(__file__).with_name("out") / "patch_store"
+
+NAME_OFFSET = 16
+NAME_LENGTH = 12
+NUM_EFFECT_TYPES = 128
+
+_INI_ENTRY = re.compile(r'^\s*([^=;\[]+?)\s*=\s*(.*?)\s*$')
+_QT_ESCAPES = {
+    'a': 0x07, 'b': 0x08, 'f': 0x0C, 'n': 0x0A, 'r': 0x0D, 't': 0x09, 'v': 0x0B,
+    '"': 0x22, "'": 0x27, '?': 0x3F, '\\': 0x5C,
+}
+
+PatchSource = Tuple[str, int, bytes]
+"""(fichier d'origine, slot ou -1, 159 octets)"""
+
+
+# ---------------------------------------------------------------------------
+# Lecture des banques
+# ---------------------------------------------------------------------------
+
+
+def unescape_qt_bytearray(text: str) -> bytes:
+    """
+    Décode le contenu d'un littéral ``@ByteArray(...)`` de QSettings.
+
+    Reprend les règles de ``QSettings`` : échappements C, ``\\x`` suivi
+    d'autant de chiffres hexadécimaux que possible, octal après ``\\0-7``.
+    """
+    out = bytearray()
+    i, end = 0, len(text)
+    while i < end:
+        char = text[i]
+        if char != '\\' or i + 1 >= end:
+            out.append(ord(char) & 0xFF)
+            i += 1
+            continue
+
+        char = text[i + 1]
+        if char == 'x':
+            j = i + 2
+            while j < end and text[j] in string.hexdigits:
+                j += 1
+            out.append(int(text[i + 2:j] or '0', 16) & 0xFF)
+            i = j
+        elif char in string.octdigits:
+            j = i + 1
+            while j < end and text[j] in string.octdigits:
+                j += 1
+            out.append(int(text[i + 1:j], 8) & 0xFF)
+            i = j
+        else:
+            out.append(_QT_ESCAPES.get(char, ord(char) & 0xFF))
+            i += 2
+    return bytes(out)
+
+
+def read_ini_bank(path: Union[str, Path]) -> List[PatchSource]:
+    """
+    Lit une banque ``.ini`` de MagicstompFrenzy (``PatchdataNN=@ByteArray(...)``).
+
+    Args:
+        path: Fichier ``.ini``
+
+    Returns:
+        Patches de 159 octets avec leur slot (0 = U01)
+    """
+    path = Path(path)
+    patches: List[PatchSource] = []
+    with open(path, encoding='latin-1') as handle:
+        for line in handle:
+            match = _INI_ENTRY.match(line)
+            if not match:
+                continue
+            key, value = match.groups()
+            if len(value) >= 2 and value[0] == '"' and value[-1] == '"':
+                value = value[1:-1]
+            if not (value.startswith('@ByteArray(') and value.endswith(')')):
+                continue
+
+            data = unescape_qt_bytearray(value[len('@ByteArray('):-1])
+            if len(data) != PATCH_TOTAL_LENGTH:
+                continue
+            digits = re.search(r'(\d+)$', key)
+            slot = int(digits.group(1)) - 1 if digits else -1
+            patches.append((str(path), slot, data))
+    return patches
+
+
+def read_syx_dump(path: Union[str, Path]) -> List[PatchSource]:
+    """
+    Lit un dump ``.syx`` (messages bulk du Magicstomp).
+
+    Chaque patch est une section common suivie d'une section effet, entre
+    les marqueurs de début et de fin facultatifs ; les messages au checksum
+    invalide sont ignorés.
+
+    Args:
+        path: Fichier ``.syx``
+
+    Returns:
+        Patches de 159 octets avec leur slot (-1 si inconnu)
+    """
+    path = Path(path)
+    raw = path.read_bytes()
+    patches: List[PatchSource] = []
+    slot, common = -1, None
+
+    start = raw.find(0xF0)
+    while start != -1:
+        stop = raw.find(0xF7, start + 1)
+        if stop == -1:
+            break
+        parsed = parse_bulk_message(list(raw[start + 1:stop]))
+        start = raw.find(0xF0, stop + 1)
+        if parsed is None:
+            continue
+
+        kind, value = parsed
+        if kind == 'start':
+            slot, common = value, None
+        elif kind == 'common':
+            common = value
+        elif kind == 'effect' and common is not None:
+            patches.append((str(path), slot, bytes(common) + bytes(value)))
+            common = None
+        elif kind == 'end':
+            slot = -1
+    return patches
+
+
+def read_bank(path: Union[str, Path]) -> List[PatchSource]:
+    """Lit une banque selon son extension (``.ini`` ou ``.syx``)."""
+    suffix = Path(path).suffix.lower()
+    if suffix == '.ini':
+        return read_ini_bank(path)
+    if suffix == '.syx':
+        return read_syx_dump(path)
+    raise ValueError(f"Format de banque non supporté: {path}")
+
+
+# ---------------------------------------------------------------------------
+# Magasin
+# ---------------------------------------------------------------------------
+
+
+class PatchStore:
+    """Patches en colonnes (memory map) indexés par type, nom et contenu."""
+
+    FORMAT_VERSION = 1
+
+    def __init__(self, directory: Union[str, Path] = DEFAULT_STORE_DIR):
+        """
+        Ouvre un magasin existant.
+
+        Args:
+            directory: Répertoire du magasin
+        """
+        self.directory = Path(directory)
+        with open(self.directory / "meta.json", encoding="utf-8") as handle:
+            self.meta: Dict[str, Any] = json.load(handle)
+
+        def load(name: str) -> np.ndarray:
+            return np.load(self.directory / f"{name}.npy", mmap_mode='r')
+
+        self.data = load("patches")
+        self.names = load("names")
+        self.hashes = load("hashes")
+        self.source_ids = load("sources")
+        self.slots = load("slots")
+        self._type_order = load("type_order")
+        self._type_offsets = load("type_offsets")
+        self._name_order = load("name_order")
+        self._hash_order = load("hash_order")
+        # Magasins antérieurs aux colonnes triées : tri fait une fois ici
+        if (self.directory / "sorted_names.npy").exists():
+            self._sorted_names = load("sorted_names")
+            self._sorted_hashes = load("sorted_hashes")
+        else:
+            self._sorted_names = self.names[self._name_order]
+            self._sorted_hashes = self.hashes[self._hash_order]
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    @property
+    def sources(self) -> List[str]:
+        return self.meta['sources']
+
+    @property
+    def effect_types(self) -> np.ndarray:
+        """Type d'effet de chaque patch (octet 1 de la section common)."""
+        return self.data[:, 1]
+
+    # ------------------------------------------------------------------
+    # Recherches
+    # ------------------------------------------------------------------
+
+    def by_effect_type(self, effect_type: int) -> np.ndarray:
+        """Lignes des patches d'un type d'effet (vue, sans parcours)."""
+        if not 0 <= effect_type < NUM_EFFECT_TYPES:
+            return self._type_order[:0]
+        return self._type_order[self._type_offsets[effect_type]:self._type_offsets[effect_type + 1]]
+
+    def effect_type_counts(self) -> Dict[int, int]:
+        """Nombre de patches par type d'effet présent."""
+        counts = np.diff(self._type_offsets)
+        return {int(t): int(counts[t]) for t in np.flatnonzero(counts)}
+
+    def by_name(self, name: str) -> np.ndarray:
+        """Lignes des patches portant un nom (espaces de fin ignorés)."""
+        key = np.array(name.encode('latin-1')[:NAME_LENGTH].rstrip(), dtype=self.names.dtype)
+        left = np.searchsorted(self._sorted_names, key, side='left')
+        right = np.searchsorted(self._sorted_names, key, side='right')
+        return self._name_order[left:right]
+
+    def find(self, data: Sequence[int]) -> Optional[int]:
+        """Ligne d'un patch de contenu identique (ou None)."""
+        key = np.array(content_hash(data), dtype=self.hashes.dtype)
+        position = int(np.searchsorted(self._sorted_hashes, key))
+        if position < len(self) and self._sorted_hashes[position] == key:
+            return int(self._hash_order[position])
+        return None
+
+    def patch(self, row: int) -> Dict[str, Any]:
+        """Patch d'une ligne, au format de :meth:`RealtimeMagicstomp.request_patch`."""
+        data = self.data[row]
+        return {
+            'patch_index': int(self.slots[row]),
+            'common': data[:PATCH_COMMON_LENGTH].tolist(),
+            'effect': data[PATCH_COMMON_LENGTH:].tolist(),
+            'name': self.names[row].decode('latin-1'),
+            'effect_type': int(data[1]),
+            'source': self.sources[self.source_ids[row]],
+        }
+
+    # ------------------------------------------------------------------
+    # Écriture
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def build(cls, directory: Union[str, Path], patches: Iterable[PatchSource]) -> 'PatchStore':
+        """
+        Écrit un magasin à partir de patches (les doublons sont ignorés).
+
+        Args:
+            directory: Répertoire du magasin (remplacé)
+            patches: (fichier d'origine, slot, 159 octets)
+
+        Returns:
+            Le magasin ouvert
+        """
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+
+        rows: List[bytes] = []
+        hashes: List[bytes] = []
+        seen = set()
+        sources: Dict[str, int] = {}
+        source_ids: List[int] = []
+        slots: List[int] = []
+        for source, slot, data in patches:
+            data = bytes(b & 0x7F for b in data)
+            digest = content_hash(data)
+            if len(data) != PATCH_TOTAL_LENGTH or digest in seen:
+                continue
+            seen.add(digest)
+            rows.append(data)
+            hashes.append(digest)
+            source_ids.append(sources.setdefault(source, len(sources)))
+            slots.append(slot)
+
+        data = np.frombuffer(b''.join(rows), dtype=np.uint8).reshape(len(rows), PATCH_TOTAL_LENGTH)
+        names = np.array([row[NAME_OFFSET:NAME_OFFSET + NAME_LENGTH].rstrip() for row in rows],
+                         dtype=f'S{NAME_LENGTH}')
+        hash_array = np.array(hashes, dtype='S20')
+
+        effect_types = data[:, 1]
+        type_order = np.argsort(effect_types, kind='stable').astype(np.int64)
+        type_offsets = np.searchsorted(effect_types[type_order], np.arange(NUM_EFFECT_TYPES + 1)).astype(np.int64)
+        name_order = np.argsort(names, kind='stable').astype(np.int64)
+        hash_order = np.argsort(hash_array, kind='stable').astype(np.int64)
+
+        arrays = {
+            'patches': data,
+            'names': names,
+            'hashes': hash_array,
+            'sources': np.array(source_ids, dtype=np.uint32),
+            'slots': np.array(slots, dtype=np.int16),
+            'type_order': type_order,
+            'type_offsets': type_offsets,
+            'name_order': name_order,
+            'hash_order': hash_order,
+            'sorted_names': names[name_order],
+            'sorted_hashes': hash_array[hash_order],
+        }
+        # Remplacement atomique : les memory maps d'un magasin déjà ouvert restent valides
+        for name, array in arrays.items():
+            tmp_path = directory / f"{name}.npy.tmp"
+            with open(tmp_path, 'wb') as handle:
+                np.save(handle, array)
+            os.replace(tmp_path, directory / f"{name}.npy")
+
+        meta = {
+            'version': cls.FORMAT_VERSION,
+            'count': len(rows),
+            'sources': list(sources),
+        }
+        tmp_path = directory / "meta.json.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as handle:
+            json.dump(meta, handle, indent=2)
+        os.replace(tmp_path, directory / "meta.json")
+        return cls(directory)
+
+    def iter_patches(self) -> Iterable[PatchSource]:
+        """Patches du magasin sous la forme acceptée par :meth:`build`."""
+        for row in range(len(self)):
+            yield self.sources[self.source_ids[row]], int(self.slots[row]), self.data[row].tobytes()
+
+
+def content_hash(data: Sequence[int]) -> bytes:
+    """SHA-1 (20 octets) des 159 octets d'un patch."""
+    return hashlib.sha1(bytes(int(b) & 0x7F for b in data)).digest()
+
+
+def ingest_files(paths: Iterable[Union[str, Path]],
+                 directory: Union[str, Path] = DEFAULT_STORE_DIR) -> PatchStore:
+    """
+    Ajoute des banques ``.ini`` / ``.syx`` à un magasin (créé si absent).
+
+    Args:
+        paths: Fichiers de banques ou répertoires (parcourus récursivement)
+        directory: Répertoire du magasin
+
+    Returns:
+        Le magasin mis à jour
+    """
+    directory = Path(directory)
+    patches: List[PatchSource] = []
+    if (directory / "meta.json").exists():
+        patches.extend(PatchStore(directory).iter_patches())
+
+    for path in paths:
+        path = Path(path)
+        files = sorted(p for p in path.rglob('*') if p.suffix.lower() in ('.ini', '.syx')) \
+            if path.is_dir() else [path]
+        for file in files:
+            patches.extend(read_bank(file))
+
+    return PatchStore.build(directory, patches)
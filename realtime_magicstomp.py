@@ -14,11 +14,13 @@ Usage:
 
 import mido
 import time
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Callable, Dict, Any, List, Optional, Tuple
 from collections import deque
 import threading
 import queue
-from datetime import datetime
+import logging
+
+from debug_logger import debug_logger
 
 from magicstomp_sysex import (
     PATCH_COMMON_LENGTH as SYSEX_PATCH_COMMON_LENGTH,
@@ -27,8 +29,12 @@ from magicstomp_sysex import (
     SYSEX_HEADER,
     SYSEX_FOOTER,
     PARAMETER_SEND_CMD,
+    NUM_USER_PATCHES,
+    build_bulk_patch_messages,
+    build_dump_request,
     build_parameter_message,
     calculate_checksum,
+    parse_bulk_message,
 )
 
 
@@ -43,10 +49,12 @@ class RealtimeMagicstomp:
     
     @staticmethod
     def _log_midi_traffic(direction: str, data: List[int], message_type: str = "SYSEX"):
-        """Log MIDI traffic in the format: [timestamp] SYSEX OUT/IN len=X data..."""
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        data_hex = ' '.join(f'{b:02X}' for b in data)
-        print(f"[{timestamp}] {message_type} {direction} len={len(data)}  {data_hex}")
+        """Log MIDI traffic in the format: [timestamp] SYSEX OUT/IN len=X data...
+
+        Délégué au logger asynchrone (catégorie ``midi.<type>.<direction>``) :
+        le formatage hexadécimal est fait hors du thread d'envoi.
+        """
+        debug_logger.log_traffic(direction, data, message_type)
 
     # Structure des patches (re-export depuis magicstomp_sysex pour compatibilité)
     PATCH_COMMON_LENGTH = SYSEX_PATCH_COMMON_LENGTH
@@ -88,6 +96,10 @@ class RealtimeMagicstomp:
         # Cache des paramètres actuels pour éviter les doublons
         self.parameter_cache = {}
         self.cache_lock = threading.Lock()
+
+        # Miroir de la banque invalidé par les écritures de slots
+        # (renseigné par sync_bank, ou directement)
+        self.mirror = None
         
         if auto_detect:
             self._initialize_midi()
@@ -330,6 +342,56 @@ class RealtimeMagicstomp:
         for offset, value in parameters.items():
             self.tweak_parameter(offset, value, immediate)
 
+    def wait_until_sent(self, timeout: float = 1.0) -> bool:
+        """
+        Attend que la queue de paramètres soit entièrement envoyée.
+
+        Args:
+            timeout: Attente maximale en secondes
+
+        Returns:
+            True si tous les messages en attente ont été envoyés
+        """
+        deadline = time.time() + timeout
+        while self.parameter_queue.unfinished_tasks:
+            if time.time() >= deadline:
+                return False
+            time.sleep(0.002)
+        return True
+
+    def _ensure_input_port(self) -> None:
+        """Ouvre le port MIDI d'entrée si nécessaire (réponses aux dumps)."""
+        if self.input_port is not None:
+            return
+
+        # Essayer d'ouvrir un port d'entrée
+        # D'abord essayer avec le même nom que le port de sortie
+        try:
+            self.input_port = mido.open_input(self.midi_port_name)
+            print(f"✅ Port MIDI d'entrée ouvert: {self.midi_port_name}")
+        except Exception:
+            # Si ça ne marche pas, essayer de trouver un port d'entrée correspondant
+            try:
+                input_ports = mido.get_input_names()
+                # Chercher un port d'entrée qui correspond au port de sortie
+                input_port_name = None
+                for port in input_ports:
+                    if 'ub9' in port.lower() or 'magicstomp' in port.lower():
+                        input_port_name = port
+                        break
+                
+                if input_port_name:
+                    self.input_port = mido.open_input(input_port_name)
+                    print(f"✅ Port MIDI d'entrée ouvert: {input_port_name}")
+                else:
+                    print("⚠️ Aucun port MIDI d'entrée Magicstomp trouvé")
+                    # Continuer sans port d'entrée
+                    self.input_port = None
+            except Exception as exc:
+                print(f"❌ Erreur ouverture port MIDI d'entrée: {exc}")
+                # Continuer sans port d'entrée
+                self.input_port = None
+
     def request_patch(self, patch_index: int = 0, timeout: float = 2.0) -> Optional[Dict[str, Any]]:
         """Demande au Magicstomp d'envoyer le patch courant."""
 
@@ -340,34 +402,7 @@ class RealtimeMagicstomp:
             print("❌ Aucun port MIDI de sortie disponible pour la requête de patch")
             return None
 
-        if self.input_port is None:
-            # Essayer d'ouvrir un port d'entrée
-            # D'abord essayer avec le même nom que le port de sortie
-            try:
-                self.input_port = mido.open_input(self.midi_port_name)
-                print(f"✅ Port MIDI d'entrée ouvert: {self.midi_port_name}")
-            except Exception:
-                # Si ça ne marche pas, essayer de trouver un port d'entrée correspondant
-                try:
-                    input_ports = mido.get_input_names()
-                    # Chercher un port d'entrée qui correspond au port de sortie
-                    input_port_name = None
-                    for port in input_ports:
-                        if 'ub9' in port.lower() or 'magicstomp' in port.lower():
-                            input_port_name = port
-                            break
-                    
-                    if input_port_name:
-                        self.input_port = mido.open_input(input_port_name)
-                        print(f"✅ Port MIDI d'entrée ouvert: {input_port_name}")
-                    else:
-                        print("⚠️ Aucun port MIDI d'entrée Magicstomp trouvé")
-                        # Continuer sans port d'entrée
-                        self.input_port = None
-                except Exception as exc:
-                    print(f"❌ Erreur ouverture port MIDI d'entrée: {exc}")
-                    # Continuer sans port d'entrée
-                    self.input_port = None
+        self._ensure_input_port()
 
         if self.input_port:
             while self.input_port.poll() is not None:
@@ -411,13 +446,13 @@ class RealtimeMagicstomp:
                 if len(data) >= 12:
                     sub_command = data[10]
                     received_index = data[11]
-                    print(f"🔍 DEBUG: Received termination message: sub_command=0x{sub_command:02X}, index={received_index}")
+                    debug_logger.log(f"🔍 DEBUG: Received termination message: sub_command=0x{sub_command:02X}, index={received_index}", level=logging.DEBUG, category="midi.dump")
                     # Ne s'arrêter que si on a reçu toutes les données ET que c'est le bon message de fin
                     if sub_command == 0x11 and common_data and effect_data:
-                        print(f"🔍 DEBUG: Patch download complete - common_data: {len(common_data)} bytes, effect_data: {len(effect_data)} bytes")
+                        debug_logger.log(f"🔍 DEBUG: Patch download complete - common_data: {len(common_data)} bytes, effect_data: {len(effect_data)} bytes", level=logging.DEBUG, category="midi.dump")
                         break
                     elif sub_command == 0x01:
-                        print(f"🔍 DEBUG: Received start message, continuing...")
+                        debug_logger.log(f"🔍 DEBUG: Received start message, continuing...", level=logging.DEBUG, category="midi.dump")
                 continue
 
             if command != 0x20 or len(data) < 13:
@@ -430,20 +465,20 @@ class RealtimeMagicstomp:
             if section == 0x00 and section_offset == 0x00 and length >= self.PATCH_COMMON_LENGTH:
                 common_data = payload[: self.PATCH_COMMON_LENGTH]
                 print(f"📦 Données 'common' reçues ({len(common_data)} octets)")
-                print(f"🔍 DEBUG: Common data: {common_data[:10]}... (first 10 bytes)")
+                debug_logger.log(f"🔍 DEBUG: Common data: {common_data[:10]}... (first 10 bytes)", level=logging.DEBUG, category="midi.dump")
                 if len(common_data) > 1:
                     # L'ID de l'effet est à l'octet 1 dans la structure SYSEX du Magicstomp (comme MagicstompFrenzy)
                     effect_type = common_data[1]
-                    print(f"🔍 DEBUG: Effect type in common (offset 1): 0x{effect_type:02X} ({effect_type})")
+                    debug_logger.log(f"🔍 DEBUG: Effect type in common (offset 1): 0x{effect_type:02X} ({effect_type})", level=logging.DEBUG, category="midi.dump")
                     # Extraire le nom du patch (octets 16-27)
                     if len(common_data) > 27:
                         patch_name_bytes = common_data[16:28]
                         patch_name = ''.join(chr(b) for b in patch_name_bytes if b != 0)
-                        print(f"🔍 DEBUG: Patch name: '{patch_name}'")
+                        debug_logger.log(f"🔍 DEBUG: Patch name: '{patch_name}'", level=logging.DEBUG, category="midi.dump")
             elif section == 0x01 and section_offset == 0x00 and length >= self.PATCH_EFFECT_LENGTH:
                 effect_data = payload[: self.PATCH_EFFECT_LENGTH]
                 print(f"🎛️ Données d'effet reçues ({len(effect_data)} octets)")
-                print(f"🔍 DEBUG: Effect data: {effect_data[:20]}... (first 20 bytes)")
+                debug_logger.log(f"🔍 DEBUG: Effect data: {effect_data[:20]}... (first 20 bytes)", level=logging.DEBUG, category="midi.dump")
 
             # Ne pas s'arrêter ici - attendre le message de terminaison
             # if common_data and effect_data:
@@ -459,13 +494,222 @@ class RealtimeMagicstomp:
             'effect': effect_data,
         }
     
+    def sync_bank(
+        self,
+        mirror,
+        slots: Optional[List[int]] = None,
+        force: bool = False,
+        window: int = 4,
+        timeout: float = 2.0,
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Synchronise la banque utilisateur vers un :class:`patch_mirror.PatchMirror`.
+
+        Les requêtes de dump sont pipelinées : jusqu'à ``window`` requêtes
+        restent en vol et la suivante part dès la réception du message de fin
+        d'un patch, sans attendre de timeout. Chaque patch reçu est écrit
+        immédiatement dans le miroir.
+
+        Le Magicstomp ne sait pas renvoyer un checksum sans envoyer tout le
+        patch : seuls les slots absents ou invalidés dans le miroir sont donc
+        demandés, sauf si ``force`` est vrai (vérification complète). Les
+        slots sont invalidés par :meth:`write_patch`, et toute la banque
+        l'est si le miroir a été rempli depuis un autre port MIDI. L'index
+        du miroir est écrit une seule fois, en fin de synchronisation.
+
+        Args:
+            mirror: Miroir local à mettre à jour
+            slots: Slots à synchroniser (toute la banque par défaut)
+            force: Re-télécharge tous les slots demandés
+            window: Nombre maximum de requêtes en vol (1 = séquentiel)
+            timeout: Délai sans réponse avant d'abandonner un slot
+            progress_callback: Appelé avec (slots traités, slots demandés)
+
+        Returns:
+            Dict avec 'requested', 'changed', 'unchanged', 'failed', 'elapsed'
+        """
+        if slots is None:
+            slots = list(range(NUM_USER_PATCHES))
+        if not self.output_port:
+            self._initialize_midi()
+        self.mirror = mirror
+        if mirror.bind_device(self.midi_port_name):
+            print("⚠️ Miroir rempli depuis un autre appareil, banque entière invalidée")
+        targets = list(slots) if force else mirror.stale_slots(slots)
+
+        result: Dict[str, Any] = {
+            'requested': len(targets),
+            'changed': [],
+            'unchanged': [],
+            'failed': [],
+            'elapsed': 0.0,
+        }
+        if not targets:
+            print("✅ Miroir à jour, aucun slot à télécharger")
+            return result
+
+        self._ensure_input_port()
+        if not self.output_port or not self.input_port:
+            print("❌ Ports MIDI indisponibles pour la synchronisation de la banque")
+            result['failed'] = targets
+            return result
+
+        while self.input_port.poll() is not None:
+            pass
+
+        pending = deque(targets)
+        in_flight: deque = deque()
+        common_data: Optional[List[int]] = None
+        effect_data: Optional[List[int]] = None
+        start = time.time()
+        last_activity = start
+
+        def fill_window():
+            while pending and len(in_flight) < max(1, window):
+                index = pending.popleft()
+                request = build_dump_request(index)
+                self._log_midi_traffic("OUT", request, "SYSEX")
+                self.output_port.send(mido.Message('sysex', data=request[1:-1]))
+                in_flight.append(index)
+
+        print(f"📥 Synchronisation de {len(targets)} slot(s) (fenêtre {window})")
+        fill_window()
+
+        while in_flight:
+            msg = self.input_port.poll()
+            if msg is None:
+                if time.time() - last_activity > timeout:
+                    lost = in_flight.popleft()
+                    print(f"⚠️ Pas de réponse pour le patch {lost + 1:02d}")
+                    result['failed'].append(lost)
+                    common_data = effect_data = None
+                    last_activity = time.time()
+                    fill_window()
+                else:
+                    time.sleep(0.001)
+                continue
+
+            if msg.type != 'sysex':
+                continue
+
+            parsed = parse_bulk_message(msg.data)
+            if parsed is None:
+                continue
+            last_activity = time.time()
+
+            kind, value = parsed
+            if kind == 'start':
+                common_data = effect_data = None
+            elif kind == 'common':
+                common_data = value
+            elif kind == 'effect':
+                effect_data = value
+            elif kind == 'end':
+                if value in in_flight:
+                    in_flight.remove(value)
+                if common_data and effect_data:
+                    if mirror.store(value, common_data, effect_data, save=False):
+                        result['changed'].append(value)
+                    else:
+                        result['unchanged'].append(value)
+                else:
+                    result['failed'].append(value)
+                common_data = effect_data = None
+
+                if progress_callback:
+                    done = len(result['changed']) + len(result['unchanged']) + len(result['failed'])
+                    progress_callback(done, len(targets))
+                fill_window()
+
+        mirror.flush()
+        result['elapsed'] = time.time() - start
+        print(
+            f"✅ Banque synchronisée en {result['elapsed']:.1f}s: "
+            f"{len(result['changed'])} modifié(s), {len(result['unchanged'])} inchangé(s), "
+            f"{len(result['failed'])} échec(s)"
+        )
+        return result
+    
+    def write_patch(
+        self,
+        patch_index: int,
+        common: List[int],
+        effect: List[int],
+        interval: float = 0.07,
+    ) -> bool:
+        """
+        Écrit un patch complet dans un slot utilisateur (bulk write).
+
+        Args:
+            patch_index: Slot de destination (0 = U01)
+            common: Section common (32 octets)
+            effect: Section effet (127 octets)
+            interval: Pause entre les messages (70 ms comme MagicstompFrenzy)
+
+        Returns:
+            True si les quatre messages ont été envoyés
+        """
+        if not self.output_port:
+            print("❌ Port MIDI non initialisé")
+            return False
+
+        # Le slot ne correspond plus au miroir, même si l'écriture échoue en route
+        if self.mirror is not None:
+            self.mirror.mark_stale(patch_index)
+
+        messages = build_bulk_patch_messages(patch_index, common, effect)
+        try:
+            for i, message in enumerate(messages):
+                if i:
+                    time.sleep(interval)
+                self._log_midi_traffic("OUT", message, "SYSEX")
+                self.output_port.send(mido.Message('sysex', data=message[1:-1]))
+        except Exception as exc:  # pragma: no cover - dépend du matériel
+            print(f"❌ Erreur écriture du patch {patch_index + 1:02d}: {exc}")
+            return False
+
+        print(f"💾 Patch écrit dans U{patch_index + 1:02d}")
+        return True
+
+    def program_change(self, program: int, channel: int = 0) -> float:
+        """
+        Sélectionne un patch utilisateur par Program Change.
+
+        Le tampon d'édition du Magicstomp est remplacé : le cache des
+        paramètres envoyés est donc vidé.
+
+        Args:
+            program: Numéro de patch (0 = U01)
+            channel: Canal MIDI (0-15)
+
+        Returns:
+            Durée d'envoi du message en secondes
+        """
+        if not self.output_port:
+            print("❌ Port MIDI non initialisé")
+            return 0.0
+
+        message = mido.Message('program_change', channel=channel & 0x0F, program=program & 0x7F)
+        start = time.perf_counter()
+        self.output_port.send(message)
+        elapsed = time.perf_counter() - start
+        self._log_midi_traffic("OUT", message.bytes(), "PC")
+
+        with self.cache_lock:
+            self.parameter_cache.clear()
+
+        return elapsed
+
     def _send_message_immediate(self, message: List[int]):
         """Envoie un message immédiatement."""
         try:
             # Log the complete SYSEX message
             self._log_midi_traffic("OUT", message, "SYSEX")
             self.output_port.send(mido.Message('sysex', data=message[1:-1]))  # Exclut F0 et F7
-            print(f"📤 Paramètre envoyé: {message[8:10]} = {message[10]}")
+            if debug_logger.is_enabled("midi.param", logging.DEBUG):
+                debug_logger.log(f"📤 Paramètre envoyé: {message[8:10]} = {message[10]}",
+                                 level=logging.DEBUG, category="midi.param")
         except Exception as e:
             print(f"❌ Erreur envoi MIDI: {e}")
     
@@ -19,10 +19,21 @@ from typing import Dict, Any, List, Tuple, Optional, Callable
 from pathlib import Path
 
 from realtime_magicstomp import RealtimeMagicstomp
-from optimize.search import CoordinateSearchOptimizer, ParameterSpace, ParameterBounds
-from optimize.loss import PerceptualLoss
+from optimize.search import CoordinateSearchOptimizer, GridSearchOptimizer, ParameterSpace, ParameterBounds
+from optimize.loss import PerceptualLoss, StreamingLossAccumulator
+from optimize.early_stop import EarlyAbortPolicy
 from hil.io import AudioDeviceManager
+from hil.pipeline import PipelinedEvaluator
+from hil.probe import Probe, ProbeDesigner
+from hil.stream_capture import ContinuousCaptureSession
+from hil.settle import SettleDetector
+from hil.slot_scheduler import DeviceSlotScheduler
+from hil.capture_cache import CaptureCache, calibration_fingerprint
+from hil.impulse_response import ImpulseResponseBank, ImpulseResponseCapture, parameter_grid
+from hil.response_table import ResponseSweep, ResponseTable
 from adapter_magicstomp import MagicstompAdapter
+from magicstomp_sysex import PATCH_COMMON_LENGTH
+from patch_codec import decode_patch
 
 
 class RealtimeParameterSpace(ParameterSpace):
@@ -121,11 +132,26 @@ class RealtimeParameterSpace(ParameterSpace):
         # Envoie la modification temps réel si l'adaptateur est disponible
         if self.realtime_adapter and name in self.PARAMETER_OFFSETS:
             offset = self.PARAMETER_OFFSETS[name]
-            midi_value = int(clamped_value * 127 / (bounds.max_val - bounds.min_val))
+            midi_value = self.to_midi_value(name, clamped_value)
             self.realtime_adapter.tweak_parameter(offset, midi_value, immediate=True)
             return True
         
         return False
+    
+    def to_midi_value(self, name: str, value: float) -> int:
+        """
+        Convertit la valeur d'un paramètre en valeur MIDI (0-127).
+        
+        Args:
+            name: Nom du paramètre
+            value: Valeur dans les bornes du paramètre
+            
+        Returns:
+            Valeur 7 bits à écrire à l'offset du paramètre
+        """
+        bounds = self.parameters[name]
+        clamped_value = bounds.clamp(value)
+        return int(clamped_value * 127 / (bounds.max_val - bounds.min_val)) & 0x7F
 
 
 class RealtimeOptimizer:
@@ -139,7 +165,8 @@ class RealtimeOptimizer:
     def __init__(self, 
                  midi_port: Optional[str] = None,
                  sample_rate: int = 44100,
-                 buffer_size: int = 1024):
+                 buffer_size: int = 1024,
+                 audio_backend: Any = None):
         """
         Initialise l'optimiseur temps réel.
         
@@ -147,12 +174,20 @@ class RealtimeOptimizer:
             midi_port: Port MIDI pour le Magicstomp
             sample_rate: Fréquence d'échantillonnage audio
             buffer_size: Taille du buffer audio
+            audio_backend: Backend audio compatible sounddevice (par défaut
+                sounddevice, ou hil.loopback.LoopbackBackend sans matériel)
         """
         self.logger = logging.getLogger(__name__)
         
-        # Initialise les composants
-        self.realtime_adapter = RealtimeMagicstomp(midi_port)
-        self.audio_manager = AudioDeviceManager(sample_rate, buffer_size)
+        # Initialise les composants ; un backend simulé fournit aussi le port
+        # MIDI de son Magicstomp (sinon les candidats n'atteindraient jamais
+        # le traitement enregistré)
+        if hasattr(audio_backend, 'midi_port'):
+            self.realtime_adapter = RealtimeMagicstomp(midi_port, auto_detect=False)
+            self.realtime_adapter.output_port = audio_backend.midi_port()
+        else:
+            self.realtime_adapter = RealtimeMagicstomp(midi_port)
+        self.audio_manager = AudioDeviceManager(sample_rate, buffer_size, backend=audio_backend)
         self.parameter_space = RealtimeParameterSpace()
         self.perceptual_loss = PerceptualLoss()
         
@@ -163,6 +198,41 @@ class RealtimeOptimizer:
         self.current_patch_data = None
         self.target_audio = None
         self.di_audio = None
+        self.full_target_audio = None
+        self.full_di_audio = None
+        self.probe = None
+        
+        # Candidats résidents dans des slots du Magicstomp (optionnel)
+        self.slot_scheduler = None
+        self._active_candidate = None
+        
+        # Attente adaptative après chaque changement de paramètres
+        self.patch_type = None
+        self.settle_detector = SettleDetector(sample_rate=sample_rate)
+        
+        # Candidats capturés dont la perte est encore en cours de calcul
+        self.pipeline_depth = 2
+        
+        # Capture de tous les candidats d'un lot dans un seul flux audio
+        # (durée du silence entre deux répétitions de la sonde, None = désactivé)
+        self.continuous_capture_gap: Optional[float] = None
+        
+        # Perte calculée pendant l'enregistrement
+        self.streaming_loss = False
+        self._loss_accumulator = None
+        
+        # Arrêt anticipé des candidats sans espoir (EarlyAbortPolicy ou None)
+        self.early_abort: Optional[EarlyAbortPolicy] = None
+        
+        # Captures persistantes réutilisées d'une session à l'autre (optionnel)
+        self.capture_cache: Optional[CaptureCache] = None
+        
+        # Réponses impulsionnelles mesurées des effets linéaires (optionnel)
+        self.ir_bank: Optional[ImpulseResponseBank] = None
+        
+        # Tables de réponse des paramètres non linéaires (optionnel)
+        self.response_table: Optional[ResponseTable] = None
+        self._response_target_features = None
         
         self.logger.info("🎸 RealtimeOptimizer initialisé")
     
@@ -181,6 +251,8 @@ class RealtimeOptimizer:
                 'amp_level', 'amp_gain', 'amp_treble', 'amp_middle', 'amp_bass'
             ]
         
+        self.patch_type = patch_type
+        
         # Définit les paramètres selon le type de patch
         if patch_type == "amp_simulator":
             self._setup_amp_parameters(parameters_to_optimize)
@@ -276,8 +348,85 @@ class RealtimeOptimizer:
         """
         self.logger.info("🎵 Calibration du système audio...")
         calibration_results = self.audio_manager.calibrate_system(duration)
+        
+        # Surveille le retour pour détecter la stabilisation après chaque changement
+        try:
+            self.audio_manager.start_monitor()
+            self.settle_detector.read_monitor = self.audio_manager.read_monitor
+            calibration_results['noise_floor_db'] = self.settle_detector.measure_noise_floor()
+        except Exception as e:
+            self.settle_detector.read_monitor = None
+            self.logger.warning(f"⚠️ Monitoring d'entrée indisponible, attentes apprises utilisées: {e}")
+        
         return calibration_results
     
+    def enable_capture_cache(self, directory: str = "out/capture_cache",
+                             max_bytes: int = 512 * 1024 * 1024,
+                             capture_format: str = 'npy',
+                             base_patch: Optional[Dict[str, Any]] = None) -> CaptureCache:
+        """
+        Active le cache persistant des captures matérielles.
+        
+        Une capture est réutilisée, sans rejouer le DI, si l'état complet du
+        Magicstomp (159 octets), le contenu du DI et la calibration sont
+        identiques. L'état des candidats est construit à partir du patch de
+        base, lu sur l'appareil s'il n'est pas fourni.
+        
+        Args:
+            directory: Répertoire du cache
+            max_bytes: Taille maximale des captures stockées
+            capture_format: 'npy' (lecture par memory map) ou 'flac'
+            base_patch: Patch courant du Magicstomp (dict de request_patch)
+            
+        Returns:
+            Le cache créé
+            
+        Raises:
+            RuntimeError: Si le patch de base est indisponible (aucune
+                capture ne pourrait être associée à un état de l'appareil)
+        """
+        if base_patch is None:
+            base_patch = self.current_patch_data or self.realtime_adapter.request_patch()
+        if not base_patch:
+            raise RuntimeError("Patch de base indisponible pour le cache des captures")
+        
+        self.current_patch_data = base_patch
+        self.capture_cache = CaptureCache(directory, max_bytes=max_bytes, capture_format=capture_format)
+        self.logger.info(f"💾 Cache des captures: {directory} ({len(self.capture_cache)} entrées)")
+        return self.capture_cache
+    
+    def _capture_key(self, parameters: Dict[str, float],
+                     di_audio: Optional[np.ndarray] = None) -> Optional[str]:
+        """Clé de cache d'un candidat, None si l'état du Magicstomp est inconnu."""
+        if self.capture_cache is None or not self.current_patch_data:
+            return None
+        # Un paramètre sans offset connu rendrait l'état de l'appareil ambigu
+        if any(name not in self.parameter_space.PARAMETER_OFFSETS for name in parameters):
+            return None
+        
+        common, effect = self._candidate_patch(parameters)
+        manager = self.audio_manager
+        calibration = calibration_fingerprint(manager.sample_rate, manager.round_trip_latency,
+                                              manager.gain_compensation, manager.calibration_data)
+        di_audio = self.di_audio if di_audio is None else di_audio
+        return CaptureCache.make_key(common + effect, self.capture_cache.di_fingerprint(di_audio), calibration)
+    
+    def _store_capture(self, key: Optional[str], processed_audio: np.ndarray) -> None:
+        """Enregistre une capture complète dans le cache."""
+        if key is not None:
+            self.capture_cache.put(key, processed_audio, self.audio_manager.sample_rate)
+    
+    def _settle_key(self):
+        """Clé des statistiques d'attente : type d'effet du patch courant."""
+        if self.current_patch_data and len(self.current_patch_data.get('common', ())) > 1:
+            return self.current_patch_data['common'][1]
+        return self.patch_type
+    
+    def _wait_for_settle(self) -> float:
+        """Attend que les messages soient partis puis que la sortie soit stable."""
+        self.realtime_adapter.wait_until_sent()
+        return self.settle_detector.wait(self._settle_key())
+    
     def load_audio_files(self, target_file: str, di_file: str):
         """
         Charge les fichiers audio pour l'optimisation.
@@ -295,35 +444,443 @@ class RealtimeOptimizer:
         
         # Charge le signal DI
         self.di_audio = self.audio_manager.load_di_signal(di_file)
+        self._loss_accumulator = None
+        self.full_target_audio = self.target_audio
+        self.full_di_audio = self.di_audio
+        self.probe = None
         
         self.logger.info(f"✅ Fichiers chargés: {len(self.target_audio)} samples")
     
-    def _loss_function_realtime(self, parameters: Dict[str, float]) -> float:
+    def use_probe(self, max_duration: float = 2.0, **designer_options) -> Probe:
+        """
+        Remplace le DI et la cible par un extrait court et informatif.
+        
+        Les évaluations suivantes ne jouent plus que la sonde (transitoires,
+        palm mutes, notes tenues, silences pour les queues d'effets).
+        
+        Args:
+            max_duration: Durée maximale de la sonde en secondes
+            **designer_options: Options de :class:`ProbeDesigner`
+            
+        Returns:
+            La sonde construite
+        """
+        if self.full_di_audio is None or self.full_target_audio is None:
+            raise ValueError("Fichiers audio non chargés. Utilisez load_audio_files().")
+        
+        designer = ProbeDesigner(self.audio_manager.sample_rate, max_duration=max_duration,
+                                 **designer_options)
+        self.probe = designer.design(self.full_di_audio, self.full_target_audio)
+        self.di_audio = self.probe.di
+        self.target_audio = self.probe.target
+        self._loss_accumulator = None
+        return self.probe
+    
+    def validate_probe(self, candidates: List[Dict[str, float]]) -> Dict[str, Any]:
+        """
+        Compare sur le Magicstomp les pertes sonde / signal complet.
+        
+        Args:
+            candidates: Candidats de validation
+            
+        Returns:
+            Rapport (accélération, corrélations de rang)
+        """
+        if self.probe is None:
+            raise ValueError("Aucune sonde active. Utilisez use_probe().")
+        
+        designer = ProbeDesigner(self.audio_manager.sample_rate)
+        return designer.validate(
+            self.probe, self.full_di_audio, self.full_target_audio,
+            render=self._capture_candidate,
+            candidates=candidates,
+            loss_function=self.perceptual_loss.compute_loss
+        )
+    
+    def _loss_function_realtime(self, parameters: Dict[str, float],
+                                bound: Optional[float] = None) -> float:
         """
         Fonction de perte avec tweaking temps réel.
         
         Args:
             parameters: Dictionnaire des paramètres
+            bound: Meilleure perte connue ; avec ``early_abort``, la capture
+                est arrêtée dès que le candidat ne peut plus la battre
             
         Returns:
-            Valeur de la perte
+            Valeur de la perte (CensoredLoss si la capture a été arrêtée)
         """
+        abort_enabled = self.early_abort is not None and bound is not None and np.isfinite(bound)
+        streaming = self.streaming_loss or abort_enabled
+        
+        # Capture déjà mesurée : pas de lecture du DI
+        key = self._capture_key(parameters)
+        cached = self.capture_cache.get(key) if key is not None else None
+        if cached is not None:
+            loss = self.perceptual_loss.compute_loss(self.target_audio, cached)
+            self.logger.debug(f"Loss (cache): {loss:.6f} pour params: {parameters}")
+            return loss
+        
         # Applique les paramètres en temps réel
         for param_name, value in parameters.items():
             self.parameter_space.set_parameter_value_realtime(param_name, value)
         
-        # Attend un peu pour que les paramètres se stabilisent
-        time.sleep(0.1)
-        
-        # Joue le signal DI et enregistre la sortie
-        processed_audio = self.audio_manager.play_and_record(self.di_audio)
+        # Attend que les paramètres soient appliqués et la queue précédente éteinte
+        self._wait_for_settle()
         
-        # Calcule la perte perceptuelle
-        loss = self.perceptual_loss.compute_loss(self.target_audio, processed_audio)
+        if streaming:
+            loss = self._streaming_capture_loss(bound if abort_enabled else None, cache_key=key)
+        else:
+            # Joue le signal DI et enregistre la sortie
+            processed_audio = self.audio_manager.play_and_record(self.di_audio)
+            self._store_capture(key, processed_audio)
+            
+            # Calcule la perte perceptuelle
+            loss = self.perceptual_loss.compute_loss(self.target_audio, processed_audio)
         
         self.logger.debug(f"Loss: {loss:.6f} pour params: {parameters}")
         return loss
     
+    def _streaming_capture_loss(self, bound: Optional[float] = None,
+                                cache_key: Optional[str] = None) -> float:
+        """
+        Capture le DI en accumulant la perte bloc par bloc.
+        
+        Args:
+            bound: Meilleure perte connue, None pour une capture complète
+            cache_key: Clé sous laquelle enregistrer la capture si elle est
+                complète
+            
+        Returns:
+            Perte complète, ou CensoredLoss si la capture a été arrêtée
+        """
+        accumulator = self._get_loss_accumulator()
+        expected_samples = len(self.di_audio) - self.audio_manager.round_trip_latency
+        accumulator.reset(expected_samples=max(expected_samples, 0))
+        
+        total_frames = min(accumulator.target_frames,
+                           1 + max(expected_samples, 0) // accumulator.HOP_LENGTH)
+        aborted = []
+        
+        def on_block(block: np.ndarray) -> bool:
+            accumulator.push(block)
+            if bound is not None and self.early_abort.should_abort(
+                    accumulator.partial_loss(), accumulator.frames_processed, total_frames, bound):
+                aborted.append(accumulator.frames_processed)
+                return True
+            return False
+        
+        recorded = self.audio_manager.play_and_record_streaming(self.di_audio, on_block)
+        
+        if aborted:
+            loss = self.early_abort.censor(accumulator.partial_loss(), aborted[0], total_frames)
+            self.logger.debug(f"⏹️ Capture arrêtée à {loss.fraction_evaluated:.0%} "
+                              f"(perte partielle {loss:.6f} > meilleure {bound:.6f})")
+            return loss
+        self._store_capture(cache_key, recorded)
+        return accumulator.finish()
+    
+    def _get_loss_accumulator(self) -> StreamingLossAccumulator:
+        """Accumulateur de perte avec les features cibles précalculées."""
+        if self._loss_accumulator is None:
+            self._loss_accumulator = self.perceptual_loss.streaming(self.target_audio)
+        return self._loss_accumulator
+    
+    def enable_device_slots(self, slots: List[int],
+                            base_patch: Optional[Dict[str, Any]] = None,
+                            midi_channel: int = 0,
+                            mirror=None) -> DeviceSlotScheduler:
+        """
+        Active l'évaluation par slots résidents et Program Change.
+        
+        Les candidats connus à l'avance (grille, population) sont écrits en
+        bloc dans ``slots`` puis sélectionnés par un seul Program Change.
+        
+        Args:
+            slots: Slots utilisateur libres (0 = U01), ils seront écrasés
+            base_patch: Patch de base ({'common', 'effect'}), téléchargé
+                depuis le Magicstomp si absent
+            midi_channel: Canal MIDI du Magicstomp
+            mirror: PatchMirror optionnel à tenir à jour
+            
+        Returns:
+            Le scheduler créé
+        """
+        if base_patch is None:
+            base_patch = self.current_patch_data or self.realtime_adapter.request_patch()
+        if not base_patch:
+            raise RuntimeError("Patch de base indisponible pour les slots résidents")
+        
+        self.current_patch_data = base_patch
+        self.slot_scheduler = DeviceSlotScheduler(
+            self.realtime_adapter, slots, midi_channel=midi_channel, mirror=mirror
+        )
+        self.logger.info(f"🎚️ Slots résidents activés: {[f'U{s + 1:02d}' for s in slots]}")
+        return self.slot_scheduler
+    
+    def _candidate_patch(self, parameters: Dict[str, float]) -> Tuple[List[int], List[int]]:
+        """Construit les 159 octets d'un candidat à partir du patch de base."""
+        data = list(self.current_patch_data['common']) + list(self.current_patch_data['effect'])
+        for name, value in parameters.items():
+            if name in self.parameter_space.parameters and name in self.parameter_space.PARAMETER_OFFSETS:
+                offset = self.parameter_space.PARAMETER_OFFSETS[name]
+                data[offset] = self.parameter_space.to_midi_value(name, value)
+        return data[:PATCH_COMMON_LENGTH], data[PATCH_COMMON_LENGTH:]
+    
+    def decode_candidate(self, parameters: Dict[str, float]) -> Dict[str, Any]:
+        """
+        Paramètres Magicstomp d'un candidat, tels qu'affichés par l'éditeur.
+        
+        Args:
+            parameters: Valeurs des paramètres optimisés
+            
+        Returns:
+            Dict de :func:`patch_codec.decode_patch` pour le patch de base
+            modifié par le candidat
+        """
+        if not self.current_patch_data:
+            raise ValueError("Patch de base indisponible (current_patch_data)")
+        return decode_patch(*self._candidate_patch(parameters))
+    
+    def _capture_candidate(self, parameters: Dict[str, float],
+                           di_audio: Optional[np.ndarray] = None) -> np.ndarray:
+        """Applique un candidat (slot résident ou tweaks) puis capture la sortie."""
+        di_audio = self.di_audio if di_audio is None else di_audio
+        key = self._capture_key(parameters, di_audio)
+        cached = self.capture_cache.get(key) if key is not None else None
+        if cached is not None:
+            return cached
+        
+        start = time.perf_counter()
+        self._apply_candidate(parameters)
+        self._wait_for_settle()
+        if self.slot_scheduler is not None:
+            self.slot_scheduler.record_switch(time.perf_counter() - start)
+        processed_audio = self.audio_manager.play_and_record(di_audio)
+        self._store_capture(key, processed_audio)
+        return processed_audio
+    
+    def _apply_candidate(self, parameters: Dict[str, float]) -> None:
+        """Envoie un candidat : Program Change si slots résidents, sinon tweaks."""
+        if self.slot_scheduler is None:
+            for param_name, value in parameters.items():
+                self.parameter_space.set_parameter_value_realtime(param_name, value)
+        else:
+            common, effect = self._candidate_patch(parameters)
+            data = common + effect
+            changed = (
+                sum(1 for a, b in zip(self._active_candidate, data) if a != b)
+                if self._active_candidate is not None else len(parameters)
+            )
+            self.slot_scheduler.activate(common, effect, changed_bytes=changed)
+            self._active_candidate = data
+    
+    def _loss_from_capture(self, processed_audio: np.ndarray) -> float:
+        """Perte perceptuelle d'une capture (exécutée dans un worker)."""
+        return self.perceptual_loss.compute_loss(self.target_audio, processed_audio)
+    
+    def evaluate_candidates(self, candidates: List[Dict[str, float]]) -> List[float]:
+        """
+        Évalue un lot de candidats connus à l'avance.
+        
+        Avec les slots résidents, le lot est préchargé sur le Magicstomp par
+        tranches de ``len(slots)`` candidats, chaque tranche juste avant son
+        évaluation, et chaque bascule coûte un Program Change ; sinon les
+        paramètres sont envoyés en temps réel. La capture du candidat N+1 se
+        fait pendant que la perte du candidat N est calculée
+        (``pipeline_depth`` captures en attente au plus).
+        
+        Args:
+            candidates: Liste de dictionnaires de paramètres
+            
+        Returns:
+            Pertes dans l'ordre des candidats
+        """
+        if self.slot_scheduler is not None:
+            losses = []
+            for chunk in self.slot_scheduler.chunks(candidates):
+                self.slot_scheduler.preload([self._candidate_patch(params) for params in chunk])
+                losses.extend(self._evaluate_batch(chunk))
+            self.slot_scheduler.log_statistics()
+            return losses
+        
+        return self._evaluate_batch(candidates)
+    
+    def _evaluate_batch(self, candidates: List[Dict[str, float]]) -> List[float]:
+        """Évalue des candidats déjà préchargés (ou sans slots résidents)."""
+        if self.continuous_capture_gap is not None:
+            return self._evaluate_continuous(candidates)
+        
+        evaluator = PipelinedEvaluator(
+            self._capture_candidate, self._loss_from_capture,
+            max_in_flight=self.pipeline_depth
+        )
+        losses = []
+        for params, loss in evaluator.imap(candidates):
+            self.logger.debug(f"Loss: {loss:.6f} pour params: {params}")
+            losses.append(loss)
+        evaluator.log_statistics()
+        return losses
+    
+    def _evaluate_continuous(self, candidates: List[Dict[str, float]]) -> List[float]:
+        """
+        Capture tout le lot dans un seul flux duplex.
+        
+        Les changements de paramètres sont planifiés sur l'horloge audio dans
+        les silences entre les répétitions de la sonde, puis l'enregistrement
+        est découpé par candidat avec la latence calibrée.
+        """
+        # Seuls les candidats absents du cache sont joués
+        keys = [self._capture_key(params) for params in candidates]
+        captures = [self.capture_cache.get(key) if key is not None else None for key in keys]
+        missing = [index for index, capture in enumerate(captures) if capture is None]
+        
+        if missing:
+            session = ContinuousCaptureSession(self.audio_manager, gap_duration=self.continuous_capture_gap)
+            recorded = session.capture(
+                self.di_audio,
+                [lambda params=candidates[index]: self._apply_candidate(params) for index in missing]
+            )
+            for index, processed_audio in zip(missing, recorded):
+                self._store_capture(keys[index], processed_audio)
+                captures[index] = processed_audio
+        
+        losses = []
+        for params, processed_audio in zip(candidates, captures):
+            loss = self._loss_from_capture(processed_audio)
+            self.logger.debug(f"Loss: {loss:.6f} pour params: {params}")
+            losses.append(loss)
+        return losses
+    
+    def build_response_table(self, parameters: Optional[List[str]] = None,
+                             resolution: int = 8,
+                             probe_duration: float = 0.5) -> ResponseTable:
+        """
+        Balaye chaque paramètre sur 0-127 et enregistre la réponse du Magicstomp.
+        
+        Les autres paramètres restent à leur valeur actuelle ; pour chaque pas,
+        les features log-mel/MFCC d'une sonde courte sont stockées dans
+        ``response_table``.
+        
+        Args:
+            parameters: Paramètres à balayer (tous ceux avec offset par défaut)
+            resolution: Pas entre deux valeurs MIDI balayées
+            probe_duration: Durée de la sonde en secondes
+            
+        Returns:
+            La table de réponse
+        """
+        if self.target_audio is None or self.di_audio is None:
+            raise ValueError("Fichiers audio non chargés. Utilisez load_audio_files().")
+        
+        if parameters is None:
+            parameters = list(self.parameter_space.parameters.keys())
+        parameters = [name for name in parameters if name in self.parameter_space.PARAMETER_OFFSETS]
+        
+        current = self.parameter_space.get_parameter_dict()
+        base_values = {name: self.parameter_space.to_midi_value(name, current[name]) for name in parameters}
+        
+        length = min(len(self.di_audio), len(self.target_audio),
+                     int(probe_duration * self.audio_manager.sample_rate))
+        probe = self.di_audio[:length]
+        
+        def apply_value(name: str, midi_value: int) -> None:
+            offset = self.parameter_space.PARAMETER_OFFSETS[name]
+            self.realtime_adapter.tweak_parameter(offset, midi_value, immediate=True)
+        
+        self.logger.info(f"📈 Balayage de {len(parameters)} paramètres (pas {resolution})")
+        sweep = ResponseSweep(self.audio_manager, self.perceptual_loss, resolution=resolution)
+        self.response_table = sweep.run(probe, base_values, apply_value, settle=self._wait_for_settle)
+        self._response_target_features = self.perceptual_loss.extract_features(self.target_audio[:length])
+        return self.response_table
+    
+    def screen_candidates(self, candidates: List[Dict[str, float]]) -> np.ndarray:
+        """
+        Pertes prédites par la table de réponse, sans jouer les candidats.
+        
+        Args:
+            candidates: Candidats à évaluer
+            
+        Returns:
+            Perte prédite de chaque candidat
+        """
+        if self.response_table is None:
+            raise ValueError("Aucune table de réponse. Utilisez build_response_table().")
+        
+        midi_candidates = [
+            {name: self.parameter_space.to_midi_value(name, value)
+             for name, value in params.items() if name in self.response_table.base_values}
+            for params in candidates
+        ]
+        target_log_mel, target_mfcc = self._response_target_features
+        return self.response_table.score_many(
+            midi_candidates, target_log_mel, target_mfcc,
+            mel_weight=self.perceptual_loss.mel_weight,
+            mfcc_weight=self.perceptual_loss.mfcc_weight
+        )
+    
+    def _screened_evaluation(self, keep: int) -> Callable[[List[Dict[str, float]]], List[float]]:
+        """Évaluation en lot ne jouant que les ``keep`` meilleurs candidats prédits."""
+        def evaluate(candidates: List[Dict[str, float]]) -> List[float]:
+            if len(candidates) <= keep:
+                return self.evaluate_candidates(candidates)
+            
+            kept = np.argsort(self.screen_candidates(candidates))[:keep]
+            losses = [float('inf')] * len(candidates)
+            for index, loss in zip(kept, self.evaluate_candidates([candidates[i] for i in kept])):
+                losses[index] = loss
+            self.logger.info(f"🔎 {len(kept)}/{len(candidates)} candidats joués après présélection")
+            return losses
+        return evaluate
+    
+    def grid_search(self, parameters_to_optimize: Optional[List[str]] = None,
+                    grid_size: int = 3,
+                    screen_keep: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Recherche en grille autour des valeurs actuelles.
+        
+        Les points de la grille sont évalués en lot via
+        :meth:`evaluate_candidates` (slots résidents si activés).
+        
+        Args:
+            parameters_to_optimize: Paramètres à explorer (tous par défaut)
+            grid_size: Nombre de points par paramètre
+            screen_keep: Nombre de points joués sur le matériel après
+                présélection par la table de réponse (None = tous)
+            
+        Returns:
+            Résultats de la recherche
+        """
+        if self.target_audio is None or self.di_audio is None:
+            raise ValueError("Fichiers audio non chargés. Utilisez load_audio_files().")
+        if screen_keep is not None and self.response_table is None:
+            raise ValueError("Aucune table de réponse. Utilisez build_response_table().")
+        
+        if parameters_to_optimize is None:
+            parameters_to_optimize = list(self.parameter_space.parameters.keys())
+        
+        batch_loss_function = self.evaluate_candidates
+        if screen_keep is not None:
+            batch_loss_function = self._screened_evaluation(screen_keep)
+        
+        optimizer = GridSearchOptimizer(
+            parameter_space=self.parameter_space,
+            loss_function=self._loss_function_realtime,
+            grid_size=grid_size,
+            batch_loss_function=batch_loss_function
+        )
+        results = optimizer.optimize(self.parameter_space.get_parameter_dict(),
+                                     parameters_to_optimize)
+        
+        if self.slot_scheduler is not None:
+            results['device_slots'] = self.slot_scheduler.get_statistics()
+        if self.capture_cache is not None:
+            results['capture_cache'] = self.capture_cache.get_statistics()
+        if self.current_patch_data:
+            results['best_patch'] = self.decode_candidate(results['best_parameters'])
+        
+        return results
+    
     def optimize_with_realtime_tweaking(self,
                                       max_iterations: int = 20,
                                       min_improvement: float = 1e-6) -> Dict[str, Any]:
@@ -347,7 +904,8 @@ class RealtimeOptimizer:
             parameter_space=self.parameter_space,
             loss_function=self._loss_function_realtime,
             max_iterations=max_iterations,
-            min_improvement=min_improvement
+            min_improvement=min_improvement,
+            bounded_loss=self.early_abort is not None
         )
         
         # Démarre l'optimisation
@@ -359,12 +917,108 @@ class RealtimeOptimizer:
         results['realtime_optimization'] = True
         results['optimization_time'] = end_time - start_time
         results['parameters_tweaked'] = list(self.parameter_space.parameters.keys())
+        if self.capture_cache is not None:
+            results['capture_cache'] = self.capture_cache.get_statistics()
         
         self.logger.info(f"✅ Optimisation terminée en {results['optimization_time']:.2f}s")
         self.logger.info(f"📊 Amélioration: {results['improvement']:.6f}")
         
         return results
     
+    def characterize_impulse_responses(self, values: Dict[str, List[float]],
+                                       effect_type=None,
+                                       **capture_options) -> ImpulseResponseBank:
+        """
+        Mesure les réponses impulsionnelles d'un effet linéaire (reverb, delay).
+        
+        Un sweep exponentiel est joué pour chaque combinaison des valeurs
+        échantillonnées ; les réponses sont ajoutées à ``ir_bank``.
+        
+        Args:
+            values: Valeurs échantillonnées par paramètre
+            effect_type: Type d'effet (par défaut celui du patch courant)
+            **capture_options: Options d'ImpulseResponseCapture
+            
+        Returns:
+            La banque de réponses impulsionnelles
+        """
+        effect_type = self._settle_key() if effect_type is None else effect_type
+        settings = parameter_grid(values)
+        self.logger.info(f"📐 Caractérisation de l'effet {effect_type}: {len(settings)} réponses à mesurer")
+        
+        def apply_parameters(parameters: Dict[str, float]) -> None:
+            for param_name, value in parameters.items():
+                self.parameter_space.set_parameter_value_realtime(param_name, value)
+        
+        capture = ImpulseResponseCapture(self.audio_manager, **capture_options)
+        self.ir_bank = capture.characterize(effect_type, settings, apply_parameters,
+                                            settle=self._wait_for_settle, bank=self.ir_bank)
+        return self.ir_bank
+    
+    def optimize_with_ir_prediction(self, max_iterations: int = 20,
+                                    confirm_top: int = 3,
+                                    effect_type=None) -> Dict[str, Any]:
+        """
+        Optimise hors ligne par convolution puis confirme sur le matériel.
+        
+        La recherche évalue les candidats avec la sortie prédite par la
+        banque de réponses impulsionnelles ; seuls les ``confirm_top``
+        meilleurs candidats sont joués sur le Magicstomp.
+        
+        Args:
+            max_iterations: Nombre maximum d'itérations de la recherche
+            confirm_top: Nombre de candidats confirmés sur le matériel
+            effect_type: Type d'effet (par défaut celui du patch courant)
+            
+        Returns:
+            Résultats de l'optimisation (meilleur candidat confirmé)
+        """
+        if self.ir_bank is None:
+            raise ValueError("Aucune réponse impulsionnelle. Utilisez characterize_impulse_responses().")
+        if self.target_audio is None or self.di_audio is None:
+            raise ValueError("Fichiers audio non chargés. Utilisez load_audio_files().")
+        
+        effect_type = self._settle_key() if effect_type is None else effect_type
+        unmeasured = set(self.parameter_space.parameters) - set(self.ir_bank.parameter_names(effect_type))
+        if unmeasured:
+            self.logger.warning(f"⚠️ Paramètres sans effet sur la prédiction: {sorted(unmeasured)}")
+        
+        predicted: Dict[Tuple, Tuple[Dict[str, float], float]] = {}
+        
+        def predicted_loss(parameters: Dict[str, float]) -> float:
+            processed_audio = self.ir_bank.predict(effect_type, parameters, self.di_audio)
+            loss = self.perceptual_loss.compute_loss(self.target_audio, processed_audio)
+            predicted[tuple(sorted(parameters.items()))] = (dict(parameters), loss)
+            return loss
+        
+        start_time = time.time()
+        optimizer = CoordinateSearchOptimizer(
+            parameter_space=self.parameter_space,
+            loss_function=predicted_loss,
+            max_iterations=max_iterations
+        )
+        offline_results = optimizer.optimize()
+        offline_time = time.time() - start_time
+        
+        # Confirmation matérielle des meilleurs candidats prédits
+        ranked = sorted(predicted.values(), key=lambda item: item[1])[:max(1, confirm_top)]
+        candidates = [params for params, _ in ranked]
+        confirmed = self.evaluate_candidates(candidates)
+        best = int(np.argmin(confirmed))
+        
+        self.logger.info(f"✅ {len(predicted)} candidats prédits en {offline_time:.2f}s, "
+                         f"{len(candidates)} confirmés sur le matériel")
+        return {
+            'best_parameters': candidates[best],
+            'best_loss': confirmed[best],
+            'predicted_loss': ranked[best][1],
+            'confirmed_losses': confirmed,
+            'predicted_evaluations': len(predicted),
+            'offline_time': offline_time,
+            'offline_results': offline_results,
+            'optimization_time': time.time() - start_time,
+        }
+    
     def quick_parameter_test(self, parameter_name: str, 
                            test_values: List[float]) -> Dict[str, float]:
         """
@@ -404,6 +1058,15 @@ class RealtimeOptimizer:
     
     def close(self):
         """Ferme les ressources."""
+        if self.slot_scheduler is not None:
+            self.slot_scheduler.log_statistics()
+        if self.capture_cache is not None:
+            self.capture_cache.log_statistics()
+            self.capture_cache.close()
+        for effect_type, stats in self.settle_detector.statistics.summary().items():
+            self.logger.info(f"⏱️ Stabilisation {effect_type}: médiane {stats['median_s'] * 1000:.0f}ms, "
+                             f"p95 {stats['p95_s'] * 1000:.0f}ms ({stats['count']} changements, "
+                             f"{stats['timeouts']} timeouts)")
         self.realtime_adapter.stop()
         self.audio_manager.close()
         self.logger.info("🛑 RealtimeOptimizer fermé")
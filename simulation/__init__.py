@@ -0,0 +1,15 @@
+"""
+Simulation Package
+==================
+
+Vectorized DSP simulation of the Magicstomp, used to run the tone matching
+and HIL workflows without hardware (demos, loopback audio backend,
+benchmarks).
+
+Modules:
+- dsp: Stateful float32 building blocks (SOS filters, delay lines, chorus, convolution reverb)
+- magicstomp: Simulated Magicstomp effect chain, offline or block by block
+"""
+
+__version__ = "1.0.0"
+__author__ = "Magicstomp Assistant"
@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+DSP Building Blocks
+===================
+
+Stateful, vectorized float32 processors used by the simulated Magicstomp.
+
+Every processor works on blocks of any length and keeps its state between
+calls, so processing a signal in one call or block by block gives the same
+result. Filter coefficients and reverb impulse responses are designed once
+per parameter value and cached.
+"""
+
+from functools import lru_cache
+from typing import Tuple
+
+import numpy as np
+from scipy import fft as sp_fft
+from scipy import signal
+
+
+@lru_cache(maxsize=256)
+def design_sos(order: int, cutoff: Tuple[float, ...], btype: str, sample_rate: int) -> np.ndarray:
+    """
+    Butterworth filter as float32 second-order sections (cached).
+
+    Args:
+        order: Filter order
+        cutoff: Cutoff frequency, or (low, high) for band filters, in Hz
+        btype: 'low', 'high' or 'band'
+        sample_rate: Sample rate
+
+    Returns:
+        SOS array, shared between callers (do not modify)
+    """
+    frequency = cutoff[0] if len(cutoff) == 1 else list(cutoff)
+    return signal.butter(order, frequency, btype=btype, fs=sample_rate, output='sos').astype(np.float32)
+
+
+@lru_cache(maxsize=32)
+def reverb_impulse_response(decay_s: float, sample_rate: int, max_length_s: float = 3.0,
+                            seed: int = 0) -> np.ndarray:
+    """
+    Synthetic reverb impulse response (cached).
+
+    Decorrelated noise with an exponential envelope reaching -60 dB after
+    ``decay_s``, normalized to unit energy.
+
+    Args:
+        decay_s: RT60 decay time in seconds
+        sample_rate: Sample rate
+        max_length_s: Truncation of the impulse response
+        seed: Seed of the noise
+
+    Returns:
+        Read-only float32 impulse response
+    """
+    length = max(1, int(min(decay_s, max_length_s) * sample_rate))
+    t = np.arange(length, dtype=np.float32) / sample_rate
+    noise = np.random.default_rng(seed).standard_normal(length).astype(np.float32)
+    ir = noise * np.exp(-6.9078 * t / max(decay_s, 1e-3)).astype(np.float32)
+    ir /= np.sqrt(np.sum(ir ** 2))
+    ir.setflags(write=False)
+    return ir
+
+
+class SOSFilter:
+    """Cascade of second-order sections keeping its state between blocks."""
+
+    def __init__(self, zero_phase: bool = False):
+        """
+        Initialize the filter.
+
+        Args:
+            zero_phase: Filter every call forward and backward, like
+                ``filtfilt`` (no phase shift, but no state between calls:
+                for whole signals only)
+        """
+        self.zero_phase = zero_phase
+        self._sos = None
+        self._zi = None
+
+    def reset(self) -> None:
+        self._zi = None
+
+    def process(self, block: np.ndarray, sos: np.ndarray) -> np.ndarray:
+        """
+        Filter a block.
+
+        Args:
+            block: float32 samples
+            sos: Coefficients from :func:`design_sos` (state is cleared if
+                they change)
+
+        Returns:
+            Filtered block
+        """
+        if self.zero_phase:
+            # Same edge padding as filtfilt with the equivalent (b, a)
+            padlen = min(3 * (2 * len(sos) + 1), len(block) - 1)
+            if padlen < 0:
+                return np.zeros(0, dtype=np.float32)
+            return signal.sosfiltfilt(sos, block, padlen=padlen).astype(np.float32, copy=False)
+
+        if sos is not self._sos or self._zi is None:
+            self._sos = sos
+            self._zi = np.zeros((sos.shape[0], 2), dtype=np.float32)
+        output, self._zi = signal.sosfilt(sos, block, zi=self._zi)
+        return output.astype(np.float32, copy=False)
+
+
+class FeedbackDelay:
+    """
+    Delay line with feedback, processed in chunks no longer than the delay.
+
+    Within such a chunk every delayed sample is already in the line, so the
+    recursion is computed with array operations instead of a sample loop.
+    """
+
+    def __init__(self, max_delay: int):
+        self.max_delay = max_delay
+        self.reset()
+
+    def reset(self) -> None:
+        self._line = np.zeros(self.max_delay, dtype=np.float32)
+
+    def process(self, block: np.ndarray, delay: int, feedback: float) -> np.ndarray:
+        """
+        Run a block through the line.
+
+        Args:
+            block: float32 input samples
+            delay: Delay in samples (1 to ``max_delay``)
+            feedback: Feedback gain
+
+        Returns:
+            Delayed (wet) signal
+        """
+        delay = int(np.clip(delay, 1, self.max_delay))
+        feedback = np.float32(feedback)
+        count = len(block)
+
+        # Line followed by the samples written during this block
+        line = np.empty(self.max_delay + count, dtype=np.float32)
+        line[:self.max_delay] = self._line
+        output = np.empty(count, dtype=np.float32)
+        for start in range(0, count, delay):
+            stop = min(start + delay, count)
+            write = self.max_delay + start
+            delayed = line[write - delay:write - delay + stop - start]
+            output[start:stop] = delayed
+            np.multiply(delayed, feedback, out=line[write:write + stop - start])
+            line[write:write + stop - start] += block[start:stop]
+        self._line = line[count:]
+        return output
+
+
+class ModulatedDelay:
+    """
+    LFO-modulated fractional delay (chorus), with linear interpolation.
+    """
+
+    def __init__(self, max_delay: int, sample_rate: int):
+        self.max_delay = max_delay
+        self.sample_rate = sample_rate
+        self.reset()
+
+    def reset(self) -> None:
+        self._history = np.zeros(self.max_delay + 1, dtype=np.float32)
+        self._phase = 0.0
+
+    def process(self, block: np.ndarray, base_delay: float, depth: float,
+                rate_hz: float) -> np.ndarray:
+        """
+        Read the block through a delay swept by a sine LFO.
+
+        Args:
+            block: float32 input samples
+            base_delay: Center delay in samples
+            depth: LFO swing in samples (limited so the delay stays
+                within 0..max_delay)
+            rate_hz: LFO frequency
+
+        Returns:
+            Modulated (wet) signal
+        """
+        count = len(block)
+        increment = 2 * np.pi * rate_hz / self.sample_rate
+        ramp = np.arange(count, dtype=np.float32)
+        phases = np.float32(self._phase) + np.float32(increment) * ramp
+        self._phase = float((self._phase + increment * count) % (2 * np.pi))
+
+        depth = min(depth, base_delay, self.max_delay - 1 - base_delay)
+        delays = np.sin(phases, out=phases)
+        delays *= np.float32(depth)
+        delays += np.float32(base_delay)
+
+        # Output n reads between buffer[k - 1] and buffer[k], k = n - floor(delay)
+        # (delays are positive: truncation is floor, and avoids np.modf)
+        whole = delays.astype(np.int32)
+        frac = delays
+        frac -= whole
+        buffer = np.concatenate([self._history, block])
+        index = np.arange(len(self._history), len(buffer), dtype=np.int32)
+        index -= whole.astype(np.int32)
+        output = np.take(buffer, index)
+        index -= 1
+        earlier = np.take(buffer, index)
+        earlier -= output
+        earlier *= frac
+        output += earlier
+
+        self._history = buffer[-len(self._history):]
+        return output.astype(np.float32, copy=False)
+
+
+@lru_cache(maxsize=32)
+def _reverb_spectrum(decay_s: float, sample_rate: int, size: int) -> np.ndarray:
+    """Spectrum of the reverb impulse response for an FFT size (cached)."""
+    return sp_fft.rfft(reverb_impulse_response(decay_s, sample_rate), size)
+
+
+@lru_cache(maxsize=32)
+def _reverb_partitions(decay_s: float, sample_rate: int, block_size: int) -> np.ndarray:
+    """Spectra of the impulse response cut in ``block_size`` partitions (cached)."""
+    ir = reverb_impulse_response(decay_s, sample_rate)
+    count = -(-len(ir) // block_size)
+    padded = np.zeros(count * block_size, dtype=np.float32)
+    padded[:len(ir)] = ir
+    return sp_fft.rfft(padded.reshape(count, block_size), 2 * block_size, axis=1)
+
+
+class ConvolutionReverb:
+    """
+    FFT convolution with a synthetic impulse response, keeping its state
+    between blocks.
+
+    Long signals are convolved in one overlap-add FFT. Short blocks (a
+    stream) use uniformly partitioned overlap-save convolution: one FFT pair
+    per block plus a multiply-accumulate over the spectra of past blocks.
+    Impulse response spectra are cached per decay and size.
+    """
+
+    def __init__(self, sample_rate: int):
+        self.sample_rate = sample_rate
+        self.reset()
+
+    def reset(self) -> None:
+        # Pending output of the overlap-add path
+        self._tail = np.zeros(0, dtype=np.float32)
+        # Frequency-domain delay line of the partitioned path
+        self._block_size = 0
+        self._history = None
+        self._previous = None
+
+    def _partitioned(self, block: np.ndarray, decay_s: float) -> np.ndarray:
+        size = len(block)
+        partitions = _reverb_partitions(decay_s, self.sample_rate, size)
+        if size != self._block_size or len(self._history) != len(partitions):
+            # Stream (re)started with a new block size or impulse length
+            self._block_size = size
+            self._history = np.zeros_like(partitions)
+            self._previous = np.zeros(size, dtype=np.float32)
+
+        self._history[1:] = self._history[:-1]
+        self._history[0] = sp_fft.rfft(np.concatenate([self._previous, block]))
+        self._previous = np.array(block, dtype=np.float32)
+        spectrum = np.einsum('kf,kf->f', self._history, partitions)
+        return sp_fft.irfft(spectrum, 2 * size)[size:].astype(np.float32)
+
+    def process(self, block: np.ndarray, decay_s: float) -> np.ndarray:
+        """
+        Convolve a block with the impulse response.
+
+        Args:
+            block: float32 input samples
+            decay_s: RT60 decay time (rounded to 10 ms for caching)
+
+        Returns:
+            Reverberated (wet) signal, same length as the block
+        """
+        count = len(block)
+        if count == 0:
+            return np.zeros(0, dtype=np.float32)
+        decay_s = round(float(decay_s), 2)
+        ir_length = len(reverb_impulse_response(decay_s, self.sample_rate))
+
+        if 4 * count <= ir_length:
+            wet = self._partitioned(block, decay_s)
+            length = count
+        else:
+            size = sp_fft.next_fast_len(count + ir_length - 1, real=True)
+            spectrum = _reverb_spectrum(decay_s, self.sample_rate, size)
+            wet = sp_fft.irfft(sp_fft.rfft(block, size) * spectrum, size)[:count + ir_length - 1]
+            length = len(wet)
+
+        # Overlap-add the pending output of previous long blocks
+        if len(self._tail) > length:
+            wet = np.concatenate([wet, np.zeros(len(self._tail) - length, dtype=wet.dtype)])
+        wet[:len(self._tail)] += self._tail
+        self._tail = wet[count:]
+        return wet[:count]
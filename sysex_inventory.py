@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Inventaire SysEx précompilé
+===========================
+
+Tables (effet, paramètre) → offset global issues des en-têtes
+MagicstompFrenzy via :mod:`auto_sysex_mapper`, compilées dans le module
+importable ``sysex_inventory_table.py`` au lieu de relire
+``sysex_inventory.json`` (messages SysEx d'exemple compris) à chaque
+construction d'un :class:`MagicstompAdapter`.
+
+Le module compilé enregistre la date de modification, la taille et
+l'empreinte SHA-1 des sources ; il n'est régénéré que si l'empreinte des
+sources a changé (la date n'est qu'un raccourci pour éviter de relire les
+fichiers). Le chargement est mis en cache pour tout le processus.
+
+Usage:
+    from sysex_inventory import get_parameter_locations
+    location = get_parameter_locations()["Chorus"]["Depth"]
+
+    python sysex_inventory.py            # recompile si nécessaire
+    python sysex_inventory.py --force    # recompile sans condition
+"""
+
+import argparse
+import hashlib
+import importlib
+import logging
+import pprint
+import sys
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from magicstomp_sysex import ParameterLocation
+
+BASE_DIR = Path(__file__).resolve().parent
+COMPILED_MODULE = "sysex_inventory_table"
+COMPILED_PATH = BASE_DIR / f"{COMPILED_MODULE}.py"
+
+SOURCE_FILES = (
+    "magicstompfrenzy_reference/knobparameters.h",
+    "magicstompfrenzy_reference/magicstomp.h",
+    "magicstomp_parameter_map.py",
+    "auto_sysex_mapper.py",
+)
+
+EffectEntry = Tuple[int, str, Tuple[Tuple[str, int], ...]]
+"""(type d'effet, nom lisible, ((libellé, offset global), ...))"""
+
+logger = logging.getLogger(__name__)
+
+
+def _source_stamp() -> Tuple[Tuple[str, int, int], ...]:
+    """(fichier, mtime en ns, taille) de chaque source présente."""
+    stamp = []
+    for name in SOURCE_FILES:
+        path = BASE_DIR / name
+        if path.exists():
+            stat = path.stat()
+            stamp.append((name, stat.st_mtime_ns, stat.st_size))
+    return tuple(stamp)
+
+
+def _source_digest() -> str:
+    """Empreinte SHA-1 du contenu des sources présentes."""
+    digest = hashlib.sha1()
+    for name in SOURCE_FILES:
+        path = BASE_DIR / name
+        if path.exists():
+            digest.update(name.encode("utf-8"))
+            digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def _build_effects() -> Dict[str, EffectEntry]:
+    """Extrait les tables d'offsets des en-têtes (via auto_sysex_mapper)."""
+    from auto_sysex_mapper import generate_mapping
+
+    effects = {}
+    for effect_name, info in generate_mapping(0)["effects"].items():
+        parameters = tuple((entry["label"], entry["global_offset"]) for entry in info["parameters"])
+        effects[effect_name] = (info["effect_id"], info["friendly_name"], parameters)
+    return effects
+
+
+def compile_inventory(path: Path = COMPILED_PATH) -> Dict[str, EffectEntry]:
+    """
+    Régénère le module compilé à partir des sources.
+
+    Args:
+        path: Module Python à écrire
+
+    Returns:
+        Les tables compilées
+    """
+    effects = _build_effects()
+    lines = [
+        '"""Inventaire SysEx compilé par sysex_inventory.compile_inventory - ne pas modifier."""',
+        "",
+        f"SOURCE_DIGEST = {_source_digest()!r}",
+        "",
+        f"SOURCE_STAMP = {pprint.pformat(_source_stamp(), width=100)}",
+        "",
+        f"EFFECTS = {pprint.pformat(effects, width=100, sort_dicts=True)}",
+        "",
+    ]
+    tmp_path = path.with_suffix(".tmp")
+    tmp_path.write_text("\n".join(lines), encoding="utf-8")
+    tmp_path.replace(path)
+    logger.info(f"Inventaire SysEx compilé: {len(effects)} effets -> {path.name}")
+    return effects
+
+
+def _is_current(module) -> bool:
+    stamp = _source_stamp()
+    if not stamp:
+        # Sources absentes (installation sans les en-têtes) : table livrée
+        return True
+    if tuple(map(tuple, module.SOURCE_STAMP)) == stamp:
+        return True
+    return module.SOURCE_DIGEST == _source_digest()
+
+
+@lru_cache(maxsize=None)
+def load_inventory() -> Dict[str, EffectEntry]:
+    """
+    Tables compilées, régénérées si les sources ont changé.
+
+    Returns:
+        {nom d'effet: (type d'effet, nom lisible, ((libellé, offset global), ...))}
+    """
+    try:
+        module = importlib.import_module(COMPILED_MODULE)
+        if _is_current(module):
+            return module.EFFECTS
+    except (ImportError, AttributeError, SyntaxError):
+        module = None
+
+    try:
+        effects = compile_inventory()
+    except OSError as exc:
+        # Répertoire en lecture seule : tables calculées en mémoire
+        logger.warning(f"Inventaire SysEx non écrit ({exc}), compilation en mémoire")
+        return _build_effects()
+
+    if module is not None:
+        importlib.reload(module)
+    return effects
+
+
+@lru_cache(maxsize=None)
+def get_parameter_locations() -> Dict[str, Dict[str, ParameterLocation]]:
+    """Emplacement de chaque paramètre, par effet puis par libellé."""
+    return {
+        effect_name: {label: ParameterLocation(offset, label) for label, offset in parameters}
+        for effect_name, (_, _, parameters) in load_inventory().items()
+    }
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description="Compile l'inventaire SysEx Magicstomp.")
+    parser.add_argument("--force", action="store_true", help="Recompile même si les sources n'ont pas changé.")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    effects = compile_inventory() if args.force else load_inventory()
+    print(f"📦 {len(effects)} effets, {sum(len(entry[2]) for entry in effects.values())} paramètres")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,203 @@
+"""Inventaire SysEx compilé par sysex_inventory.compile_inventory - ne pas modifier."""
+
+SOURCE_DIGEST = '1e2a0b33fe763eefb9fdd038275f1afbc7905b54'
+
+SOURCE_STAMP = (('magicstompfrenzy_reference/knobparameters.h', 1758806240000000000, 8976),
+ ('magicstompfrenzy_reference/magicstomp.h', 1758806240000000000, 3108),
+ ('magicstomp_parameter_map.py', 1758806240000000000, 3781),
+ ('auto_sysex_mapper.py', 1758806240000000000, 14189))
+
+EFFECTS = {'AcousticMulti': (0,
+                   'Acoustic Multi',
+                   (('Type', 43),
+                    ('Blend', 51),
+                    ('Bass', 52),
+                    ('Middle', 53),
+                    ('Treble', 54),
+                    ('Presence', 55),
+                    ('Volume', 56),
+                    ('Stereo', 57),
+                    ('Bass Freq', 58),
+                    ('Middle Freq', 59),
+                    ('Treble Freq', 60),
+                    ('Presence Freq', 61),
+                    ('Limiter On/Off', 62),
+                    ('Chorus/Delay Type', 64),
+                    ('Reverb Type', 66),
+                    ('Limiter', 68),
+                    ('Speed/Time', 69),
+                    ('Depth/Feedback', 70),
+                    ('Chorus/Delay Level', 71),
+                    ('Reverb Level', 72))),
+ 'AmpMultiFlange': (56,
+                    'Amp Multi Flange',
+                    (('Compressor Threshold', 34),
+                     ('Flanger Delay', 35),
+                     ('Delay Feedback', 36),
+                     ('Reverb Ini. Delay', 37),
+                     ('Amp Type', 43),
+                     ('Gain', 51),
+                     ('Master', 52),
+                     ('Bass', 53),
+                     ('Middle', 54),
+                     ('Treble', 55),
+                     ('Presence', 56),
+                     ('Volume', 57),
+                     ('Stereo', 58),
+                     ('Bass Freq', 59),
+                     ('Middle Freq', 60),
+                     ('Treble Freq', 61),
+                     ('Presence Freq', 62),
+                     ('Flanger Type', 64),
+                     ('Flanger Speed', 65),
+                     ('Flanger Depth', 66),
+                     ('Flanger Feedback', 67),
+                     ('Flanger Manual', 68),
+                     ('Flanger Mix', 69),
+                     ('Flanger Stereo', 70),
+                     ('Flanger Depth', 85),
+                     ('Flanger Feedback', 86),
+                     ('Delay Level', 99),
+                     ('High Pass Filter', 103),
+                     ('Low Pass Filter', 104))),
+ 'BassPreamp': (64,
+                'Bass Preamp',
+                (('Type', 32),
+                 ('Gain', 40),
+                 ('Master', 41),
+                 ('Bass', 42),
+                 ('Middle', 43),
+                 ('Treble', 51),
+                 ('Presence', 52),
+                 ('Volume', 53),
+                 ('Stereo', 54))),
+ 'Chorus': (18,
+            'Chorus',
+            (('Modulation Delay', 32),
+             ('Frequency', 40),
+             ('Depth', 41),
+             ('Feedback', 42),
+             ('Wave', 43),
+             ('LSH Frequency', 51),
+             ('LSH Gain', 52),
+             ('EQ Frequency', 53),
+             ('EQ Gain', 54),
+             ('EQ Q', 55),
+             ('HSH Frequency', 56),
+             ('HSH Gain', 57),
+             ('Mix', 61))),
+ 'Compressor': (54,
+                'Compressor',
+                (('Threshold', 32),
+                 ('Ratio', 51),
+                 ('Attack', 52),
+                 ('Release', 53),
+                 ('Knee', 54),
+                 ('Gain', 55))),
+ 'Distortion': (47,
+                'Distortion',
+                (('EQ 1 Frequency', 32),
+                 ('Pre EQ Level', 33),
+                 ('Gain', 40),
+                 ('Master', 41),
+                 ('Tone', 42),
+                 ('Type', 43),
+                 ('EQ 1 Gain', 51),
+                 ('EQ 1 Q', 52),
+                 ('EQ 2 Frequency', 53),
+                 ('EQ 2 Gain', 54),
+                 ('EQ 2 Q', 55),
+                 ('EQ 3 Frequency', 56),
+                 ('EQ 3 Gain', 57),
+                 ('EQ 3 Q', 58),
+                 ('EQ 4 Frequency', 59),
+                 ('EQ 4 Gain', 60),
+                 ('EQ 4 Q', 61),
+                 ('Pre EQ 1 Frequency', 64),
+                 ('Pre EQ 1 Gain', 65),
+                 ('Pre EQ 1 Q', 66),
+                 ('Pre EQ 2 Frequency', 67),
+                 ('Pre EQ 2 Gain', 68),
+                 ('Pre EQ 2 Q', 69),
+                 ('Pre EQ 3 Frequency', 70),
+                 ('Pre EQ 3 Gain', 71),
+                 ('Pre EQ 3 Q', 72),
+                 ('Noise Gate Threshold', 74),
+                 ('Noise Gate Attack', 75),
+                 ('Noise Gate Hold', 76),
+                 ('Noise Gate Decay', 77))),
+ 'Flange': (19,
+            'Flange',
+            (('Modulation Delay', 32),
+             ('Frequency', 40),
+             ('Depth', 41),
+             ('Feedback', 42),
+             ('Wave', 43),
+             ('LSH Frequency', 51),
+             ('LSH Gain', 52),
+             ('EQ Frequency', 53),
+             ('EQ Gain', 54),
+             ('EQ Q', 55),
+             ('HSH Frequency', 56),
+             ('HSH Gain', 57),
+             ('Mix', 61))),
+ 'MonoDelay': (13,
+               'Mono Delay',
+               (('Time', 32),
+                ('Feedback', 40),
+                ('Level', 41),
+                ('High Pass Filter', 42),
+                ('Low Pass Filter', 43),
+                ('Tempo', 51),
+                ('Note', 52),
+                ('Dotted', 53),
+                ('Triplet', 54))),
+ 'Phaser': (21,
+            'Phaser',
+            (('Offset', 32),
+             ('Frequency', 40),
+             ('Depth', 41),
+             ('Feedback Gain', 42),
+             ('Stage', 43),
+             ('Phase', 51),
+             ('LSH Frequency', 52),
+             ('LSH Gain', 53),
+             ('HSH Frequency', 54),
+             ('HSH Gain', 55),
+             ('Mix', 61))),
+ 'Reverb': (9,
+            'Reverb',
+            (('Type', 32),
+             ('Decay', 40),
+             ('Pre Delay', 41),
+             ('High Cut', 42),
+             ('Low Cut', 43),
+             ('Level', 51),
+             ('Mix', 52),
+             ('Stereo', 53))),
+ 'SpringReverb': (52, 'Spring Reverb', (('Reverb', 32),)),
+ 'TapeEcho': (53, 'Tape Echo', (('Time', 32), ('Feedback', 51), ('Level', 52))),
+ 'ThreeBandParametricEQ': (51,
+                           'Three Band Parametric E Q',
+                           (('Level', 32),
+                            ('EQ 1 Frequency', 40),
+                            ('EQ 2 Frequency', 41),
+                            ('EQ 3 Frequency', 42),
+                            ('EQ 1 Gain', 53),
+                            ('EQ 2 Gain', 54),
+                            ('EQ 3 Gain', 55),
+                            ('EQ 1 Q', 59),
+                            ('EQ 2 Q', 60),
+                            ('EQ 3 Q', 61))),
+ 'Tremolo': (23,
+             'Tremolo',
+             (('Rate', 32),
+              ('Depth', 40),
+              ('Wave', 41),
+              ('Phase', 42),
+              ('Offset', 43),
+              ('LSH Frequency', 51),
+              ('LSH Gain', 52),
+              ('HSH Frequency', 53),
+              ('HSH Gain', 54),
+              ('Mix', 61)))}
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Test Detector Outputs and Remapping
+===================================
+
+Checks that patches can be re-derived from the stored raw detector outputs
+and that remapping only rewrites the patches whose decision changes.
+"""
+
+import copy
+import io
+import json
+import os
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from analyze2json import AudioAnalyzer, detectors_path, remap_library, save_analysis
+from config import DETECTION_THRESHOLDS
+
+SAMPLE_RATE = 22050
+
+
+def make_signals():
+    rng = np.random.default_rng(0)
+    t = np.arange(int(0.6 * SAMPLE_RATE)) / SAMPLE_RATE
+
+    echo = np.zeros_like(t)
+    echo[:1000] = rng.normal(size=1000)
+    start = int(0.25 * SAMPLE_RATE)
+    echo[start:start + 1000] += 0.7 * echo[:1000]
+
+    return {
+        'echo': echo,
+        'clipped': np.clip(3 * np.sin(2 * np.pi * 110 * t), -1, 1),
+        'noise': rng.normal(size=len(t)) * np.exp(-3 * t),
+    }
+
+
+class TestRemap(unittest.TestCase):
+    """Test measure / decide split and library remapping."""
+
+    @classmethod
+    def setUpClass(cls):
+        analyzer = AudioAnalyzer(sample_rate=SAMPLE_RATE)
+        cls.analyses = {}
+        with redirect_stdout(io.StringIO()):
+            for name, y in make_signals().items():
+                detectors = analyzer.measure(y.astype(np.float32), input_file=f"{name}.wav")
+                cls.analyses[name] = (analyzer.map_detectors(detectors), detectors)
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.library = Path(self.tmp.name)
+        for name, (patch, detectors) in self.analyses.items():
+            save_analysis(patch, detectors, self.library / f"{name}.json")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def analyzer(self, **overrides):
+        thresholds = copy.deepcopy(DETECTION_THRESHOLDS)
+        for key, value in overrides.items():
+            detector, name = key.split('__')
+            thresholds[detector][name] = value
+        return AudioAnalyzer(sample_rate=SAMPLE_RATE, thresholds=thresholds, quiet=True)
+
+    def test_detectors_are_stored_next_to_the_patch(self):
+        raw_path = detectors_path(self.library / "echo.json")
+        self.assertEqual(raw_path.name, "echo.detectors.json")
+        with open(raw_path, encoding='utf-8') as f:
+            detectors = json.load(f)
+        self.assertEqual(detectors['patch_file'], "echo.json")
+        self.assertIn('clipping_ratio', detectors['distortion'])
+
+        time_ms, height = detectors['delay']['peaks'][0]
+        self.assertAlmostEqual(time_ms, 250, delta=1)
+        self.assertTrue(self.analyses['echo'][0]['delay']['enabled'])
+
+    def test_remap_with_same_thresholds_rewrites_nothing(self):
+        result = remap_library([self.library], self.analyzer())
+        self.assertEqual(result['changed'], [])
+        self.assertEqual(len(result['unchanged']), 3)
+        self.assertEqual(result['stale'], [])
+
+    def test_remap_rewrites_only_changed_decisions(self):
+        before = {path: path.read_bytes() for path in self.library.glob('*.json')}
+
+        with_delay = sorted(self.library / f"{name}.json" for name, (patch, _) in self.analyses.items()
+                            if patch['delay']['enabled'])
+        self.assertIn(self.library / "echo.json", with_delay)
+        self.assertNotIn(self.library / "noise.json", with_delay)
+
+        result = remap_library([self.library], self.analyzer(delay__min_peak_height=0.99))
+        self.assertEqual(result['changed'], with_delay)
+
+        after = {path: path.read_bytes() for path in self.library.glob('*.json')}
+        self.assertEqual(sorted(path for path in before if before[path] != after[path]), with_delay)
+        with open(self.library / "echo.json", encoding='utf-8') as f:
+            self.assertFalse(json.load(f)['delay']['enabled'])
+
+    def test_dry_run_and_stale_measurements(self):
+        result = remap_library([self.library], self.analyzer(distortion__clipping_threshold=0.5,
+                                                             distortion__min_thd=100.0,
+                                                             distortion__min_clipping_ratio=1.0),
+                               dry_run=True)
+        self.assertEqual(len(result['stale']), 3)
+        self.assertIn(self.library / "clipped.json", result['changed'])
+
+        with open(self.library / "clipped.json", encoding='utf-8') as f:
+            self.assertEqual(json.load(f), json.loads(json.dumps(self.analyses['clipped'][0])))
+
+    def test_amp_model_follows_config_bounds(self):
+        analyzer = AudioAnalyzer(quiet=True)
+        self.assertEqual(analyzer.select_amp_model({'spectral_centroid_mean': 3500,
+                                                    'spectral_bandwidth_mean': 2000}), "BRIT_TOP_BOOST")
+        self.assertEqual(analyzer.select_amp_model({'spectral_centroid_mean': 1500,
+                                                    'spectral_bandwidth_mean': 800}), "TWEED_BASSMAN")
+        self.assertEqual(analyzer.select_amp_model({'spectral_centroid_mean': 3500,
+                                                    'spectral_bandwidth_mean': 800}), "JCM800")
+
+
+if __name__ == '__main__':
+    unittest.main()
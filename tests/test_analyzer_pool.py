@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Test Analyzer Pool
+==================
+
+Checks that pooled analyzers are reused, never shared between concurrent
+jobs and never created beyond the pool size.
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+import numpy as np
+import soundfile as sf
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from analyzers.pool import AnalyzerPool, get_analyzer_pool
+
+
+class RecordingAnalyzer:
+    """Fake analyzer that fails if two jobs use it at the same time."""
+
+    def __init__(self):
+        self.busy = False
+        self.jobs = 0
+
+    def get_backend_name(self):
+        return 'recording'
+
+    def analyze(self, path):
+        assert not self.busy, "analyzer shared between concurrent jobs"
+        self.busy = True
+        time.sleep(0.01)
+        self.jobs += 1
+        self.busy = False
+        return {'path': path, 'analyzer': id(self)}
+
+
+class TestAnalyzerPool(unittest.TestCase):
+    """Test reuse, exclusivity and concurrency cap."""
+
+    def make_pool(self, size, prewarm=1):
+        self.instances = []
+        self.running = 0
+        self.max_running = 0
+
+        def factory():
+            instance = RecordingAnalyzer()
+            self.instances.append(instance)
+            return instance
+
+        return AnalyzerPool(size=size, prewarm=prewarm, factory=factory)
+
+    def test_concurrent_jobs_are_capped_and_reuse_instances(self):
+        pool = self.make_pool(size=3)
+        lock = threading.Lock()
+
+        def job(analyzer, path):
+            with lock:
+                self.running += 1
+                self.max_running = max(self.max_running, self.running)
+            try:
+                return analyzer.analyze(path)
+            finally:
+                with lock:
+                    self.running -= 1
+
+        threads = [threading.Thread(target=pool.run, args=(job, f"file{i}.wav")) for i in range(24)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertLessEqual(self.max_running, 3)
+        self.assertLessEqual(pool.created, 3)
+        self.assertEqual(sum(instance.jobs for instance in self.instances), 24)
+        self.assertEqual(pool.in_use, 0)
+
+    def test_sequential_jobs_use_one_warm_instance(self):
+        pool = self.make_pool(size=4)
+        results = pool.analyze_many(["first.wav"])
+        results += [pool.analyze("again.wav") for _ in range(5)]
+        self.assertEqual(pool.created, 1)
+        self.assertEqual(len({result['analyzer'] for result in results}), 1)
+        self.assertEqual(pool.backend_name, 'recording')
+
+    def test_timeout_when_exhausted(self):
+        pool = self.make_pool(size=1)
+        with pool.analyzer():
+            with self.assertRaises(TimeoutError):
+                with pool.analyzer(timeout=0.01):
+                    pass
+        with pool.analyzer(timeout=0.01) as analyzer:
+            self.assertIs(analyzer, self.instances[0])
+
+    def test_process_wide_pool_with_tone_matcher(self):
+        from auto_tone_match_magicstomp import AutoToneMatcher
+
+        pool = get_analyzer_pool('librosa', 22050, size=2)
+        self.assertIs(get_analyzer_pool('librosa', 22050), pool)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "tone.wav")
+            t = np.arange(22050) / 22050
+            sf.write(path, 0.5 * np.sin(2 * np.pi * 220 * t), 22050)
+
+            matcher = AutoToneMatcher(pool=pool)
+            self.assertIsNone(matcher.analyzer)
+            self.assertEqual(matcher.backend_name, 'librosa')
+            features = matcher.analyze_audio(path)
+            self.assertGreater(features['spectral_centroid_mean'], 0)
+            AutoToneMatcher(pool=pool).analyze_audio(path)
+        self.assertEqual(pool.created, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Test Hardware Capture Cache
+===========================
+
+Tests keys, persistence, memory-mapped reads, LRU eviction and statistics
+of the capture cache, and its use by the HIL tone matcher.
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from cli.auto_match_hil import HILToneMatcher
+from hil.capture_cache import CaptureCache, audio_fingerprint, calibration_fingerprint
+from hil.loopback import LoopbackBackend
+from simulation.magicstomp import SimulatedMagicstomp
+
+SAMPLE_RATE = 8000
+HIL_SAMPLE_RATE = 44100
+
+
+def make_key(cache, patch_byte=0, di=None, latency=100):
+    state = [0] * 159
+    state[40] = patch_byte
+    di = np.zeros(100, dtype=np.float32) if di is None else di
+    return CaptureCache.make_key(state, cache.di_fingerprint(di),
+                                 calibration_fingerprint(SAMPLE_RATE, latency, 1.0))
+
+
+class TestCaptureCache(unittest.TestCase):
+    """Test the on-disk capture cache."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.capture = np.sin(np.arange(4000) / 10.0).astype(np.float32) * 0.5
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_round_trip_is_memory_mapped_and_persistent(self):
+        cache = CaptureCache(self.directory.name)
+        key = make_key(cache)
+        self.assertIsNone(cache.get(key))
+        cache.put(key, self.capture, SAMPLE_RATE)
+        cache.close()
+
+        reopened = CaptureCache(self.directory.name)
+        cached = reopened.get(key)
+        self.assertIsInstance(cached, np.memmap)
+        np.testing.assert_array_equal(cached, self.capture)
+        self.assertEqual(reopened.get_statistics()['hits'], 1)
+        self.assertEqual(reopened.hit_rate, 1.0)
+
+    def test_key_depends_on_state_di_and_calibration(self):
+        cache = CaptureCache(self.directory.name)
+        reference = make_key(cache)
+        self.assertEqual(reference, make_key(cache))
+        self.assertNotEqual(reference, make_key(cache, patch_byte=1))
+        self.assertNotEqual(reference, make_key(cache, di=np.ones(100, dtype=np.float32)))
+        self.assertNotEqual(reference, make_key(cache, latency=101))
+        with self.assertRaises(ValueError):
+            CaptureCache.make_key([0] * 158, audio_fingerprint(self.capture), 'x')
+
+    def test_least_recently_used_entries_are_evicted(self):
+        entry_bytes = self.capture.nbytes + 128
+        cache = CaptureCache(self.directory.name, max_bytes=int(2.5 * entry_bytes))
+        keys = [make_key(cache, patch_byte=i) for i in range(3)]
+        cache.put(keys[0], self.capture, SAMPLE_RATE)
+        cache.put(keys[1], self.capture, SAMPLE_RATE)
+        cache.get(keys[0])  # keys[1] becomes the oldest
+        cache.put(keys[2], self.capture, SAMPLE_RATE)
+
+        self.assertIn(keys[0], cache)
+        self.assertNotIn(keys[1], cache)
+        self.assertIn(keys[2], cache)
+        self.assertEqual(cache.evictions, 1)
+        self.assertLessEqual(cache.total_bytes, cache.max_bytes)
+
+    def test_flac_format(self):
+        cache = CaptureCache(self.directory.name, capture_format='flac')
+        key = make_key(cache)
+        cache.put(key, self.capture, SAMPLE_RATE)
+        np.testing.assert_allclose(cache.get(key), self.capture, atol=1e-6)
+
+
+class TestHILCaptureCache(unittest.TestCase):
+    """Test that the HIL tone matcher replays a measured patch from the cache."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        backend = LoopbackBackend(processor=SimulatedMagicstomp(sample_rate=HIL_SAMPLE_RATE),
+                                  noise_db=None)
+        self.matcher = HILToneMatcher('librosa', sample_rate=HIL_SAMPLE_RATE, audio_backend=backend)
+        self.matcher.setup_audio_devices('Loopback', 'Loopback')
+        self.matcher.di_signal = (0.3 * np.sin(np.arange(4000) / 5.0)).astype(np.float32)
+        self.matcher.enable_capture_cache(self.directory.name)
+
+    def tearDown(self):
+        self.matcher.cleanup()
+        self.directory.cleanup()
+
+    def capture(self, patch):
+        self.assertTrue(self.matcher.send_patch_to_magicstomp(patch))
+        return self.matcher.capture_magicstomp_output(wait_time=0)
+
+    def test_measured_patch_is_not_played_again(self):
+        manager = self.matcher.audio_manager
+        with mock.patch.object(manager, 'play_and_record',
+                               wraps=manager.play_and_record) as play:
+            first = self.capture({"amp": {"gain": 0.4}})
+            self.capture({"amp": {"gain": 0.9}})
+            again = self.capture({"amp": {"gain": 0.4}})
+
+        self.assertEqual(play.call_count, 2)
+        np.testing.assert_array_equal(again, first)
+        self.assertEqual(self.matcher.capture_cache.get_statistics()['hits'], 1)
+
+    def test_capture_before_any_send_is_not_cached(self):
+        self.matcher.capture_magicstomp_output(wait_time=0)
+        self.assertEqual(len(self.matcher.capture_cache), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
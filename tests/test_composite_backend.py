@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Test Composite Backend Routing
+==============================
+
+Tests the per-feature agreement checks, the routing choice and the
+per-machine benchmark profile of the composite analyzer.
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from analyzers.composite import FEATURES, CompositeAnalyzer, benchmark_signal, choose_routing, results_agree
+from analyzers.librosa_backend import LibrosaAnalyzer
+
+SAMPLE_RATE = 22050
+
+
+class QuickAnalyzer(LibrosaAnalyzer):
+    """Fake backend: instant but wrong centroid, instant and right tempo."""
+
+    tempo = None
+
+    def spectral_centroid_mean(self, y, sr):
+        return 1.0
+
+    def tempo_bpm(self, y, sr):
+        return self.tempo
+
+
+class CachingAnalyzer(LibrosaAnalyzer):
+    """Fake backend: slow first tempo call per signal, cached afterwards."""
+
+    def __init__(self, sample_rate):
+        super().__init__(sample_rate)
+        self.cached = None
+
+    def tempo_bpm(self, y, sr):
+        if self.cached is None:
+            time.sleep(0.05)
+            self.cached = (super().tempo_bpm(y, sr),)
+        return self.cached[0]
+
+    def clear_cache(self):
+        self.cached = None
+
+
+class TestRouting(unittest.TestCase):
+    """Test agreement checks and routing choice."""
+
+    def test_results_agree_uses_equivalence_tolerances(self):
+        self.assertTrue(results_agree('spectral_centroid_mean', 1000.0, 1090.0))
+        self.assertFalse(results_agree('spectral_centroid_mean', 1000.0, 1200.0))
+        self.assertTrue(results_agree('spectral_tilt_db', -10.0, -12.5))
+        self.assertFalse(results_agree('onset_delay_ms', (100.0, 0.3), (100.0, 0.7)))
+        self.assertTrue(results_agree('thd_proxy', 0.001, 0.009))
+        self.assertTrue(results_agree('lfo_rate_hz', (None, 0.1), (5.0, 0.2)))
+        self.assertFalse(results_agree('tempo_bpm', None, 120.0))
+
+    def test_choose_routing(self):
+        timings = {'tempo_bpm': {'librosa': 0.5, 'essentia': 0.1},
+                   'thd_proxy': {'librosa': 0.5, 'essentia': 0.1}}
+        agrees = {'tempo_bpm': {'librosa': True, 'essentia': True},
+                  'thd_proxy': {'librosa': True, 'essentia': False}}
+        self.assertEqual(choose_routing(timings, agrees, 'librosa'),
+                         {'tempo_bpm': 'essentia', 'thd_proxy': 'librosa'})
+
+
+class TestCompositeAnalyzer(unittest.TestCase):
+    """Test benchmarking, profile caching and delegation."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.reference = LibrosaAnalyzer(SAMPLE_RATE)
+        QuickAnalyzer.tempo = cls.reference.tempo_bpm(benchmark_signal('tempo_bpm', SAMPLE_RATE), SAMPLE_RATE)
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.profile_path = Path(self.tmp.name) / "profile.json"
+        self.backends = {'librosa': self.reference, 'quick': QuickAnalyzer(SAMPLE_RATE)}
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def create(self, **kwargs):
+        return CompositeAnalyzer(self.backends, kwargs.pop('sample_rate', SAMPLE_RATE),
+                                 profile_path=self.profile_path, repeats=kwargs.pop('repeats', 1), **kwargs)
+
+    def test_routes_to_fastest_agreeing_backend(self):
+        analyzer = self.create()
+        self.assertEqual(analyzer.routing['spectral_centroid_mean'], 'librosa')
+        self.assertEqual(analyzer.routing['tempo_bpm'], 'quick')
+        self.assertEqual(set(analyzer.routing), set(FEATURES))
+
+        y = benchmark_signal('spectral_centroid_mean', SAMPLE_RATE)
+        self.assertGreater(analyzer.spectral_centroid_mean(y, SAMPLE_RATE), 100)
+        self.assertEqual(analyzer.get_backend_name(), 'composite')
+
+        rows = {row['feature']: row for row in analyzer.routing_table()}
+        self.assertFalse(rows['spectral_centroid_mean']['agrees']['quick'])
+        self.assertIn('librosa', rows['tempo_bpm']['timings_s'])
+
+    def test_profile_is_reused_until_stale(self):
+        first = self.create()
+        with open(self.profile_path, encoding='utf-8') as f:
+            self.assertEqual(json.load(f)['routing'], first.routing)
+
+        with mock.patch.object(CompositeAnalyzer, 'benchmark', side_effect=AssertionError("re-benchmarked")):
+            self.assertEqual(self.create().routing, first.routing)
+
+        with mock.patch.object(CompositeAnalyzer, 'benchmark', return_value=first.profile) as benchmark:
+            self.create(sample_rate=16000)
+        benchmark.assert_called_once()
+
+    def test_benchmark_clears_backend_caches(self):
+        self.backends = {'librosa': self.reference, 'caching': CachingAnalyzer(SAMPLE_RATE)}
+        analyzer = self.create(repeats=3)
+        self.assertGreaterEqual(analyzer.profile['timings_s']['tempo_bpm']['caching'], 0.05)
+
+
+if __name__ == '__main__':
+    unittest.main()
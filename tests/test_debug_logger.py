@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Test Asynchronous Debug Logger
+==============================
+
+Tests for level/category filtering, deferred formatting and the bounded
+ring buffer of the debug logger.
+"""
+
+import logging
+import os
+import sys
+import tempfile
+import unittest
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from debug_logger import DebugLogger
+
+
+class TestDebugLogger(unittest.TestCase):
+    """Test the ring-buffered debug logger."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.log_path = os.path.join(self.tmpdir.name, "debug.log")
+        self.logger = DebugLogger(self.log_path, echo=False)
+
+    def tearDown(self):
+        self.logger.close()
+        self.tmpdir.cleanup()
+
+    def read_log(self):
+        self.logger.close()
+        with open(self.log_path, encoding="utf-8") as handle:
+            return handle.read()
+
+    def test_traffic_is_formatted_by_writer(self):
+        """Traffic records are written as hex by the background thread."""
+        self.logger.log_traffic("OUT", [0xF0, 0x43, 0x7D, 0xF7], "SYSEX")
+        self.logger.log("hello")
+
+        content = self.read_log()
+        self.assertIn("SYSEX OUT len=4  F0 43 7D F7", content)
+        self.assertIn("hello", content)
+
+    def test_category_and_level_filtering(self):
+        """Disabled categories and low levels are never buffered."""
+        self.logger.set_category_enabled("midi", False)
+        self.logger.set_category_enabled("midi.pc", True)
+        self.logger.set_level(logging.INFO)
+
+        self.assertFalse(self.logger.is_enabled("midi.sysex.out", logging.WARNING))
+        self.assertTrue(self.logger.is_enabled("midi.pc.out", logging.WARNING))
+        self.assertFalse(self.logger.is_enabled("debug", logging.DEBUG))
+
+        self.logger.log_traffic("OUT", [0xF0, 0xF7], "SYSEX", level=logging.WARNING)
+        self.logger.log("filtered", level=logging.DEBUG)
+        self.assertEqual(self.logger.pending, 0)
+        self.assertFalse(self.logger.running)
+
+    def test_ring_buffer_drops_oldest(self):
+        """A full buffer keeps the newest records and counts the drops."""
+        logger = DebugLogger(self.log_path, capacity=4, echo=False, flush_interval=10.0)
+        logger.start()  # the writer sleeps for flush_interval before draining
+        for i in range(10):
+            logger.log(f"message {i}")
+
+        self.assertEqual(logger.dropped, 6)
+        self.assertEqual(logger.pending, 4)
+        logger.close()
+        self.assertFalse(logger.running)
+
+        content = self.read_log()
+        self.assertNotIn("message 5", content)
+        for i in range(6, 10):
+            self.assertIn(f"message {i}", content)
+
+    def test_disabled_traffic_follows_category_changes(self):
+        """Traffic categories are cached but re-evaluated when rules change."""
+        self.logger.set_category_enabled("midi.sysex.out", False)
+        self.logger.log_traffic("OUT", [0xF0, 0xF7], "SYSEX")
+        self.assertEqual(self.logger.pending, 0)
+
+        self.logger.set_category_enabled("midi.sysex.out", True)
+        self.logger.log_traffic("OUT", [0xF0, 0xF7], "SYSEX")
+        self.assertIn("SYSEX OUT len=2  F0 F7", self.read_log())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Test Early Abort of Hopeless Candidates
+=======================================
+
+Tests for the early-abort policy on streamed captures and for censored
+evaluations in the coordinate search optimizer.
+"""
+
+import os
+import sys
+import unittest
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from optimize.early_stop import CensoredLoss, EarlyAbortPolicy, is_censored
+from optimize.loss import PerceptualLoss
+from optimize.search import CoordinateSearchOptimizer, ParameterSpace
+
+
+def stream_with_abort(accumulator, processed, policy, best_loss, block_size=1024):
+    """Feed blocks until the policy aborts; return (loss, samples played)."""
+    total_frames = min(accumulator.target_frames, 1 + len(processed) // accumulator.HOP_LENGTH)
+    accumulator.reset()
+    for start in range(0, len(processed), block_size):
+        accumulator.push(processed[start:start + block_size])
+        if policy.should_abort(accumulator.partial_loss(), accumulator.frames_processed,
+                               total_frames, best_loss):
+            return (policy.censor(accumulator.partial_loss(), accumulator.frames_processed,
+                                  total_frames), start + block_size)
+    return accumulator.finish(), len(processed)
+
+
+class TestEarlyAbortPolicy(unittest.TestCase):
+    """Test abort decisions on partial losses."""
+
+    def test_hard_bound_and_margin(self):
+        policy = EarlyAbortPolicy(margin=0.25, min_fraction=0.1)
+        # Never abort without a finite best loss
+        self.assertFalse(policy.should_abort(100.0, 10, 100, float('inf')))
+        # Hard bound: 5% heard but already 25x the best loss
+        self.assertTrue(policy.should_abort(25.0, 5, 100, 1.0))
+        # Before min_fraction only the hard bound applies
+        self.assertFalse(policy.should_abort(2.0, 5, 100, 1.0))
+        # After min_fraction the margin applies
+        self.assertTrue(policy.should_abort(1.3, 10, 100, 1.0))
+        self.assertFalse(policy.should_abort(1.2, 10, 100, 1.0))
+
+    def test_bad_candidate_stops_early_good_candidate_completes(self):
+        """On a 10 s capture a bad candidate is stopped within 20%."""
+        sample_rate = 44100
+        t = np.arange(sample_rate * 10) / sample_rate
+        target = 0.5 * np.sin(2 * np.pi * 196 * t)
+        rng = np.random.default_rng(0)
+        good = target + 0.01 * rng.standard_normal(len(t))
+        bad = np.sign(target) * 0.5
+
+        loss = PerceptualLoss(sample_rate)
+        accumulator = loss.streaming(target)
+        policy = EarlyAbortPolicy()
+
+        best, played = stream_with_abort(accumulator, good, policy, float('inf'))
+        self.assertFalse(is_censored(best))
+        self.assertEqual(played, len(good))
+
+        again, played = stream_with_abort(accumulator, good, policy, best)
+        self.assertFalse(is_censored(again))
+
+        censored, played = stream_with_abort(accumulator, bad, policy, best)
+        self.assertTrue(is_censored(censored))
+        self.assertGreater(censored, best)
+        self.assertLess(played / len(bad), 0.2)
+
+
+class TestCensoredOptimization(unittest.TestCase):
+    """Test that the optimizer passes the bound and counts censored results."""
+
+    def test_coordinate_search_counts_censored(self):
+        space = ParameterSpace()
+        bounds = []
+
+        def loss_function(params, bound=None):
+            bounds.append(bound)
+            value = sum((v - 0.3) ** 2 for v in params.values())
+            if bound is not None and value > bound * 1.5:
+                return CensoredLoss(bound * 1.5, 0.2)
+            return value
+
+        optimizer = CoordinateSearchOptimizer(space, loss_function, max_iterations=3,
+                                              bounded_loss=True)
+        results = optimizer.optimize()
+
+        self.assertEqual(bounds[0], float('inf'))
+        self.assertEqual(results['evaluations'], len(bounds))
+        self.assertLessEqual(results['censored_evaluations'], results['evaluations'])
+        self.assertFalse(is_censored(results['final_loss']))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Test Essentia Streaming Analyzer
+================================
+
+Tests the framewise post-processing of the streaming network and, when
+Essentia is installed, that one network run yields every feature.
+"""
+
+import os
+import sys
+import unittest
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from analyzers.essentia_streaming import (ESSENTIA_STREAMING_AVAILABLE, _delay_from_onsets,
+                                          _lfo_from_envelope, _reverb_from_frames)
+
+SAMPLE_RATE = 44100
+HOP_SIZE = 512
+FRAME_RATE = SAMPLE_RATE / HOP_SIZE
+
+
+def frame_rms(y):
+    frames = y[:len(y) // HOP_SIZE * HOP_SIZE].reshape(-1, HOP_SIZE)
+    return np.sqrt(np.mean(frames ** 2, axis=1))
+
+
+class TestFramewiseFeatures(unittest.TestCase):
+    """Test the features derived from per-frame descriptors."""
+
+    def test_lfo_from_rms_envelope(self):
+        t = np.arange(2 * SAMPLE_RATE) / SAMPLE_RATE
+        y = np.sin(2 * np.pi * 440 * t) * (1 + 0.3 * np.sin(2 * np.pi * 5 * t))
+        rate, strength = _lfo_from_envelope(frame_rms(y), FRAME_RATE)
+        self.assertAlmostEqual(rate, 5.0, delta=0.5)
+        self.assertGreater(strength, 0.1)
+
+        self.assertEqual(_lfo_from_envelope(np.ones(200), FRAME_RATE), (None, 0.0))
+
+    def test_delay_from_onsets(self):
+        onset = np.zeros(400)
+        onset[::100] = 1.0
+        delay_ms, feedback = _delay_from_onsets(onset, FRAME_RATE)
+        self.assertAlmostEqual(delay_ms, 100 * 1000 / FRAME_RATE, delta=1)
+        self.assertGreater(feedback, 0)
+        self.assertEqual(_delay_from_onsets(np.zeros(1), FRAME_RATE), (0.0, 0.0))
+
+    def test_reverb_from_tail(self):
+        rms = np.exp(-np.arange(400) / FRAME_RATE)
+        decay_s, mix = _reverb_from_frames(rms, 0.2, 1.0, HOP_SIZE, 2048, SAMPLE_RATE)
+        self.assertAlmostEqual(decay_s, np.log(10), delta=0.05)
+        self.assertAlmostEqual(mix, 0.3)
+        self.assertEqual(_reverb_from_frames(rms, 0.0, 1.0, HOP_SIZE, 2048, SAMPLE_RATE), (0.0, 0.0))
+
+
+@unittest.skipUnless(ESSENTIA_STREAMING_AVAILABLE, "Essentia not available")
+class TestStreamingNetwork(unittest.TestCase):
+    """Test the streaming network end to end."""
+
+    def test_single_run_for_all_features(self):
+        from analyzers.essentia_streaming import EssentiaStreamingAnalyzer
+
+        analyzer = EssentiaStreamingAnalyzer(SAMPLE_RATE)
+        t = np.arange(2 * SAMPLE_RATE) / SAMPLE_RATE
+        y = (0.7 * np.sin(2 * np.pi * 440 * t)).astype(np.float32)
+
+        features = analyzer.analyze_signal(y, SAMPLE_RATE)
+        self.assertAlmostEqual(features['spectral_centroid_mean'], 440, delta=150)
+        self.assertEqual(analyzer.spectral_centroid_mean(y, SAMPLE_RATE), features['spectral_centroid_mean'])
+        self.assertEqual(analyzer.get_backend_name(), 'essentia_streaming')
+
+
+if __name__ == '__main__':
+    unittest.main()
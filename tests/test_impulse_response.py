@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Test Impulse Response Characterization
+======================================
+
+Measures impulse responses of a simulated echo through the loopback audio
+backend and checks the convolution predictions and the bank persistence.
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+from scipy import signal
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from hil.impulse_response import ImpulseResponseBank, ImpulseResponseCapture, parameter_grid
+from hil.io import AudioDeviceManager
+from hil.loopback import LoopbackBackend
+
+SAMPLE_RATE = 8000
+
+
+class Echo:
+    """Linear device: dry signal plus one echo of settable delay and level."""
+
+    def __init__(self):
+        self.parameters = {'time': 400, 'level': 0.5}
+
+    def process_audio(self, audio):
+        output = np.array(audio, dtype=np.float64)
+        delay = int(self.parameters['time'])
+        output[delay:] += self.parameters['level'] * audio[:-delay]
+        return output
+
+
+def make_capture(device):
+    backend = LoopbackBackend(processor=device, sample_rate=SAMPLE_RATE, latency=120, noise_db=None)
+    manager = AudioDeviceManager(SAMPLE_RATE, backend=backend)
+    manager.set_input_device(0)
+    manager.set_output_device(0)
+    manager.round_trip_latency = 120
+    return ImpulseResponseCapture(manager, sweep_duration=1.0, ir_duration=0.2)
+
+
+class TestImpulseResponse(unittest.TestCase):
+    """Test measurement, prediction and persistence."""
+
+    def test_measured_response_predicts_the_device(self):
+        device = Echo()
+        capture = make_capture(device)
+        ir = capture.measure()
+
+        # Band-limited pulse at the latency-compensated origin, echo after it
+        self.assertEqual(int(np.argmax(ir)), 0)
+        self.assertAlmostEqual(float(ir[400] / ir[0]), 0.5, delta=0.02)
+
+        # DI within the band of the sweep
+        noise = np.random.default_rng(0).standard_normal(4000) * 0.2
+        di = signal.sosfilt(signal.butter(4, [100, 3000], btype='band', fs=SAMPLE_RATE, output='sos'), noise)
+        bank = ImpulseResponseBank(SAMPLE_RATE)
+        bank.add(0x0D, device.parameters, ir)
+        predicted = bank.predict(0x0D, device.parameters, di)
+        expected = device.process_audio(di)
+        error = np.sqrt(np.mean((predicted - expected) ** 2) / np.mean(expected ** 2))
+        self.assertLess(error, 0.08)
+
+    def test_characterize_grid_and_interpolate(self):
+        device = Echo()
+        capture = make_capture(device)
+        settings = parameter_grid({'time': [400], 'level': [0.2, 0.8]})
+        self.assertEqual(len(settings), 2)
+
+        bank = capture.characterize(0x0D, settings, device.parameters.update)
+        self.assertEqual(len(bank), 2)
+        ir = bank.impulse_response(0x0D, {'time': 400, 'level': 0.5})
+        # Halfway between the measurements: blended echo level
+        self.assertAlmostEqual(float(ir[400] / ir[0]), 0.5, delta=0.02)
+
+    def test_characterize_fills_the_given_bank(self):
+        device = Echo()
+        capture = make_capture(device)
+        bank = ImpulseResponseBank(SAMPLE_RATE)
+        filled = capture.characterize(0x0D, [{'time': 400, 'level': 0.5}], device.parameters.update,
+                                      bank=bank)
+        self.assertIs(filled, bank)
+        self.assertEqual(len(bank), 1)
+
+        with self.assertRaises(ValueError):
+            capture.characterize(0x0D, [], device.parameters.update,
+                                 bank=ImpulseResponseBank(2 * SAMPLE_RATE))
+
+    def test_save_and_load(self):
+        bank = ImpulseResponseBank(SAMPLE_RATE)
+        bank.add(0x09, {'decay': 1.0}, np.array([1.0, 0.5, 0.25]))
+        bank.add(0x09, {'decay': 2.0}, np.array([1.0, 0.8]))
+        with tempfile.TemporaryDirectory() as directory:
+            bank.save(directory)
+            loaded = ImpulseResponseBank.load(directory)
+        self.assertEqual(len(loaded), 2)
+        np.testing.assert_allclose(loaded.impulse_response(0x09, {'decay': 1.0}), [1.0, 0.5, 0.25])
+        with self.assertRaises(ValueError):
+            bank.add(0x09, {'mix': 0.5}, np.ones(3))
+
+
+if __name__ == '__main__':
+    unittest.main()
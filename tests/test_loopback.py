@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Test Loopback Audio Backend
+===========================
+
+Tests that AudioDeviceManager runs its calibration, captures and duplex
+streams end-to-end on the simulated loopback device.
+"""
+
+import os
+import sys
+import time
+import unittest
+
+import mido
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from adapter_magicstomp import MagicstompAdapter
+from hil.io import AudioDeviceManager
+from hil.loopback import LoopbackBackend, LoopbackChannel
+from simulation.magicstomp import SimulatedMagicstomp
+
+SAMPLE_RATE = 8000
+
+
+def make_manager(**backend_options):
+    """Manager on a loopback device with both directions selected."""
+    backend = LoopbackBackend(sample_rate=SAMPLE_RATE, seed=0, **backend_options)
+    manager = AudioDeviceManager(SAMPLE_RATE, buffer_size=256, backend=backend)
+    assert manager.set_input_device(device_name='loopback')
+    assert manager.set_output_device(device_name='loopback')
+    return manager
+
+
+class TestLoopbackChannel(unittest.TestCase):
+    """Test the impairments of the return path."""
+
+    def test_latency_and_gain_across_blocks(self):
+        channel = LoopbackChannel(latency=100, gain=0.5)
+        signal = np.random.default_rng(1).standard_normal(1000)
+        output = np.concatenate([channel.process(block) for block in np.split(signal, 10)])
+        np.testing.assert_allclose(output[100:], 0.5 * signal[:900], atol=1e-6)
+        np.testing.assert_allclose(output[:100], 0.0)
+
+    def test_drift_stretches_the_signal(self):
+        channel = LoopbackChannel(drift_ppm=1000.0)
+        ramp = np.arange(20000, dtype=np.float64)
+        output = np.concatenate([channel.process(block) for block in np.split(ramp, 20)])
+        # The input clock runs 0.1% fast: sample n reads position n / 1.001
+        self.assertAlmostEqual(output[10000], 10000 / 1.001, delta=0.5)
+
+
+class TestLoopbackBackend(unittest.TestCase):
+    """Test AudioDeviceManager on the loopback device."""
+
+    def test_calibration_measures_latency_and_gain(self):
+        manager = make_manager(latency=300, gain=0.5)
+        results = manager.calibrate_system(duration=1.0)
+        self.assertEqual(results['latency_samples'], 300)
+        self.assertGreater(results['gain_compensation'], 1.0)
+
+    def test_play_and_record_goes_through_processor(self):
+        manager = make_manager(latency=300, processor=lambda audio: -2.0 * audio)
+        manager.round_trip_latency = 300
+        signal = np.sin(2 * np.pi * 440 * np.arange(4000) / SAMPLE_RATE)
+        recorded = manager.play_and_record(signal)
+        self.assertEqual(len(recorded), len(signal) - 300)
+        np.testing.assert_allclose(recorded, -2.0 * signal[:len(recorded)], atol=1e-3)
+
+    def test_streaming_capture_matches_playrec(self):
+        manager = make_manager(latency=300, noise_db=None)
+        manager.round_trip_latency = 300
+        signal = np.random.default_rng(2).standard_normal(4000).astype(np.float32) * 0.1
+        blocks = []
+        recorded = manager.play_and_record_streaming(signal, lambda block: blocks.append(block))
+        self.assertEqual(len(recorded), len(signal) - 300)
+        np.testing.assert_allclose(recorded, signal[:len(recorded)], atol=1e-6)
+        self.assertGreater(len(blocks), 1)
+
+    def test_stalled_streaming_capture_raises(self):
+        class StallingProcessor:
+            def process_block(self, block):
+                time.sleep(1.5)
+                return block
+
+        manager = make_manager(latency=300, processor=StallingProcessor())
+        signal = np.zeros(4000, dtype=np.float32)
+        with self.assertRaises(RuntimeError):
+            manager.play_and_record_streaming(signal, lambda block: None)
+
+    def test_scheduled_events_run_on_stream_clock(self):
+        manager = make_manager(latency=300, noise_db=None)
+        state = {'gain': 1.0}
+        manager.backend.processor = lambda block: block * state['gain']
+
+        def mute():
+            state['gain'] = 0.0
+
+        signal = np.ones(4000, dtype=np.float32)
+        recording = manager.play_and_record_scheduled(signal, [(2000, mute)])
+        self.assertEqual(len(recording), len(signal))
+        # Played before the event: back after the latency; after: silent
+        np.testing.assert_allclose(recording[400:1900], 1.0)
+        np.testing.assert_allclose(recording[2700:], 0.0)
+
+    def test_latency_shorter_than_a_block_is_rejected(self):
+        manager = make_manager(latency=100)
+        with self.assertRaises(ValueError):
+            manager.backend.Stream(blocksize=256, channels=1, callback=lambda *args: None)
+
+
+class TestSimulatedDeviceMidi(unittest.TestCase):
+    """Test that candidates sent over MIDI reach the simulated device."""
+
+    def setUp(self):
+        self.device = SimulatedMagicstomp(sample_rate=SAMPLE_RATE)
+        self.manager = make_manager(latency=300, processor=self.device, noise_db=None)
+        self.manager.round_trip_latency = 300
+        self.adapter = MagicstompAdapter()
+        self.port = self.manager.backend.midi_port()
+        t = np.arange(4000) / SAMPLE_RATE
+        self.signal = (0.3 * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+
+    def record(self, candidate):
+        messages = self.adapter.json_to_patch(candidate).to_parameter_messages()
+        self.assertTrue(self.adapter.send_to_device(messages, existing_port=self.port))
+        return self.manager.play_and_record(self.signal)
+
+    def test_candidates_produce_different_recordings(self):
+        quiet = self.record({"amp": {"gain": 0.0, "treble": 0.2}})
+        self.assertAlmostEqual(self.device.current_params['gain'], 0.0)
+
+        echo = self.record({"delay": {"time_ms": 50, "feedback": 0.5, "mix": 0.5}})
+        self.assertGreater(self.device.current_params['delay_mix'], 0.4)
+        self.assertGreater(float(np.max(np.abs(echo - quiet))), 0.05)
+
+    def test_program_change_recalls_a_bulk_written_slot(self):
+        patch = self.adapter.json_to_patch({"reverb": {"decay_s": 2.0, "mix": 0.5}})
+        self.adapter.send_to_device(patch.to_bulk_messages(3), existing_port=self.port)
+        self.assertNotIn('reverb_mix', self.device.current_params)
+
+        self.port.send(mido.Message('program_change', program=3))
+        self.assertAlmostEqual(self.device.current_params['reverb_mix'], 0.5, delta=1 / 127)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Test Canonical Patch Type
+=========================
+
+Tests the section views, copy-on-write clones, diffs and the conversions
+between Patch and the other patch representations.
+"""
+
+import os
+import sys
+import unittest
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from adapter_magicstomp import MagicstompAdapter
+from magicstomp_patch import Patch, attribute_name
+from magicstomp_sysex import parse_parameter_message
+
+
+def make_patch(effect_type=0x12, seed=0):
+    rng = np.random.default_rng(seed)
+    common = rng.integers(0, 128, size=32)
+    common[1] = effect_type
+    common[16:28] = list(b"Test Patch  ")
+    return Patch.from_sections(common.tolist(), rng.integers(0, 128, size=127).tolist(), patch_index=3)
+
+
+class TestPatch(unittest.TestCase):
+    """Test buffers, views and clones."""
+
+    def test_views_share_the_buffer(self):
+        patch = make_patch()
+        effect = patch.effect
+        self.assertEqual(len(patch.common), 32)
+        self.assertEqual(len(effect), 127)
+        self.assertTrue(effect.readonly)
+
+        patch[40] = 99
+        self.assertEqual(effect[40 - 32], 99)
+        self.assertEqual(patch.name, "Test Patch")
+        self.assertEqual(patch.effect_type, 0x12)
+
+    def test_clone_is_copy_on_write(self):
+        patch = make_patch()
+        clone = patch.clone()
+        self.assertIs(clone._buffer, patch._buffer)
+
+        clone[50] = (patch[50] + 1) % 128
+        self.assertIsNot(clone._buffer, patch._buffer)
+        self.assertEqual(clone.diff(patch).tolist(), [50])
+
+        # The original still sees its own value after writing in turn
+        patch.name = "Renamed"
+        self.assertEqual(clone.name, "Test Patch")
+        self.assertEqual(patch.name, "Renamed")
+
+    def test_parameter_messages_cover_the_diff(self):
+        base = make_patch()
+        patch = base.clone()
+        patch.write(60, [1, 2, 3])
+        patch[5] = 7
+        patch[31] = 0 if base[31] else 1
+        patch[32] = 0 if base[32] else 1
+
+        messages = patch.to_parameter_messages(base=base)
+        # The run 31-32 is split at the section boundary
+        self.assertEqual([parse_parameter_message(m)[0] for m in messages], [5, 31, 32, 60])
+
+        restored = base.clone()
+        self.assertEqual(restored.apply_messages(messages), 4)
+        self.assertEqual(restored, patch)
+
+    def test_dump_and_bulk_round_trips(self):
+        patch = make_patch()
+        self.assertEqual(Patch.from_dump(patch.to_dump()), patch)
+
+        restored = Patch.from_messages(patch.to_bulk_messages())
+        self.assertEqual(restored, patch)
+        self.assertEqual(restored.patch_index, 3)
+
+        with self.assertRaises(ValueError):
+            Patch(bytes(10))
+
+    def test_generated_accessors(self):
+        patch = make_patch(0x12)  # Chorus
+        accessor = patch.params
+        self.assertIn('freq', dir(accessor))
+        self.assertEqual(attribute_name('Freq.'), 'freq')
+
+        accessor.wave = 'Triangle'
+        accessor.freq = 2.0
+        self.assertEqual(patch.get_parameter('Wave'), 'Triangle')
+        self.assertAlmostEqual(patch.params.freq, 2.0, delta=0.15)
+        self.assertIs(type(make_patch(0x12).params), type(accessor))
+
+
+class TestAdapterConversions(unittest.TestCase):
+    """Test nested JSON <-> Patch."""
+
+    def setUp(self):
+        self.adapter = MagicstompAdapter()
+        self.patch_json = {
+            "amp": {"model": "JCM800", "gain": 0.5, "treble": 0.75},
+            "delay": {"enabled": True, "time_ms": 350, "feedback": 0.3, "mix": 0.2},
+        }
+
+    def test_json_to_patch_matches_json_to_syx(self):
+        patch = self.adapter.json_to_patch(self.patch_json)
+        expected = Patch()
+        expected[1] = self.adapter.inventory.effect_type("MonoDelay")
+        expected.apply_messages(self.adapter.json_to_syx(self.patch_json))
+        self.assertEqual(patch, expected)
+
+    def test_patch_to_json_round_trip(self):
+        amp_json = {"amp": self.patch_json["amp"]}
+        patch_json = self.adapter.patch_to_json(self.adapter.json_to_patch(amp_json))
+        self.assertEqual(patch_json["amp"]["model"], "JCM800")
+        self.assertAlmostEqual(patch_json["amp"]["gain"], 0.5, delta=1 / 127)
+        self.assertEqual(set(patch_json), {"amp"})
+
+        # A MonoDelay patch has no amp section
+        patch_json = self.adapter.patch_to_json(self.adapter.json_to_patch(self.patch_json))
+        self.assertAlmostEqual(patch_json["delay"]["time_ms"], 350, delta=350 * 0.05)
+        self.assertEqual(set(patch_json), {"delay"})
+
+        # Reverb and modulation reuse the delay offsets (32, 40, 41)
+        reverb_json = {"reverb": {"type": "PLATE", "decay_s": 2.0, "mix": 0.4}}
+        patch_json = self.adapter.patch_to_json(self.adapter.json_to_patch(reverb_json))
+        self.assertEqual(patch_json["reverb"]["type"], "PLATE")
+        self.assertAlmostEqual(patch_json["reverb"]["decay_s"], 2.0, delta=10 / 127)
+        self.assertAlmostEqual(patch_json["reverb"]["mix"], 0.4, delta=1 / 127)
+        self.assertEqual(set(patch_json), {"reverb"})
+
+        mod_json = {"mod": {"rate_hz": 1.5, "depth": 0.6, "mix": 0.3}}
+        patch_json = self.adapter.patch_to_json(self.adapter.json_to_patch(mod_json))
+        self.assertAlmostEqual(patch_json["mod"]["rate_hz"], 1.5, delta=5 / 127)
+        self.assertAlmostEqual(patch_json["mod"]["depth"], 0.6, delta=1 / 127)
+        self.assertAlmostEqual(patch_json["mod"]["mix"], 0.3, delta=1 / 127)
+        self.assertEqual(set(patch_json), {"mod"})
+
+    def test_untyped_patch_decodes_each_offset_once(self):
+        patch_json = self.adapter.patch_to_json(Patch())
+        self.assertEqual(set(patch_json["delay"]), {"time_ms", "feedback", "mix"})
+        self.assertEqual(set(patch_json["reverb"]), {"mix"})
+        self.assertEqual(set(patch_json["mod"]), {"mix"})
+
+    def test_json_on_base_leaves_base_untouched(self):
+        base = self.adapter.json_to_patch(self.patch_json)
+        changed = self.adapter.json_to_patch({"amp": {"gain": 0.9}}, base=base)
+        self.assertEqual(len(changed.diff(base)), 1)
+        self.assertEqual(len(changed.to_parameter_messages(base=base)), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
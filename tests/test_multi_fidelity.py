@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Test Multi-Fidelity Optimization
+================================
+
+Tests successive halving and Hyperband budgets and the correction learned
+between a biased cheap fidelity and the reference one.
+"""
+
+import os
+import sys
+import unittest
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from optimize.multi_fidelity import Fidelity, FidelityCorrection, MultiFidelityOptimizer
+from optimize.search import ParameterBounds, ParameterSpace
+
+
+def make_space():
+    space = ParameterSpace()
+    space.parameters = {
+        'x': ParameterBounds(0.0, 1.0, 0.05, 0.5),
+        'y': ParameterBounds(0.0, 1.0, 0.05, 0.5),
+    }
+    return space
+
+
+def reference_loss(params):
+    return (params['x'] - 0.7) ** 2 + (params['y'] - 0.2) ** 2
+
+
+def cheap_loss(params):
+    # Biased simulator: optimum of y misplaced
+    return 2.0 * ((params['x'] - 0.7) ** 2 + (params['y'] - 0.4) ** 2) + 0.1
+
+
+def batch(loss):
+    return lambda candidates: [loss(params) for params in candidates]
+
+
+class TestMultiFidelityOptimizer(unittest.TestCase):
+    """Test promotion budgets and results."""
+
+    def test_successive_halving_budget(self):
+        fidelities = [Fidelity('simulator', batch(cheap_loss), cost=0.05),
+                      Fidelity('probe', batch(reference_loss), cost=0.3),
+                      Fidelity('hardware', batch(reference_loss))]
+        optimizer = MultiFidelityOptimizer(make_space(), fidelities, eta=3, seed=0)
+        results = optimizer.optimize(27)
+
+        budget = results['budget']
+        self.assertEqual([budget[name]['evaluations'] for name in ('simulator', 'probe', 'hardware')], [27, 9, 3])
+        self.assertAlmostEqual(budget['probe']['cost'], 2.7)
+        self.assertEqual([p['promoted'] for p in results['promotions']], [9, 3])
+        self.assertTrue(results['success'])
+        self.assertLess(results['final_loss'], reference_loss({'x': 0.5, 'y': 0.5}))
+        self.assertAlmostEqual(results['final_loss'], reference_loss(results['best_parameters']))
+
+    def test_hyperband_brackets_start_at_every_fidelity(self):
+        fidelities = [Fidelity('simulator', batch(cheap_loss), cost=0.05),
+                      Fidelity('hardware', batch(reference_loss))]
+        optimizer = MultiFidelityOptimizer(make_space(), fidelities, eta=3, seed=1)
+        results = optimizer.optimize(9, hyperband=True)
+
+        self.assertEqual(results['iterations'], 2)
+        # Bracket 1: 9 simulated, 3 promoted; bracket 2: 6 on the hardware directly
+        self.assertEqual(results['budget']['simulator']['evaluations'], 9)
+        self.assertEqual(results['budget']['hardware']['evaluations'], 3 + 6)
+
+
+class TestFidelityCorrection(unittest.TestCase):
+    """Test the learned mapping between fidelities."""
+
+    def test_correction_reorders_candidates(self):
+        space = make_space()
+        correction = FidelityCorrection(space, ['x', 'y'], ridge=1e-6)
+        rng = np.random.default_rng(0)
+        for _ in range(20):
+            params = {'x': rng.uniform(), 'y': rng.uniform()}
+            correction.add(cheap_loss(params), reference_loss(params), params)
+
+        # The simulator prefers y=0.4, the reference y=0.2
+        candidates = [{'x': 0.7, 'y': 0.4}, {'x': 0.7, 'y': 0.2}]
+        cheap = [cheap_loss(params) for params in candidates]
+        self.assertLess(cheap[0], cheap[1])
+        corrected = correction.predict(cheap, candidates)
+        self.assertLess(corrected[1], corrected[0])
+
+    def test_offset_before_enough_pairs(self):
+        correction = FidelityCorrection(make_space(), ['x', 'y'])
+        np.testing.assert_allclose(correction.predict([1.0], [{}]), [1.0])
+        correction.add(1.0, 0.4, {'x': 0.1, 'y': 0.1})
+        np.testing.assert_allclose(correction.predict([2.0], [{}]), [1.4])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Test Headless Patch Codec
+=========================
+
+Checks that the compiled codec decodes like the Tk widgets, that encoding
+inverts decoding and that batches match single sections.
+"""
+
+import os
+import sys
+import types
+import unittest
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from patch_codec import _registry, decode_patch, get_effect_codec, get_widget_codec
+
+try:
+    from magicstomp_effects.base_effect_widget import BaseEffectWidget
+except ImportError:  # tkinter not installed
+    BaseEffectWidget = None
+
+
+def widget_decode(codec, section):
+    """Reference decoding: the BaseEffectWidget.apply_magicstomp_data path."""
+    params = {}
+    for spec in codec.parameters:
+        widget = types.SimpleNamespace(conversion=spec.conversion, min_val=spec.min_val, max_val=spec.max_val)
+        raw = BaseEffectWidget._decode_sysex_value(section[spec.offset:spec.offset + spec.length])
+        value = BaseEffectWidget._convert_from_magicstomp(BaseEffectWidget, widget, raw)
+        if spec.min_val is not None:
+            value = max(spec.min_val, value)
+        if spec.max_val is not None:
+            value = min(spec.max_val, value)
+        if spec.values is not None and isinstance(value, int) and 0 <= value < len(spec.values):
+            value = spec.values[value]
+        params[spec.name] = value
+    return params
+
+
+class TestPatchCodec(unittest.TestCase):
+    """Test the compiled codec."""
+
+    def setUp(self):
+        self.rng = np.random.default_rng(0)
+        self.sections = self.rng.integers(0, 128, size=(8, 127))
+
+    @unittest.skipIf(BaseEffectWidget is None, "tkinter not available")
+    def test_decode_matches_widget_conversions(self):
+        for effect_type in _registry()[0]:
+            codec = get_effect_codec(effect_type)
+            for section in self.sections[:3].tolist():
+                expected = widget_decode(codec, section)
+                decoded = codec.decode(section)
+                self.assertEqual(decoded.keys(), expected.keys())
+                for name, value in expected.items():
+                    if isinstance(value, str):
+                        self.assertEqual(decoded[name], value, (codec, name))
+                    else:
+                        self.assertAlmostEqual(decoded[name], value, places=9, msg=(codec, name))
+
+    def test_encode_inverts_decode(self):
+        for effect_type in _registry()[0]:
+            codec = get_effect_codec(effect_type)
+            values = codec.decode_values(self.sections)
+            encoded = codec.encode_values(values, base=self.sections)
+            # Parameters declared at the same offset (conflicting metadata) excluded
+            owners = np.bincount(codec.offsets, minlength=127)
+            unique = owners[codec.offsets] == 1
+            np.testing.assert_allclose(codec.decode_values(encoded)[:, unique], values[:, unique],
+                                       err_msg=repr(codec))
+
+    def test_batch_matches_single_sections(self):
+        codec = get_effect_codec(0x3C)
+        batch = codec.decode_values(self.sections)
+        for row, section in zip(batch, self.sections):
+            np.testing.assert_array_equal(row, codec.decode_values(section))
+
+    def test_encode_parameters_and_labels(self):
+        codec = get_effect_codec(0x12)  # Chorus
+        self.assertIs(get_effect_codec(0x12), codec)
+        base = bytes(self.sections[0].tolist())
+        section = codec.encode({'Wave': 'Triangle', 'Freq.': 2.0}, base=base)
+
+        decoded = codec.decode(section)
+        self.assertEqual(decoded['Wave'], 'Triangle')
+        self.assertAlmostEqual(decoded['Freq.'], 2.0, delta=0.15)
+        # Other parameters keep the base bytes
+        untouched = [spec.offset for spec in codec.parameters if spec.name not in ('Wave', 'Freq.')]
+        self.assertEqual([section[o] for o in untouched], [base[o] for o in untouched])
+
+        with self.assertRaises(KeyError):
+            codec.encode({'Unknown': 1})
+        with self.assertRaises(ValueError):
+            codec.encode({'Wave': 'Square'})
+
+    def test_two_byte_parameters(self):
+        codec = get_widget_codec('MonoDelayWidget')
+        two_bytes = [spec for spec in codec.parameters if spec.length == 2]
+        self.assertTrue(two_bytes)
+        spec = two_bytes[0]
+        section = codec.encode({spec.name: spec.max_val})
+        self.assertAlmostEqual(codec.decode(section)[spec.name], spec.max_val, delta=spec.max_val * 0.01)
+
+    def test_decode_patch(self):
+        common = [0] * 32
+        common[1] = 0x12
+        patch = decode_patch(common, self.sections[0].tolist())
+        self.assertEqual(patch['effect_name'], 'Chorus')
+        self.assertIn('Freq.', patch['parameters'])
+
+
+if __name__ == '__main__':
+    unittest.main()
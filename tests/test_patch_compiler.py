@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Test Vectorized Patch Compiler
+==============================
+
+Checks that the batch compiler produces the same bytes as the per-patch
+adapter conversion and bulk message builder.
+"""
+
+import os
+import sys
+import time
+import unittest
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from magicstomp_patch import Patch
+from magicstomp_sysex import build_bulk_patch_messages
+from patch_compiler import BulkPatchCompiler
+
+NUMERIC_COLUMNS = {
+    'amp.gain': (0.0, 1.0),
+    'delay.time_ms': (-10.0, 2500.0),
+    'delay.mix': (-0.1, 1.1),
+    'reverb.decay_s': (0.0, 7.0),
+    'mod.rate_hz': (0.0, 12.0),
+}
+
+
+class TestBulkPatchCompiler(unittest.TestCase):
+    """Test the batch compiler against the scalar path."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.compiler = BulkPatchCompiler()
+        cls.adapter = cls.compiler.adapter
+
+    def test_vector_transforms_match_scalar_transforms(self):
+        for column, (low, high) in NUMERIC_COLUMNS.items():
+            values = np.linspace(low, high, 5001)
+            raw = self.compiler.transform_column(column, values)
+            scalar = [self.compiler._scalar[column](float(value)) for value in values]
+            np.testing.assert_array_equal(raw, scalar, err_msg=column)
+
+    def test_states_match_json_to_patch(self):
+        rng = np.random.default_rng(0)
+        columns = list(NUMERIC_COLUMNS) + ['amp.model']
+        models = np.array(['JCM800', 'AC30', 'unknown', None], dtype=object)[rng.integers(0, 4, size=20)]
+        matrix = np.column_stack([rng.uniform(low, high, size=20) for low, high in NUMERIC_COLUMNS.values()]
+                                 + [models]).astype(object)
+        base = Patch(rng.integers(0, 128, size=159))
+
+        states = self.compiler.compile_states(matrix, columns, base=base)
+        for row, values in zip(states, matrix):
+            patch_json = {}
+            for column, value in zip(columns, values):
+                section, key = column.split('.')
+                patch_json.setdefault(section, {})[key] = value
+            self.assertEqual(row.tobytes(), bytes(self.adapter.json_to_patch(patch_json, base=base)))
+
+    def test_bulk_dump_matches_messages(self):
+        rng = np.random.default_rng(1)
+        states = rng.integers(0, 128, size=(5, 159)).astype(np.uint8)
+        for edit_buffer in (False, True):
+            dump = self.compiler.bulk_dump(states, patch_indices=[3, 10, 50, 98, 0], edit_buffer=edit_buffer)
+            for row, index, buffer in zip(states, [3, 10, 50, 98, 0], dump):
+                messages = build_bulk_patch_messages(index, row[:32].tolist(), row[32:].tolist(),
+                                                     edit_buffer=edit_buffer)
+                self.assertEqual(buffer.tobytes(), b''.join(bytes(message) for message in messages))
+            messages = [list(m) + [0xF7] for m in dump[1].tobytes().split(b'\xf7')[:-1]]
+            self.assertEqual(Patch.from_messages(messages), Patch(states[1]))
+
+    def test_hundred_thousand_candidates(self):
+        rng = np.random.default_rng(2)
+        matrix = np.column_stack([rng.uniform(low, high, size=100000) for low, high in NUMERIC_COLUMNS.values()])
+
+        start = time.perf_counter()
+        dump = self.compiler.bulk_dump(self.compiler.compile_states(matrix, list(NUMERIC_COLUMNS)))
+        self.assertLess(time.perf_counter() - start, 1.0)
+        self.assertEqual(dump.shape[0], 100000)
+
+    def test_unknown_column(self):
+        with self.assertRaises(KeyError):
+            self.compiler.compile_states(np.zeros((1, 1)), ['amp.unknown'])
+        with self.assertRaises(ValueError):
+            self.compiler.compile_states(np.zeros((1, 2)), ['amp.gain'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Test Patch Mirror and Bank Sync
+===============================
+
+Tests for the local patch mirror and the pipelined bank dump, using a fake
+MIDI device that answers dump requests like the Magicstomp.
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from collections import deque
+from unittest import mock
+
+import mido
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from magicstomp_sysex import BULK_HEADER, calculate_checksum
+from patch_mirror import PatchMirror
+from realtime_magicstomp import RealtimeMagicstomp
+
+
+def make_patch(slot, effect_type=0x0D):
+    """Create a recognisable 159-byte patch for *slot*."""
+    common = [0] * 32
+    common[1] = effect_type
+    name = f"Patch {slot:02d}"
+    common[16:16 + len(name)] = [ord(c) for c in name]
+    effect = [(slot + i) % 128 for i in range(127)]
+    return common, effect
+
+
+def bulk(body):
+    """Build a bulk message body (no F0/F7) with its checksum."""
+    data = BULK_HEADER[1:] + body
+    return data + [calculate_checksum(data[7:])]
+
+
+class FakeMagicstomp:
+    """Answers dump requests with start/common/effect/end messages."""
+
+    def __init__(self, bank):
+        self.bank = bank
+        self.incoming = deque()
+        self.requests = []
+
+    # Output port interface
+    def send(self, message):
+        data = list(message.data)
+        index = data[-1]
+        self.requests.append(index)
+        common, effect = self.bank[index]
+        for body in (
+            [0x00, 0x00, 0x30, 0x01, index],
+            [0x00, 0x20, 0x20, 0x00, 0x00] + common,
+            [0x00, 0x7F, 0x20, 0x01, 0x00] + effect,
+            [0x00, 0x00, 0x30, 0x11, index],
+        ):
+            self.incoming.append(mido.Message('sysex', data=bulk(body)))
+
+    # Input port interface
+    def poll(self):
+        return self.incoming.popleft() if self.incoming else None
+
+
+class TestPatchMirror(unittest.TestCase):
+    """Test mirror storage."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.mirror = PatchMirror(self.tmpdir.name)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_store_and_load(self):
+        common, effect = make_patch(3)
+        self.assertTrue(self.mirror.store(3, common, effect))
+        self.assertFalse(self.mirror.store(3, common, effect))
+
+        loaded = PatchMirror(self.tmpdir.name).load(3)
+        self.assertEqual(loaded['common'], common)
+        self.assertEqual(loaded['effect'], effect)
+        self.assertEqual(self.mirror.entry(3)['name'], "Patch 03")
+
+    def test_stale_slots(self):
+        common, effect = make_patch(0)
+        self.mirror.store(0, common, effect)
+        self.assertNotIn(0, self.mirror.stale_slots())
+        self.assertIn(1, self.mirror.stale_slots())
+
+        self.mirror.mark_stale(0)
+        self.assertIn(0, self.mirror.stale_slots())
+
+    def test_other_device_invalidates_the_bank(self):
+        self.assertFalse(self.mirror.bind_device("Magicstomp A"))
+        common, effect = make_patch(0)
+        self.mirror.store(0, common, effect)
+
+        self.assertFalse(PatchMirror(self.tmpdir.name).bind_device("Magicstomp A"))
+        self.assertTrue(self.mirror.bind_device("Magicstomp B"))
+        self.assertIn(0, self.mirror.stale_slots())
+
+    def test_invalid_length(self):
+        with self.assertRaises(ValueError):
+            self.mirror.store(0, [0] * 10, [0] * 127)
+
+
+class TestBankSync(unittest.TestCase):
+    """Test pipelined bank download."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.mirror = PatchMirror(self.tmpdir.name)
+        self.bank = {slot: make_patch(slot) for slot in range(99)}
+        self.device = FakeMagicstomp(self.bank)
+
+        self.rt = RealtimeMagicstomp(auto_detect=False)
+        self.rt.output_port = self.device
+        self.rt.input_port = self.device
+        self.rt._log_midi_traffic = lambda *args, **kwargs: None
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_full_sync(self):
+        result = self.rt.sync_bank(self.mirror, window=4, timeout=0.5)
+        self.assertEqual(result['requested'], 99)
+        self.assertEqual(len(result['changed']), 99)
+        self.assertEqual(result['failed'], [])
+        self.assertEqual(self.mirror.load(42)['effect'], self.bank[42][1])
+
+    def test_incremental_sync(self):
+        self.rt.sync_bank(self.mirror, slots=[0, 1, 2], timeout=0.5)
+        self.device.requests.clear()
+
+        self.mirror.mark_stale(1)
+        result = self.rt.sync_bank(self.mirror, slots=[0, 1, 2], timeout=0.5)
+        self.assertEqual(self.device.requests, [1])
+        self.assertEqual(result['unchanged'], [1])
+
+    def test_sync_writes_the_index_once(self):
+        with mock.patch.object(PatchMirror, '_save_index', autospec=True,
+                               side_effect=PatchMirror._save_index) as save:
+            self.rt.sync_bank(self.mirror, timeout=0.5)
+        self.assertEqual(save.call_count, 1)
+        self.assertEqual(PatchMirror(self.tmpdir.name).slots(), list(range(99)))
+
+    def test_written_slot_is_downloaded_again(self):
+        self.rt.sync_bank(self.mirror, slots=[0, 1, 2], timeout=0.5)
+        sent = []
+        self.rt.output_port = mock.Mock(send=sent.append)
+        common, effect = make_patch(7)
+        self.assertTrue(self.rt.write_patch(1, common, effect, interval=0.0))
+        self.assertEqual(len(sent), 4)
+
+        self.rt.output_port = self.device
+        self.device.requests.clear()
+        self.rt.sync_bank(self.mirror, slots=[0, 1, 2], timeout=0.5)
+        self.assertEqual(self.device.requests, [1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Test Patch Store
+================
+
+Tests Qt ``@ByteArray`` and ``.syx`` bank parsing and the lookups of the
+memory-mapped columnar store.
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from magicstomp_sysex import build_bulk_patch_messages
+from patch_store import PatchStore, ingest_files, read_ini_bank, read_syx_dump, unescape_qt_bytearray
+
+PRESETS_DIR = Path(__file__).parent.parent / "magicstompfrenzy-master"
+
+
+def make_patch(effect_type, name, seed):
+    rng = np.random.default_rng(seed)
+    common = rng.integers(0, 128, size=32)
+    common[1] = effect_type
+    common[16:28] = list(name.ljust(12).encode('latin-1'))
+    return common.tolist(), rng.integers(0, 128, size=127).tolist()
+
+
+class TestBankParsing(unittest.TestCase):
+    """Test the bank readers."""
+
+    def test_unescape_qt_bytearray(self):
+        self.assertEqual(unescape_qt_bytearray(r"\0\x37\0\x13"), b"\x00\x37\x00\x13")
+        # Hex escapes consume every following hex digit
+        self.assertEqual(unescape_qt_bytearray(r"\x37\x30'sRock"), b"\x37\x30's" b"Rock")
+        self.assertEqual(unescape_qt_bytearray(r"\x44rivin"), b"Drivin")
+        self.assertEqual(unescape_qt_bytearray(r'\t\"\\\12a'), b'\t"\\\na')
+
+    @unittest.skipUnless((PRESETS_DIR / "guitarpresets.ini").exists(), "preset banks not available")
+    def test_read_ini_bank(self):
+        patches = read_ini_bank(PRESETS_DIR / "guitarpresets.ini")
+        self.assertEqual(len(patches), 99)
+        self.assertTrue(all(len(data) == 159 for _, _, data in patches))
+        _, slot, data = patches[0]
+        self.assertEqual(slot, 0)
+        self.assertEqual(data[16:28].rstrip(), b"HeavyHiGain")
+
+    def test_read_syx_dump(self):
+        common, effect = make_patch(0x0D, "Echo", 1)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "bank.syx"
+            messages = build_bulk_patch_messages(4, common, effect)
+            path.write_bytes(b''.join(bytes(message) for message in messages))
+            patches = read_syx_dump(path)
+
+        self.assertEqual(len(patches), 1)
+        _, slot, data = patches[0]
+        self.assertEqual(slot, 4)
+        self.assertEqual(list(data), common + effect)
+
+
+class TestPatchStore(unittest.TestCase):
+    """Test the columnar store."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.directory = Path(self.tmp.name) / "store"
+        self.patches = [make_patch(t, f"P{i}", i) for i, t in enumerate([0x0D, 0x12, 0x0D, 0x30])]
+        sources = [("bank.ini", i, bytes(c + e)) for i, (c, e) in enumerate(self.patches)]
+        # Duplicate content is stored once
+        self.store = PatchStore.build(self.directory, sources + sources[:1])
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_lookups(self):
+        self.assertEqual(len(self.store), 4)
+        self.assertEqual(sorted(self.store.by_effect_type(0x0D).tolist()), [0, 2])
+        self.assertEqual(len(self.store.by_effect_type(0x01)), 0)
+        self.assertEqual(self.store.effect_type_counts(), {0x0D: 2, 0x12: 1, 0x30: 1})
+        self.assertEqual(self.store.by_name("P3").tolist(), [3])
+        self.assertEqual(self.store.find(self.patches[1][0] + self.patches[1][1]), 1)
+        self.assertIsNone(self.store.find([0] * 159))
+
+    def test_reopen_memory_mapped(self):
+        store = PatchStore(self.directory)
+        self.assertIsInstance(store.data, np.memmap)
+        self.assertIsInstance(store._sorted_names, np.memmap)
+        patch = store.patch(2)
+        self.assertEqual(patch['common'], self.patches[2][0])
+        self.assertEqual(patch['effect'], self.patches[2][1])
+        self.assertEqual(patch['name'], "P2")
+        self.assertEqual(patch['effect_type'], 0x0D)
+
+    def test_lookups_without_sorted_columns(self):
+        # Stores written before sorted_names/sorted_hashes existed
+        for name in ("sorted_names", "sorted_hashes"):
+            (self.directory / f"{name}.npy").unlink()
+        store = PatchStore(self.directory)
+        self.assertEqual(store.by_name("P3").tolist(), [3])
+        self.assertEqual(store.find(self.patches[1][0] + self.patches[1][1]), 1)
+
+    def test_ingest_appends(self):
+        common, effect = make_patch(0x12, "New", 10)
+        path = Path(self.tmp.name) / "new.syx"
+        path.write_bytes(b''.join(bytes(m) for m in build_bulk_patch_messages(7, common, effect)))
+
+        store = ingest_files([path], self.directory)
+        self.assertEqual(len(store), 5)
+        self.assertEqual(len(store.by_effect_type(0x12)), 2)
+        self.assertEqual(store.patch(4)['source'], str(path))
+
+
+if __name__ == '__main__':
+    unittest.main()
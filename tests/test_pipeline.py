@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Test Pipelined HIL Evaluation
+=============================
+
+Tests for ordering, in-flight bounds and capture/loss overlap of the
+pipelined evaluator.
+"""
+
+import os
+import sys
+import threading
+import time
+import unittest
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from hil.pipeline import PipelinedEvaluator
+
+
+class TestPipelinedEvaluator(unittest.TestCase):
+    """Test the pipelined evaluator with sleeping capture/loss functions."""
+
+    def test_results_in_order_and_overlapped(self):
+        """Losses come back in order and loss time hides behind captures."""
+        def capture(candidate):
+            time.sleep(0.05)
+            return np.full(4, candidate, dtype=float)
+
+        def loss(audio):
+            # Later candidates finish faster, order must still be kept
+            time.sleep(0.05 - audio[0] * 0.005)
+            return float(audio[0] ** 2)
+
+        evaluator = PipelinedEvaluator(capture, loss, max_in_flight=2, workers=2)
+        losses = evaluator.evaluate(range(8))
+
+        self.assertEqual(losses, [float(i ** 2) for i in range(8)])
+        stats = evaluator.get_statistics()
+        self.assertEqual(stats['evaluations'], 8)
+        # Sequential would take ~0.8 s
+        self.assertLess(stats['wall_time_s'], 0.65)
+        self.assertGreater(stats['hardware_utilization'], 0.6)
+
+    def test_in_flight_depth_is_bounded(self):
+        """No more than max_in_flight captures wait for their loss."""
+        lock = threading.Lock()
+        state = {'captured': 0, 'done': 0, 'max_pending': 0}
+
+        def capture(candidate):
+            with lock:
+                state['captured'] += 1
+                pending = state['captured'] - state['done']
+                state['max_pending'] = max(state['max_pending'], pending)
+            return np.zeros(1)
+
+        def loss(audio):
+            time.sleep(0.01)
+            with lock:
+                state['done'] += 1
+            return 0.0
+
+        evaluator = PipelinedEvaluator(capture, loss, max_in_flight=1)
+        evaluator.evaluate(range(10))
+        # At most one pending loss plus the capture that just finished
+        self.assertLessEqual(state['max_pending'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Test DI Probe Design
+====================
+
+Tests that the probe built from a synthetic DI is much shorter than the DI
+and preserves the ranking of candidate losses of a simple simulated chain.
+"""
+
+import os
+import sys
+import unittest
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from hil.probe import ProbeDesigner
+from optimize.loss import PerceptualLoss
+
+SAMPLE_RATE = 44100
+
+
+def pluck(freq, duration, decay):
+    """Harmonic note with exponential decay."""
+    t = np.arange(int(duration * SAMPLE_RATE)) / SAMPLE_RATE
+    note = sum(np.sin(2 * np.pi * freq * k * t) / k ** 1.5 for k in range(1, 8))
+    return 0.4 * note * np.exp(-t * decay)
+
+
+def make_di():
+    """Phrase with single notes, gaps, a sustained note and palm mutes."""
+    parts = []
+    for i in range(6):
+        parts += [pluck(110 * 2 ** (i / 12), 1.0, 3.0), np.zeros(int(0.3 * SAMPLE_RATE))]
+    parts.append(pluck(82, 2.0, 0.5))
+    parts += [pluck(82, 0.25, 25.0) for _ in range(8)]
+    parts += [np.zeros(int(0.8 * SAMPLE_RATE)), pluck(196, 2.5, 0.8)]
+    di = np.concatenate(parts)
+    return di + 1e-4 * np.random.default_rng(0).standard_normal(len(di))
+
+
+def render(candidate, di):
+    """Drive + echo chain standing in for the device."""
+    gain, mix, feedback = candidate
+    dry = np.tanh(gain * di) / np.tanh(gain) * 0.5
+    out = dry.copy()
+    delay = int(0.25 * SAMPLE_RATE)
+    for k in range(1, 6):
+        shift = delay * k
+        if shift < len(dry):
+            out[shift:] += mix * feedback ** (k - 1) * dry[:-shift]
+    return out
+
+
+class TestProbeDesigner(unittest.TestCase):
+    """Test probe design and validation report."""
+
+    def test_probe_is_short_and_preserves_ranking(self):
+        di = make_di()
+        target = render((4.0, 0.3, 0.5), di)
+        designer = ProbeDesigner(SAMPLE_RATE, max_duration=2.0)
+
+        probe = designer.design(di, target)
+        self.assertLessEqual(probe.duration, 2.0)
+        self.assertEqual(len(probe.di), len(probe.target))
+        self.assertGreater(probe.speedup, 5.0)
+        kinds = {segment.kind for segment in probe.segments}
+        self.assertIn('gap', kinds)
+        self.assertIn('transient', kinds)
+
+        loss = PerceptualLoss(SAMPLE_RATE)
+        candidates = [(g, m, f) for g in (1, 2, 4, 8) for m in (0.0, 0.3, 0.6) for f in (0.2, 0.5)]
+        report = designer.validate(
+            probe, di, target, render, candidates,
+            lambda t, p: loss.compute_loss(t, p, align_signals=False)
+        )
+        self.assertEqual(report['candidates'], len(candidates))
+        self.assertGreater(report['spearman'], 0.85)
+
+    def test_gaps_keep_the_note_they_follow(self):
+        designer = ProbeDesigner(SAMPLE_RATE, max_duration=2.0)
+        di = make_di()
+        segments = designer.select(designer.analyze(di))
+        gaps = [segment for segment in segments if segment.kind == 'gap']
+        self.assertTrue(gaps)
+
+        threshold = 10 ** ((designer.silence_db + 20) / 20)
+        for gap in gaps:
+            # The selected audio runs contiguously from the note into the silence
+            self.assertLess(gap.start, gap.gap_start)
+            self.assertGreater(np.max(np.abs(di[gap.start:gap.gap_start])), threshold)
+            self.assertLess(np.max(np.abs(di[gap.gap_start + designer.n_fft:gap.end])),
+                            np.max(np.abs(di[gap.start:gap.gap_start])))
+
+    def test_crossfade_concatenation_length(self):
+        designer = ProbeDesigner(SAMPLE_RATE, crossfade_duration=0.01)
+        di = make_di()
+        segments = designer.select(designer.analyze(di))
+        probe = designer._concatenate(di, segments)
+        fade = int(0.01 * SAMPLE_RATE)
+        expected = sum(s.length for s in segments) - fade * (len(segments) - 1)
+        self.assertEqual(len(probe), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
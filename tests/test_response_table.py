@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Test Per-Parameter Response Tables
+==================================
+
+Sweeps a simulated nonlinear amp through the loopback audio backend and
+checks table lookups, candidate screening and persistence.
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from hil.io import AudioDeviceManager
+from hil.loopback import LoopbackBackend
+from hil.response_table import ResponseSweep, ResponseTable
+from optimize.loss import PerceptualLoss
+
+SAMPLE_RATE = 22050
+
+
+class Amp:
+    """Nonlinear device: drive into tanh clipping, then output level."""
+
+    def __init__(self):
+        self.parameters = {'drive': 64, 'level': 64}
+
+    def process_audio(self, audio):
+        drive = 1.0 + self.parameters['drive'] / 8.0
+        level = self.parameters['level'] / 127.0
+        return level * np.tanh(drive * np.asarray(audio, dtype=np.float64))
+
+
+def make_sweep(device, resolution=16):
+    backend = LoopbackBackend(processor=device, sample_rate=SAMPLE_RATE, latency=64, noise_db=None)
+    manager = AudioDeviceManager(SAMPLE_RATE, backend=backend)
+    manager.set_input_device(0)
+    manager.set_output_device(0)
+    manager.round_trip_latency = 64
+    return ResponseSweep(manager, PerceptualLoss(SAMPLE_RATE), resolution=resolution)
+
+
+def make_probe(seconds=0.3):
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return (0.3 * np.sin(2 * np.pi * 110 * t) * np.exp(-3 * t)).astype(np.float32)
+
+
+class TestResponseTable(unittest.TestCase):
+    """Test sweeps, lookups and screening."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.device = Amp()
+        cls.sweep = make_sweep(cls.device)
+        cls.probe = make_probe()
+        cls.table = cls.sweep.run(cls.probe, {'drive': 64, 'level': 64}, cls.device.parameters.__setitem__)
+
+    def measure(self, **parameters):
+        previous = dict(self.device.parameters)
+        self.device.parameters.update(parameters)
+        try:
+            return self.sweep._measure(self.probe, None)
+        finally:
+            self.device.parameters.update(previous)
+
+    def test_sweep_values_cover_the_range(self):
+        self.assertEqual(self.sweep.sweep_values(), [0, 16, 32, 48, 64, 80, 96, 112, 127])
+        self.assertEqual(self.table.parameters, ['drive', 'level'])
+        # Base values restored after each sweep
+        self.assertEqual(self.device.parameters, {'drive': 64, 'level': 64})
+
+    def test_lookup_matches_measurement_on_the_grid(self):
+        log_mel, mfcc = self.table.predict_many([{'drive': 96}])
+        measured_log_mel, measured_mfcc = self.measure(drive=96)
+        np.testing.assert_allclose(log_mel[0], measured_log_mel, atol=1e-2)
+        np.testing.assert_allclose(mfcc[0], measured_mfcc, atol=5e-2)
+
+    def test_screening_ranks_the_true_setting_first(self):
+        target_log_mel, target_mfcc = self.measure(drive=100, level=40)
+        candidates = [{'drive': d, 'level': l} for d in (20, 60, 100) for l in (40, 90)]
+        scores = self.table.score_many(candidates, target_log_mel, target_mfcc)
+        self.assertEqual(candidates[int(np.argmin(scores))], {'drive': 100, 'level': 40})
+
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'table.npz')
+            self.table.save(path)
+            loaded = ResponseTable.load(path)
+        self.assertEqual(loaded.base_values, self.table.base_values)
+        self.assertEqual(loaded.parameters, self.table.parameters)
+        candidates = [{'drive': 70, 'level': 10}]
+        np.testing.assert_allclose(loaded.predict_many(candidates)[0], self.table.predict_many(candidates)[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
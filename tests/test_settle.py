@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Test Adaptive Settle Detection
+==============================
+
+Tests for the settle detector using a simulated return signal driven by a
+virtual clock: a decaying reverb tail over a constant noise floor.
+"""
+
+import os
+import sys
+import unittest
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from hil.settle import SettleDetector, SettleStatistics
+
+
+class VirtualMonitor:
+    """Return signal whose tail decays by 60 dB every ``rt60`` seconds."""
+
+    def __init__(self, sample_rate=44100, rt60=0.0, tail_db=-10.0, noise_db=-70.0):
+        self.sample_rate = sample_rate
+        self.rt60 = rt60
+        self.tail_db = tail_db
+        self.noise_db = noise_db
+        self.now = 0.0
+        self.rng = np.random.default_rng(0)
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+    def clock(self):
+        return self.now
+
+    def read(self, num_samples):
+        t = self.now - np.arange(num_samples)[::-1] / self.sample_rate
+        noise = self.rng.standard_normal(num_samples) * 10 ** (self.noise_db / 20)
+        if self.rt60 <= 0:
+            return noise
+        level_db = np.where(t >= 0, self.tail_db - 60.0 * t / self.rt60, self.tail_db)
+        tone = np.sin(2 * np.pi * 440 * t) * np.sqrt(2) * 10 ** (level_db / 20)
+        return noise + tone
+
+
+def make_detector(monitor, **kwargs):
+    detector = SettleDetector(monitor.read, sample_rate=monitor.sample_rate, **kwargs)
+    detector._sleep = monitor.sleep
+    detector._clock = monitor.clock
+    return detector
+
+
+class TestSettleDetector(unittest.TestCase):
+    """Test settle detection and per-effect statistics."""
+
+    def test_silent_output_settles_quickly(self):
+        """Without a tail, the wait is one polling block."""
+        monitor = VirtualMonitor()
+        detector = make_detector(monitor)
+        detector.noise_floor_db = -70.0
+
+        waited = detector.wait('amp')
+        self.assertLess(waited, 0.05)
+
+    def test_waits_for_reverb_tail(self):
+        """A long tail is waited out until it reaches the noise floor."""
+        monitor = VirtualMonitor(rt60=2.0)
+        detector = make_detector(monitor)
+        detector.noise_floor_db = -70.0
+
+        waited = detector.wait('reverb')
+        # -10 dB -> -64 dB at 30 dB/s takes 1.8 s
+        self.assertGreater(waited, 1.6)
+        self.assertLess(waited, 2.2)
+        self.assertEqual(detector.statistics.summary()['reverb']['timeouts'], 0)
+
+    def test_fallback_uses_learned_times(self):
+        """Without monitor, the learned p90 per effect type is used."""
+        statistics = SettleStatistics()
+        for seconds in (0.5, 0.6, 0.7):
+            statistics.observe('delay', seconds)
+        detector = SettleDetector(None, statistics=statistics, fallback_wait=0.1)
+        detector._sleep = lambda seconds: None
+
+        self.assertAlmostEqual(detector.wait('delay'), 0.68, places=3)
+        self.assertEqual(detector.wait('amp'), 0.1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Test Device Slot Scheduler
+==========================
+
+Tests for bulk-write messages and the LRU policy of candidate slots.
+"""
+
+import os
+import sys
+import unittest
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from hil.slot_scheduler import DeviceSlotScheduler
+from magicstomp_sysex import build_bulk_patch_messages, parse_bulk_message
+
+
+def make_candidate(value):
+    common = [0] * 32
+    common[1] = 0x08
+    effect = [value] * 127
+    return common, effect
+
+
+class FakeAdapter:
+    """Records bulk writes and Program Changes."""
+
+    def __init__(self):
+        self.writes = []
+        self.programs = []
+
+    def write_patch(self, slot, common, effect, interval=0.0):
+        self.writes.append(slot)
+        return True
+
+    def program_change(self, program, channel=0):
+        self.programs.append(program)
+        return 0.0
+
+
+class TestBulkMessages(unittest.TestCase):
+    """Bulk-write messages must parse back to the same patch."""
+
+    def test_round_trip(self):
+        common, effect = make_candidate(17)
+        messages = build_bulk_patch_messages(5, common, effect)
+        parsed = [parse_bulk_message(msg[1:-1]) for msg in messages]
+        self.assertEqual(parsed, [('start', 5), ('common', common),
+                                  ('effect', effect), ('end', 5)])
+
+
+class TestDeviceSlotScheduler(unittest.TestCase):
+    """Test LRU residency of candidates."""
+
+    def setUp(self):
+        self.adapter = FakeAdapter()
+        self.scheduler = DeviceSlotScheduler(self.adapter, slots=[90, 91],
+                                             write_interval=0.0)
+
+    def test_preload_then_switch_is_single_message(self):
+        a, b = make_candidate(1), make_candidate(2)
+        self.assertEqual(self.scheduler.preload([a, b]), [90, 91])
+
+        self.scheduler.activate(*b)
+        self.scheduler.activate(*a)
+        self.assertEqual(self.adapter.writes, [90, 91])
+        self.assertEqual(self.adapter.programs, [91, 90])
+        self.assertEqual(self.scheduler.get_statistics()['hits'], 2)
+
+    def test_lru_eviction(self):
+        a, b, c = make_candidate(1), make_candidate(2), make_candidate(3)
+        self.scheduler.preload([a, b])
+        self.scheduler.activate(*a)
+
+        # b is least recently used and gets replaced by c
+        self.scheduler.activate(*c)
+        self.assertEqual(self.adapter.programs[-1], 91)
+        self.assertTrue(self.scheduler.is_resident(*a))
+        self.assertFalse(self.scheduler.is_resident(*b))
+        self.assertEqual(self.scheduler.get_statistics()['evictions'], 1)
+
+    def test_batch_larger_than_pool_is_written_once(self):
+        scheduler = DeviceSlotScheduler(self.adapter, slots=[90, 91, 92], write_interval=0.0)
+        batch = [make_candidate(value) for value in range(9)]
+
+        for chunk in scheduler.chunks(batch):
+            scheduler.preload(chunk)
+            for candidate in chunk:
+                scheduler.activate(*candidate)
+
+        stats = scheduler.get_statistics()
+        self.assertEqual(stats['hits'], 9)
+        self.assertEqual(stats['misses'], 0)
+        self.assertEqual(stats['slot_writes'], 9)
+
+    def test_preload_never_evicts_its_own_batch(self):
+        a, b, c = make_candidate(1), make_candidate(2), make_candidate(3)
+        self.scheduler.preload([a, b])
+        self.scheduler.activate(*a)
+
+        self.assertEqual(self.scheduler.preload([b, c]), [91, 90])
+        self.assertTrue(self.scheduler.is_resident(*b))
+        with self.assertRaises(ValueError):
+            self.scheduler.preload([a, b, c])
+
+    def test_switch_latency_is_reported_separately_from_dispatch(self):
+        a = make_candidate(1)
+        self.scheduler.activate(*a)
+        self.assertNotIn('switch_latency_mean_ms', self.scheduler.get_statistics())
+
+        self.scheduler.record_switch(0.05)
+        stats = self.scheduler.get_statistics()
+        self.assertIn('dispatch_latency_mean_ms', stats)
+        self.assertAlmostEqual(stats['switch_latency_mean_ms'], 50.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
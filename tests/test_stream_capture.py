@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Test Continuous Multi-Candidate Capture
+=======================================
+
+Tests the timeline, scheduling and slicing of the continuous capture with a
+fake audio manager simulating a device whose gain is switched by events.
+"""
+
+import os
+import sys
+import unittest
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from hil.stream_capture import ContinuousCaptureSession
+
+
+class FakeDuplexManager:
+    """Device with a gain set by events and a fixed round-trip latency."""
+
+    def __init__(self, sample_rate=8000, latency=300):
+        self.sample_rate = sample_rate
+        self.round_trip_latency = latency
+        self.gain_compensation = 1.0
+        self.device_gain = 0.0
+        self.streams_opened = 0
+
+    def play_and_record_scheduled(self, audio_data, events):
+        self.streams_opened += 1
+        events = sorted(events, key=lambda event: event[0])
+        # The device sees the output half-way through the round trip
+        half = self.round_trip_latency // 2
+        processed = np.zeros(len(audio_data), dtype=np.float32)
+        next_event = 0
+        for n, sample in enumerate(audio_data):
+            while next_event < len(events) and events[next_event][0] <= n:
+                events[next_event][1]()
+                next_event += 1
+            if n + half < len(processed):
+                processed[n + half] = sample * self.device_gain
+        recording = np.zeros_like(processed)
+        recording[self.round_trip_latency - half:] = processed[:len(processed) - (self.round_trip_latency - half)]
+        return recording
+
+
+class TestContinuousCapture(unittest.TestCase):
+    """Test the continuous capture session."""
+
+    def test_each_slice_holds_its_candidate(self):
+        manager = FakeDuplexManager()
+        session = ContinuousCaptureSession(manager, gap_duration=0.1)
+        probe = np.ones(400, dtype=np.float32)
+        gains = [0.2, 0.5, 0.9, 0.1]
+
+        def setter(gain):
+            def apply():
+                manager.device_gain = gain
+            return apply
+
+        captures = session.capture(probe, [setter(g) for g in gains])
+
+        self.assertEqual(manager.streams_opened, 1)
+        self.assertEqual(len(captures), len(gains))
+        for gain, capture in zip(gains, captures):
+            self.assertEqual(len(capture), len(probe))
+            np.testing.assert_allclose(capture, gain, rtol=1e-6)
+
+    def test_switches_happen_in_gaps(self):
+        manager = FakeDuplexManager()
+        session = ContinuousCaptureSession(manager, gap_duration=0.1)
+        playback, starts, switches = session.build_timeline(np.ones(400), 3)
+
+        gap = int(0.1 * manager.sample_rate)
+        for index in range(1, 3):
+            previous_end = starts[index - 1] + 400
+            # After the previous repetition is back, before the next one
+            self.assertGreaterEqual(switches[index], previous_end + manager.round_trip_latency)
+            self.assertLess(switches[index], starts[index])
+        self.assertEqual(len(playback), 3 * (gap + 400) + manager.round_trip_latency)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Test Streaming Perceptual Loss
+==============================
+
+Checks that the block-wise loss accumulator gives the same value as the
+batch PerceptualLoss computation, whatever the block size, with and without
+alignment.
+"""
+
+import os
+import sys
+import unittest
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from optimize.loss import PerceptualLoss
+
+
+class TestStreamingLoss(unittest.TestCase):
+    """Compare streaming and batch perceptual loss."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.loss = PerceptualLoss(44100)
+        rng = np.random.default_rng(3)
+        t = np.arange(int(44100 * 1.5)) / 44100
+        cls.target = 0.5 * np.sin(2 * np.pi * 220 * t) * np.exp(-t)
+        cls.processed = np.tanh(3 * cls.target) + 0.01 * rng.standard_normal(len(t))
+
+    def stream(self, processed, block_size, align_signals=False):
+        accumulator = self.loss.streaming(self.target, align_signals=align_signals)
+        accumulator.reset(expected_samples=len(processed))
+        for start in range(0, len(processed), block_size):
+            accumulator.push(processed[start:start + block_size])
+        return accumulator.finish()
+
+    def test_matches_batch_for_any_block_size(self):
+        """Streaming and batch losses agree for several block sizes."""
+        expected = self.loss.compute_loss(self.target, self.processed, align_signals=False)
+        for block_size in (64, 511, 1024, 4096):
+            with self.subTest(block_size=block_size):
+                self.assertAlmostEqual(self.stream(self.processed, block_size), expected, places=9)
+
+    def test_processed_shorter_and_longer_than_target(self):
+        """Frame count mismatch is handled like the batch loss."""
+        for processed in (self.processed[:30000],
+                          np.concatenate([self.processed, self.processed[:20000]])):
+            expected = self.loss.compute_loss(self.target, processed, align_signals=False)
+            self.assertAlmostEqual(self.stream(processed, 1000), expected, places=9)
+
+    def test_partial_loss_and_reset(self):
+        """Partial loss is available mid-stream and reset starts over."""
+        accumulator = self.loss.streaming(self.target, align_signals=False)
+        accumulator.push(self.processed[:22050])
+        self.assertGreater(accumulator.frames_processed, 0)
+        self.assertGreater(accumulator.partial_loss(), 0.0)
+
+        accumulator.reset()
+        self.assertEqual(accumulator.frames_processed, 0)
+        accumulator.push(self.processed)
+        expected = self.loss.compute_loss(self.target, self.processed, align_signals=False)
+        self.assertAlmostEqual(accumulator.finish(), expected, places=9)
+
+    def test_delayed_signal_matches_aligned_batch_loss(self):
+        """With alignment, a delayed capture gives the batch loss."""
+        for delay in (300, -300):
+            with self.subTest(delay=delay):
+                processed = np.roll(self.processed, delay)[:-400]
+                expected = self.loss.compute_loss(self.target, processed)
+                self.assertNotAlmostEqual(
+                    self.loss.compute_loss(self.target, processed, align_signals=False), expected, places=3
+                )
+                for block_size in (512, 4096):
+                    self.assertAlmostEqual(self.stream(processed, block_size, align_signals=True),
+                                           expected, places=9)
+
+    def test_capture_shorter_than_alignment_window(self):
+        """A capture shorter than the window is aligned when finished."""
+        processed = self.processed[:5000]
+        expected = self.loss.compute_loss(self.target, processed)
+        accumulator = self.loss.streaming(self.target, align_window=44100)
+        accumulator.reset(expected_samples=len(processed))
+        accumulator.push(processed)
+        self.assertEqual(accumulator.frames_processed, 0)
+        self.assertAlmostEqual(accumulator.finish(), expected, places=9)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Test Precompiled SysEx Inventory
+================================
+
+Checks that the compiled tables match the JSON inventory and that they are
+only rebuilt when the source contents change.
+"""
+
+import importlib.util
+import json
+import os
+import sys
+import tempfile
+import types
+import unittest
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import sysex_inventory
+from adapter_magicstomp import _SysexInventory
+
+JSON_PATH = Path(sysex_inventory.BASE_DIR) / "sysex_inventory.json"
+
+
+class TestSysexInventory(unittest.TestCase):
+    """Test the compiled inventory."""
+
+    def test_matches_json_inventory(self):
+        from_json = _SysexInventory(JSON_PATH)._effects
+        compiled = _SysexInventory()._effects
+        self.assertEqual(compiled, from_json)
+
+        with JSON_PATH.open(encoding="utf-8") as handle:
+            effects = json.load(handle)["effects"]
+        effect_type, name, _ = sysex_inventory.load_inventory()["Chorus"]
+        self.assertEqual((effect_type, name), (effects["Chorus"]["effect_id"], effects["Chorus"]["friendly_name"]))
+
+    def test_single_cached_copy(self):
+        self.assertIs(_SysexInventory()._effects, _SysexInventory()._effects)
+
+    def test_compiled_module_is_importable(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "table.py"
+            effects = sysex_inventory.compile_inventory(path)
+            spec = importlib.util.spec_from_file_location("table", path)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+        self.assertEqual(module.EFFECTS, effects)
+        self.assertTrue(sysex_inventory._is_current(module))
+
+    def test_staleness_uses_content_digest(self):
+        digest = sysex_inventory._source_digest()
+        # Touched sources with identical contents: still current
+        touched = types.SimpleNamespace(SOURCE_STAMP=(), SOURCE_DIGEST=digest)
+        self.assertTrue(sysex_inventory._is_current(touched))
+        edited = types.SimpleNamespace(SOURCE_STAMP=(), SOURCE_DIGEST="0" * 40)
+        self.assertFalse(sysex_inventory._is_current(edited))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Test Feature-Space Warm Starts
+==============================
+
+Tests the nearest-neighbour feature index and the warm starts of the
+coordinate search optimizer.
+"""
+
+import os
+import sys
+import tempfile
+import time
+import unittest
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from optimize.search import CoordinateSearchOptimizer, ParameterBounds, ParameterSpace
+from optimize.warm_start import FEATURE_NAMES, FeatureIndex, build_feature_index, feature_vector
+
+
+def render_features(parameters):
+    """Fake analysis: features are a smooth function of the parameters."""
+    return {
+        'spectral_tilt_db': 20.0 * parameters['treble'] - 10.0,
+        'spectral_centroid_mean': 1000.0 + 3000.0 * parameters['treble'],
+        'thd_proxy': parameters['gain'] ** 2,
+        'onset_delay_ms': (0.0, 0.0),
+        'reverb_estimate': (0.5 + 2.0 * parameters['reverb_mix'], parameters['reverb_mix']),
+        'lfo_rate_hz': (None, 0.0),
+    }
+
+
+class TestFeatureIndex(unittest.TestCase):
+    """Test the k-nearest-neighbour index."""
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.library = [{'treble': t, 'gain': g, 'reverb_mix': r} for t, g, r in rng.uniform(size=(200, 3))]
+        self.index = build_feature_index(self.library, render_features, lambda features: features)
+
+    def test_feature_vector(self):
+        features = render_features({'treble': 0.5, 'gain': 0.5, 'reverb_mix': 0.2})
+        vector = feature_vector(features)
+        self.assertEqual(len(vector), len(FEATURE_NAMES))
+        self.assertEqual(vector[FEATURE_NAMES.index('lfo_rate_hz')], 0.0)
+        self.assertEqual(len(feature_vector(features, mfcc=np.zeros((13, 40)))), len(FEATURE_NAMES) + 26)
+
+    def test_nearest_patch_is_returned(self):
+        target = self.library[17]
+        neighbours = self.index.query(feature_vector(render_features(target)), k=3)
+        self.assertEqual(neighbours[0]['index'], 17)
+        self.assertAlmostEqual(neighbours[0]['distance'], 0.0)
+        self.assertEqual(neighbours[0]['parameters'], target)
+        self.assertLessEqual(neighbours[1]['distance'], neighbours[2]['distance'])
+
+        starts = self.index.warm_starts(render_features(target), k=2)
+        self.assertEqual(starts[0], target)
+
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'index.npz')
+            self.index.save(path)
+            loaded = FeatureIndex.load(path)
+        self.assertEqual(len(loaded), len(self.index))
+        features = feature_vector(render_features(self.library[3]))
+        self.assertEqual(loaded.query(features, 1)[0]['index'], 3)
+
+    def test_large_library_query_time(self):
+        rng = np.random.default_rng(1)
+        index = FeatureIndex(['x'])
+        for row in rng.normal(size=(100000, len(FEATURE_NAMES))):
+            index._features.append(row)
+            index._parameters.append(np.zeros(1))
+        index.build()
+
+        start = time.perf_counter()
+        for query in rng.normal(size=(100, len(FEATURE_NAMES))):
+            index.query(query, k=5)
+        self.assertLess((time.perf_counter() - start) / 100, 0.05)
+
+
+class TestWarmStartOptimizer(unittest.TestCase):
+    """Test warm starts of the coordinate search."""
+
+    def make_space(self):
+        space = ParameterSpace()
+        space.parameters = {
+            'x': ParameterBounds(0.0, 1.0, 0.05, 0.0),
+            'y': ParameterBounds(0.0, 1.0, 0.05, 0.0),
+        }
+        return space
+
+    def loss(self, parameters):
+        return (parameters['x'] - 0.8) ** 2 + (parameters['y'] - 0.6) ** 2
+
+    def test_starts_from_best_warm_start(self):
+        cold = CoordinateSearchOptimizer(self.make_space(), self.loss, max_iterations=50).optimize()
+        optimizer = CoordinateSearchOptimizer(self.make_space(), self.loss, max_iterations=50)
+        warm = optimizer.optimize(warm_starts=[{'x': 0.2, 'y': 0.9}, {'x': 0.75, 'y': 0.6}])
+
+        self.assertEqual(warm['warm_start'], 1)
+        self.assertLess(warm['iterations'], cold['iterations'])
+        self.assertLessEqual(warm['final_loss'], cold['final_loss'] + 1e-12)
+        self.assertIsNone(cold['warm_start'])
+
+    def test_worse_warm_starts_are_ignored(self):
+        space = self.make_space()
+        space.set_parameter_value('x', 0.8)
+        space.set_parameter_value('y', 0.6)
+        results = CoordinateSearchOptimizer(space, self.loss).optimize(warm_starts=[{'x': 0.0, 'y': 0.0}])
+        self.assertIsNone(results['warm_start'])
+        self.assertAlmostEqual(results['best_parameters']['x'], 0.8)
+
+    def test_partial_warm_starts_start_from_the_initial_parameters(self):
+        space = self.make_space()
+        evaluated = []
+
+        def moving_loss(parameters):
+            # Like the HIL loss, applies each candidate to the parameter space
+            for name, value in parameters.items():
+                space.set_parameter_value(name, value)
+            evaluated.append(dict(parameters))
+            return self.loss(parameters)
+
+        CoordinateSearchOptimizer(space, moving_loss, max_iterations=1).optimize(
+            warm_starts=[{'y': 0.9}, {'x': 0.8}])
+        self.assertIn({'x': 0.0, 'y': 0.9}, evaluated)
+        self.assertIn({'x': 0.8, 'y': 0.0}, evaluated)
+        self.assertNotIn({'x': 0.8, 'y': 0.9}, evaluated[:3])
+
+
+if __name__ == '__main__':
+    unittest.main()